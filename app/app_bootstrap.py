@@ -1,12 +1,13 @@
 """Application bootstrap helpers for Flask/Specter composition."""
 
 import logging
+import logging.handlers
 from datetime import timedelta
 
 from flask_socketio import SocketIO
 
 from app.config import Config, config_by_name
-from app.utils.log_utils import LogObfuscationFilter
+from app.utils.log_utils import LogObfuscationFilter, create_async_log_handler
 
 
 def configure_root_logging() -> None:
@@ -18,14 +19,22 @@ def configure_root_logging() -> None:
         datefmt='%Y-%m-%d %H:%M:%S',
     )
 
+    # Obfuscate at the handlers so only records that are actually emitted pay
+    # for it; logger-level filters would also miss propagated child records.
     root_logger = logging.getLogger()
-    if not any(isinstance(current, LogObfuscationFilter) for current in root_logger.filters):
-        root_logger.addFilter(LogObfuscationFilter())
-
     for handler in root_logger.handlers:
         if not any(isinstance(current, LogObfuscationFilter) for current in handler.filters):
             handler.addFilter(LogObfuscationFilter())
 
+    if Config.ASYNC_LOGGING and not any(
+        isinstance(handler, logging.handlers.QueueHandler) for handler in root_logger.handlers
+    ):
+        target_handlers = list(root_logger.handlers)
+        queue_handler, _ = create_async_log_handler(target_handlers)
+        for handler in target_handlers:
+            root_logger.removeHandler(handler)
+        root_logger.addHandler(queue_handler)
+
 
 def create_socketio() -> SocketIO:
     """Create the shared Socket.IO server with GhostHub defaults."""
@@ -71,6 +80,7 @@ def build_specter_services():
     from app.services.core.app_startup_service import AppStartupService
     from app.services.core.runtime_config_service import RuntimeConfigService
     from app.services.core.socket_transport_service import SocketTransportService
+    from app.services.core.sqlite_writer_service import SqliteWriterService
     from app.services.core.stale_media_cleanup_runtime_service import (
         StaleMediaCleanupRuntimeService,
     )
@@ -84,10 +94,15 @@ def build_specter_services():
     from app.services.media.indexing_runtime_service import IndexingRuntimeService
     from app.services.media.library_event_service import LibraryEventService
     from app.services.media.library_runtime_service import LibraryRuntimeService
+    from app.services.media.media_watch_service import MediaWatchService
     from app.services.media.progress_event_service import ProgressEventService
+    from app.services.media.progress_write_behind_service import ProgressWriteBehindService
     from app.services.media.storage_event_handler_service import (
         MediaStorageEventHandlerService,
     )
+    from app.services.media.subtitle_prewarm_runtime_service import (
+        SubtitlePrewarmRuntimeService,
+    )
     from app.services.media.thumbnail_runtime_service import ThumbnailRuntimeService
     from app.services.media.worker_boot_service import MediaWorkerBootService
     from app.services.storage.storage_drive_service import StorageDriveRuntimeService
@@ -123,13 +138,17 @@ def build_specter_services():
         LibraryEventService(),
         LibraryRuntimeService(),
         MediaStorageEventHandlerService(),
+        MediaWatchService(),
         MeshWatchdogService(),
         ProgressEventService(),
+        ProgressWriteBehindService(),
         RuntimeConfigService(),
         SocketTransportService(),
+        SqliteWriterService(),
         StaleMediaCleanupRuntimeService(),
         StorageEventService(),
         StorageWorkerBootService(),
+        SubtitlePrewarmRuntimeService(),
         SyncEventService(),
         ThumbnailRuntimeService(),
         TunnelUrlCaptureService(),
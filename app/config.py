@@ -67,14 +67,14 @@ class Config:
     ENABLE_TV_SORTING = True  # Enable intelligent TV season/episode sorting
     VIDEO_END_BEHAVIOR = "loop"  # What to do when video ends: "stop", "loop", or "play_next"
     DEBUG_MODE = False  # Enable verbose console/debug logging (set True for development)
+    ASYNC_LOGGING = False  # Hand log records to a background listener so handler I/O stays off the request path
     MAX_CATEGORY_SCAN_DEPTH = 0  # 0 = unlimited scan depth for nested media folders
     UI_SETTINGS_MODE = "basic"  # Settings modal mode: "basic" (simplified) or "advanced" (all settings)
     AUTO_OPTIMIZE_FOR_HARDWARE = True  # Enable dynamic scaling based on RAM
     ENABLE_GZIP_COMPRESSION = True  # Compress text responses when clients support gzip
     GZIP_MIN_SIZE = 1024  # Skip compression for tiny responses to save CPU on Pi hardware
     GZIP_COMPRESSION_LEVEL = 5  # Middle-ground level for CPU vs bandwidth on embedded devices
-    ENABLE_GZIP_CACHE = True  # Reuse compressed static assets instead of recompressing on each request
-    GZIP_CACHE_MAX_ENTRIES = 64  # Keep the in-memory cache small for Raspberry Pi deployments
+    PRECOMPRESS_STATIC_ASSETS = True  # Write .br/.gz siblings for static assets at startup instead of compressing per request
     
     # HDMI-CEC TV Wake-up Configuration
     ENABLE_CEC_WAKE = True  # Enable automatic TV wake-up via CEC before casting
@@ -95,11 +95,13 @@ class Config:
     DOWNLOAD_RATE_LIMIT_GLOBAL = 500.0     # Mbps total for all downloads
     STREAM_MAX_DURATION_SECONDS = 0         # 0 = unlimited, >0 = hard cap per stream request
     STREAM_READ_TIMEOUT_SECONDS = 15        # Per-chunk file read timeout for streaming
+    STREAM_USE_SENDFILE = True              # Stream files via os.sendfile (gunicorn_worker) for non-Tailscale clients
     STALE_MEDIA_CLEANUP_INTERVAL = 21600    # Run stale media cleanup every 6 hours
     STALE_MEDIA_CLEANUP_BATCH_SIZE = 5000   # Max rows validated per cleanup pass
     INDEXING_CHUNK_SIZE_BASE = 25           # 2GB tier: files processed per indexing batch
     INDEXING_CHUNK_SIZE_STANDARD = 75       # 4GB tier
     INDEXING_CHUNK_SIZE_PRO = 150           # 8GB tier
+    INDEXING_FULL_RECONCILE_INTERVAL = 86400  # Full rescan cadence; in between only changed dirs are listed (0 = always full)
 
     # Connection-type rate limit multipliers (applied by rate_limit_service)
     RATE_LIMIT_MULTIPLIER_ETHERNET = 4.0   # Ethernet: 50 * 4 = 200 Mbps effective
@@ -234,6 +236,7 @@ _configurable_keys_info = {
     'ENABLE_TV_SORTING': lambda v: str(v).lower() == 'true',
     'VIDEO_END_BEHAVIOR': str,
     'DEBUG_MODE': lambda v: str(v).lower() == 'true',
+    'ASYNC_LOGGING': lambda v: str(v).lower() == 'true',
     'UPLOAD_CHUNK_SIZE_FAST': int,
     'UPLOAD_CHUNK_SIZE_MEDIUM': int,
     'UPLOAD_CHUNK_SIZE_SLOW': int,
@@ -243,19 +246,20 @@ _configurable_keys_info = {
     'DOWNLOAD_RATE_LIMIT_GLOBAL': float,
     'STREAM_MAX_DURATION_SECONDS': float,
     'STREAM_READ_TIMEOUT_SECONDS': float,
+    'STREAM_USE_SENDFILE': lambda v: str(v).lower() == 'true',
     'STALE_MEDIA_CLEANUP_INTERVAL': int,
     'STALE_MEDIA_CLEANUP_BATCH_SIZE': int,
     'INDEXING_CHUNK_SIZE_BASE': int,
     'INDEXING_CHUNK_SIZE_STANDARD': int,
     'INDEXING_CHUNK_SIZE_PRO': int,
+    'INDEXING_FULL_RECONCILE_INTERVAL': int,
     'MAX_CATEGORY_SCAN_DEPTH': int,
     'UI_SETTINGS_MODE': str,
     'AUTO_OPTIMIZE_FOR_HARDWARE': lambda v: str(v).lower() == 'true',
     'ENABLE_GZIP_COMPRESSION': lambda v: str(v).lower() == 'true',
     'GZIP_MIN_SIZE': int,
     'GZIP_COMPRESSION_LEVEL': int,
-    'ENABLE_GZIP_CACHE': lambda v: str(v).lower() == 'true',
-    'GZIP_CACHE_MAX_ENTRIES': int,
+    'PRECOMPRESS_STATIC_ASSETS': lambda v: str(v).lower() == 'true',
 }
 
 for key, type_converter in _configurable_keys_info.items():
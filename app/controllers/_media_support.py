@@ -77,7 +77,9 @@ class MediaVisibilitySupport:
             if file_path and hidden_content_service.is_file_hidden(file_path):
                 continue
 
-            if not file_path and rel_path and hidden_files_set:
+            # Suffix matching needs the path strings, which only the small
+            # frozenset form keeps; HiddenPathIndex stores hashes.
+            if not file_path and rel_path and isinstance(hidden_files_set, frozenset) and hidden_files_set:
                 rel_norm = os.path.normcase(os.path.normpath(rel_path))
                 rel_norm_slash = rel_norm.replace('\\', '/')
                 hidden_by_suffix = False
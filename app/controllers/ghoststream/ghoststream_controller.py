@@ -5,10 +5,9 @@ import os
 import re
 import socket
 
-import requests as sync_requests
 from flask import Response, request, send_file
 
-from app.services.ghoststream import ghoststream_service, transcode_cache_service
+from app.services.ghoststream import ghoststream_service, hls_proxy_service, transcode_cache_service
 from app.services.media.category_query_service import get_category_by_id
 from specter import Controller, registry
 from app.utils.auth import admin_required, get_request_session_id, is_current_admin_session_with_flag_sync
@@ -492,6 +491,7 @@ class GhostStreamController(Controller):
             'server_count': len(servers),
             'servers': server_health,
             'preferred_server': ghoststream_service.get_preferred_server(),
+            'proxy': hls_proxy_service.get_proxy_stats(),
             'tips': [
                 'Ensure GhostStream is running on another device',
                 'Both devices must be on the same network',
@@ -515,16 +515,21 @@ class GhostStreamController(Controller):
             return {'error': 'No GhostStream server available'}, 503
 
         try:
-            request_headers = ghoststream_service.get_job_auth_headers(job_id)
-            response = sync_requests.get(
-                upstream_url,
-                timeout=120.0,
-                allow_redirects=False,
-                headers=request_headers,
-            )
+            if request.method == 'HEAD':
+                asset = hls_proxy_service.head_hls_asset(
+                    upstream_url,
+                    auth_headers=ghoststream_service.get_job_auth_headers(job_id),
+                )
+            else:
+                asset = hls_proxy_service.open_hls_asset(
+                    upstream_url,
+                    filename,
+                    auth_headers=ghoststream_service.get_job_auth_headers(job_id),
+                    range_header=request.headers.get('Range'),
+                )
 
-            if response.status_code == 307:
-                redirect_url = response.headers.get('location', '')
+            if asset.status == 307:
+                redirect_url = asset.location or ''
                 if redirect_url:
                     match = re.search(r'/stream/([^/]+)/(.+)$', redirect_url)
                     if match:
@@ -537,28 +542,20 @@ class GhostStreamController(Controller):
                             'Location': proxy_redirect,
                             'Access-Control-Allow-Origin': '*',
                         })
-                return Response(response.content, status=307, headers={
+                return Response('', status=307, headers={
                     'Location': redirect_url,
                     'Access-Control-Allow-Origin': '*',
                 })
 
-            if response.status_code != 200:
-                return Response(response.content, status=response.status_code)
-
-            if filename.endswith('.m3u8'):
-                content_type = 'application/vnd.apple.mpegurl'
-            elif filename.endswith('.ts'):
-                content_type = 'video/mp2t'
-            elif filename.endswith('.mp4'):
-                content_type = 'video/mp4'
-            else:
-                content_type = 'application/octet-stream'
+            if asset.status not in (200, 206):
+                return Response(asset.body, status=asset.status)
 
             return Response(
-                response.content,
-                status=200,
-                content_type=content_type,
+                asset.body,
+                status=asset.status,
+                content_type=hls_proxy_service.content_type_for(filename),
                 headers={
+                    **asset.headers,
                     'Access-Control-Allow-Origin': '*',
                     'Accept-Ranges': 'bytes',
                     'Cache-Control': 'no-cache',
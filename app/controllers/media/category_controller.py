@@ -4,13 +4,10 @@ import logging
 import math
 import traceback
 
-from flask import jsonify, request
+from flask import Response, current_app, jsonify, request
 
-from app.services.media.category_cache_service import get_cache_timestamp
-from app.services.media.category_query_service import (
-    get_all_categories_with_details,
-    get_category_by_id,
-)
+from app.services.media.category_query_service import get_category_by_id
+from app.services.media.category_snapshot_service import get_category_snapshot
 from app.services.media.category_service import CategoryService
 from app.services.media import media_catalog_service
 from app.services.media.playlist_service import PlaylistService
@@ -43,116 +40,55 @@ class CategoryController(Controller):
                 media_filter = request.args.get('filter', 'all', type=str).lower()
                 force_refresh = request.args.get('force_refresh', 'false').lower() == 'true'
                 category_id_filter = request.args.get('category_id')
+                parent_name_filter = request.args.get('parent_name')
+                category_ids_filter = request.args.get('category_ids')
 
                 show_hidden = get_show_hidden_flag()
-                categories = get_all_categories_with_details(
-                    use_cache=not force_refresh,
+                snapshot = get_category_snapshot(
                     show_hidden=show_hidden,
+                    force_refresh=force_refresh,
                 )
 
-                parent_name_filter = request.args.get('parent_name')
-                category_ids_filter = request.args.get('category_ids')
+                if category_id_filter and category_id_filter not in snapshot.by_id:
+                    return self._build_single_category_response(
+                        category_id_filter,
+                        show_hidden=show_hidden,
+                    )
+
                 has_explicit_filter = bool(
                     category_id_filter or category_ids_filter or parent_name_filter
                 )
-
-                categories_ts = get_cache_timestamp()
-                etag = (
-                    f"cats-{categories_ts}-{page}-{limit}-{media_filter}-{show_hidden}-"
-                    f"{category_id_filter or ''}-{category_ids_filter or ''}-"
-                    f"{parent_name_filter or ''}"
+                virtual_playlist = (
+                    None if has_explicit_filter else PlaylistService.get_virtual_category()
+                )
+                listing = snapshot.page(
+                    page=page,
+                    limit=limit,
+                    media_filter=media_filter,
+                    category_id=category_id_filter,
+                    category_ids=category_ids_filter,
+                    parent_name=parent_name_filter,
+                    head=virtual_playlist,
                 )
-                if request.headers.get('If-None-Match') == f'"{etag}"' and not force_refresh:
-                    return '', 304
-
-                if category_id_filter:
-                    categories = [
-                        category for category in categories
-                        if category.get('id') == category_id_filter
-                    ]
-                    if not categories:
-                        try:
-                            from app.services.media.hidden_content_service import (
-                                should_block_category_access,
-                            )
-                            if should_block_category_access(category_id_filter, show_hidden):
-                                categories = []
-                            else:
-                                resolved = get_category_by_id(category_id_filter)
-                                if resolved:
-                                    categories = [
-                                        self._build_category_summary_payload(
-                                            resolved,
-                                            show_hidden=show_hidden,
-                                        )
-                                    ]
-                        except Exception:
-                            resolved = get_category_by_id(category_id_filter)
-                            if resolved:
-                                categories = [
-                                    self._build_category_summary_payload(
-                                        resolved,
-                                        show_hidden=show_hidden,
-                                    )
-                                ]
-                elif category_ids_filter:
-                    id_set = {item.strip() for item in category_ids_filter.split(',')}
-                    categories = [
-                        category for category in categories
-                        if category.get('id') in id_set
-                    ]
-                elif parent_name_filter:
-                    parent_name = parent_name_filter.lower()
-                    filtered = []
-                    for category in categories:
-                        name = category.get('name', '')
-                        if '(' not in name:
-                            continue
-                        breadcrumb = name.split('(', 1)[1].rstrip(')')
-                        parts = [part.strip().lower() for part in breadcrumb.split('›')]
-                        if parent_name in parts:
-                            filtered.append(category)
-                    categories = filtered
-
-                if media_filter != 'all':
-                    if media_filter == 'video':
-                        categories = [
-                            category for category in categories
-                            if category.get('containsVideo', False)
-                        ]
-                    elif media_filter == 'image':
-                        categories = [
-                            category for category in categories
-                            if (
-                                not category.get('containsVideo', False) and
-                                category.get('mediaCount', 0) > 0
-                            )
-                        ]
-
-                virtual_playlist = PlaylistService.get_virtual_category()
-                if virtual_playlist and not has_explicit_filter:
-                    categories = [virtual_playlist] + categories
-
-                total = len(categories)
-                if limit > 0:
-                    start = (page - 1) * limit
-                    end = start + limit
-                    categories = categories[start:end]
-
-                total_pages = math.ceil(total / limit) if limit > 0 else 1
 
-                response = jsonify({
-                    'categories': categories,
-                    'pagination': {
-                        'page': page,
-                        'limit': limit,
-                        'total': total,
-                        'totalPages': total_pages,
-                        'hasMore': limit > 0 and (page * limit) < total,
-                    },
-                })
-                response.headers['ETag'] = f'"{etag}"'
+                use_gzip = (
+                    listing.gzip_body is not None and
+                    current_app.config.get('ENABLE_GZIP_COMPRESSION', True) and
+                    request.accept_encodings['gzip'] > 0
+                )
+                etag = f'"{listing.etag}-gz"' if use_gzip else f'"{listing.etag}"'
+                if not force_refresh and request.headers.get('If-None-Match') == etag:
+                    response = Response(status=304)
+                else:
+                    response = Response(
+                        listing.gzip_body if use_gzip else listing.body,
+                        mimetype='application/json',
+                    )
+                    if use_gzip:
+                        response.headers['Content-Encoding'] = 'gzip'
+                response.headers['ETag'] = etag
                 response.headers['Cache-Control'] = 'no-cache'
+                response.vary.add('Accept-Encoding')
                 return response
             except Exception as exc:
                 logger.error("Error in list_categories endpoint: %s", exc)
@@ -236,6 +172,51 @@ class CategoryController(Controller):
                 )
                 return jsonify({'status': 'error', 'message': str(exc)}), 500
 
+    def _build_single_category_response(self, category_id, show_hidden=False):
+        """Resolve a category missing from the snapshot (e.g. a deep auto:: child)."""
+        from app.services.media.hidden_content_service import should_block_category_access
+
+        categories = []
+        try:
+            blocked = should_block_category_access(category_id, show_hidden)
+        except Exception:
+            blocked = False
+        if not blocked:
+            resolved = get_category_by_id(category_id)
+            if resolved:
+                categories = [
+                    self._build_category_summary_payload(
+                        resolved,
+                        show_hidden=show_hidden,
+                    )
+                ]
+
+        limit = request.args.get('limit', 0, type=int)
+        media_filter = request.args.get('filter', 'all', type=str).lower()
+        if media_filter == 'video':
+            categories = [
+                category for category in categories
+                if category.get('containsVideo', False)
+            ]
+        elif media_filter == 'image':
+            categories = [
+                category for category in categories
+                if not category.get('containsVideo', False) and category.get('mediaCount', 0) > 0
+            ]
+
+        response = jsonify({
+            'categories': categories,
+            'pagination': {
+                'page': request.args.get('page', 1, type=int),
+                'limit': limit,
+                'total': len(categories),
+                'totalPages': math.ceil(len(categories) / limit) if limit > 0 else 1,
+                'hasMore': False,
+            },
+        })
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
     def _build_category_summary_payload(self, category, show_hidden=False):
         """Build a single-category payload, including deep auto:: fallback."""
         from app.services.media import media_index_service
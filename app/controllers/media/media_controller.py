@@ -55,6 +55,7 @@ class MediaController(Controller):
                     }), 400
                 limit = request.args.get('limit', 100, type=int)
                 limit = max(1, min(limit, 250))
+                offset = max(0, request.args.get('offset', 0, type=int))
                 folders_limit = request.args.get('folders_limit', 100, type=int)
                 folders_limit = max(1, min(folders_limit, 250))
                 parent_limit = request.args.get('parent_limit', 50, type=int)
@@ -70,6 +71,7 @@ class MediaController(Controller):
                     query,
                     limit=limit,
                     show_hidden=show_hidden,
+                    offset=offset,
                 )
 
                 folder_match_rows = []
@@ -350,6 +352,7 @@ class MediaController(Controller):
                     'results': list(results_by_category.values()),
                     'total_categories': len(results_by_category),
                     'total_results': len(search_results),
+                    'offset': offset,
                     'total_matched_folders': len(matched_folders),
                     'total_matched_parent_folders': len(matched_parent_folders),
                     'folders_truncated': folders_truncated,
@@ -427,6 +430,12 @@ class MediaController(Controller):
                     get_runtime_config_value('DEFAULT_PAGE_SIZE', 50),
                     type=int,
                 )
+                # Cursor mode: an empty `cursor` asks for the first keyset page,
+                # later pages pass back `pagination.nextCursor`.
+                cursor = request.args.get('cursor')
+                cursor_mode = cursor is not None
+                if cursor_mode:
+                    page = 1
                 sort_by = request.args.get('sort_by', 'name')
                 sort_order = request.args.get('sort_order', 'ASC').upper()
                 filter_type = request.args.get('filter', 'all')
@@ -525,7 +534,7 @@ class MediaController(Controller):
                                 files.append(item)
 
                             subfolders = []
-                            if page == 1:
+                            if page == 1 and not cursor:
                                 try:
                                     subfolders = SortService.get_subfolders(
                                         category_id,
@@ -574,28 +583,59 @@ class MediaController(Controller):
                     f"{category_id}-{version_hash}-{page}-{limit}-{sort_by}-"
                     f"{sort_order}-{filter_type}-{int(show_hidden)}-"
                     f"{int(bool(effective_shuffle))}-{int(include_total)}"
-                    f"-{subfolder or ''}"
+                    f"-{subfolder or ''}-{cursor or ''}"
                 )
                 if request.headers.get('If-None-Match') == f'"{etag}"' and not force_refresh:
                     return '', 304
 
                 session_id = self._resolve_media_session_id()
-                fetch_limit = limit + 1 if (not include_total and limit > 0) else limit
-                media_files = SortService.get_sorted_media(
-                    category_id=category_id,
-                    subfolder=subfolder,
-                    sort_by=sort_by,
-                    shuffle=shuffle,
-                    sort_order=sort_order,
-                    page=page,
-                    limit=fetch_limit,
-                    filter_type=filter_type,
-                    show_hidden=show_hidden,
-                    session_id=session_id,
-                    force_refresh=force_refresh,
-                )
+                next_cursor = None
+                if cursor_mode:
+                    try:
+                        media_files, next_cursor = SortService.get_sorted_media_page(
+                            category_id=category_id,
+                            subfolder=subfolder,
+                            sort_by=sort_by,
+                            shuffle=shuffle,
+                            sort_order=sort_order,
+                            limit=limit,
+                            filter_type=filter_type,
+                            show_hidden=show_hidden,
+                            session_id=session_id,
+                            force_refresh=force_refresh,
+                            cursor=cursor or None,
+                        )
+                    except ValueError as cursor_error:
+                        logger.debug("Rejected media cursor for %s: %s", category_id, cursor_error)
+                        return jsonify({'error': 'Invalid pagination cursor'}), 400
+                else:
+                    fetch_limit = limit + 1 if (not include_total and limit > 0) else limit
+                    media_files = SortService.get_sorted_media(
+                        category_id=category_id,
+                        subfolder=subfolder,
+                        sort_by=sort_by,
+                        shuffle=shuffle,
+                        sort_order=sort_order,
+                        page=page,
+                        limit=fetch_limit,
+                        filter_type=filter_type,
+                        show_hidden=show_hidden,
+                        session_id=session_id,
+                        force_refresh=force_refresh,
+                    )
 
-                if include_total:
+                if cursor_mode:
+                    has_more = next_cursor is not None
+                    total = (
+                        SortService.get_total_count(
+                            category_id,
+                            subfolder,
+                            filter_type,
+                            show_hidden,
+                        )
+                        if include_total and not cursor else None
+                    )
+                elif include_total:
                     total = SortService.get_total_count(
                         category_id,
                         subfolder,
@@ -619,8 +659,10 @@ class MediaController(Controller):
                         'version_hash': version_hash,
                     },
                 }
+                if cursor_mode:
+                    response_data['pagination']['nextCursor'] = next_cursor
 
-                if page == 1:
+                if page == 1 and not cursor:
                     try:
                         response_data['subfolders'] = SortService.get_subfolders(
                             category_id,
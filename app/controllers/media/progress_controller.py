@@ -499,6 +499,7 @@ class ProgressController(MediaVisibilitySupport, Controller):
             video_completed=video_completed,
             profile_id=profile_id,
             sid=request.sid,
+            critical_save=critical_save,
         )
 
         with self._progress_timestamps_lock:
@@ -548,6 +549,7 @@ class ProgressController(MediaVisibilitySupport, Controller):
             video_completed=video_completed,
             persist_requested=bool(video_url and (video_completed or video_timestamp > 0)),
             profile_id=profile_id,
+            critical=bool(state.get('paused')),
         )
 
         if result['failure']:
@@ -646,12 +648,7 @@ class ProgressController(MediaVisibilitySupport, Controller):
                                 os.path.join(category_path, filename)
                             )
                         )
-                        if hidden_files_set == 'OVERFLOW':
-                            if hidden_content_service.is_file_hidden(
-                                os.path.join(category_path, filename)
-                            ):
-                                continue
-                        elif absolute_path in hidden_files_set:
+                        if absolute_path in hidden_files_set:
                             continue
 
                 visible.append(video)
@@ -713,6 +710,7 @@ class ProgressController(MediaVisibilitySupport, Controller):
         video_completed,
         profile_id,
         sid,
+        critical_save=False,
     ):
         with app.app_context():
             result = self._persist_runtime_progress(
@@ -724,6 +722,7 @@ class ProgressController(MediaVisibilitySupport, Controller):
                 video_completed=video_completed,
                 persist_requested=bool(persist_video_progress or video_completed),
                 profile_id=profile_id,
+                critical=critical_save,
             )
 
             if result['failure']:
@@ -784,7 +783,13 @@ class ProgressController(MediaVisibilitySupport, Controller):
         video_completed,
         persist_requested,
         profile_id,
+        critical=False,
     ):
+        """Persist one playback update.
+
+        Routine ticks are deferred to the progress write-behind buffer;
+        critical saves (pause, page hide) write through immediately.
+        """
         result = {
             'saved': False,
             'deleted': False,
@@ -836,6 +841,7 @@ class ProgressController(MediaVisibilitySupport, Controller):
             video_duration=video_duration,
             thumbnail_url=thumbnail_url,
             profile_id=profile_id,
+            defer=not critical,
         )
         result['message'] = message
         if not success:
@@ -73,20 +73,14 @@ class StorageFileController(Controller):
             if not success:
                 return {'error': folder_name}, 404
 
-            zip_filename = f"{folder_name}.zip"
-
-            def generate():
-                for chunk in storage_archive_service.stream_folder_zip(folder_path):
-                    yield chunk
-
-            return Response(
-                generate(),
-                mimetype='application/zip',
-                headers={
-                    'Content-Disposition': f'attachment; filename="{zip_filename}"',
-                    'Cache-Control': 'no-cache',
-                },
-            )
+            plan = storage_archive_service.build_zip_plan([
+                (file_path, arcname)
+                for file_path, arcname, _ in storage_archive_service.get_folder_file_list(folder_path)
+            ])
+            if plan is None:
+                return {'error': 'No downloadable files found'}, 404
+
+            return storage_archive_service.build_zip_response(plan, f"{folder_name}.zip")
         except Exception as exc:
             logger.error("Error streaming folder ZIP: %s", exc)
             return {'error': str(exc)}, 500
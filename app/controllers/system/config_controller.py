@@ -145,6 +145,7 @@ class ConfigController(Controller):
             'DOWNLOAD_RATE_LIMIT_GLOBAL': float,
             'STREAM_MAX_DURATION_SECONDS': float,
             'STREAM_READ_TIMEOUT_SECONDS': float,
+            'STREAM_USE_SENDFILE': self._to_bool,
             'STALE_MEDIA_CLEANUP_INTERVAL': int,
             'STALE_MEDIA_CLEANUP_BATCH_SIZE': int,
             'MAX_CATEGORY_SCAN_DEPTH': int,
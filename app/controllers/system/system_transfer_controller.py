@@ -4,7 +4,7 @@ import logging
 import os
 import traceback
 
-from flask import Response, request, send_file
+from flask import request, send_file
 
 from app.services.storage import storage_io_service
 from app.services.storage import storage_archive_service
@@ -193,46 +193,27 @@ class SystemTransferController(Controller):
             num_parts = len(parts)
 
             if part is None and num_parts <= 1:
+                part_files = files_list
                 zip_filename = f"{folder_name}.zip"
-
-                def generate():
-                    file_list = [(file_path, arcname) for file_path, arcname, _ in files_list]
-                    for chunk in storage_archive_service.stream_zip_from_file_list(file_list):
-                        yield chunk
-
-                return Response(
-                    generate(),
-                    mimetype='application/zip',
-                    headers={
-                        'Content-Disposition': f'attachment; filename="{zip_filename}"',
-                        'Cache-Control': 'no-cache',
-                        'X-Total-Parts': '1',
-                        'X-Current-Part': '1',
-                    },
-                )
-
-            if part is None:
                 part = 1
+            else:
+                if part is None:
+                    part = 1
+                if part < 1 or part > num_parts:
+                    return {'error': f'Invalid part number. Must be 1-{num_parts}'}, 400
+                part_files = parts[part - 1]
+                zip_filename = f"{folder_name}_part{part}of{num_parts}.zip"
+
+            plan = storage_archive_service.build_zip_plan([
+                (file_path, arcname) for file_path, arcname, _ in part_files
+            ])
+            if plan is None:
+                return {'error': 'No downloadable files found'}, 404
 
-            if part < 1 or part > num_parts:
-                return {'error': f'Invalid part number. Must be 1-{num_parts}'}, 400
-
-            zip_filename = f"{folder_name}_part{part}of{num_parts}.zip"
-
-            def generate():
-                file_list = [
-                    (file_path, arcname)
-                    for file_path, arcname, _ in parts[part - 1]
-                ]
-                for chunk in storage_archive_service.stream_zip_from_file_list(file_list):
-                    yield chunk
-
-            return Response(
-                generate(),
-                mimetype='application/zip',
+            return storage_archive_service.build_zip_response(
+                plan,
+                zip_filename,
                 headers={
-                    'Content-Disposition': f'attachment; filename="{zip_filename}"',
-                    'Cache-Control': 'no-cache',
                     'X-Total-Parts': str(num_parts),
                     'X-Current-Part': str(part),
                 },
@@ -376,17 +357,13 @@ class SystemTransferController(Controller):
                 filepath, filename = file_paths[0]
                 return send_file(filepath, as_attachment=True, download_name=filename)
 
-            def generate():
-                for chunk in storage_archive_service.stream_zip_from_file_list(file_paths):
-                    yield chunk
+            plan = storage_archive_service.build_zip_plan(file_paths)
+            if plan is None:
+                return {'error': 'No valid files found'}, 404
 
-            return Response(
-                generate(),
-                mimetype='application/zip',
-                headers={
-                    'Content-Disposition': f'attachment; filename="ghosthub-{len(file_paths)}-files.zip"',
-                    'Cache-Control': 'no-cache',
-                },
+            return storage_archive_service.build_zip_response(
+                plan,
+                f"ghosthub-{len(file_paths)}-files.zip",
             )
         except Exception as exc:
             logger.error("[GalleryDownload] Error: %s", exc)
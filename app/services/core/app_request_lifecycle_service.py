@@ -1,16 +1,19 @@
 """Specter service for Flask request/response lifecycle hooks."""
 
-from collections import OrderedDict
 import gzip
 import logging
+import mimetypes
 import os
 import uuid
 
-from flask import abort, request, session
-from gevent.lock import BoundedSemaphore
+from flask import abort, request, send_file, session
 
 from specter import Service, registry
 from app.services.core.session_store import is_blocked
+from app.utils.static_asset_utils import (
+    PRECOMPRESSED_ENCODINGS,
+    is_variant_fresh,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,8 +31,7 @@ COMPRESSIBLE_MIME_TYPES = {
     'text/xml',
 }
 
-_gzip_cache = OrderedDict()
-_gzip_cache_lock = BoundedSemaphore(1)
+STATIC_MAX_AGE = 86400
 
 
 class AppRequestLifecycleService(Service):
@@ -68,6 +70,13 @@ class AppRequestLifecycleService(Service):
                 )
                 abort(403, "Your IP address has been temporarily blocked from this session.")
 
+        @app.before_request
+        def serve_precompressed_static():
+            """Answer static requests from .br/.gz siblings when the client accepts them."""
+            if request.method not in ('GET', 'HEAD') or not request.path.startswith('/static/'):
+                return None
+            return AppRequestLifecycleService._precompressed_static_response(app)
+
         @app.after_request
         def ensure_session_cookie(response):
             """Attach the custom session cookie to successful responses."""
@@ -103,7 +112,7 @@ class AppRequestLifecycleService(Service):
         def optimize_response(response):
             """Apply shared caching and security headers."""
             if request.path.startswith('/static/'):
-                response.headers['Cache-Control'] = 'public, max-age=86400'
+                response.headers['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}'
 
             if request.path.startswith('/media/'):
                 response.headers['Content-Encoding'] = 'identity'
@@ -168,7 +177,9 @@ class AppRequestLifecycleService(Service):
         if request.method == 'HEAD':
             return False
 
-        if request.path.startswith('/media/') or request.path.startswith('/socket.io'):
+        # Static assets are served from precompressed siblings; runtime
+        # compression is reserved for dynamic responses.
+        if request.path.startswith(('/media/', '/socket.io', '/static/')):
             return False
 
         if response.status_code < 200 or response.status_code in (204, 206, 304):
@@ -180,11 +191,8 @@ class AppRequestLifecycleService(Service):
         if AppRequestLifecycleService._is_download_response(response):
             return False
 
-        # Non-static streamed/direct-passthrough responses should keep their original delivery mode.
-        if (
-            not request.path.startswith('/static/')
-            and (response.is_streamed or response.direct_passthrough)
-        ):
+        # Streamed/direct-passthrough responses keep their original delivery mode.
+        if response.is_streamed or response.direct_passthrough:
             return False
 
         if not AppRequestLifecycleService._client_accepts_gzip():
@@ -209,20 +217,12 @@ class AppRequestLifecycleService(Service):
 
         min_size = max(0, int(app.config.get('GZIP_MIN_SIZE', 1024)))
         compression_level = min(9, max(1, int(app.config.get('GZIP_COMPRESSION_LEVEL', 5))))
-        cache_key = AppRequestLifecycleService._build_static_cache_key(app, response, compression_level)
 
-        response.direct_passthrough = False
         payload = response.get_data()
         if len(payload) < min_size:
             return response
 
-        compressed = AppRequestLifecycleService._get_cached_gzip_payload(app, cache_key)
-        if compressed is None:
-            compressed = gzip.compress(payload, compresslevel=compression_level)
-            if len(compressed) >= len(payload):
-                return response
-            AppRequestLifecycleService._store_cached_gzip_payload(app, cache_key, compressed)
-
+        compressed = gzip.compress(payload, compresslevel=compression_level)
         if len(compressed) >= len(payload):
             return response
 
@@ -233,56 +233,40 @@ class AppRequestLifecycleService(Service):
         return response
 
     @staticmethod
-    def _build_static_cache_key(app, response, compression_level):
-        """Build a stable cache key for static-file gzip responses."""
-        if not app.config.get('ENABLE_GZIP_CACHE', True):
-            return None
-
-        if not request.path.startswith('/static/'):
-            return None
-
+    def _resolve_static_path(app):
+        """Return the on-disk path for the requested static asset, or None."""
         static_root = os.path.abspath(app.static_folder or '')
         rel_path = request.path[len('/static/'):].lstrip('/')
         candidate = os.path.abspath(os.path.join(static_root, rel_path))
-        if not static_root or (
-            candidate != static_root and not candidate.startswith(f'{static_root}{os.sep}')
-        ):
-            return None
-
-        try:
-            stat_info = os.stat(candidate)
-        except OSError:
+        if not static_root or not candidate.startswith(f'{static_root}{os.sep}'):
             return None
-
-        return (
-            candidate,
-            stat_info.st_mtime_ns,
-            stat_info.st_size,
-            response.mimetype,
-            compression_level,
-        )
+        return candidate
 
     @staticmethod
-    def _get_cached_gzip_payload(app, cache_key):
-        """Fetch a compressed static payload from the LRU cache."""
-        if cache_key is None:
+    def _precompressed_static_response(app):
+        """Build a response from a fresh compressed sibling, or None to fall through."""
+        if not app.config.get('ENABLE_GZIP_COMPRESSION', True):
             return None
 
-        with _gzip_cache_lock:
-            payload = _gzip_cache.pop(cache_key, None)
-            if payload is None:
-                return None
-            _gzip_cache[cache_key] = payload
-            return payload
+        source_path = AppRequestLifecycleService._resolve_static_path(app)
+        if source_path is None:
+            return None
+        try:
+            source_stat = os.stat(source_path)
+        except OSError:
+            return None
 
-    @staticmethod
-    def _store_cached_gzip_payload(app, cache_key, compressed):
-        """Store a compressed static payload in the bounded LRU cache."""
-        if cache_key is None:
-            return
-
-        max_entries = max(1, int(app.config.get('GZIP_CACHE_MAX_ENTRIES', 64)))
-        with _gzip_cache_lock:
-            _gzip_cache[cache_key] = compressed
-            while len(_gzip_cache) > max_entries:
-                _gzip_cache.popitem(last=False)
+        accepted = request.accept_encodings
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if accepted[encoding] <= 0:
+                continue
+            variant_path = source_path + suffix
+            if not is_variant_fresh(source_stat, variant_path):
+                continue
+
+            mimetype = mimetypes.guess_type(source_path)[0] or 'application/octet-stream'
+            response = send_file(variant_path, mimetype=mimetype, conditional=True)
+            response.headers['Content-Encoding'] = encoding
+            AppRequestLifecycleService._append_vary_header(response, 'Accept-Encoding')
+            return response
+        return None
@@ -119,6 +119,7 @@ class AppStartupService(Service):
             )
             valid_ids = [category['id'] for category in all_categories]
             media_index_service.cleanup_orphaned_media_index(valid_ids)
+            media_index_service.prune_orphaned_media_probes()
 
             logger.info("Startup cleanup complete")
             return True
@@ -40,6 +40,7 @@ def get_default_config():
             "DOWNLOAD_RATE_LIMIT_GLOBAL": 100.0,
             "STREAM_MAX_DURATION_SECONDS": 0,
             "STREAM_READ_TIMEOUT_SECONDS": 15,
+            "STREAM_USE_SENDFILE": True,
             "STALE_MEDIA_CLEANUP_INTERVAL": 21600,
             "STALE_MEDIA_CLEANUP_BATCH_SIZE": 5000,
             "MAX_CATEGORY_SCAN_DEPTH": 0,
@@ -8,7 +8,16 @@ import uuid
 
 from app.services.core.runtime_config_service import get_runtime_config_value
 from app.services.core.database_schema_service import (
+    CATEGORY_MEDIA_SUMMARY_TABLE,
+    CREATE_MEDIA_SEARCH_INDEX_SQL,
+    CREATE_MEDIA_SEARCH_TRIGGERS_SQL,
     CREATE_TABLES_SQL,
+    HIDDEN_CATEGORY_CLOSURE_TABLE,
+    MEDIA_SEARCH_INDEX_TABLE,
+    MEDIA_TIMELINE_ROLLUP_TABLE,
+    REBUILD_CATEGORY_MEDIA_SUMMARY_SQL,
+    REBUILD_HIDDEN_CATEGORY_CLOSURE_SQL,
+    REBUILD_MEDIA_TIMELINE_ROLLUP_SQL,
     SCHEMA_VERSION,
 )
 from app.services.core.sqlite_runtime_service import (
@@ -36,7 +45,17 @@ def ensure_database_ready():
             _migrate_legacy_video_progress_schema(conn)
             current_version = SCHEMA_VERSION
 
+        closure_exists = _table_exists(conn, HIDDEN_CATEGORY_CLOSURE_TABLE)
+        timeline_rollup_exists = _table_exists(conn, MEDIA_TIMELINE_ROLLUP_TABLE)
+        media_summary_exists = _table_exists(conn, CATEGORY_MEDIA_SUMMARY_TABLE)
         conn.executescript(CREATE_TABLES_SQL)
+        if not closure_exists:
+            _rebuild_hidden_category_closure(conn)
+        if not timeline_rollup_exists:
+            _rebuild_media_timeline_rollup(conn)
+        if not media_summary_exists:
+            _rebuild_category_media_summary(conn)
+        _ensure_media_search_index(conn)
 
         if current_version is None:
             _set_schema_version(conn, SCHEMA_VERSION)
@@ -88,6 +107,80 @@ def _ensure_instance_folder():
     os.makedirs(instance_path, exist_ok=True)
 
 
+def _ensure_media_search_index(conn):
+    """Create and backfill the FTS5 media search index when SQLite supports it."""
+    if _table_exists(conn, MEDIA_SEARCH_INDEX_TABLE):
+        for trigger_sql in CREATE_MEDIA_SEARCH_TRIGGERS_SQL:
+            conn.execute(trigger_sql)
+        return True
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(CREATE_MEDIA_SEARCH_INDEX_SQL)
+        for trigger_sql in CREATE_MEDIA_SEARCH_TRIGGERS_SQL:
+            conn.execute(trigger_sql)
+        conn.execute(
+            f"""
+            INSERT INTO {MEDIA_SEARCH_INDEX_TABLE} (rowid, name, rel_path, category_id)
+            SELECT rowid, name, rel_path, category_id FROM media_index
+            """
+        )
+        conn.execute("COMMIT")
+    except sqlite3.OperationalError as err:
+        conn.execute("ROLLBACK")
+        logger.warning(
+            "FTS5 trigram search unavailable in this SQLite build (%s); "
+            "media search will use LIKE scans",
+            err,
+        )
+        return False
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    logger.info("Built %s search index", MEDIA_SEARCH_INDEX_TABLE)
+    return True
+
+
+def _rebuild_hidden_category_closure(conn):
+    """Backfill the hidden-category closure from existing hidden rows."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for statement in REBUILD_HIDDEN_CATEGORY_CLOSURE_SQL:
+            conn.execute(statement)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    logger.info("Built %s table", HIDDEN_CATEGORY_CLOSURE_TABLE)
+
+
+def _rebuild_media_timeline_rollup(conn):
+    """Backfill per-day timeline counts from existing media_index rows."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for statement in REBUILD_MEDIA_TIMELINE_ROLLUP_SQL:
+            conn.execute(statement)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    logger.info("Built %s table", MEDIA_TIMELINE_ROLLUP_TABLE)
+
+
+def _rebuild_category_media_summary(conn):
+    """Backfill per-category and per-directory summaries from media_index."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for statement in REBUILD_CATEGORY_MEDIA_SUMMARY_SQL:
+            conn.execute(statement)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    logger.info("Built %s table", CATEGORY_MEDIA_SUMMARY_TABLE)
+
+
 def _ensure_schema_info_table(conn):
     conn.execute(
         """
@@ -95,10 +95,427 @@ CREATE INDEX IF NOT EXISTS idx_media_index_category_rel_path ON media_index(cate
 CREATE INDEX IF NOT EXISTS idx_media_index_cat_hidden_name ON media_index(category_id, is_hidden, name COLLATE NOCASE);
 CREATE INDEX IF NOT EXISTS idx_media_index_cat_hidden_parent_name ON media_index(category_id, is_hidden, parent_path, name COLLATE NOCASE);
 CREATE INDEX IF NOT EXISTS idx_media_index_cat_hidden_mtime ON media_index(category_id, is_hidden, mtime DESC);
+CREATE INDEX IF NOT EXISTS idx_media_index_cat_hidden_size ON media_index(category_id, is_hidden, size);
+
+-- Every category ID covered by a hidden_categories row, including auto
+-- descendants, so cross-category visibility checks are a primary-key probe.
+CREATE TABLE IF NOT EXISTS hidden_category_closure (
+    category_id TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS hidden_category_closure_hide
+AFTER INSERT ON hidden_categories BEGIN
+    INSERT OR IGNORE INTO hidden_category_closure (category_id)
+    SELECT new.category_id
+    UNION
+    SELECT DISTINCT category_id FROM media_index
+    WHERE category_id LIKE new.category_id || '::%'
+       OR (new.category_id LIKE 'auto%' AND category_id LIKE new.category_id || '-%');
+END;
+
+CREATE TRIGGER IF NOT EXISTS hidden_category_closure_unhide
+AFTER DELETE ON hidden_categories BEGIN
+    DELETE FROM hidden_category_closure
+    WHERE (
+        category_id = old.category_id
+        OR category_id LIKE old.category_id || '::%'
+        OR (old.category_id LIKE 'auto%' AND category_id LIKE old.category_id || '-%')
+    )
+    AND NOT EXISTS (
+        SELECT 1 FROM hidden_categories hc
+        WHERE hidden_category_closure.category_id = hc.category_id
+           OR hidden_category_closure.category_id LIKE hc.category_id || '::%'
+           OR (hc.category_id LIKE 'auto%' AND hidden_category_closure.category_id LIKE hc.category_id || '-%')
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS hidden_category_closure_media
+AFTER INSERT ON media_index
+WHEN NOT EXISTS (
+    SELECT 1 FROM hidden_category_closure WHERE category_id = new.category_id
+) AND EXISTS (
+    SELECT 1 FROM hidden_categories hc
+    WHERE new.category_id LIKE hc.category_id || '::%'
+       OR (hc.category_id LIKE 'auto%' AND new.category_id LIKE hc.category_id || '-%')
+)
+BEGIN
+    INSERT OR IGNORE INTO hidden_category_closure (category_id) VALUES (new.category_id);
+END;
+
+-- Directory mtimes from the last index pass, so rescans only list the
+-- directories whose contents changed since.
+CREATE TABLE IF NOT EXISTS media_index_dirs (
+    category_id TEXT NOT NULL,
+    rel_dir TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    PRIMARY KEY (category_id, rel_dir)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS media_index_scan_state (
+    category_id TEXT PRIMARY KEY,
+    file_count INTEGER NOT NULL DEFAULT 0,
+    reconciled_at REAL NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL DEFAULT 0
+);
+
+-- ffprobe results for indexed videos, valid while size and mtime match,
+-- so thumbnail runs do not re-probe unchanged files. Rows are not tied to
+-- media_index deletes (a full re-index replaces every row); orphans are
+-- pruned by startup cleanup instead.
+CREATE TABLE IF NOT EXISTS media_probe (
+    category_id TEXT NOT NULL,
+    rel_path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    has_video INTEGER NOT NULL,
+    duration REAL,
+    probed_at REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (category_id, rel_path)
+) WITHOUT ROWID;
+
+DROP TRIGGER IF EXISTS media_probe_media_delete;
+
+-- Subtitle stream metadata from ffprobe, keyed by the subtitle service's
+-- video hash (path, mtime and size), so opening an unchanged video does not
+-- re-probe it.
+CREATE TABLE IF NOT EXISTS subtitle_probe (
+    video_hash TEXT PRIMARY KEY,
+    start_time REAL NOT NULL DEFAULT 0,
+    tracks_json TEXT NOT NULL,
+    probed_at REAL NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+-- Per-day media counts kept in step with media_index by triggers, so
+-- timeline views aggregate O(days) rows instead of scanning every file.
+CREATE TABLE IF NOT EXISTS media_timeline_rollup (
+    category_id TEXT NOT NULL,
+    date_key TEXT NOT NULL,
+    type TEXT NOT NULL,
+    is_hidden INTEGER NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (category_id, date_key, type, is_hidden)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_media_timeline_rollup_date ON media_timeline_rollup(date_key);
+CREATE INDEX IF NOT EXISTS idx_media_index_day ON media_index(date(mtime, 'unixepoch'), mtime DESC);
+
+CREATE TRIGGER IF NOT EXISTS media_timeline_rollup_insert
+AFTER INSERT ON media_index BEGIN
+    INSERT INTO media_timeline_rollup (category_id, date_key, type, is_hidden, count)
+    VALUES (new.category_id, COALESCE(date(new.mtime, 'unixepoch'), ''), new.type, new.is_hidden, 1)
+    ON CONFLICT (category_id, date_key, type, is_hidden) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS media_timeline_rollup_delete
+AFTER DELETE ON media_index BEGIN
+    UPDATE media_timeline_rollup SET count = count - 1
+    WHERE category_id = old.category_id
+      AND date_key = COALESCE(date(old.mtime, 'unixepoch'), '')
+      AND type = old.type AND is_hidden = old.is_hidden;
+    DELETE FROM media_timeline_rollup
+    WHERE category_id = old.category_id AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS media_timeline_rollup_update
+AFTER UPDATE OF category_id, mtime, type, is_hidden ON media_index
+WHEN old.category_id IS NOT new.category_id
+  OR date(old.mtime, 'unixepoch') IS NOT date(new.mtime, 'unixepoch')
+  OR old.type IS NOT new.type
+  OR old.is_hidden IS NOT new.is_hidden
+BEGIN
+    UPDATE media_timeline_rollup SET count = count - 1
+    WHERE category_id = old.category_id
+      AND date_key = COALESCE(date(old.mtime, 'unixepoch'), '')
+      AND type = old.type AND is_hidden = old.is_hidden;
+    DELETE FROM media_timeline_rollup
+    WHERE category_id = old.category_id AND count <= 0;
+    INSERT INTO media_timeline_rollup (category_id, date_key, type, is_hidden, count)
+    VALUES (new.category_id, COALESCE(date(new.mtime, 'unixepoch'), ''), new.type, new.is_hidden, 1)
+    ON CONFLICT (category_id, date_key, type, is_hidden) DO UPDATE SET count = count + 1;
+END;
+
+-- Per-category and per-directory media counts with the first rel_path of
+-- each type, kept in step with media_index by triggers so category and
+-- folder cards read a few summary rows instead of aggregating every file.
+CREATE TABLE IF NOT EXISTS category_media_summary (
+    category_id TEXT NOT NULL,
+    is_hidden INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    first_rel_path TEXT,
+    PRIMARY KEY (category_id, is_hidden, type)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS category_dir_media_summary (
+    category_id TEXT NOT NULL,
+    parent_path TEXT NOT NULL,
+    is_hidden INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    first_rel_path TEXT,
+    PRIMARY KEY (category_id, parent_path, is_hidden, type)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS category_media_summary_insert
+AFTER INSERT ON media_index BEGIN
+    INSERT INTO category_media_summary (category_id, is_hidden, type, count, first_rel_path)
+    VALUES (new.category_id, new.is_hidden, new.type, 1, new.rel_path)
+    ON CONFLICT (category_id, is_hidden, type) DO UPDATE SET
+        count = count + 1,
+        first_rel_path = CASE
+            WHEN first_rel_path IS NULL OR excluded.first_rel_path < first_rel_path
+            THEN excluded.first_rel_path ELSE first_rel_path
+        END;
+    INSERT INTO category_dir_media_summary (category_id, parent_path, is_hidden, type, count, first_rel_path)
+    VALUES (new.category_id, new.parent_path, new.is_hidden, new.type, 1, new.rel_path)
+    ON CONFLICT (category_id, parent_path, is_hidden, type) DO UPDATE SET
+        count = count + 1,
+        first_rel_path = CASE
+            WHEN first_rel_path IS NULL OR excluded.first_rel_path < first_rel_path
+            THEN excluded.first_rel_path ELSE first_rel_path
+        END;
+END;
+
+CREATE TRIGGER IF NOT EXISTS category_media_summary_delete
+AFTER DELETE ON media_index BEGIN
+    UPDATE category_media_summary SET
+        count = count - 1,
+        first_rel_path = CASE WHEN first_rel_path = old.rel_path THEN (
+            SELECT MIN(rel_path) FROM media_index
+            WHERE category_id = old.category_id AND is_hidden = old.is_hidden AND type = old.type
+        ) ELSE first_rel_path END
+    WHERE category_id = old.category_id AND is_hidden = old.is_hidden AND type = old.type;
+    DELETE FROM category_media_summary
+    WHERE category_id = old.category_id AND is_hidden = old.is_hidden
+      AND type = old.type AND count <= 0;
+    UPDATE category_dir_media_summary SET
+        count = count - 1,
+        first_rel_path = CASE WHEN first_rel_path = old.rel_path THEN (
+            SELECT MIN(rel_path) FROM media_index
+            WHERE category_id = old.category_id AND parent_path = old.parent_path
+              AND is_hidden = old.is_hidden AND type = old.type
+        ) ELSE first_rel_path END
+    WHERE category_id = old.category_id AND parent_path = old.parent_path
+      AND is_hidden = old.is_hidden AND type = old.type;
+    DELETE FROM category_dir_media_summary
+    WHERE category_id = old.category_id AND parent_path = old.parent_path
+      AND is_hidden = old.is_hidden AND type = old.type AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS category_media_summary_update
+AFTER UPDATE OF category_id, rel_path, parent_path, type, is_hidden ON media_index
+WHEN old.category_id IS NOT new.category_id
+  OR old.rel_path IS NOT new.rel_path
+  OR old.parent_path IS NOT new.parent_path
+  OR old.type IS NOT new.type
+  OR old.is_hidden IS NOT new.is_hidden
+BEGIN
+    UPDATE category_media_summary SET
+        count = count - 1,
+        first_rel_path = CASE WHEN first_rel_path = old.rel_path THEN (
+            SELECT MIN(rel_path) FROM media_index
+            WHERE category_id = old.category_id AND is_hidden = old.is_hidden AND type = old.type
+        ) ELSE first_rel_path END
+    WHERE category_id = old.category_id AND is_hidden = old.is_hidden AND type = old.type;
+    DELETE FROM category_media_summary
+    WHERE category_id = old.category_id AND is_hidden = old.is_hidden
+      AND type = old.type AND count <= 0;
+    UPDATE category_dir_media_summary SET
+        count = count - 1,
+        first_rel_path = CASE WHEN first_rel_path = old.rel_path THEN (
+            SELECT MIN(rel_path) FROM media_index
+            WHERE category_id = old.category_id AND parent_path = old.parent_path
+              AND is_hidden = old.is_hidden AND type = old.type
+        ) ELSE first_rel_path END
+    WHERE category_id = old.category_id AND parent_path = old.parent_path
+      AND is_hidden = old.is_hidden AND type = old.type;
+    DELETE FROM category_dir_media_summary
+    WHERE category_id = old.category_id AND parent_path = old.parent_path
+      AND is_hidden = old.is_hidden AND type = old.type AND count <= 0;
+    INSERT INTO category_media_summary (category_id, is_hidden, type, count, first_rel_path)
+    VALUES (new.category_id, new.is_hidden, new.type, 1, new.rel_path)
+    ON CONFLICT (category_id, is_hidden, type) DO UPDATE SET
+        count = count + 1,
+        first_rel_path = CASE
+            WHEN first_rel_path IS NULL OR excluded.first_rel_path < first_rel_path
+            THEN excluded.first_rel_path ELSE first_rel_path
+        END;
+    INSERT INTO category_dir_media_summary (category_id, parent_path, is_hidden, type, count, first_rel_path)
+    VALUES (new.category_id, new.parent_path, new.is_hidden, new.type, 1, new.rel_path)
+    ON CONFLICT (category_id, parent_path, is_hidden, type) DO UPDATE SET
+        count = count + 1,
+        first_rel_path = CASE
+            WHEN first_rel_path IS NULL OR excluded.first_rel_path < first_rel_path
+            THEN excluded.first_rel_path ELSE first_rel_path
+        END;
+END;
+
+-- Shared shuffle permutations as packed array('I') media_index rowids.
+-- basis is the (count, rowid sum, max rowid) of the listing scope; a
+-- mismatch means files were added, removed or re-indexed since.
+CREATE TABLE IF NOT EXISTS media_shuffle_orders (
+    category_id TEXT NOT NULL,
+    subfolder TEXT NOT NULL,
+    filter_type TEXT NOT NULL,
+    show_hidden INTEGER NOT NULL,
+    basis TEXT NOT NULL,
+    rowid_order BLOB NOT NULL,
+    created_at REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (category_id, subfolder, filter_type, show_hidden)
+);
 
 CREATE TABLE IF NOT EXISTS drive_labels (
     device_key TEXT PRIMARY KEY,
     label TEXT NOT NULL,
     updated_at REAL NOT NULL DEFAULT 0
 );
+
+-- CRC-32 of files served in streamed ZIP downloads, valid while size and
+-- mtime match, so archive layouts can be served by Range without rereading.
+CREATE TABLE IF NOT EXISTS file_crc_cache (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    crc32 INTEGER NOT NULL,
+    computed_at REAL NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+-- Transcoded file cache index (formerly per-category cache_index.json).
+-- transcode_cache_totals is kept in step by triggers so size checks read
+-- one row per category, and the last_accessed indexes give LRU eviction.
+CREATE TABLE IF NOT EXISTS transcode_cache (
+    category_path TEXT NOT NULL,
+    cache_key TEXT NOT NULL,
+    original_filename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    resolution TEXT NOT NULL DEFAULT 'original',
+    video_codec TEXT NOT NULL DEFAULT 'h264',
+    audio_codec TEXT NOT NULL DEFAULT 'aac',
+    file_size INTEGER NOT NULL DEFAULT 0,
+    source_size INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL DEFAULT 0,
+    last_accessed REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (category_path, cache_key)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_transcode_cache_lru
+ON transcode_cache(category_path, last_accessed);
+
+CREATE TABLE IF NOT EXISTS transcode_cache_totals (
+    category_path TEXT PRIMARY KEY,
+    file_count INTEGER NOT NULL DEFAULT 0,
+    total_bytes INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS transcode_cache_totals_insert
+AFTER INSERT ON transcode_cache BEGIN
+    INSERT INTO transcode_cache_totals (category_path, file_count, total_bytes)
+    VALUES (new.category_path, 1, new.file_size)
+    ON CONFLICT (category_path) DO UPDATE SET
+        file_count = file_count + 1,
+        total_bytes = total_bytes + excluded.total_bytes;
+END;
+
+CREATE TRIGGER IF NOT EXISTS transcode_cache_totals_delete
+AFTER DELETE ON transcode_cache BEGIN
+    UPDATE transcode_cache_totals SET
+        file_count = file_count - 1,
+        total_bytes = total_bytes - old.file_size
+    WHERE category_path = old.category_path;
+    DELETE FROM transcode_cache_totals
+    WHERE category_path = old.category_path AND file_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS transcode_cache_totals_update
+AFTER UPDATE OF file_size ON transcode_cache
+WHEN old.file_size IS NOT new.file_size
+BEGIN
+    UPDATE transcode_cache_totals SET
+        total_bytes = total_bytes - old.file_size + new.file_size
+    WHERE category_path = new.category_path;
+END;
+"""
+
+HIDDEN_CATEGORY_CLOSURE_TABLE = 'hidden_category_closure'
+
+REBUILD_HIDDEN_CATEGORY_CLOSURE_SQL = (
+    "DELETE FROM hidden_category_closure",
+    """
+    INSERT OR IGNORE INTO hidden_category_closure (category_id)
+    SELECT category_id FROM hidden_categories
+    UNION
+    SELECT DISTINCT mi.category_id
+    FROM media_index mi
+    JOIN hidden_categories hc
+      ON mi.category_id LIKE hc.category_id || '::%'
+      OR (hc.category_id LIKE 'auto%' AND mi.category_id LIKE hc.category_id || '-%')
+    """,
+)
+
+MEDIA_TIMELINE_ROLLUP_TABLE = 'media_timeline_rollup'
+
+REBUILD_MEDIA_TIMELINE_ROLLUP_SQL = (
+    "DELETE FROM media_timeline_rollup",
+    """
+    INSERT INTO media_timeline_rollup (category_id, date_key, type, is_hidden, count)
+    SELECT category_id, COALESCE(date(mtime, 'unixepoch'), ''), type, is_hidden, COUNT(*)
+    FROM media_index
+    GROUP BY 1, 2, 3, 4
+    """,
+)
+
+CATEGORY_MEDIA_SUMMARY_TABLE = 'category_media_summary'
+
+REBUILD_CATEGORY_MEDIA_SUMMARY_SQL = (
+    "DELETE FROM category_media_summary",
+    "DELETE FROM category_dir_media_summary",
+    """
+    INSERT INTO category_media_summary (category_id, is_hidden, type, count, first_rel_path)
+    SELECT category_id, is_hidden, type, COUNT(*), MIN(rel_path)
+    FROM media_index
+    GROUP BY 1, 2, 3
+    """,
+    """
+    INSERT INTO category_dir_media_summary
+        (category_id, parent_path, is_hidden, type, count, first_rel_path)
+    SELECT category_id, parent_path, is_hidden, type, COUNT(*), MIN(rel_path)
+    FROM media_index
+    GROUP BY 1, 2, 3, 4
+    """,
+)
+
+# FTS5 shadow index for media search. Created separately from
+# CREATE_TABLES_SQL because platform SQLite builds may lack FTS5 or the
+# trigram tokenizer; search falls back to LIKE scans when it is missing.
+MEDIA_SEARCH_INDEX_TABLE = 'media_index_fts'
+
+CREATE_MEDIA_SEARCH_INDEX_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS media_index_fts USING fts5(
+    name,
+    rel_path,
+    category_id,
+    tokenize='trigram'
+)
 """
+
+CREATE_MEDIA_SEARCH_TRIGGERS_SQL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS media_index_fts_ai AFTER INSERT ON media_index BEGIN
+        INSERT OR REPLACE INTO media_index_fts (rowid, name, rel_path, category_id)
+        VALUES (new.rowid, new.name, new.rel_path, new.category_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS media_index_fts_ad AFTER DELETE ON media_index BEGIN
+        DELETE FROM media_index_fts WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS media_index_fts_au
+    AFTER UPDATE OF name, rel_path, category_id ON media_index BEGIN
+        DELETE FROM media_index_fts WHERE rowid = old.rowid;
+        INSERT INTO media_index_fts (rowid, name, rel_path, category_id)
+        VALUES (new.rowid, new.name, new.rel_path, new.category_id);
+    END
+    """,
+)
@@ -3,6 +3,8 @@
 import logging
 import os
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
 
 import gevent.local
@@ -13,6 +15,13 @@ logger = logging.getLogger(__name__)
 
 DB_FILENAME = 'ghosthub.db'
 
+# Connections kept open for reuse. Greenlets beyond this wait briefly, then
+# get a throwaway overflow connection so nested checkouts cannot deadlock.
+POOL_SIZE = 8
+POOL_WAIT_TIMEOUT = 5.0
+STATEMENT_CACHE_SIZE = 256
+WRITE_JOB_TIMEOUT = 30.0
+
 
 def get_db_path():
     """Return the current SQLite database path from runtime config."""
@@ -33,92 +42,331 @@ PRAGMA_SETTINGS = [
     "PRAGMA cache_size=-8000",
     "PRAGMA temp_store=MEMORY",
     "PRAGMA mmap_size=67108864",
+    "PRAGMA recursive_triggers=ON",
 ]
 
 
+def _pragmas_for_runtime():
+    """Return the PRAGMA list for the current hardware tier."""
+    from app.services.system.system_stats_service import get_hardware_tier
+
+    pragmas = PRAGMA_SETTINGS.copy()
+    if get_runtime_config_value('AUTO_OPTIMIZE_FOR_HARDWARE'):
+        tier = get_hardware_tier()
+        if tier == 'PRO':
+            pragmas = [
+                "PRAGMA journal_mode=WAL",
+                "PRAGMA synchronous=NORMAL",
+                "PRAGMA cache_size=-131072",
+                "PRAGMA temp_store=MEMORY",
+                "PRAGMA mmap_size=1073741824",
+                "PRAGMA recursive_triggers=ON",
+            ]
+            logger.info("Applying PRO tier SQLite optimizations")
+        elif tier == 'STANDARD':
+            pragmas = [
+                "PRAGMA journal_mode=WAL",
+                "PRAGMA synchronous=NORMAL",
+                "PRAGMA cache_size=-32768",
+                "PRAGMA temp_store=MEMORY",
+                "PRAGMA mmap_size=268435456",
+                "PRAGMA recursive_triggers=ON",
+            ]
+            logger.info("Applying STANDARD tier SQLite optimizations")
+        else:
+            logger.info("Applying BASE tier SQLite optimizations")
+    return pragmas
+
+
+def open_connection(db_path=None):
+    """Open and configure a new SQLite connection outside the pool."""
+    current_db_path = db_path or get_db_path()
+    instance_path = os.path.dirname(current_db_path)
+    os.makedirs(instance_path, exist_ok=True)
+
+    if os.path.isdir('/tmp/ghosthub_sqlite'):
+        os.environ['TMPDIR'] = '/tmp/ghosthub_sqlite'
+        os.environ['TEMP'] = '/tmp/ghosthub_sqlite'
+        os.environ['TMP'] = '/tmp/ghosthub_sqlite'
+        logger.info("Using tmpfs /tmp/ghosthub_sqlite for SQLite temp files")
+
+    connection = sqlite3.connect(
+        current_db_path,
+        timeout=30.0,
+        isolation_level=None,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    connection.row_factory = sqlite3.Row
+
+    for pragma in _pragmas_for_runtime():
+        try:
+            connection.execute(pragma)
+        except sqlite3.Error as err:
+            logger.warning("Failed to apply %s: %s", pragma, err)
+
+    return connection
+
+
+class _ConnectionPool:
+    """Bounded LIFO pool of configured connections shared across greenlets."""
+
+    def __init__(self, size, wait_timeout):
+        self.size = size
+        self.wait_timeout = wait_timeout
+        self._idle = []
+        self._open = 0
+        self._condition = threading.Condition()
+        self._stats = {
+            'checkouts': 0,
+            'hits': 0,
+            'misses': 0,
+            'waits': 0,
+            'wait_ms_total': 0.0,
+            'wait_ms_max': 0.0,
+            'overflow': 0,
+        }
+
+    def acquire(self, db_path):
+        """Check out a connection for ``db_path``; returns ``(conn, pooled)``."""
+        with self._condition:
+            self._stats['checkouts'] += 1
+            reused = self._take_idle(db_path)
+            if reused is not None:
+                self._stats['hits'] += 1
+                return reused, True
+
+            if self._open >= self.size:
+                started = time.perf_counter()
+                self._stats['waits'] += 1
+                deadline = started + self.wait_timeout
+                while reused is None and self._open >= self.size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                    reused = self._take_idle(db_path)
+                waited_ms = (time.perf_counter() - started) * 1000.0
+                self._stats['wait_ms_total'] += waited_ms
+                self._stats['wait_ms_max'] = max(self._stats['wait_ms_max'], waited_ms)
+                if reused is not None:
+                    self._stats['hits'] += 1
+                    return reused, True
+                if self._open >= self.size:
+                    self._stats['overflow'] += 1
+                    self._stats['misses'] += 1
+                    pooled = False
+                else:
+                    self._open += 1
+                    self._stats['misses'] += 1
+                    pooled = True
+            else:
+                self._open += 1
+                self._stats['misses'] += 1
+                pooled = True
+
+        try:
+            return open_connection(db_path), pooled
+        except Exception:
+            if pooled:
+                with self._condition:
+                    self._open -= 1
+                    self._condition.notify()
+            raise
+
+    def release(self, connection, db_path, pooled):
+        """Return a connection to the pool, closing overflow or stale ones."""
+        if not pooled:
+            _close_quietly(connection)
+            return
+
+        if connection.in_transaction:
+            logger.warning("Rolling back transaction left open on released SQLite connection")
+            try:
+                connection.execute("ROLLBACK")
+            except sqlite3.Error:
+                self.discard(connection)
+                return
+
+        with self._condition:
+            if db_path == get_db_path():
+                self._idle.append((connection, db_path))
+                self._condition.notify()
+                return
+            self._open -= 1
+            self._condition.notify()
+        _close_quietly(connection)
+
+    def discard(self, connection):
+        """Close a pooled connection and free its slot."""
+        _close_quietly(connection)
+        with self._condition:
+            self._open = max(0, self._open - 1)
+            self._condition.notify()
+
+    def close_idle(self):
+        """Close every idle connection."""
+        with self._condition:
+            idle = self._idle
+            self._idle = []
+            self._open = max(0, self._open - len(idle))
+            self._condition.notify_all()
+        for connection, _db_path in idle:
+            _close_quietly(connection)
+
+    def stats(self):
+        """Return a snapshot of pool counters."""
+        with self._condition:
+            snapshot = dict(self._stats)
+            idle = len(self._idle)
+            snapshot.update({
+                'size': self.size,
+                'open': self._open,
+                'idle': idle,
+                'in_use': self._open - idle,
+            })
+        checkouts = snapshot['checkouts']
+        snapshot['hit_rate'] = round(snapshot['hits'] / checkouts, 3) if checkouts else 0.0
+        snapshot['wait_ms_total'] = round(snapshot['wait_ms_total'], 2)
+        snapshot['wait_ms_max'] = round(snapshot['wait_ms_max'], 2)
+        return snapshot
+
+    def _take_idle(self, db_path):
+        while self._idle:
+            connection, idle_path = self._idle.pop()
+            if idle_path == db_path:
+                return connection
+            self._open -= 1
+            _close_quietly(connection)
+        return None
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except sqlite3.Error:
+        pass
+
+
+_pool = _ConnectionPool(POOL_SIZE, POOL_WAIT_TIMEOUT)
+
+
 def get_connection():
-    """Get a greenlet-local SQLite connection."""
+    """Get the SQLite connection bound to the current greenlet.
+
+    Connections are checked out of the shared pool and stay bound until the
+    outermost ``get_db()`` block exits or ``close_connection()`` is called.
+    """
     current_db_path = get_db_path()
 
     if (
-        hasattr(_local, 'connection') and
-        _local.connection is not None and
+        getattr(_local, 'connection', None) is not None and
         getattr(_local, 'db_path', None) != current_db_path
     ):
         close_connection()
 
-    if not hasattr(_local, 'connection') or _local.connection is None:
-        instance_path = os.path.dirname(current_db_path)
-        os.makedirs(instance_path, exist_ok=True)
-
-        if os.path.isdir('/tmp/ghosthub_sqlite'):
-            os.environ['TMPDIR'] = '/tmp/ghosthub_sqlite'
-            os.environ['TEMP'] = '/tmp/ghosthub_sqlite'
-            os.environ['TMP'] = '/tmp/ghosthub_sqlite'
-            logger.info("Using tmpfs /tmp/ghosthub_sqlite for SQLite temp files")
-
-        _local.connection = sqlite3.connect(
-            current_db_path,
-            timeout=30.0,
-            isolation_level=None,
-            check_same_thread=False,
-        )
-        _local.connection.row_factory = sqlite3.Row
+    if getattr(_local, 'connection', None) is None:
+        connection, pooled = _pool.acquire(current_db_path)
+        _local.connection = connection
         _local.db_path = current_db_path
+        _local.pooled = pooled
+        _local.depth = 0
 
-        from app.services.system.system_stats_service import get_hardware_tier
-
-        pragmas = PRAGMA_SETTINGS.copy()
-        if get_runtime_config_value('AUTO_OPTIMIZE_FOR_HARDWARE'):
-            tier = get_hardware_tier()
-            if tier == 'PRO':
-                pragmas = [
-                    "PRAGMA journal_mode=WAL",
-                    "PRAGMA synchronous=NORMAL",
-                    "PRAGMA cache_size=-131072",
-                    "PRAGMA temp_store=MEMORY",
-                    "PRAGMA mmap_size=1073741824",
-                ]
-                logger.info("Applying PRO tier SQLite optimizations")
-            elif tier == 'STANDARD':
-                pragmas = [
-                    "PRAGMA journal_mode=WAL",
-                    "PRAGMA synchronous=NORMAL",
-                    "PRAGMA cache_size=-32768",
-                    "PRAGMA temp_store=MEMORY",
-                    "PRAGMA mmap_size=268435456",
-                ]
-                logger.info("Applying STANDARD tier SQLite optimizations")
-            else:
-                logger.info("Applying BASE tier SQLite optimizations")
+    return _local.connection
 
-        for pragma in pragmas:
-            try:
-                _local.connection.execute(pragma)
-            except sqlite3.Error as err:
-                logger.warning("Failed to apply %s: %s", pragma, err)
 
-    return _local.connection
+def release_connection():
+    """Return the current greenlet's connection to the pool."""
+    connection = getattr(_local, 'connection', None)
+    if connection is None:
+        return
+    _pool.release(
+        connection,
+        getattr(_local, 'db_path', None),
+        getattr(_local, 'pooled', False),
+    )
+    _local.connection = None
+    _local.db_path = None
+    _local.depth = 0
 
 
 @contextmanager
 def get_db():
     """Context manager for SQLite operations."""
     conn = get_connection()
+    _local.depth = getattr(_local, 'depth', 0) + 1
     try:
         yield conn
     except sqlite3.Error as err:
         logger.error("Database error: %s", err)
         raise
+    finally:
+        _local.depth = max(0, getattr(_local, 'depth', 1) - 1)
+        if _local.depth == 0 and getattr(_local, 'connection', None) is conn:
+            release_connection()
 
 
-def close_connection():
-    """Close the greenlet-local SQLite connection."""
-    if hasattr(_local, 'connection') and _local.connection is not None:
+def run_write(fn, *args, **kwargs):
+    """Run ``fn(conn, *args, **kwargs)`` in a write transaction and return its result.
+
+    When the ``sqlite_writer`` service is running the job joins its next
+    group commit; otherwise (tests, boot, or a caller already inside a
+    transaction) it runs inline on the caller's pooled connection.
+    """
+    from specter import registry
+
+    writer = registry.resolve('sqlite_writer')
+    bound = getattr(_local, 'connection', None)
+    if (
+        writer is not None and
+        writer.accepts_jobs() and
+        not (bound is not None and bound.in_transaction)
+    ):
+        return writer.submit(fn, *args, **kwargs)
+    return run_write_inline(fn, *args, **kwargs)
+
+
+def run_write_inline(fn, *args, **kwargs):
+    """Run a write job in its own transaction on the current greenlet."""
+    with get_db() as conn:
+        if conn.in_transaction:
+            return fn(conn, *args, **kwargs)
+
+        conn.execute("BEGIN IMMEDIATE")
         try:
-            _local.connection.close()
-        except sqlite3.Error:
-            pass
+            result = fn(conn, *args, **kwargs)
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def execute_write(conn, sql, params=()):
+    """Write job that runs a single statement and returns its rowcount."""
+    return conn.execute(sql, params).rowcount
+
+
+def get_connection_pool_stats():
+    """Return pool and writer metrics for the admin status page."""
+    from specter import registry
+
+    stats = {'pool': _pool.stats()}
+    writer = registry.resolve('sqlite_writer')
+    stats['writer'] = writer.get_metrics() if writer is not None else None
+    return stats
+
+
+def close_connection():
+    """Close the current greenlet's connection and any idle pooled ones."""
+    connection = getattr(_local, 'connection', None)
+    if connection is not None:
+        if getattr(_local, 'pooled', False):
+            _pool.discard(connection)
+        else:
+            _close_quietly(connection)
         _local.connection = None
     if hasattr(_local, 'db_path'):
         _local.db_path = None
+    _local.depth = 0
+    _pool.close_idle()
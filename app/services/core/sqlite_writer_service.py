@@ -0,0 +1,223 @@
+"""Specter-owned single writer greenlet for SQLite group commits."""
+
+import logging
+import sqlite3
+import time
+
+import gevent
+from gevent.event import AsyncResult
+from gevent.monkey import get_original
+from gevent.queue import Empty, Queue
+
+from specter import Service
+from app.services.core.sqlite_runtime_service import (
+    WRITE_JOB_TIMEOUT,
+    get_db_path,
+    open_connection,
+    run_write_inline,
+)
+
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_MAX_JOBS = 64
+WRITE_POLL_INTERVAL = 0.5
+
+# Native thread ident even under monkey-patching: jobs may only be handed to
+# the writer from its own hub thread (threadpool callers run inline).
+_native_thread_ident = get_original('threading', 'get_ident')
+
+
+class _WriteJob:
+    __slots__ = ('fn', 'args', 'kwargs', 'result', 'started', 'cancelled')
+
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.result = AsyncResult()
+        self.started = False
+        self.cancelled = False
+
+
+class SqliteWriterService(Service):
+    """Serialize queued write jobs onto one connection and commit them in batches.
+
+    Every job queued while the previous commit ran shares the next
+    ``BEGIN IMMEDIATE``/``COMMIT``, so bursts of small writes take the WAL
+    write lock once instead of contending for it individually. Each job runs
+    under its own savepoint so one failing job does not roll back the rest.
+    """
+
+    def __init__(self):
+        super().__init__('sqlite_writer', {
+            'queue_size': 0,
+            'batches': 0,
+            'jobs': 0,
+            'failed_jobs': 0,
+            'max_batch': 0,
+            'last_batch_size': 0,
+            'last_commit_ms': 0.0,
+        })
+        self.priority = 10
+        self._queue = Queue()
+        self._greenlet = None
+        self._thread_ident = None
+        self._loop_active = False
+        self._connection = None
+        self._connection_path = None
+
+    def on_start(self):
+        """Start the writer greenlet."""
+        self._thread_ident = _native_thread_ident()
+        self._greenlet = self.spawn(self._writer_loop, label='sqlite_writer')
+
+    def on_stop(self):
+        """Flush queued jobs inline so callers are not left waiting."""
+        self._greenlet = None
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except Empty:
+                break
+            if not job.cancelled:
+                self._run_job_inline(job)
+        self._close_connection()
+
+    def accepts_jobs(self):
+        """Return True when jobs can be handed to the writer greenlet."""
+        greenlet = self._greenlet
+        return (
+            self.running and
+            self._loop_active and
+            greenlet is not None and
+            not greenlet.dead and
+            gevent.getcurrent() is not greenlet and
+            _native_thread_ident() == self._thread_ident
+        )
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue ``fn(conn, *args, **kwargs)`` and wait for its group commit.
+
+        A job still queued after ``WRITE_JOB_TIMEOUT`` is cancelled and the
+        caller gets ``OperationalError``. Once the writer has taken the job
+        into a batch the caller waits for the real outcome, so a reported
+        failure never hides a write that later commits.
+        """
+        job = _WriteJob(fn, args, kwargs)
+        self._queue.put(job)
+        try:
+            return job.result.get(timeout=WRITE_JOB_TIMEOUT)
+        except gevent.Timeout:
+            if job.started:
+                return job.result.get()
+            job.cancelled = True
+            raise sqlite3.OperationalError(
+                f"SQLite writer did not start the job within {WRITE_JOB_TIMEOUT:.0f}s",
+            )
+
+    def get_metrics(self):
+        """Return writer counters for the admin status page."""
+        metrics = self.get_state()
+        metrics['queue_size'] = self._queue.qsize()
+        metrics['running'] = self.accepts_jobs()
+        return metrics
+
+    def _writer_loop(self):
+        self._loop_active = True
+        try:
+            while self.running:
+                try:
+                    first = self._queue.get(timeout=WRITE_POLL_INTERVAL)
+                except Empty:
+                    continue
+
+                batch = [first] if not first.cancelled else []
+                while len(batch) < WRITE_BATCH_MAX_JOBS:
+                    try:
+                        job = self._queue.get_nowait()
+                    except Empty:
+                        break
+                    if not job.cancelled:
+                        batch.append(job)
+                if not batch:
+                    continue
+                for job in batch:
+                    job.started = True
+
+                try:
+                    self._commit_batch(batch)
+                except Exception as exc:
+                    logger.error("SQLite writer batch failed: %s", exc)
+                    for job in batch:
+                        if not job.result.ready():
+                            job.result.set_exception(exc)
+        finally:
+            self._loop_active = False
+
+    def _commit_batch(self, batch):
+        conn = self._writer_connection()
+        started = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+
+        outcomes = []
+        try:
+            for job in batch:
+                conn.execute("SAVEPOINT write_job")
+                try:
+                    value = job.fn(conn, *job.args, **job.kwargs)
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO write_job")
+                    conn.execute("RELEASE write_job")
+                    outcomes.append((job, None, exc))
+                    continue
+                conn.execute("RELEASE write_job")
+                outcomes.append((job, value, None))
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+        commit_ms = (time.perf_counter() - started) * 1000.0
+        failed = 0
+        for job, value, exc in outcomes:
+            if exc is not None:
+                failed += 1
+                job.result.set_exception(exc)
+            else:
+                job.result.set(value)
+
+        state = self.get_state()
+        self.set_state({
+            'queue_size': self._queue.qsize(),
+            'batches': state['batches'] + 1,
+            'jobs': state['jobs'] + len(batch),
+            'failed_jobs': state['failed_jobs'] + failed,
+            'max_batch': max(state['max_batch'], len(batch)),
+            'last_batch_size': len(batch),
+            'last_commit_ms': round(commit_ms, 2),
+        })
+
+    def _writer_connection(self):
+        db_path = get_db_path()
+        if self._connection is None or self._connection_path != db_path:
+            self._close_connection()
+            self._connection = open_connection(db_path)
+            self._connection_path = db_path
+        return self._connection
+
+    def _close_connection(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except sqlite3.Error:
+                pass
+        self._connection = None
+        self._connection_path = None
+
+    @staticmethod
+    def _run_job_inline(job):
+        try:
+            job.result.set(run_write_inline(job.fn, *job.args, **job.kwargs))
+        except Exception as exc:
+            job.result.set_exception(exc)
@@ -1,11 +1,41 @@
 """Specter runtime owner for periodic stale media-index cleanup."""
 
 import logging
+import os
+import time
 
+import gevent
+
+from app.constants import BUS_EVENTS
 from specter import Service
 
 logger = logging.getLogger(__name__)
 
+# Directory listings and category paths used by on-demand verification are
+# reused for this long, so paging through one folder costs one scandir.
+STALE_VERIFY_LISTING_TTL_SECONDS = 30
+STALE_VERIFY_MAX_CACHED_DIRS = 512
+
+
+def _list_directory_names(dir_path):
+    """Return the entry names in a directory, or an empty set if it is gone.
+
+    Returns None when the directory exists but cannot be read, so callers
+    never delete rows on a transient permission or I/O error.
+    """
+    try:
+        with os.scandir(dir_path) as entries:
+            return frozenset(entry.name for entry in entries)
+    except (FileNotFoundError, NotADirectoryError):
+        return frozenset()
+    except OSError:
+        return None
+
+
+def _existing_paths(paths):
+    """Return the subset of ``paths`` that exist on disk right now."""
+    return {path for path in paths if os.path.exists(path)}
+
 
 class StaleMediaCleanupRuntimeService(Service):
     """Own periodic filesystem validation passes for `media_index` rows."""
@@ -17,8 +47,34 @@ class StaleMediaCleanupRuntimeService(Service):
             'cleanup_interval_seconds': 0,
             'initial_delay_seconds': 0,
             'periodic_cleanup_enabled': False,
+            'verification_queued': 0,
+            'verification_stale_deleted': 0,
         })
         self._batch_size = 0
+        self._pending_verification = {}
+        self._verification_running = False
+        self._dir_listings = {}
+        self._category_paths = {}
+
+    def on_start(self):
+        """Drop cached listings for directories that just gained files."""
+        self.listen(BUS_EVENTS['STORAGE_FILE_UPLOADED'], self._handle_file_uploaded)
+        self.listen(BUS_EVENTS['STORAGE_FILE_RENAMED'], self._handle_file_renamed)
+
+    def _handle_file_uploaded(self, payload):
+        target_path = payload.get('target_path')
+        if target_path:
+            self.invalidate_directories([os.path.dirname(target_path)])
+
+    def _handle_file_renamed(self, payload):
+        new_path = payload.get('new_path')
+        if new_path:
+            self.invalidate_directories([os.path.dirname(new_path)])
+
+    def invalidate_directories(self, dir_paths):
+        """Forget cached listings so new files are not reported as missing."""
+        for dir_path in dir_paths:
+            self._dir_listings.pop(os.path.normpath(dir_path), None)
 
     def initialize_runtime(
         self,
@@ -76,3 +132,142 @@ class StaleMediaCleanupRuntimeService(Service):
                 logger.info("Periodic stale media cleanup deleted %s rows", deleted)
         except Exception as exc:
             logger.warning("Periodic stale media cleanup failed: %s", exc)
+
+    def queue_verification(self, entries):
+        """Queue (category_id, rel_path) rows for background existence checks."""
+        queued = 0
+        for category_id, rel_path in entries:
+            if category_id and rel_path:
+                self._pending_verification[(category_id, str(rel_path))] = None
+                queued += 1
+        if not queued:
+            return 0
+
+        self.set_state({
+            'verification_queued': self.state.get('verification_queued', 0) + queued,
+        })
+        if not self._verification_running:
+            self._verification_running = True
+            try:
+                self.spawn(self._drain_verification_queue, label='stale_media_verification')
+            except Exception:
+                self._verification_running = False
+                raise
+        return queued
+
+    def is_known_missing(self, category_id, rel_path):
+        """Return True when cached listings already show the row is stale.
+
+        Only consults in-memory state, so request paths can drop known-stale
+        rows without touching the disk.
+        """
+        now = time.time()
+        cached_category = self._category_paths.get(category_id)
+        if not cached_category or cached_category[0] < now:
+            return False
+        base_path = cached_category[1]
+        if not base_path:
+            return True
+
+        parent, name = os.path.split(os.path.join(base_path, str(rel_path)))
+        cached_listing = self._dir_listings.get(os.path.normpath(parent))
+        if not cached_listing or cached_listing[0] < now or cached_listing[1] is None:
+            return False
+        return name not in cached_listing[1]
+
+    def _drain_verification_queue(self):
+        """Verify queued rows with one scandir per parent directory."""
+        from app.services.media import media_index_service
+
+        try:
+            while self._pending_verification:
+                pending = list(self._pending_verification)
+                self._pending_verification.clear()
+
+                by_directory = {}
+                stale_entries = []
+                candidates = {}
+                for category_id, rel_path in pending:
+                    base_path = self._resolve_category_path(category_id)
+                    if not base_path:
+                        stale_entries.append((category_id, rel_path))
+                        continue
+                    parent, name = os.path.split(os.path.join(base_path, rel_path))
+                    by_directory.setdefault(parent, []).append((category_id, rel_path, name))
+
+                for parent, rows in by_directory.items():
+                    names = self._get_directory_listing(parent)
+                    if names is None:
+                        continue
+                    for category_id, rel_path, name in rows:
+                        if name not in names:
+                            candidates[os.path.join(parent, name)] = (category_id, rel_path)
+                    gevent.sleep(0)
+
+                if candidates:
+                    # Listings may be up to a TTL old; never delete a row
+                    # whose file exists now.
+                    from app.services.storage.storage_io_service import get_file_io_pool
+
+                    existing = get_file_io_pool().spawn(_existing_paths, list(candidates)).get()
+                    stale_entries.extend(
+                        entry for path, entry in candidates.items() if path not in existing
+                    )
+
+                if stale_entries:
+                    deleted = media_index_service.delete_media_index_entries_batch(
+                        stale_entries,
+                    )
+                    self.set_state({
+                        'verification_stale_deleted': (
+                            self.state.get('verification_stale_deleted', 0) + deleted
+                        ),
+                    })
+                    logger.info(
+                        "Stale media verification removed %s of %s checked rows",
+                        deleted,
+                        len(pending),
+                    )
+        except Exception as exc:
+            logger.warning("Stale media verification failed: %s", exc)
+        finally:
+            self._verification_running = False
+
+    def _resolve_category_path(self, category_id):
+        """Return a category's base path, cached for the listing TTL."""
+        now = time.time()
+        cached = self._category_paths.get(category_id)
+        if cached and cached[0] >= now:
+            return cached[1]
+
+        from app.services.media.category_query_service import get_category_by_id
+
+        category = get_category_by_id(category_id)
+        base_path = category.get('path') if category else None
+        self._category_paths[category_id] = (
+            now + STALE_VERIFY_LISTING_TTL_SECONDS,
+            base_path,
+        )
+        return base_path
+
+    def _get_directory_listing(self, dir_path):
+        """Return cached entry names for a directory, scanning off the hub."""
+        now = time.time()
+        dir_path = os.path.normpath(dir_path)
+        cached = self._dir_listings.get(dir_path)
+        if cached and cached[0] >= now:
+            return cached[1]
+
+        from app.services.storage.storage_io_service import get_file_io_pool
+
+        names = get_file_io_pool().spawn(_list_directory_names, dir_path).get()
+        if len(self._dir_listings) >= STALE_VERIFY_MAX_CACHED_DIRS:
+            self._dir_listings = {
+                path: entry
+                for path, entry in self._dir_listings.items()
+                if entry[0] >= now
+            }
+            if len(self._dir_listings) >= STALE_VERIFY_MAX_CACHED_DIRS:
+                self._dir_listings.pop(next(iter(self._dir_listings)))
+        self._dir_listings[dir_path] = (now + STALE_VERIFY_LISTING_TTL_SECONDS, names)
+        return names
@@ -2,7 +2,7 @@
 
 import logging
 
-from app.services.ghoststream import ghoststream_service
+from app.services.ghoststream import ghoststream_service, hls_proxy_service
 from specter import Service
 
 logger = logging.getLogger(__name__)
@@ -99,6 +99,11 @@ class GhostStreamRuntimeService(Service):
         except Exception as exc:
             logger.debug("GhostStream websocket disconnect skipped: %s", exc)
 
+        try:
+            hls_proxy_service.close_upstream_sessions()
+        except Exception as exc:
+            logger.debug("GhostStream proxy pool teardown skipped: %s", exc)
+
         self.set_state({
             'runtime_initialized': False,
             'discovery_started': False,
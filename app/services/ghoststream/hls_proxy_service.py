@@ -0,0 +1,385 @@
+"""
+GhostStream HLS Proxy
+---------------------
+Streams HLS playlists and segments from GhostStream servers to browsers.
+
+- One keep-alive connection pool per GhostStream server
+- Segment bodies are passed through in chunks instead of buffered whole
+- Range requests are forwarded upstream untouched
+- Recently fetched segments are kept in a small byte-bounded LRU, and
+  concurrent requests for a segment that is still downloading share the
+  in-flight upstream fetch, so sync viewers cost one upstream read
+- The shared fetch is drained by its own greenlet, so a viewer that
+  disconnects never cuts the segment short for the others
+"""
+import logging
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+import gevent
+import requests
+from gevent.queue import Empty, Queue
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+UPSTREAM_CONNECT_TIMEOUT = 5.0
+UPSTREAM_READ_TIMEOUT = 120.0
+UPSTREAM_POOL_MAXSIZE = 8
+PROXY_CHUNK_SIZE = 64 * 1024
+
+SEGMENT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+SEGMENT_CACHE_MAX_ENTRY_BYTES = 8 * 1024 * 1024
+# Playlists change while a transcode is running, so only segments are shared.
+SEGMENT_SUFFIXES = ('.ts', '.m4s', '.mp4', '.aac', '.vtt')
+
+PASSTHROUGH_HEADERS = ('Content-Length', 'Content-Range')
+
+_FETCH_FAILED = object()
+
+
+def content_type_for(filename):
+    """Return the Content-Type for an HLS asset name."""
+    if filename.endswith('.m3u8'):
+        return 'application/vnd.apple.mpegurl'
+    if filename.endswith('.ts'):
+        return 'video/mp2t'
+    if filename.endswith('.mp4'):
+        return 'video/mp4'
+    return 'application/octet-stream'
+
+
+class ProxiedAsset:
+    """Upstream answer for one proxied HLS request."""
+
+    __slots__ = ('status', 'body', 'headers', 'location')
+
+    def __init__(self, status, body=b'', headers=None, location=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.location = location
+
+
+class SegmentCache:
+    """Byte-bounded LRU of complete segment bodies keyed by upstream URL."""
+
+    def __init__(self, max_bytes=SEGMENT_CACHE_MAX_BYTES, max_entry_bytes=SEGMENT_CACHE_MAX_ENTRY_BYTES):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_entry_bytes:
+            return False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self._size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+class _SegmentFetch:
+    """One upstream segment download fanned out to every concurrent viewer.
+
+    Chunks are kept for replay to late joiners until the segment outgrows
+    the cache entry limit; from then on the fetch only serves the viewers
+    already subscribed.
+    """
+
+    def __init__(self, headers, max_bytes=SEGMENT_CACHE_MAX_ENTRY_BYTES):
+        self.headers = headers
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.oversized = False
+        self._chunks = []
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """Return a queue replaying chunks received so far, then live ones.
+
+        Returns None once the fetch stopped keeping chunks for replay.
+        """
+        subscriber = Queue()
+        with self._lock:
+            if self.oversized:
+                return None
+            for chunk in self._chunks:
+                subscriber.put(chunk)
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def publish(self, chunk):
+        """Fan ``chunk`` out; return True if it pushed the fetch past the cap."""
+        with self._lock:
+            self.size += len(chunk)
+            overflowed = not self.oversized and self.size > self.max_bytes
+            if overflowed:
+                self.oversized = True
+                self._chunks = []
+            elif not self.oversized:
+                self._chunks.append(chunk)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.put(chunk)
+        return overflowed
+
+    def finish(self, completed):
+        marker = None if completed else _FETCH_FAILED
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for subscriber in subscribers:
+            subscriber.put(marker)
+
+    def body(self):
+        """Return the whole segment, or None if it was too large to keep."""
+        with self._lock:
+            if self.oversized:
+                return None
+            return b''.join(self._chunks)
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_segment_cache = SegmentCache()
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def get_upstream_session(url):
+    """Return the pooled keep-alive session for the server hosting ``url``."""
+    parts = urlsplit(url)
+    key = f"{parts.scheme}://{parts.netloc}"
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=UPSTREAM_POOL_MAXSIZE)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[key] = session
+    return session
+
+
+def close_upstream_sessions():
+    """Close every pooled upstream connection and drop cached segments."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        try:
+            session.close()
+        except Exception as exc:
+            logger.debug("[GhostStream Proxy] Session close failed: %s", exc)
+    _segment_cache.clear()
+
+
+def get_proxy_stats():
+    """Return pool and segment cache counters for diagnostics."""
+    return {
+        'upstream_pools': len(_sessions),
+        'inflight_segments': len(_inflight),
+        'segment_cache': _segment_cache.stats(),
+    }
+
+
+def _passthrough_headers(response):
+    headers = {}
+    if response.headers.get('Content-Encoding'):
+        # requests decodes the body, so upstream lengths no longer apply.
+        return headers
+    for name in PASSTHROUGH_HEADERS:
+        value = response.headers.get(name)
+        if value:
+            headers[name] = value
+    return headers
+
+
+def _stream_body(response):
+    try:
+        for chunk in response.iter_content(chunk_size=PROXY_CHUNK_SIZE):
+            if chunk:
+                yield chunk
+    finally:
+        response.close()
+
+
+def _release_inflight(url, fetch):
+    with _inflight_lock:
+        if _inflight.get(url) is fetch:
+            del _inflight[url]
+
+
+def _drain_segment_fetch(url, response, fetch):
+    """Read a shared segment to the end, independent of any one viewer."""
+    completed = False
+    try:
+        for chunk in response.iter_content(chunk_size=PROXY_CHUNK_SIZE):
+            if chunk and fetch.publish(chunk):
+                # Too large to replay or cache: new viewers fetch their own.
+                _release_inflight(url, fetch)
+        completed = True
+    except Exception as exc:
+        logger.debug("[GhostStream Proxy] Segment fetch failed for %s: %s", url, exc)
+    finally:
+        response.close()
+        _release_inflight(url, fetch)
+        if completed:
+            body = fetch.body()
+            if body is not None:
+                _segment_cache.put(url, body)
+        fetch.finish(completed)
+
+
+def _follow_segment_fetch(fetch, subscriber):
+    try:
+        while True:
+            try:
+                chunk = subscriber.get(timeout=UPSTREAM_READ_TIMEOUT)
+            except Empty:
+                return
+            if chunk is None or chunk is _FETCH_FAILED:
+                return
+            yield chunk
+    finally:
+        fetch.unsubscribe(subscriber)
+
+
+def _join_segment_fetch(fetch):
+    """Return a follower body for ``fetch``, or None if it cannot be joined."""
+    subscriber = fetch.subscribe()
+    if subscriber is None:
+        return None
+    return _follow_segment_fetch(fetch, subscriber)
+
+
+def head_hls_asset(url, auth_headers=None):
+    """Answer a HEAD request from local state, or ask upstream for it.
+
+    Bodies are empty iterators so the response keeps the asset's length.
+    """
+    cached = _segment_cache.get(url)
+    if cached is not None:
+        return ProxiedAsset(200, iter(()), {'Content-Length': str(len(cached))})
+    fetch = _inflight.get(url)
+    if fetch is not None:
+        return ProxiedAsset(200, iter(()), dict(fetch.headers))
+
+    response = get_upstream_session(url).head(
+        url,
+        headers=dict(auth_headers or {}),
+        timeout=(UPSTREAM_CONNECT_TIMEOUT, UPSTREAM_READ_TIMEOUT),
+        allow_redirects=False,
+    )
+    try:
+        if response.status_code == 307:
+            return ProxiedAsset(307, location=response.headers.get('location', ''))
+        return ProxiedAsset(response.status_code, iter(()), _passthrough_headers(response))
+    finally:
+        response.close()
+
+
+def open_hls_asset(url, filename, auth_headers=None, range_header=None):
+    """Fetch one HLS asset from GhostStream.
+
+    Returns a ``ProxiedAsset`` whose body is bytes for playlists, cached
+    segments and errors, or a chunk iterator for streamed segments.
+    """
+    shareable = not range_header and filename.endswith(SEGMENT_SUFFIXES)
+    if shareable:
+        cached = _segment_cache.get(url)
+        if cached is not None:
+            return ProxiedAsset(200, cached, {'Content-Length': str(len(cached))})
+        fetch = _inflight.get(url)
+        if fetch is not None:
+            body = _join_segment_fetch(fetch)
+            if body is not None:
+                return ProxiedAsset(200, body, dict(fetch.headers))
+
+    request_headers = dict(auth_headers or {})
+    if range_header:
+        request_headers['Range'] = range_header
+
+    response = get_upstream_session(url).get(
+        url,
+        headers=request_headers,
+        timeout=(UPSTREAM_CONNECT_TIMEOUT, UPSTREAM_READ_TIMEOUT),
+        allow_redirects=False,
+        stream=True,
+    )
+
+    if response.status_code == 307:
+        location = response.headers.get('location', '')
+        response.close()
+        return ProxiedAsset(307, location=location)
+
+    if response.status_code not in (200, 206) or filename.endswith('.m3u8'):
+        try:
+            return ProxiedAsset(response.status_code, response.content)
+        finally:
+            response.close()
+
+    headers = _passthrough_headers(response)
+    if not shareable or response.status_code != 200:
+        return ProxiedAsset(response.status_code, _stream_body(response), headers)
+
+    with _inflight_lock:
+        existing = _inflight.get(url)
+        if existing is None:
+            fetch = _SegmentFetch(headers, _segment_cache.max_entry_bytes)
+            _inflight[url] = fetch
+    if existing is not None:
+        # Another viewer started the same fetch while we were connecting.
+        body = _join_segment_fetch(existing)
+        if body is not None:
+            response.close()
+            return ProxiedAsset(200, body, dict(existing.headers))
+        return ProxiedAsset(200, _stream_body(response), headers)
+
+    body = _join_segment_fetch(fetch)
+    gevent.spawn(_drain_segment_fetch, url, response, fetch)
+    return ProxiedAsset(200, body, headers)
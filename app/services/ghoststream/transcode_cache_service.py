@@ -3,18 +3,23 @@ Transcode Cache Service
 -----------------------
 Manages cached transcoded files in .ghosthub folder alongside original media.
 Supports batch pre-transcoding and automatic cache cleanup.
+
+The cache index lives in the transcode_cache SQLite table with trigger-kept
+per-category byte totals; legacy cache_index.json files are imported once.
 """
 import os
 import json
 import hashlib
 import logging
+import time
 import gevent
 from pathlib import Path
 from typing import Optional, Dict, List, Any
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from specter import Service, registry
 
+from app.services.core.sqlite_runtime_service import get_db, run_write
 from .transcode_cache_runtime_store import transcode_cache_runtime_store
 
 logger = logging.getLogger(__name__)
@@ -29,6 +34,14 @@ DEFAULT_MAX_CACHE_SIZE_GB = 50  # Max cache size in GB
 DEFAULT_MAX_CACHE_AGE_DAYS = 30  # Max age of cached files
 DEFAULT_CACHE_CLEANUP_INTERVAL = 3600  # Check for cleanup every hour
 
+# Seconds between last_accessed writes for the same entry
+ACCESS_TOUCH_INTERVAL = 60
+# Entries fetched per LRU eviction query
+EVICTION_BATCH_SIZE = 32
+
+# Category paths whose legacy cache_index.json was already imported
+_imported_categories = set()
+
 def _transcode_cache_runtime_access(reader):
     """Read transcode-cache runtime state atomically."""
     return transcode_cache_runtime_store.access(reader)
@@ -58,8 +71,13 @@ def _generate_cache_key(filename: str, resolution: str = "original",
     return hashlib.md5(key_str.encode()).hexdigest()[:12]
 
 
+def _category_key(category_path: str) -> str:
+    """Normalize a category path for use as the cache index key."""
+    return os.path.normpath(str(category_path))
+
+
 def _load_cache_index(category_path: str) -> Dict[str, Dict]:
-    """Load the cache index for a category."""
+    """Load a legacy cache_index.json for a category (pre-SQLite format)."""
     index_path = get_cache_index_path(category_path)
     if index_path.exists():
         try:
@@ -70,15 +88,107 @@ def _load_cache_index(category_path: str) -> Dict[str, Dict]:
     return {}
 
 
-def _save_cache_index(category_path: str, index: Dict[str, Dict]):
-    """Save the cache index for a category."""
+def _parse_timestamp(value, default: float) -> float:
+    """Accept epoch numbers or the ISO strings the JSON index stored."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    return default
+
+
+def _import_legacy_index(category_path: str):
+    """Move a category's cache_index.json into SQLite once, then retire the file."""
+    key = _category_key(category_path)
+    if key in _imported_categories:
+        return
+    _imported_categories.add(key)
+
     index_path = get_cache_index_path(category_path)
+    if not index_path.exists():
+        return
+
+    index = _load_cache_index(category_path)
+    now = time.time()
+    rows = []
+    for cache_key, entry in index.items():
+        if not isinstance(entry, dict) or not entry.get("path"):
+            continue
+        created_at = _parse_timestamp(entry.get("created_at"), now)
+        rows.append((
+            key,
+            cache_key,
+            entry.get("original_filename", ""),
+            entry["path"],
+            entry.get("resolution", "original"),
+            entry.get("video_codec", "h264"),
+            entry.get("audio_codec", "aac"),
+            int(entry.get("file_size") or 0),
+            int(entry.get("source_size") or 0),
+            created_at,
+            _parse_timestamp(entry.get("last_accessed"), created_at),
+        ))
+
     try:
-        index_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(index_path, 'w') as f:
-            json.dump(index, f, indent=2, default=str)
+        if rows:
+            run_write(_upsert_cache_rows, rows)
+        index_path.replace(index_path.with_name(f"{CACHE_INDEX_FILE}.migrated"))
+        logger.info(f"[TranscodeCache] Imported {len(rows)} entries from {index_path}")
     except Exception as e:
-        logger.error(f"Failed to save cache index to {index_path}: {e}")
+        _imported_categories.discard(key)
+        logger.error(f"[TranscodeCache] Failed to import cache index {index_path}: {e}")
+
+
+def _upsert_cache_rows(conn, rows):
+    conn.executemany(
+        """
+        INSERT INTO transcode_cache (
+            category_path, cache_key, original_filename, path, resolution,
+            video_codec, audio_codec, file_size, source_size, created_at, last_accessed
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (category_path, cache_key) DO UPDATE SET
+            original_filename = excluded.original_filename,
+            path = excluded.path,
+            resolution = excluded.resolution,
+            video_codec = excluded.video_codec,
+            audio_codec = excluded.audio_codec,
+            file_size = excluded.file_size,
+            source_size = excluded.source_size,
+            created_at = excluded.created_at,
+            last_accessed = excluded.last_accessed
+        """,
+        rows,
+    )
+
+
+def _delete_cache_rows(conn, category_key, cache_keys):
+    conn.executemany(
+        "DELETE FROM transcode_cache WHERE category_path = ? AND cache_key = ?",
+        [(category_key, cache_key) for cache_key in cache_keys],
+    )
+
+
+def _touch_cache_row(conn, category_key, cache_key, accessed_at):
+    conn.execute(
+        """
+        UPDATE transcode_cache SET last_accessed = ?
+        WHERE category_path = ? AND cache_key = ?
+        """,
+        (accessed_at, category_key, cache_key),
+    )
+
+
+def _unlink_cached(cached_path: Path, reason: str):
+    if cached_path.exists():
+        try:
+            cached_path.unlink()
+            logger.info(f"[TranscodeCache] {reason}: {cached_path}")
+        except Exception as e:
+            logger.error(f"[TranscodeCache] Failed to delete cached file {cached_path}: {e}")
 
 
 def get_cached_file(category_path: str, filename: str, 
@@ -91,26 +201,35 @@ def get_cached_file(category_path: str, filename: str,
     Returns:
         Path to cached file if exists and valid, None otherwise
     """
+    _import_legacy_index(category_path)
+    category_key = _category_key(category_path)
     cache_key = _generate_cache_key(filename, resolution, video_codec, audio_codec)
-    index = _load_cache_index(category_path)
-    
-    if cache_key in index:
-        entry = index[cache_key]
-        cached_path = Path(entry.get("path", ""))
-        
-        if cached_path.exists():
-            # Update last accessed time
-            entry["last_accessed"] = datetime.now().isoformat()
-            _save_cache_index(category_path, index)
-            logger.info(f"[TranscodeCache] Cache hit: {filename} -> {cached_path}")
-            return str(cached_path)
-        else:
-            # Cached file missing, remove from index
-            del index[cache_key]
-            _save_cache_index(category_path, index)
-            logger.warning(f"[TranscodeCache] Cached file missing, removed from index: {cached_path}")
-    
-    return None
+
+    with get_db() as conn:
+        row = conn.execute(
+            """
+            SELECT path, last_accessed FROM transcode_cache
+            WHERE category_path = ? AND cache_key = ?
+            """,
+            (category_key, cache_key),
+        ).fetchone()
+
+    if row is None:
+        return None
+
+    cached_path = Path(row["path"])
+    if not cached_path.exists():
+        # Cached file missing, remove from index
+        run_write(_delete_cache_rows, category_key, [cache_key])
+        logger.warning(f"[TranscodeCache] Cached file missing, removed from index: {cached_path}")
+        return None
+
+    # LRU order only needs coarse timestamps; skip the write on rapid re-checks.
+    now = time.time()
+    if now - row["last_accessed"] >= ACCESS_TOUCH_INTERVAL:
+        run_write(_touch_cache_row, category_key, cache_key, now)
+    logger.info(f"[TranscodeCache] Cache hit: {filename} -> {cached_path}")
+    return str(cached_path)
 
 
 def add_cached_file(category_path: str, filename: str, cached_path: str,
@@ -135,22 +254,28 @@ def add_cached_file(category_path: str, filename: str, cached_path: str,
     Returns:
         True if added successfully
     """
+    _import_legacy_index(category_path)
     cache_key = _generate_cache_key(filename, resolution, video_codec, audio_codec)
-    index = _load_cache_index(category_path)
-    
-    index[cache_key] = {
-        "original_filename": filename,
-        "path": cached_path,
-        "resolution": resolution,
-        "video_codec": video_codec,
-        "audio_codec": audio_codec,
-        "file_size": file_size,
-        "source_size": source_size,
-        "created_at": datetime.now().isoformat(),
-        "last_accessed": datetime.now().isoformat()
-    }
-    
-    _save_cache_index(category_path, index)
+    now = time.time()
+
+    try:
+        run_write(_upsert_cache_rows, [(
+            _category_key(category_path),
+            cache_key,
+            filename,
+            str(cached_path),
+            resolution,
+            video_codec,
+            audio_codec,
+            int(file_size or 0),
+            int(source_size or 0),
+            now,
+            now,
+        )])
+    except Exception as e:
+        logger.error(f"[TranscodeCache] Failed to add {filename} to cache index: {e}")
+        return False
+
     logger.info(f"[TranscodeCache] Added to cache: {filename} ({resolution}) -> {cached_path}")
     return True
 
@@ -160,47 +285,80 @@ def remove_cached_file(category_path: str, filename: str,
                        video_codec: str = "h264",
                        audio_codec: str = "aac") -> bool:
     """Remove a file from the cache (both index and actual file)."""
+    _import_legacy_index(category_path)
+    category_key = _category_key(category_path)
     cache_key = _generate_cache_key(filename, resolution, video_codec, audio_codec)
-    index = _load_cache_index(category_path)
-    
-    if cache_key in index:
-        entry = index[cache_key]
-        cached_path = Path(entry.get("path", ""))
-        
-        # Delete the actual file
-        if cached_path.exists():
-            try:
-                cached_path.unlink()
-                logger.info(f"[TranscodeCache] Deleted cached file: {cached_path}")
-            except Exception as e:
-                logger.error(f"[TranscodeCache] Failed to delete cached file {cached_path}: {e}")
-        
-        # Remove from index
-        del index[cache_key]
-        _save_cache_index(category_path, index)
-        return True
-    
-    return False
+
+    with get_db() as conn:
+        row = conn.execute(
+            "SELECT path FROM transcode_cache WHERE category_path = ? AND cache_key = ?",
+            (category_key, cache_key),
+        ).fetchone()
+
+    if row is None:
+        return False
+
+    _unlink_cached(Path(row["path"]), "Deleted cached file")
+    run_write(_delete_cache_rows, category_key, [cache_key])
+    return True
+
+
+def _entry_from_row(row) -> Dict[str, Any]:
+    return {
+        "original_filename": row["original_filename"],
+        "path": row["path"],
+        "resolution": row["resolution"],
+        "video_codec": row["video_codec"],
+        "audio_codec": row["audio_codec"],
+        "file_size": row["file_size"],
+        "source_size": row["source_size"],
+        "created_at": datetime.fromtimestamp(row["created_at"]).isoformat(),
+        "last_accessed": datetime.fromtimestamp(row["last_accessed"]).isoformat(),
+    }
+
+
+def get_cache_totals(category_path: Optional[str] = None) -> Dict[str, int]:
+    """Return the running file count and byte total for a category, or all categories."""
+    if category_path is not None:
+        _import_legacy_index(category_path)
+    with get_db() as conn:
+        if category_path is None:
+            row = conn.execute(
+                """
+                SELECT COALESCE(SUM(file_count), 0) AS file_count,
+                       COALESCE(SUM(total_bytes), 0) AS total_bytes
+                FROM transcode_cache_totals
+                """
+            ).fetchone()
+        else:
+            row = conn.execute(
+                "SELECT file_count, total_bytes FROM transcode_cache_totals WHERE category_path = ?",
+                (_category_key(category_path),),
+            ).fetchone()
+    if row is None:
+        return {"file_count": 0, "total_size_bytes": 0}
+    return {"file_count": row["file_count"], "total_size_bytes": row["total_bytes"]}
 
 
 def get_cache_stats(category_path: str) -> Dict[str, Any]:
     """Get cache statistics for a category."""
-    index = _load_cache_index(category_path)
-    
-    total_size = 0
-    file_count = 0
-    
-    for entry in index.values():
-        file_size = entry.get("file_size", 0)
-        if isinstance(file_size, int):
-            total_size += file_size
-        file_count += 1
-    
+    totals = get_cache_totals(category_path)
+    with get_db() as conn:
+        rows = conn.execute(
+            """
+            SELECT * FROM transcode_cache
+            WHERE category_path = ?
+            ORDER BY last_accessed DESC
+            """,
+            (_category_key(category_path),),
+        ).fetchall()
+
+    total_size = totals["total_size_bytes"]
     return {
-        "file_count": file_count,
+        "file_count": totals["file_count"],
         "total_size_bytes": total_size,
         "total_size_mb": round(total_size / (1024 * 1024), 2),
-        "entries": list(index.values())
+        "entries": [_entry_from_row(row) for row in rows]
     }
 
 
@@ -211,40 +369,25 @@ def cleanup_old_cache(category_path: str, max_age_days: int = DEFAULT_MAX_CACHE_
     Returns:
         Number of files cleaned up
     """
-    index = _load_cache_index(category_path)
-    cutoff = datetime.now() - timedelta(days=max_age_days)
-    removed_count = 0
-    
-    keys_to_remove = []
-    
-    for cache_key, entry in index.items():
-        last_accessed_str = entry.get("last_accessed")
-        if last_accessed_str:
-            try:
-                last_accessed = datetime.fromisoformat(last_accessed_str)
-                if last_accessed < cutoff:
-                    keys_to_remove.append(cache_key)
-            except ValueError:
-                pass
-    
-    for cache_key in keys_to_remove:
-        entry = index[cache_key]
-        cached_path = Path(entry.get("path", ""))
-        
-        if cached_path.exists():
-            try:
-                cached_path.unlink()
-                logger.info(f"[TranscodeCache] Cleaned up old file: {cached_path}")
-            except Exception as e:
-                logger.error(f"[TranscodeCache] Failed to delete old file {cached_path}: {e}")
-        
-        del index[cache_key]
-        removed_count += 1
-    
-    if removed_count > 0:
-        _save_cache_index(category_path, index)
-    
-    return removed_count
+    _import_legacy_index(category_path)
+    category_key = _category_key(category_path)
+    cutoff = time.time() - max_age_days * 86400
+
+    with get_db() as conn:
+        rows = conn.execute(
+            """
+            SELECT cache_key, path FROM transcode_cache
+            WHERE category_path = ? AND last_accessed < ?
+            """,
+            (category_key, cutoff),
+        ).fetchall()
+
+    for row in rows:
+        _unlink_cached(Path(row["path"]), "Cleaned up old file")
+
+    if rows:
+        run_write(_delete_cache_rows, category_key, [row["cache_key"] for row in rows])
+    return len(rows)
 
 
 def cleanup_cache_by_size(category_path: str, max_size_gb: float = DEFAULT_MAX_CACHE_SIZE_GB) -> int:
@@ -254,44 +397,39 @@ def cleanup_cache_by_size(category_path: str, max_size_gb: float = DEFAULT_MAX_C
     Returns:
         Number of files cleaned up
     """
-    index = _load_cache_index(category_path)
     max_size_bytes = int(max_size_gb * 1024 * 1024 * 1024)
-    
-    # Calculate current size
-    current_size = sum(entry.get("file_size", 0) for entry in index.values())
-    
+    current_size = get_cache_totals(category_path)["total_size_bytes"]
     if current_size <= max_size_bytes:
         return 0
-    
-    # Sort by last_accessed (oldest first)
-    sorted_entries = sorted(
-        index.items(),
-        key=lambda x: x[1].get("last_accessed", "")
-    )
-    
+
+    category_key = _category_key(category_path)
     removed_count = 0
-    
-    for cache_key, entry in sorted_entries:
-        if current_size <= max_size_bytes:
+    while current_size > max_size_bytes:
+        # Walks the (category_path, last_accessed) index from the oldest entry.
+        with get_db() as conn:
+            rows = conn.execute(
+                """
+                SELECT cache_key, path, file_size FROM transcode_cache
+                WHERE category_path = ?
+                ORDER BY last_accessed
+                LIMIT ?
+                """,
+                (category_key, EVICTION_BATCH_SIZE),
+            ).fetchall()
+        if not rows:
             break
-        
-        cached_path = Path(entry.get("path", ""))
-        file_size = entry.get("file_size", 0)
-        
-        if cached_path.exists():
-            try:
-                cached_path.unlink()
-                logger.info(f"[TranscodeCache] Cleaned up for size: {cached_path}")
-            except Exception as e:
-                logger.error(f"[TranscodeCache] Failed to delete {cached_path}: {e}")
-        
-        del index[cache_key]
-        current_size -= file_size
-        removed_count += 1
-    
-    if removed_count > 0:
-        _save_cache_index(category_path, index)
-    
+
+        evicted = []
+        for row in rows:
+            if current_size <= max_size_bytes:
+                break
+            _unlink_cached(Path(row["path"]), "Cleaned up for size")
+            evicted.append(row["cache_key"])
+            current_size -= row["file_size"]
+
+        run_write(_delete_cache_rows, category_key, evicted)
+        removed_count += len(evicted)
+
     return removed_count
 
 
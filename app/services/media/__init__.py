@@ -17,7 +17,7 @@ from .library_event_service import *
 from .indexing_runtime_service import *
 from .library_runtime_service import *
 from .progress_event_service import *
-from .sort_runtime_store import *
+from .progress_write_behind_service import *
 from .thumbnail_processing_service import *
 from .thumbnail_runtime_service import *
 from .subtitle_service import *
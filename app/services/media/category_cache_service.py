@@ -24,12 +24,18 @@ def _update_category_runtime(mutator):
     return category_runtime_store.update(mutator)
 
 
+def _bump_generation(draft):
+    """Advance the generation counter whenever cached category payloads change."""
+    draft['generation'] = draft.get('generation', 0) + 1
+
+
 def invalidate_cache():
     """Invalidate the entire category cache."""
     def _reset_cache(draft):
         draft['category_cache'] = []
         draft['last_cache_update'] = 0
         draft['dir_mtime_cache'] = {}
+        _bump_generation(draft)
 
     _update_category_runtime(_reset_cache)
     logger.info("Category cache invalidated")
@@ -63,6 +69,7 @@ def invalidate_cache_for_category(category_path):
             ]
             if len(draft['category_cache']) < original_count:
                 draft['last_cache_update'] = 0
+                _bump_generation(draft)
                 logger.info("Removed category from cache for path: %s", normalized_path)
 
     _update_category_runtime(_invalidate_path)
@@ -125,6 +132,7 @@ def update_cached_category(category_id):
                 category_cache[index]["containsVideo"] = new_contains_video
                 if thumbnail_url:
                     category_cache[index]["thumbnailUrl"] = thumbnail_url
+                _bump_generation(draft)
             if new_path_mtime is not None and cached_path:
                 draft.setdefault('dir_mtime_cache', {})[cached_path] = new_path_mtime
             logger.info(
@@ -144,6 +152,13 @@ def get_cache_timestamp():
     )
 
 
+def get_cache_generation():
+    """Return a counter that changes whenever cached category payloads change."""
+    return _category_runtime_access(
+        lambda state: state.get('generation', 0),
+    )
+
+
 def get_cached_categories(max_age_seconds=CATEGORY_CACHE_TTL):
     """Return a copy of cached categories when the cache is still fresh."""
     current_time = int(time.time())
@@ -165,6 +180,7 @@ def store_cached_categories(categories, timestamp):
     def _cache_categories(draft):
         draft['category_cache'] = list(categories)
         draft['last_cache_update'] = timestamp
+        _bump_generation(draft)
 
     _update_category_runtime(_cache_categories)
 
@@ -230,6 +246,7 @@ def check_content_changes() -> bool:
             draft['last_cache_update'] = 0
             draft['dir_mtime_cache'] = {}
             draft['last_content_check'] = current_time
+            _bump_generation(draft)
         _update_category_runtime(_invalidate)
         return True
 
@@ -44,37 +44,82 @@ def build_manual_categories(categories, summaries):
     return manual_categories
 
 
-def enrich_categories_with_runtime_data(categories):
-    """Attach progress and thumbnail runtime status to category payloads."""
-    if not categories:
-        return
+RUNTIME_OVERLAY_FIELDS = (
+    "tracking_mode",
+    "video_progress_count",
+    "processingStatus",
+    "processingData",
+)
+
+
+def get_runtime_overlays(category_ids, save_video_progress=None):
+    """Return sparse per-category progress and thumbnail runtime fields.
+
+    Only categories with progress entries or in-flight thumbnail work get an
+    entry, so the result doubles as a cheap change signature for listings.
+    """
+    if save_video_progress is None:
+        save_video_progress = get_runtime_config_value("SAVE_VIDEO_PROGRESS", False)
+    category_ids = [category_id for category_id in category_ids if category_id]
+    if not category_ids:
+        return {}
 
-    save_video_progress = get_runtime_config_value("SAVE_VIDEO_PROGRESS", False)
-    category_ids = [category.get("id") for category in categories if category.get("id")]
     thumbnail_runtime = registry.resolve('thumbnail_runtime')
-
     all_video_progress = {}
-    if save_video_progress and category_ids:
+    if save_video_progress:
         progress_controller = registry.resolve('progress')
         if progress_controller is not None:
             all_video_progress = progress_controller.get_video_progress_batch(
                 category_ids,
             )
 
-    for category in categories:
-        category_id = category.get("id")
+    overlays = {}
+    for category_id in category_ids:
+        overlay = {}
         if save_video_progress:
-            category["tracking_mode"] = "video"
             video_progress = all_video_progress.get(category_id, {})
             if video_progress:
-                category["video_progress_count"] = len(video_progress)
+                overlay["video_progress_count"] = len(video_progress)
 
         status = None
         if thumbnail_runtime is not None:
             status = thumbnail_runtime.get_thumbnail_status(category_id)
         if status and status.get("status") in ("generating", "pending"):
-            category["processingStatus"] = "generating"
-            category["processingData"] = status
-        else:
-            category.pop("processingStatus", None)
-            category.pop("processingData", None)
+            overlay["processingStatus"] = "generating"
+            overlay["processingData"] = status
+        if overlay:
+            overlays[category_id] = overlay
+    return overlays
+
+
+def apply_runtime_overlay(category, overlay, save_video_progress):
+    """Apply one category's runtime overlay in place."""
+    if save_video_progress:
+        category["tracking_mode"] = "video"
+        if "video_progress_count" in overlay:
+            category["video_progress_count"] = overlay["video_progress_count"]
+
+    if "processingStatus" in overlay:
+        category["processingStatus"] = overlay["processingStatus"]
+        category["processingData"] = overlay["processingData"]
+    else:
+        category.pop("processingStatus", None)
+        category.pop("processingData", None)
+
+
+def enrich_categories_with_runtime_data(categories):
+    """Attach progress and thumbnail runtime status to category payloads."""
+    if not categories:
+        return
+
+    save_video_progress = get_runtime_config_value("SAVE_VIDEO_PROGRESS", False)
+    overlays = get_runtime_overlays(
+        [category.get("id") for category in categories],
+        save_video_progress,
+    )
+    for category in categories:
+        apply_runtime_overlay(
+            category,
+            overlays.get(category.get("id"), {}),
+            save_video_progress,
+        )
@@ -8,4 +8,5 @@ category_runtime_store = create_store('category_runtime', {
     'last_cache_update': 0,
     'dir_mtime_cache': {},
     'last_content_check': 0,
+    'generation': 0,
 })
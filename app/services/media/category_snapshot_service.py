@@ -0,0 +1,273 @@
+"""Pre-serialized, versioned category listing snapshots."""
+
+import gzip
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+
+from gevent.lock import BoundedSemaphore
+
+from app.services.core.runtime_config_service import get_runtime_config_value
+from app.services.media import media_index_service
+from app.services.media.category_cache_service import (
+    CATEGORY_CACHE_TTL,
+    check_content_changes,
+    get_cache_generation,
+    get_cache_timestamp,
+    has_cached_categories,
+)
+from app.services.media.category_enrichment_service import (
+    RUNTIME_OVERLAY_FIELDS,
+    apply_runtime_overlay,
+    get_runtime_overlays,
+)
+from app.services.media.category_query_service import get_all_categories_with_details
+from app.services.media.hidden_content_service import get_hidden_state_version
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_SNAPSHOT_MAX_PAGES = 64
+CATEGORY_SNAPSHOT_GZIP_MIN_BYTES = 1024
+CATEGORY_SNAPSHOT_GZIP_LEVEL = 6
+
+_bases = {}
+_snapshots = {}
+_snapshot_lock = BoundedSemaphore(1)
+
+
+class CategoryPage:
+    """One serialized listing page plus its gzip variant."""
+
+    __slots__ = ('etag', 'body', 'gzip_body')
+
+    def __init__(self, etag, body, gzip_body):
+        self.etag = etag
+        self.body = body
+        self.gzip_body = gzip_body
+
+
+class CategorySnapshot:
+    """Immutable category list with secondary indexes and a page cache.
+
+    ``version`` changes only when the library, hidden state, drive labels or
+    per-category runtime overlays change, so it is safe as a strong ETag base.
+    """
+
+    def __init__(self, version, categories):
+        self.version = version
+        self.categories = categories
+        self.by_id = {}
+        self.by_parent = {}
+        self.by_media_type = {'all': categories, 'video': [], 'image': []}
+        self._pages = OrderedDict()
+        self._pages_lock = BoundedSemaphore(1)
+
+        for category in categories:
+            category_id = category.get('id')
+            if category_id and category_id not in self.by_id:
+                self.by_id[category_id] = category
+
+            if category.get('containsVideo', False):
+                self.by_media_type['video'].append(category)
+            elif category.get('mediaCount', 0) > 0:
+                self.by_media_type['image'].append(category)
+
+            for parent_name in _breadcrumb_parts(category.get('name', '')):
+                self.by_parent.setdefault(parent_name, []).append(category)
+
+    def select(self, media_filter='all', category_id=None, category_ids=None, parent_name=None):
+        """Return the categories matching the listing filters, in list order."""
+        if category_id:
+            match = self.by_id.get(category_id)
+            selected = [match] if match is not None else []
+        elif category_ids:
+            id_set = {item.strip() for item in category_ids.split(',')}
+            selected = [
+                category for category in self.categories
+                if category.get('id') in id_set
+            ]
+        elif parent_name:
+            selected = self.by_parent.get(parent_name.lower(), [])
+        else:
+            return self.by_media_type.get(media_filter, self.categories)
+
+        if media_filter in ('video', 'image'):
+            allowed = {id(category) for category in self.by_media_type[media_filter]}
+            selected = [category for category in selected if id(category) in allowed]
+        return selected
+
+    def page(self, *, page=1, limit=0, media_filter='all', category_id=None,
+             category_ids=None, parent_name=None, head=None):
+        """Return a cached ``CategoryPage`` for the given listing request."""
+        head_json = (
+            json.dumps(head, sort_keys=True, separators=(',', ':'))
+            if head else ''
+        )
+        page_key = (
+            page, limit, media_filter, category_id or '', category_ids or '',
+            (parent_name or '').lower(), head_json,
+        )
+        with self._pages_lock:
+            cached = self._pages.pop(page_key, None)
+            if cached is not None:
+                self._pages[page_key] = cached
+                return cached
+
+        categories = self.select(
+            media_filter=media_filter,
+            category_id=category_id,
+            category_ids=category_ids,
+            parent_name=parent_name,
+        )
+        if head:
+            categories = [head] + categories
+
+        total = len(categories)
+        if limit > 0:
+            start = (page - 1) * limit
+            categories = categories[start:start + limit]
+
+        body = json.dumps({
+            'categories': categories,
+            'pagination': {
+                'page': page,
+                'limit': limit,
+                'total': total,
+                'totalPages': math.ceil(total / limit) if limit > 0 else 1,
+                'hasMore': limit > 0 and (page * limit) < total,
+            },
+        }, separators=(',', ':')).encode('utf-8')
+
+        gzip_body = None
+        if len(body) >= CATEGORY_SNAPSHOT_GZIP_MIN_BYTES:
+            compressed = gzip.compress(
+                body,
+                compresslevel=CATEGORY_SNAPSHOT_GZIP_LEVEL,
+                mtime=0,
+            )
+            if len(compressed) < len(body):
+                gzip_body = compressed
+
+        page_digest = hashlib.sha1(repr(page_key).encode('utf-8')).hexdigest()[:12]
+        result = CategoryPage(f"cats-{self.version}-{page_digest}", body, gzip_body)
+        with self._pages_lock:
+            self._pages[page_key] = result
+            while len(self._pages) > CATEGORY_SNAPSHOT_MAX_PAGES:
+                self._pages.popitem(last=False)
+        return result
+
+
+def _breadcrumb_parts(name):
+    """Return the lower-cased ancestor names from an auto-category display name."""
+    if '(' not in name:
+        return ()
+    breadcrumb = name.split('(', 1)[1].rstrip(')')
+    return tuple(dict.fromkeys(
+        part.strip().lower() for part in breadcrumb.split('›')
+    ))
+
+
+def _drive_label_signature():
+    try:
+        from app.services.storage.drive_label_service import get_drive_folder_labels
+        return tuple(sorted(get_drive_folder_labels().items()))
+    except Exception:
+        return ()
+
+
+def _cache_is_fresh():
+    last_update = get_cache_timestamp()
+    return last_update > 0 and (time.time() - last_update) < CATEGORY_CACHE_TTL
+
+
+def _base_key(show_hidden):
+    return (
+        get_cache_generation(),
+        get_hidden_state_version(),
+        _drive_label_signature(),
+        bool(show_hidden),
+    )
+
+
+def _build_base(show_hidden, force_refresh):
+    """Build the overlay-free category list for one visibility mode."""
+    categories = get_all_categories_with_details(
+        use_cache=not force_refresh,
+        show_hidden=show_hidden,
+    )
+    base_categories = [
+        {
+            key: value for key, value in category.items()
+            if key not in RUNTIME_OVERLAY_FIELDS
+        }
+        for category in categories
+    ]
+    return {
+        'key': _base_key(show_hidden),
+        'library_version': media_index_service.get_library_version_hash(),
+        'categories': base_categories,
+    }
+
+
+def get_category_snapshot(show_hidden=False, force_refresh=False):
+    """Return the current category snapshot for a visibility mode.
+
+    The overlay-free list is rebuilt only when the category cache generation,
+    hidden-state version or drive labels change. Progress counts and thumbnail
+    status are read on every call and folded into the snapshot version.
+    """
+    if not force_refresh and has_cached_categories():
+        check_content_changes()
+
+    show_hidden = bool(show_hidden)
+    base = None if force_refresh else _bases.get(show_hidden)
+    if base is None or not _cache_is_fresh() or base['key'] != _base_key(show_hidden):
+        base = _build_base(show_hidden, force_refresh)
+        with _snapshot_lock:
+            _bases[show_hidden] = base
+
+    save_video_progress = bool(get_runtime_config_value("SAVE_VIDEO_PROGRESS", False))
+    overlays = get_runtime_overlays(
+        [category.get('id') for category in base['categories']],
+        save_video_progress,
+    )
+    overlay_signature = json.dumps(overlays, sort_keys=True, default=str)
+    version = hashlib.sha1(
+        f"{base['library_version']}|{base['key']!r}|{save_video_progress}|"
+        f"{overlay_signature}".encode('utf-8')
+    ).hexdigest()[:20]
+
+    snapshot = _snapshots.get(show_hidden)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    categories = []
+    for base_category in base['categories']:
+        category = dict(base_category)
+        apply_runtime_overlay(
+            category,
+            overlays.get(category.get('id'), {}),
+            save_video_progress,
+        )
+        categories.append(category)
+
+    snapshot = CategorySnapshot(version, categories)
+    with _snapshot_lock:
+        _snapshots[show_hidden] = snapshot
+    logger.debug(
+        "Built category snapshot %s (%s categories, show_hidden=%s)",
+        version,
+        len(categories),
+        show_hidden,
+    )
+    return snapshot
+
+
+def invalidate_category_snapshots():
+    """Drop all cached snapshots so the next listing rebuilds from the cache."""
+    with _snapshot_lock:
+        _bases.clear()
+        _snapshots.clear()
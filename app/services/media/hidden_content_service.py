@@ -5,7 +5,8 @@ import os
 import sqlite3
 import time
 
-from app.services.core.sqlite_runtime_service import get_db
+from app.services.core.sqlite_runtime_service import execute_write, get_db, run_write
+from app.services.media.hidden_path_index import HiddenPathIndex
 from app.services.media.media_index_service import bump_category_version_hash
 from specter import create_cache
 
@@ -13,8 +14,24 @@ logger = logging.getLogger(__name__)
 
 _hidden_files_cache = create_cache('hidden_files')
 _hidden_categories_cache = create_cache('hidden_categories')
-_HIDDEN_FILES_OVERFLOW = "OVERFLOW"
+# Above this many hidden files the cache holds a HiddenPathIndex instead of
+# a frozenset of path strings.
 _MAX_HIDDEN_FILES_CACHE = 10000
+_hidden_state_version = 0
+
+
+def _bump_hidden_state_version():
+    global _hidden_state_version
+    _hidden_state_version += 1
+
+
+_hidden_files_cache.on_invalidate(_bump_hidden_state_version)
+_hidden_categories_cache.on_invalidate(_bump_hidden_state_version)
+
+
+def get_hidden_state_version():
+    """Return a counter that changes whenever hidden categories or files change."""
+    return _hidden_state_version
 
 
 def _normalize_category_id(category_id):
@@ -31,13 +48,13 @@ def update_hidden_file_path(old_path, new_path):
         old_path = os.path.normpath(old_path)
         new_path = os.path.normpath(new_path)
 
-        with get_db() as conn:
-            cursor = conn.execute(
-                "UPDATE hidden_files SET file_path = ?, hidden_at = ? WHERE file_path = ?",
-                (str(new_path), time.time(), str(old_path)),
-            )
+        updated = run_write(
+            execute_write,
+            "UPDATE hidden_files SET file_path = ?, hidden_at = ? WHERE file_path = ?",
+            (str(new_path), time.time(), str(old_path)),
+        )
 
-        if cursor.rowcount > 0:
+        if updated > 0:
             _invalidate_hidden_files_cache()
             logger.info("Updated hidden file path: %s -> %s", old_path, new_path)
             return True
@@ -51,13 +68,13 @@ def delete_hidden_file_entry(file_path):
     """Delete a hidden-file entry without affecting category visibility."""
     try:
         normalized_path = os.path.normpath(file_path)
-        with get_db() as conn:
-            cursor = conn.execute(
-                "DELETE FROM hidden_files WHERE file_path = ?",
-                (str(normalized_path),),
-            )
+        deleted = run_write(
+            execute_write,
+            "DELETE FROM hidden_files WHERE file_path = ?",
+            (str(normalized_path),),
+        )
 
-        if cursor.rowcount > 0:
+        if deleted > 0:
             _invalidate_hidden_files_cache()
             logger.info("Deleted hidden file entry: %s", normalized_path)
             return True
@@ -173,6 +190,22 @@ def _reconcile_media_index_hidden_state(conn, category_ids=None):
     _reapply_hidden_file_states(conn)
 
 
+def _write_hidden_categories(conn, data):
+    """Insert hidden-category rows and flag their indexed media in one transaction."""
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO hidden_categories
+        (category_id, hidden_at, hidden_by)
+        VALUES (?, ?, ?)
+        """,
+        data,
+    )
+    conn.executemany(
+        "UPDATE media_index SET is_hidden = 1 WHERE category_id = ?",
+        [(str(cat_id),) for cat_id, _, _ in data],
+    )
+
+
 def hide_category(category_id, admin_session_id=None):
     """Hide a category and all of its discovered children."""
     try:
@@ -183,21 +216,7 @@ def hide_category(category_id, admin_session_id=None):
         data = [(normalized_category_id, current_time, admin_id)]
         data.extend((str(child_id), current_time, admin_id) for child_id in children)
 
-        with get_db() as conn:
-            conn.executemany(
-                """
-                INSERT OR REPLACE INTO hidden_categories
-                (category_id, hidden_at, hidden_by)
-                VALUES (?, ?, ?)
-                """,
-                data,
-            )
-
-            for cat_id, _, _ in data:
-                conn.execute(
-                    "UPDATE media_index SET is_hidden = 1 WHERE category_id = ?",
-                    (str(cat_id),),
-                )
+        run_write(_write_hidden_categories, data)
 
         _invalidate_hidden_categories_cache()
         for cat_id, _, _ in data:
@@ -217,19 +236,23 @@ def hide_category(category_id, admin_session_id=None):
         return False, f"Failed to hide category: {str(exc)}"
 
 
+def _delete_all_hidden_categories(conn):
+    cursor = conn.execute("SELECT category_id FROM hidden_categories")
+    hidden_category_ids = [
+        row['category_id']
+        for row in cursor.fetchall()
+        if row['category_id']
+    ]
+    conn.execute("DELETE FROM hidden_categories")
+    _reconcile_media_index_hidden_state(conn)
+    return hidden_category_ids
+
+
 def unhide_all_categories():
     """Clear all hidden categories."""
     try:
-        with get_db() as conn:
-            cursor = conn.execute("SELECT category_id FROM hidden_categories")
-            hidden_category_ids = [
-                row['category_id']
-                for row in cursor.fetchall()
-                if row['category_id']
-            ]
-            count = len(hidden_category_ids)
-            conn.execute("DELETE FROM hidden_categories")
-            _reconcile_media_index_hidden_state(conn)
+        hidden_category_ids = run_write(_delete_all_hidden_categories)
+        count = len(hidden_category_ids)
 
         _invalidate_hidden_categories_cache()
         for category_id in hidden_category_ids:
@@ -241,6 +264,21 @@ def unhide_all_categories():
         return False, f"Failed to unhide categories: {str(exc)}"
 
 
+def _delete_hidden_categories(conn, target_ids):
+    rows_affected = 0
+    batch_size = 500
+    for index in range(0, len(target_ids), batch_size):
+        batch = target_ids[index:index + batch_size]
+        placeholders = ','.join('?' * len(batch))
+        cursor = conn.execute(
+            f"DELETE FROM hidden_categories WHERE category_id IN ({placeholders})",
+            batch,
+        )
+        rows_affected += cursor.rowcount
+        _reconcile_media_index_hidden_state(conn, batch)
+    return rows_affected
+
+
 def unhide_category(category_id, cascade=True):
     """Unhide a category, optionally including all children."""
     try:
@@ -249,19 +287,7 @@ def unhide_category(category_id, cascade=True):
         target_ids = [normalized_category_id]
         target_ids.extend(str(child_id) for child_id in children)
 
-        rows_affected = 0
-        with get_db() as conn:
-            if target_ids:
-                batch_size = 500
-                for index in range(0, len(target_ids), batch_size):
-                    batch = target_ids[index:index + batch_size]
-                    placeholders = ','.join('?' * len(batch))
-                    cursor = conn.execute(
-                        f"DELETE FROM hidden_categories WHERE category_id IN ({placeholders})",
-                        batch,
-                    )
-                    rows_affected += cursor.rowcount
-                    _reconcile_media_index_hidden_state(conn, batch)
+        rows_affected = run_write(_delete_hidden_categories, target_ids)
 
         if rows_affected > 0:
             _invalidate_hidden_categories_cache()
@@ -350,8 +376,18 @@ def _invalidate_hidden_files_cache():
     logger.debug("Hidden files cache invalidated")
 
 
+def _hidden_path_key(file_path):
+    """Return the normalized key hidden-file membership is checked against."""
+    return os.path.normcase(os.path.normpath(str(file_path)))
+
+
 def get_hidden_files_set():
-    """Return cached hidden-file paths or overflow sentinel."""
+    """Return the cached hidden-file membership structure.
+
+    Small sets are a frozenset of normalized paths. Past
+    ``_MAX_HIDDEN_FILES_CACHE`` entries a ``HiddenPathIndex`` is returned,
+    which supports ``in`` and ``len`` but not iteration.
+    """
     def factory():
         try:
             with get_db() as conn:
@@ -360,18 +396,18 @@ def get_hidden_files_set():
                 ).fetchone()
                 count = count_row['count'] if count_row else 0
 
+                cursor = conn.execute("SELECT file_path FROM hidden_files")
+                path_keys = (_hidden_path_key(row['file_path']) for row in cursor)
                 if count > _MAX_HIDDEN_FILES_CACHE:
-                    logger.warning(
-                        "Hidden files count (%s) exceeds cache limit. Scaling to DB lookups.",
-                        count,
+                    result = HiddenPathIndex.from_paths(path_keys)
+                    logger.info(
+                        "Hidden files index loaded: %s files in %s bytes",
+                        len(result),
+                        result.memory_bytes(),
                     )
-                    return _HIDDEN_FILES_OVERFLOW
+                    return result
 
-                cursor = conn.execute("SELECT file_path FROM hidden_files")
-                result = frozenset(
-                    os.path.normcase(os.path.normpath(row['file_path']))
-                    for row in cursor.fetchall()
-                )
+                result = frozenset(path_keys)
                 logger.debug("Hidden files cache loaded: %s files", len(result))
                 return result
         except sqlite3.Error as exc:
@@ -381,6 +417,32 @@ def get_hidden_files_set():
     return _hidden_files_cache.get_or_compute(factory)
 
 
+def _apply_hidden_files_change(added=(), removed=()):
+    """Fold hidden/unhidden paths into the cached membership structure.
+
+    Avoids reloading every hidden path from SQLite after each hide or
+    unhide. Falls back to invalidation when nothing is cached yet.
+    """
+    current = _hidden_files_cache.get()
+    if current is None:
+        _invalidate_hidden_files_cache()
+        return
+
+    added_keys = {_hidden_path_key(path) for path in added}
+    removed_keys = {_hidden_path_key(path) for path in removed} - added_keys
+
+    if isinstance(current, HiddenPathIndex):
+        current.update(added_keys, removed_keys)
+        updated = current
+    else:
+        updated = (current - removed_keys) | added_keys
+        if len(updated) > _MAX_HIDDEN_FILES_CACHE:
+            updated = HiddenPathIndex.from_paths(updated)
+
+    _hidden_files_cache.set(updated)
+    _bump_hidden_state_version()
+
+
 def _resolve_category_id_for_file(normalized_path, category_id):
     """Resolve a normalized category ID for a file path when missing."""
     cat_id = _normalize_category_id(category_id)
@@ -430,6 +492,19 @@ def _update_media_index_hidden_state(conn, normalized_path, category_id, is_hidd
     )
 
 
+def _write_hidden_files(conn, data, category_id):
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO hidden_files
+        (file_path, category_id, hidden_at, hidden_by)
+        VALUES (?, ?, ?, ?)
+        """,
+        data,
+    )
+    for row in data:
+        _update_media_index_hidden_state(conn, row[0], category_id, 1)
+
+
 def hide_file(file_path, category_id=None, admin_session_id=None):
     """Hide one file and mirror that state into media_index."""
     try:
@@ -438,18 +513,13 @@ def hide_file(file_path, category_id=None, admin_session_id=None):
         admin_id = str(admin_session_id) if admin_session_id else None
         cat_id = _resolve_category_id_for_file(normalized_path, category_id)
 
-        with get_db() as conn:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO hidden_files
-                (file_path, category_id, hidden_at, hidden_by)
-                VALUES (?, ?, ?, ?)
-                """,
-                (normalized_path, cat_id, current_time, admin_id),
-            )
-            _update_media_index_hidden_state(conn, normalized_path, cat_id, 1)
+        run_write(
+            _write_hidden_files,
+            [(normalized_path, cat_id, current_time, admin_id)],
+            cat_id,
+        )
 
-        _invalidate_hidden_files_cache()
+        _apply_hidden_files_change(added=[normalized_path])
         bump_category_version_hash(str(cat_id) if cat_id else '')
         return True, f"File hidden successfully: {os.path.basename(file_path)}"
     except sqlite3.Error as exc:
@@ -474,19 +544,9 @@ def hide_files_batch(files_list, category_id=None, admin_session_id=None):
         if not data:
             return True, "No files to hide.", 0
 
-        with get_db() as conn:
-            conn.executemany(
-                """
-                INSERT OR REPLACE INTO hidden_files
-                (file_path, category_id, hidden_at, hidden_by)
-                VALUES (?, ?, ?, ?)
-                """,
-                data,
-            )
-            for normalized_path in normalized_paths:
-                _update_media_index_hidden_state(conn, normalized_path, cat_id, 1)
+        run_write(_write_hidden_files, data, cat_id)
 
-        _invalidate_hidden_files_cache()
+        _apply_hidden_files_change(added=normalized_paths)
         if cat_id:
             bump_category_version_hash(str(cat_id))
 
@@ -503,52 +563,61 @@ def hide_files_batch(files_list, category_id=None, admin_session_id=None):
         return False, f"Failed to hide files: {str(exc)}", 0
 
 
+def _delete_hidden_file_rows(conn, normalized_path, file_path, affected_category_ids):
+    cursor = conn.execute(
+        "SELECT category_id FROM hidden_files WHERE file_path = ?",
+        (normalized_path,),
+    )
+    affected_category_ids.update(
+        row['category_id']
+        for row in cursor.fetchall()
+        if row['category_id']
+    )
+    cursor = conn.execute(
+        "DELETE FROM hidden_files WHERE file_path = ?",
+        (normalized_path,),
+    )
+    rows = cursor.rowcount
+
+    if rows == 0:
+        cursor = conn.execute(
+            "SELECT category_id FROM hidden_files WHERE file_path = ?",
+            (file_path,),
+        )
+        affected_category_ids.update(
+            row['category_id']
+            for row in cursor.fetchall()
+            if row['category_id']
+        )
+        cursor = conn.execute(
+            "DELETE FROM hidden_files WHERE file_path = ?",
+            (file_path,),
+        )
+        rows = cursor.rowcount
+
+    if rows > 0:
+        _reconcile_media_index_hidden_state(
+            conn,
+            list(affected_category_ids) if affected_category_ids else None,
+        )
+    return rows
+
+
 def unhide_file(file_path):
     """Unhide a single file."""
     try:
         normalized_path = os.path.normpath(str(file_path))
         affected_category_ids = set()
 
-        with get_db() as conn:
-            cursor = conn.execute(
-                "SELECT category_id FROM hidden_files WHERE file_path = ?",
-                (normalized_path,),
-            )
-            affected_category_ids.update(
-                row['category_id']
-                for row in cursor.fetchall()
-                if row['category_id']
-            )
-            cursor = conn.execute(
-                "DELETE FROM hidden_files WHERE file_path = ?",
-                (normalized_path,),
-            )
-            rows = cursor.rowcount
-
-            if rows == 0:
-                cursor = conn.execute(
-                    "SELECT category_id FROM hidden_files WHERE file_path = ?",
-                    (file_path,),
-                )
-                affected_category_ids.update(
-                    row['category_id']
-                    for row in cursor.fetchall()
-                    if row['category_id']
-                )
-                cursor = conn.execute(
-                    "DELETE FROM hidden_files WHERE file_path = ?",
-                    (file_path,),
-                )
-                rows = cursor.rowcount
-
-            if rows > 0:
-                _reconcile_media_index_hidden_state(
-                    conn,
-                    list(affected_category_ids) if affected_category_ids else None,
-                )
+        rows = run_write(
+            _delete_hidden_file_rows,
+            normalized_path,
+            str(file_path),
+            affected_category_ids,
+        )
 
-        _invalidate_hidden_files_cache()
         if rows > 0:
+            _apply_hidden_files_change(removed=[normalized_path])
             for category_id in affected_category_ids:
                 bump_category_version_hash(str(category_id))
             return True, f"File unhidden successfully: {os.path.basename(file_path)}"
@@ -558,6 +627,47 @@ def unhide_file(file_path):
         return False, f"Database error: {str(exc)}"
 
 
+def _delete_hidden_file_batches(conn, normalized_paths, affected_category_ids):
+    should_invalidate_categories = False
+    total_rows_affected = 0
+    batch_size = 500
+
+    for index in range(0, len(normalized_paths), batch_size):
+        batch = normalized_paths[index:index + batch_size]
+        placeholders = ','.join('?' * len(batch))
+        cursor = conn.execute(
+            f"SELECT DISTINCT category_id FROM hidden_files WHERE file_path IN ({placeholders})",
+            batch,
+        )
+        category_ids = [
+            row['category_id']
+            for row in cursor.fetchall()
+            if row['category_id']
+        ]
+
+        cursor = conn.execute(
+            f"DELETE FROM hidden_files WHERE file_path IN ({placeholders})",
+            batch,
+        )
+        total_rows_affected += cursor.rowcount
+
+        if category_ids:
+            cat_placeholders = ','.join('?' * len(category_ids))
+            conn.execute(
+                f"DELETE FROM hidden_categories WHERE category_id IN ({cat_placeholders})",
+                category_ids,
+            )
+            should_invalidate_categories = True
+            affected_category_ids.update(category_ids)
+            logger.info("Implicitly unhid %s parent categories", len(category_ids))
+
+    _reconcile_media_index_hidden_state(
+        conn,
+        list(affected_category_ids) if affected_category_ids else None,
+    )
+    return total_rows_affected, should_invalidate_categories
+
+
 def unhide_files_batch(file_paths):
     """Unhide multiple files in one transaction."""
     if not file_paths:
@@ -565,50 +675,17 @@ def unhide_files_batch(file_paths):
 
     try:
         normalized_paths = [os.path.normpath(str(path)) for path in file_paths]
-        should_invalidate_categories = False
         affected_category_ids = set()
-        total_rows_affected = 0
-        batch_size = 500
-
-        with get_db() as conn:
-            for index in range(0, len(normalized_paths), batch_size):
-                batch = normalized_paths[index:index + batch_size]
-                placeholders = ','.join('?' * len(batch))
-                cursor = conn.execute(
-                    f"SELECT DISTINCT category_id FROM hidden_files WHERE file_path IN ({placeholders})",
-                    batch,
-                )
-                category_ids = [
-                    row['category_id']
-                    for row in cursor.fetchall()
-                    if row['category_id']
-                ]
-
-                cursor = conn.execute(
-                    f"DELETE FROM hidden_files WHERE file_path IN ({placeholders})",
-                    batch,
-                )
-                total_rows_affected += cursor.rowcount
-
-                if category_ids:
-                    cat_placeholders = ','.join('?' * len(category_ids))
-                    conn.execute(
-                        f"DELETE FROM hidden_categories WHERE category_id IN ({cat_placeholders})",
-                        category_ids,
-                    )
-                    should_invalidate_categories = True
-                    affected_category_ids.update(category_ids)
-                    logger.info("Implicitly unhid %s parent categories", len(category_ids))
-
-            _reconcile_media_index_hidden_state(
-                conn,
-                list(affected_category_ids) if affected_category_ids else None,
-            )
+        total_rows_affected, should_invalidate_categories = run_write(
+            _delete_hidden_file_batches,
+            normalized_paths,
+            affected_category_ids,
+        )
 
         if should_invalidate_categories:
             _invalidate_hidden_categories_cache()
         if total_rows_affected > 0:
-            _invalidate_hidden_files_cache()
+            _apply_hidden_files_change(removed=normalized_paths)
         for category_id in affected_category_ids:
             bump_category_version_hash(str(category_id))
 
@@ -618,21 +695,23 @@ def unhide_files_batch(file_paths):
         return False, f"Failed to unhide files: {str(exc)}"
 
 
+def _delete_all_hidden_files(conn):
+    cursor = conn.execute("SELECT category_id FROM hidden_files")
+    affected_category_ids = {
+        row['category_id']
+        for row in cursor.fetchall()
+        if row['category_id']
+    }
+    hidden_count = conn.execute("SELECT COUNT(*) as count FROM hidden_files").fetchone()['count']
+    conn.execute("DELETE FROM hidden_files")
+    _reconcile_media_index_hidden_state(conn)
+    return affected_category_ids, hidden_count
+
+
 def unhide_all_files():
     """Clear all hidden-file records and visible state flags."""
     try:
-        with get_db() as conn:
-            cursor = conn.execute("SELECT category_id FROM hidden_files")
-            affected_category_ids = {
-                row['category_id']
-                for row in cursor.fetchall()
-                if row['category_id']
-            }
-            count = len(affected_category_ids)
-            cursor = conn.execute("SELECT COUNT(*) as count FROM hidden_files")
-            hidden_count = cursor.fetchone()['count']
-            conn.execute("DELETE FROM hidden_files")
-            _reconcile_media_index_hidden_state(conn)
+        affected_category_ids, hidden_count = run_write(_delete_all_hidden_files)
 
         _invalidate_hidden_files_cache()
         for category_id in affected_category_ids:
@@ -648,18 +727,7 @@ def is_file_hidden(file_path):
     """Return True when the file is hidden."""
     try:
         normalized_path = os.path.normpath(str(file_path))
-        norm_case_path = os.path.normcase(normalized_path)
-        hidden_files = get_hidden_files_set()
-
-        if hidden_files == _HIDDEN_FILES_OVERFLOW:
-            with get_db() as conn:
-                row = conn.execute(
-                    "SELECT 1 FROM hidden_files WHERE file_path = ?",
-                    (normalized_path,),
-                ).fetchone()
-                return row is not None
-
-        if norm_case_path in hidden_files:
+        if os.path.normcase(normalized_path) in get_hidden_files_set():
             return True
 
         for part in normalized_path.split(os.sep):
@@ -0,0 +1,143 @@
+"""Compact membership index for large hidden-file sets.
+
+Hidden paths are stored as a sorted ``array('Q')`` of 64-bit BLAKE2b path
+hashes (8 bytes per path) fronted by a Bloom filter, so a visible file is
+usually rejected by a few bit probes and a hidden one is confirmed with a
+binary search. A million hidden paths fit in roughly 10 MB.
+
+Two distinct paths share a 64-bit hash with probability about n / 2**64,
+which is treated as exact membership. Removals cannot clear Bloom bits, so
+the filter is rebuilt from the hash array once enough removals accumulate.
+"""
+
+import hashlib
+from array import array
+from bisect import bisect_left
+
+BLOOM_BITS_PER_PATH = 10
+BLOOM_HASH_COUNT = 7
+BLOOM_MIN_BITS = 8192
+# Rebuild the Bloom filter once this fraction of its entries was removed.
+BLOOM_REBUILD_RATIO = 0.25
+# Batches larger than this are merged by re-sorting instead of per-item inserts.
+BULK_CHANGE_THRESHOLD = 64
+
+_MASK_32 = 0xFFFFFFFF
+
+
+def path_hash(path_key):
+    """Return the 64-bit hash of a normalized path key."""
+    digest = hashlib.blake2b(
+        path_key.encode('utf-8', 'surrogateescape'),
+        digest_size=8,
+    ).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class HiddenPathIndex:
+    """Bloom filter plus sorted hash array keyed by normalized path strings."""
+
+    __slots__ = ('_hashes', '_bloom', '_bloom_bits', '_bloom_capacity', '_stale_bits')
+
+    def __init__(self, hashes=()):
+        self._hashes = array('Q', sorted(set(hashes)))
+        self._rebuild_bloom()
+
+    @classmethod
+    def from_paths(cls, path_keys):
+        """Build an index from normalized path keys."""
+        return cls(path_hash(key) for key in path_keys)
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def __bool__(self):
+        return bool(self._hashes)
+
+    def __contains__(self, path_key):
+        return self._contains_hash(path_hash(path_key))
+
+    def memory_bytes(self):
+        """Approximate memory held by the hash array and Bloom filter."""
+        return len(self._hashes) * self._hashes.itemsize + len(self._bloom)
+
+    def update(self, added=(), removed=()):
+        """Fold hidden/unhidden path keys into the index in place."""
+        added_hashes = {path_hash(key) for key in added}
+        removed_hashes = {path_hash(key) for key in removed} - added_hashes
+
+        if removed_hashes:
+            self._remove_hashes(removed_hashes)
+        if added_hashes:
+            self._add_hashes(added_hashes)
+
+    def _contains_hash(self, value):
+        if not self._bloom_may_contain(value):
+            return False
+        hashes = self._hashes
+        position = bisect_left(hashes, value)
+        return position < len(hashes) and hashes[position] == value
+
+    def _bloom_positions(self, value):
+        bits = self._bloom_bits
+        first = value & _MASK_32
+        step = (value >> 32) | 1
+        return [(first + index * step) % bits for index in range(BLOOM_HASH_COUNT)]
+
+    def _bloom_may_contain(self, value):
+        bloom = self._bloom
+        for position in self._bloom_positions(value):
+            if not bloom[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def _bloom_add(self, value):
+        bloom = self._bloom
+        for position in self._bloom_positions(value):
+            bloom[position >> 3] |= 1 << (position & 7)
+
+    def _rebuild_bloom(self, capacity=None):
+        capacity = max(capacity or 0, len(self._hashes))
+        self._bloom_capacity = capacity
+        self._bloom_bits = max(BLOOM_MIN_BITS, capacity * BLOOM_BITS_PER_PATH)
+        self._bloom = bytearray((self._bloom_bits + 7) // 8)
+        self._stale_bits = 0
+        for value in self._hashes:
+            self._bloom_add(value)
+
+    def _add_hashes(self, added_hashes):
+        hashes = self._hashes
+        new_hashes = [value for value in added_hashes if not self._contains_hash(value)]
+        if not new_hashes:
+            return
+
+        if len(new_hashes) > BULK_CHANGE_THRESHOLD:
+            merged = list(hashes)
+            merged.extend(new_hashes)
+            merged.sort()
+            self._hashes = array('Q', merged)
+        else:
+            for value in new_hashes:
+                hashes.insert(bisect_left(hashes, value), value)
+
+        if len(self._hashes) > self._bloom_capacity:
+            # Grow ahead of demand so steady additions do not rebuild every batch.
+            self._rebuild_bloom(capacity=len(self._hashes) * 2)
+        else:
+            for value in new_hashes:
+                self._bloom_add(value)
+
+    def _remove_hashes(self, removed_hashes):
+        hashes = self._hashes
+        before = len(hashes)
+        if len(removed_hashes) > BULK_CHANGE_THRESHOLD:
+            self._hashes = array('Q', (value for value in hashes if value not in removed_hashes))
+        else:
+            for value in removed_hashes:
+                position = bisect_left(hashes, value)
+                if position < len(hashes) and hashes[position] == value:
+                    del hashes[position]
+
+        self._stale_bits += before - len(self._hashes)
+        if self._stale_bits > self._bloom_capacity * BLOOM_REBUILD_RATIO:
+            self._rebuild_bloom()
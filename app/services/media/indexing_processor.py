@@ -22,6 +22,10 @@ DB_WRITE_RETRY_ATTEMPTS = 4
 DB_WRITE_RETRY_BASE_DELAY_SECONDS = 0.05
 STALE_DELETION_SET_DIFF_THRESHOLD = 50000
 STALE_DELETION_DB_BATCH_SIZE = 5000
+DEFAULT_FULL_RECONCILE_INTERVAL = 86400
+EXCLUDED_DIR_NAMES = frozenset(
+    (".ghosthub", ".ghosthub_uploads", "$recycle.bin", "system volume information")
+)
 
 
 def _is_retryable_db_error(err):
@@ -88,6 +92,271 @@ def get_indexing_chunk_size():
     return base_chunk
 
 
+def get_full_reconcile_interval():
+    """Seconds between full rescans; 0 disables directory-mtime incremental scans."""
+    from app.services.core.runtime_config_service import get_runtime_config_value
+
+    try:
+        return max(
+            0,
+            int(
+                get_runtime_config_value(
+                    'INDEXING_FULL_RECONCILE_INTERVAL',
+                    DEFAULT_FULL_RECONCILE_INTERVAL,
+                )
+            ),
+        )
+    except (TypeError, ValueError):
+        return DEFAULT_FULL_RECONCILE_INTERVAL
+
+
+def _rel_dir(root, category_path):
+    rel = os.path.relpath(root, category_path).replace("\\", "/")
+    return "" if rel == "." else rel
+
+
+def _list_directory(full_dir, rel_dir, recursive):
+    """Return (media rel paths, subdirectory rel paths) for one directory."""
+    media_paths = []
+    subdirs = []
+    with os.scandir(full_dir) as it:
+        for entry in it:
+            if recursive:
+                if entry.is_dir():
+                    if (
+                        not entry.is_symlink()
+                        and entry.name.lower() not in EXCLUDED_DIR_NAMES
+                    ):
+                        subdirs.append(f"{rel_dir}/{entry.name}" if rel_dir else entry.name)
+                    continue
+            elif entry.name.startswith(".") or not entry.is_file(follow_symlinks=False):
+                continue
+            if is_media_file(entry.name):
+                media_paths.append(f"{rel_dir}/{entry.name}" if rel_dir else entry.name)
+    media_paths.sort()
+    return media_paths, subdirs
+
+
+def _scan_changed_directories(category_path, snapshot_dirs, recursive):
+    """
+    Stat every known directory and list only those whose mtime moved.
+
+    Adding, removing or renaming an entry bumps its parent directory's mtime,
+    so unchanged directories reuse their snapshot children without a listing.
+    Only a directory that is gone counts as removed; one that fails with any
+    other error (EACCES, EIO, a stale handle) is skipped and keeps its
+    snapshot and index rows.
+
+    Returns:
+        (dir_mtimes, changed_dirs {rel_dir: [media rel paths]}, removed_dirs)
+    """
+    children = {}
+    for rel_dir in snapshot_dirs:
+        if rel_dir:
+            children.setdefault(rel_dir.rpartition("/")[0], []).append(rel_dir)
+
+    dir_mtimes = {}
+    changed_dirs = {}
+    unreadable = set()
+    pending = [""]
+    visited = 0
+    while pending:
+        rel_dir = pending.pop()
+        full_dir = os.path.join(category_path, rel_dir) if rel_dir else category_path
+        try:
+            mtime = os.stat(full_dir).st_mtime
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        except OSError as exc:
+            logger.warning("Error reading directory %s: %s", full_dir, exc)
+            unreadable.add(rel_dir)
+            continue
+        dir_mtimes[rel_dir] = mtime
+
+        if snapshot_dirs.get(rel_dir) == mtime:
+            if recursive:
+                pending.extend(children.get(rel_dir, ()))
+        else:
+            try:
+                media_paths, subdirs = _list_directory(full_dir, rel_dir, recursive)
+            except OSError as exc:
+                logger.warning("Error listing directory %s: %s", full_dir, exc)
+                del dir_mtimes[rel_dir]
+                if not isinstance(exc, (FileNotFoundError, NotADirectoryError)):
+                    unreadable.add(rel_dir)
+                continue
+            changed_dirs[rel_dir] = media_paths
+            pending.extend(subdirs)
+
+        visited += 1
+        if visited % 100 == 0:
+            gevent.sleep(0)
+
+    removed_dirs = [
+        rel_dir
+        for rel_dir in snapshot_dirs
+        if rel_dir not in dir_mtimes
+        and rel_dir not in unreadable
+        and rel_dir.rpartition("/")[0] in dir_mtimes
+    ]
+    return dir_mtimes, changed_dirs, removed_dirs
+
+
+def _process_incremental_task(
+    category_id,
+    category_path,
+    category_name,
+    recursive_scan,
+    *,
+    upsert_chunk,
+    upsert_row,
+    update_status,
+):
+    """
+    Apply add/remove deltas for directories whose mtime changed.
+
+    Returns the keyword arguments for ``_finish_indexing_task`` or None when a
+    full scan is required (no snapshot, reconcile due, or the index was edited
+    outside the indexer). In-place edits that keep a file's name do not touch
+    the directory mtime; those are caught by the periodic full reconcile.
+    """
+    reconcile_interval = get_full_reconcile_interval()
+    if reconcile_interval <= 0:
+        return None
+
+    state = media_index_service.get_directory_scan_state(category_id)
+    if (
+        not state
+        or "" not in state["dirs"]
+        or state["file_count"] != state["indexed_count"]
+        or time.time() - state["reconciled_at"] >= reconcile_interval
+    ):
+        return None
+
+    dir_mtimes, changed_dirs, removed_dirs = _scan_changed_directories(
+        category_path,
+        state["dirs"],
+        recursive_scan,
+    )
+    if "" not in dir_mtimes:
+        return None
+
+    fs_rel_paths = [rel_path for paths in changed_dirs.values() for rel_path in paths]
+    db_rel_paths = media_index_service.get_rel_paths_for_parents(category_id, changed_dirs)
+    deleted_rel_paths = db_rel_paths.difference(fs_rel_paths)
+    total_files = len(fs_rel_paths)
+    update_status(total_files=total_files)
+
+    chunk_size = get_indexing_chunk_size()
+    changed_files_metadata = []
+    status_preview_files = []
+    added_count = 0
+    db_failures = 0
+    for index in range(0, total_files, chunk_size):
+        chunk_paths = fs_rel_paths[index:index + chunk_size]
+        existing_chunk_map = media_index_service.get_media_metadata_batch(
+            category_id,
+            chunk_paths,
+        )
+        chunk_changed = []
+        for rel_path in chunk_paths:
+            try:
+                stats = os.stat(os.path.join(category_path, rel_path))
+            except OSError:
+                continue
+            existing = existing_chunk_map.get(rel_path)
+            if (
+                existing
+                and existing.get("hash")
+                and existing.get("size") == stats.st_size
+                and existing.get("mtime") == stats.st_mtime
+            ):
+                continue
+            if not existing:
+                added_count += 1
+            entry = {
+                "name": rel_path,
+                "size": stats.st_size,
+                "mtime": stats.st_mtime,
+                "type": get_media_type(rel_path),
+                "hash": generate_file_hash(rel_path, stats.st_size, stats.st_mtime),
+            }
+            chunk_changed.append(entry)
+            changed_files_metadata.append(
+                {
+                    "name": entry["name"],
+                    "type": entry["type"],
+                    "size": entry["size"],
+                    "mtime": entry["mtime"],
+                }
+            )
+            if len(status_preview_files) < MAX_ASYNC_STATUS_FILES:
+                status_preview_files.append(entry)
+
+        if chunk_changed and not upsert_chunk(chunk_changed):
+            for file_meta in chunk_changed:
+                if not upsert_row(file_meta):
+                    db_failures += 1
+        update_status(processed_files=min(index + chunk_size, total_files))
+        gevent.sleep(0)
+
+    removed_count = 0
+    if deleted_rel_paths:
+        removed_count += media_index_service.delete_media_index_entries_batch(
+            [(category_id, rel_path) for rel_path in deleted_rel_paths]
+        )
+    for rel_dir in removed_dirs:
+        removed_count += media_index_service.delete_media_index_under_directory(
+            category_id,
+            rel_dir,
+        )
+
+    index_changed = bool(changed_files_metadata or removed_count)
+    indexed_count = max(0, state["indexed_count"] + added_count - removed_count)
+    if db_failures:
+        logger.error(
+            "Incremental indexing '%s': %s DB operations failed",
+            category_name,
+            db_failures,
+        )
+        media_index_service.clear_directory_scan_state(category_id)
+    else:
+        media_index_service.save_directory_scan_state(
+            category_id,
+            {rel_dir: dir_mtimes[rel_dir] for rel_dir in changed_dirs},
+            removed_dirs=removed_dirs,
+        )
+
+    logger.info(
+        "Incremental index of '%s': %s of %s directories changed, %s files updated, %s removed",
+        category_name,
+        len(changed_dirs),
+        len(dir_mtimes),
+        len(changed_files_metadata),
+        removed_count,
+    )
+    update_status(
+        files=status_preview_files,
+        processed_files=total_files,
+        progress=99,
+    )
+
+    return {
+        "status_preview_files": status_preview_files,
+        "processed": indexed_count,
+        "total_files": indexed_count,
+        "changed_files_metadata": changed_files_metadata,
+        "fs_rel_paths_seen": set(),
+        "collection_hash": (
+            media_index_service.bump_category_version_hash(category_id)
+            if index_changed
+            else None
+        ),
+        "index_changed": index_changed,
+        "directories": sorted(dir_mtimes),
+    }
+
+
 def process_indexing_task(
     category_id,
     category_path,
@@ -176,25 +445,38 @@ def process_indexing_task(
             )
         return False
 
+    recursive_scan = not str(category_id).startswith("auto::")
+    if not force_refresh:
+        incremental = _process_incremental_task(
+            category_id,
+            category_path,
+            category_name,
+            recursive_scan,
+            upsert_chunk=_upsert_chunk_with_retries,
+            upsert_row=_upsert_row_with_retries,
+            update_status=_update,
+        )
+        if incremental is not None:
+            return _finish_indexing_task(
+                category_id,
+                category_path,
+                category_name,
+                force_refresh,
+                generate_thumbnails=generate_thumbnails,
+                queue_child_category=queue_child_category,
+                **incremental,
+            )
+
+    dir_mtimes = {}
+    fs_rel_paths_seen = set()
+    scan_completed = False
     try:
-        recursive_scan = not str(category_id).startswith("auto::")
-        fs_rel_paths_seen = set()
 
         def _iter_media_chunks():
             chunk = []
             if recursive_scan:
                 for root, dirs, files in os.walk(category_path):
-                    dirs[:] = [
-                        d
-                        for d in dirs
-                        if d.lower()
-                        not in [
-                            ".ghosthub",
-                            ".ghosthub_uploads",
-                            "$recycle.bin",
-                            "system volume information",
-                        ]
-                    ]
+                    dirs[:] = [d for d in dirs if d.lower() not in EXCLUDED_DIR_NAMES]
                     for filename in sorted(files):
                         if is_media_file(filename):
                             full_path = os.path.join(root, filename)
@@ -223,23 +505,20 @@ def process_indexing_task(
             if chunk:
                 yield chunk
 
+        # Directory mtimes are captured before listing so anything added
+        # mid-scan leaves the snapshot stale and is picked up next pass.
         if recursive_scan:
-            for _root, dirs, files in os.walk(category_path):
-                dirs[:] = [
-                    d
-                    for d in dirs
-                    if d.lower()
-                    not in [
-                        ".ghosthub",
-                        ".ghosthub_uploads",
-                        "$recycle.bin",
-                        "system volume information",
-                    ]
-                ]
+            for root, dirs, files in os.walk(category_path):
+                dirs[:] = [d for d in dirs if d.lower() not in EXCLUDED_DIR_NAMES]
+                try:
+                    dir_mtimes[_rel_dir(root, category_path)] = os.stat(root).st_mtime
+                except OSError:
+                    pass
                 total_files += sum(1 for filename in files if is_media_file(filename))
                 gevent.sleep(0)
         else:
             try:
+                dir_mtimes[""] = os.stat(category_path).st_mtime
                 with os.scandir(category_path) as it:
                     total_files = sum(
                         1
@@ -424,11 +703,22 @@ def process_indexing_task(
                 category_name,
                 db_failures,
             )
+        scan_completed = db_failures == 0
 
     except Exception as walk_error:
         logger.error("Error walking directory %s: %s", category_path, walk_error)
         logger.debug(traceback.format_exc())
 
+    if scan_completed:
+        media_index_service.save_directory_scan_state(
+            category_id,
+            dir_mtimes,
+            replace=True,
+            reconciled_at=time.time(),
+        )
+    else:
+        media_index_service.clear_directory_scan_state(category_id)
+
     _update(
         files=status_preview_files,
         processed_files=processed,
@@ -436,6 +726,61 @@ def process_indexing_task(
     )
     logger.info("Finished processing all %s files for '%s'", processed, category_name)
 
+    return _finish_indexing_task(
+        category_id,
+        category_path,
+        category_name,
+        force_refresh,
+        generate_thumbnails=generate_thumbnails,
+        queue_child_category=queue_child_category,
+        status_preview_files=status_preview_files,
+        processed=processed,
+        total_files=total_files,
+        changed_files_metadata=changed_files_metadata,
+        fs_rel_paths_seen=fs_rel_paths_seen,
+        collection_hash=collection_hasher.hexdigest(),
+        index_changed=index_changed,
+        directories=sorted(dir_mtimes),
+    )
+
+
+def _queue_subtitle_prewarm(category_path, changed_files_metadata):
+    """Hand changed videos to the subtitle pre-extraction worker."""
+    try:
+        from specter import registry
+
+        prewarm = registry.resolve("subtitle_prewarm_runtime")
+        if prewarm is None:
+            return
+        queued = prewarm.queue_videos(
+            os.path.join(category_path, item["name"])
+            for item in changed_files_metadata
+            if item.get("type") == "video"
+        )
+        if queued:
+            logger.debug("Queued %s videos for subtitle pre-extraction", queued)
+    except Exception as prewarm_error:
+        logger.debug("Subtitle pre-extraction queueing failed: %s", prewarm_error)
+
+
+def _finish_indexing_task(
+    category_id,
+    category_path,
+    category_name,
+    force_refresh,
+    *,
+    generate_thumbnails,
+    queue_child_category,
+    status_preview_files,
+    processed,
+    total_files,
+    changed_files_metadata,
+    fs_rel_paths_seen,
+    collection_hash,
+    index_changed,
+    directories,
+):
+    """Queue thumbnails and child categories, then publish the version hash."""
     if generate_thumbnails:
         try:
             from app.services.media.thumbnail_processing_service import (
@@ -494,9 +839,14 @@ def process_indexing_task(
             )
             logger.debug(traceback.format_exc())
 
+    if changed_files_metadata:
+        _queue_subtitle_prewarm(category_path, changed_files_metadata)
+
     current_time = time.time()
-    collection_hash = collection_hasher.hexdigest()
-    media_index_service.update_category_version_hash(category_id, collection_hash)
+    if collection_hash is None:
+        collection_hash = media_index_service.get_category_version_hash(category_id)
+    else:
+        media_index_service.update_category_version_hash(category_id, collection_hash)
 
     if (
         queue_child_category is not None
@@ -509,13 +859,7 @@ def process_indexing_task(
                     continue
                 if entry.name.startswith("."):
                     continue
-                name_lower = entry.name.lower()
-                if name_lower in (
-                    ".ghosthub",
-                    ".ghosthub_uploads",
-                    "$recycle.bin",
-                    "system volume information",
-                ):
+                if entry.name.lower() in EXCLUDED_DIR_NAMES:
                     continue
 
                 child_id = f"{category_id}::{entry.name}"
@@ -544,4 +888,5 @@ def process_indexing_task(
         "hash": collection_hash,
         "timestamp": current_time,
         "index_changed": index_changed,
+        "directories": directories,
     }
@@ -224,7 +224,7 @@ class IndexingRuntimeService(Service):
                     if not cat_id or not cat_path or not is_on_active_mount(cat_path):
                         continue
 
-                    process_indexing_task(
+                    result = process_indexing_task(
                         cat_id,
                         cat_path,
                         cat_name,
@@ -233,6 +233,7 @@ class IndexingRuntimeService(Service):
                         update_status=None,
                         queue_child_category=self.start_async_indexing,
                     )
+                    self._watch_category(cat_id, cat_path, cat_name, result)
 
                 logger.info(
                     "Background reindex completed for %s categories",
@@ -245,6 +246,21 @@ class IndexingRuntimeService(Service):
         finally:
             self.set_state({'reindex_running': False})
 
+    @staticmethod
+    def _watch_category(category_id, category_path, category_name, result):
+        watcher = registry.resolve('media_watch')
+        if watcher is None or not result:
+            return
+        try:
+            watcher.watch_category(
+                category_id,
+                category_path,
+                category_name,
+                result.get('directories'),
+            )
+        except Exception as exc:
+            logger.debug("Could not watch '%s' for changes: %s", category_name, exc)
+
     def _require_app(self):
         manager = registry.require('service_manager')
         if manager is None or getattr(manager, 'app', None) is None:
@@ -333,6 +349,7 @@ class IndexingRuntimeService(Service):
                 total_files = result.get('total_files', processed)
                 current_time = result.get('timestamp')
                 collection_hash = result.get('hash')
+                self._watch_category(category_id, category_path, category_name, result)
 
                 self._update_status(
                     category_id,
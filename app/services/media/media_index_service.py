@@ -1,30 +1,101 @@
 """Media index domain service."""
 
+import base64
+import json
 import logging
 import os
 import time
+from array import array
 
-from app.services.core.sqlite_runtime_service import get_db
+from app.services.core.database_schema_service import MEDIA_SEARCH_INDEX_TABLE
+from app.services.core.sqlite_runtime_service import execute_write, get_db, run_write
 from app.services.core.runtime_config_service import get_runtime_root_path
 
 logger = logging.getLogger(__name__)
 
+# The trigram tokenizer indexes 3-character windows, so shorter terms
+# cannot be answered from the FTS index.
+MEDIA_SEARCH_MIN_TERM_LENGTH = 3
+
+MEDIA_CURSOR_VERSION = 1
+MEDIA_CURSOR_SORT_COLUMNS = {'name': 'name', 'mtime': 'mtime', 'size': 'size'}
+
+MEDIA_ROWID_FETCH_SIZE = 5000
+# Stays under SQLite's default host-parameter limit.
+MEDIA_ROWID_CHUNK_SIZE = 500
+# Rows per writer job when a full re-index replaces a category.
+MEDIA_REPLACE_CHUNK_SIZE = 2000
+
 
 def _hidden_category_clause(column_name="media_index.category_id"):
-    """Return a descendant-aware SQL clause excluding hidden categories."""
+    """Return a SQL clause excluding hidden categories and their descendants.
+
+    hidden_category_closure is maintained by triggers on hidden_categories
+    and media_index, so this is a primary-key probe per row instead of a
+    LIKE scan over every hidden category.
+    """
     return (
         "NOT EXISTS ("
-        "SELECT 1 FROM hidden_categories hc "
-        f"WHERE {column_name} = hc.category_id "
-        f"OR {column_name} LIKE hc.category_id || '::%' "
-        f"OR (hc.category_id LIKE 'auto%' AND {column_name} LIKE hc.category_id || '-%')"
+        "SELECT 1 FROM hidden_category_closure hcc "
+        f"WHERE hcc.category_id = {column_name}"
         ")"
     )
 
+_UPSERT_MEDIA_INDEX_SQL = """
+    INSERT OR REPLACE INTO media_index
+    (id, category_id, rel_path, parent_path, name, size, mtime, hash, type, is_hidden, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _upsert_media_index_rows(conn, rows):
+    conn.executemany(_UPSERT_MEDIA_INDEX_SQL, rows)
+    return len(rows)
+
+
+# Full re-index merge: unchanged rows are left alone so their rowids (and
+# anything keyed on them) survive, and change triggers only fire for rows
+# whose indexed values actually moved.
+_MERGE_MEDIA_INDEX_SQL = """
+    INSERT INTO media_index
+    (id, category_id, rel_path, parent_path, name, size, mtime, hash, type, is_hidden, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        parent_path = excluded.parent_path,
+        name = excluded.name,
+        size = excluded.size,
+        mtime = excluded.mtime,
+        hash = excluded.hash,
+        type = excluded.type,
+        is_hidden = excluded.is_hidden,
+        updated_at = excluded.updated_at
+    WHERE media_index.parent_path IS NOT excluded.parent_path
+       OR media_index.name IS NOT excluded.name
+       OR media_index.size IS NOT excluded.size
+       OR media_index.mtime IS NOT excluded.mtime
+       OR media_index.hash IS NOT excluded.hash
+       OR media_index.type IS NOT excluded.type
+       OR media_index.is_hidden IS NOT excluded.is_hidden
+"""
+
+
+def _merge_media_index_rows(conn, rows):
+    conn.executemany(_MERGE_MEDIA_INDEX_SQL, rows)
+    return len(rows)
+
+
+def _delete_media_index_rows(conn, entries):
+    return conn.executemany(
+        "DELETE FROM media_index WHERE category_id = ? AND rel_path = ?",
+        entries,
+    ).rowcount
+
+
 def update_media_index_batch(category_id, files_metadata, version_hash=None):
     """
     Perform high-performance batch update of the media index for a category.
-    This replaces existing records for the category with fresh ones.
+    This replaces existing records for the category with fresh ones; rows
+    whose values are unchanged keep their rowid.
 
     Args:
         category_id (str): The category ID.
@@ -48,36 +119,14 @@ def update_media_index_batch(category_id, files_metadata, version_hash=None):
         )
 
         current_time = time.time()
-        # Pre-fetch hidden files (absolute paths) for comparison
+        # Hidden-file membership (frozenset or HiddenPathIndex) for comparison
         hidden_files_set = get_hidden_files_set()
 
-        # If cache is in OVERFLOW mode, we'll do a batch check later for the whole chunk
-        is_overflow = hidden_files_set == "OVERFLOW"
-        active_hidden_paths = set()
-
         # Get category path to build absolute paths
         from app.services.media.category_query_service import get_category_by_id
         cat_info = get_category_by_id(category_id)
         cat_path = cat_info['path'] if cat_info else None
 
-        # If in overflow, pre-fetch hidden status for all files in this metadata batch
-        if is_overflow and cat_path:
-            try:
-                # Build absolute paths for comparison
-                all_abs_paths = [os.path.normpath(os.path.join(cat_path, fm.get('name', ''))) for fm in files_metadata if fm.get('name')]
-                if all_abs_paths:
-                    # SQLite variable limit check (usually 999)
-                    # We'll chunk this if it's large, though usually files_metadata is already chunked.
-                    for i in range(0, len(all_abs_paths), 500):
-                        chunk = all_abs_paths[i:i+500]
-                        placeholders = ', '.join(['?'] * len(chunk))
-                        with get_db() as conn:
-                            cursor = conn.execute(f"SELECT file_path FROM hidden_files WHERE file_path IN ({placeholders})", chunk)
-                            for row in cursor:
-                                active_hidden_paths.add(os.path.normcase(os.path.normpath(row['file_path'])))
-            except Exception as e:
-                logger.error(f"Error pre-fetching hidden files in overflow mode: {e}")
-
         # Prepare data for batch insert
         data = []
         for fm in files_metadata:
@@ -102,10 +151,7 @@ def update_media_index_batch(category_id, files_metadata, version_hash=None):
                 abs_path = os.path.normpath(os.path.join(cat_path, rel_path))
                 norm_abs_path = os.path.normcase(abs_path)
                 # Use normcase for robust case-insensitive comparison on Windows
-                if is_overflow:
-                    if norm_abs_path in active_hidden_paths:
-                        is_hid = 1
-                elif norm_abs_path in hidden_files_set:
+                if norm_abs_path in hidden_files_set:
                     is_hid = 1
 
             data.append((
@@ -123,43 +169,47 @@ def update_media_index_batch(category_id, files_metadata, version_hash=None):
                 current_time
             ))
 
+        # Merge in writer-sized chunks so a large library never holds the
+        # write lock for the whole pass, then drop rows the scan no longer
+        # saw. Readers see old and new rows during the pass, never an empty
+        # category.
         with get_db() as conn:
-            # We use a transaction to ensure atomicity and speed
-            conn.execute("BEGIN")
-            try:
-                # 1. Clear existing records for this category
-                conn.execute("DELETE FROM media_index WHERE category_id = ?", (category_id,))
-
-                # 2. Bulk insert new records
-                conn.executemany("""
-                    INSERT INTO media_index
-                    (id, category_id, rel_path, parent_path, name, size, mtime, hash, type, is_hidden, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, data)
-
-                # 3. Update version hash if provided
-                if version_hash:
-                    conn.execute("UPDATE categories SET version_hash = ? WHERE id = ?", (version_hash, category_id))
-
-                conn.execute("COMMIT")
-                logger.info(f"Updated media_index for {category_id} with {len(data)} files")
-                return True, len(data)
-            except Exception as e:
-                conn.execute("ROLLBACK")
-                raise e
+            indexed_paths = {
+                row['rel_path']
+                for row in conn.execute(
+                    "SELECT rel_path FROM media_index WHERE category_id = ?",
+                    (category_id,),
+                )
+            }
+        for i in range(0, len(data), MEDIA_REPLACE_CHUNK_SIZE):
+            run_write(_merge_media_index_rows, data[i:i + MEDIA_REPLACE_CHUNK_SIZE])
+
+        scanned_paths = {row[2] for row in data}
+        removed = [(category_id, rel_path) for rel_path in indexed_paths - scanned_paths]
+        for i in range(0, len(removed), MEDIA_REPLACE_CHUNK_SIZE):
+            run_write(_delete_media_index_rows, removed[i:i + MEDIA_REPLACE_CHUNK_SIZE])
+        if version_hash:
+            run_write(_write_category_version_hash, category_id, version_hash)
+        logger.info(f"Updated media_index for {category_id} with {len(data)} files")
+        return True, len(data)
 
     except Exception as e:
         logger.error(f"Error updating media_index batch for {category_id}: {e}")
         return False, 0
 
+def _delete_category_media_rows(conn, category_id):
+    cursor = conn.execute("DELETE FROM media_index WHERE category_id = ?", (category_id,))
+    conn.execute("DELETE FROM media_shuffle_orders WHERE category_id = ?", (category_id,))
+    conn.execute("UPDATE categories SET version_hash = NULL WHERE id = ?", (category_id,))
+    return cursor.rowcount
+
+
 def delete_media_index_by_category(category_id):
     """Delete all index records for a specific category."""
     try:
-        with get_db() as conn:
-            cursor = conn.execute("DELETE FROM media_index WHERE category_id = ?", (category_id,))
-            conn.execute("UPDATE categories SET version_hash = NULL WHERE id = ?", (category_id,))
-            logger.info(f"Deleted {cursor.rowcount} media_index records for category {category_id}")
-            return True
+        deleted = run_write(_delete_category_media_rows, category_id)
+        logger.info(f"Deleted {deleted} media_index records for category {category_id}")
+        return True
     except Exception as e:
         logger.error(f"Error deleting media_index for {category_id}: {e}")
         return False
@@ -167,15 +217,10 @@ def delete_media_index_by_category(category_id):
 def delete_media_index_entry(category_id, rel_path):
     """Delete a specific file from the media index."""
     try:
-        with get_db() as conn:
-            cursor = conn.execute(
-                "DELETE FROM media_index WHERE category_id = ? AND rel_path = ?",
-                (category_id, rel_path)
-            )
-            if cursor.rowcount > 0:
-                logger.debug(f"Removed {rel_path} from media_index in category {category_id}")
-                return True
-            return False
+        if run_write(_delete_media_index_rows, [(category_id, rel_path)]) > 0:
+            logger.debug(f"Removed {rel_path} from media_index in category {category_id}")
+            return True
+        return False
     except Exception as e:
         logger.error(f"Error removing {rel_path} from media_index: {e}")
         return False
@@ -192,16 +237,10 @@ def delete_media_index_entries_batch(stale_entries):
         return 0
 
     try:
-        with get_db() as conn:
-            # executemany automatically handles the transaction if isolation_level is None
-            cursor = conn.executemany(
-                "DELETE FROM media_index WHERE category_id = ? AND rel_path = ?",
-                stale_entries
-            )
-            count = cursor.rowcount
-            if count > 0:
-                logger.info(f"Batch deleted {count} stale entries from media_index")
-            return count
+        count = run_write(_delete_media_index_rows, list(stale_entries))
+        if count > 0:
+            logger.info(f"Batch deleted {count} stale entries from media_index")
+        return count
     except Exception as e:
         logger.error(f"Error in batch media_index deletion: {e}")
         return 0
@@ -257,25 +296,20 @@ def upsert_media_index_entry(category_id, category_path, rel_path, size, mtime,
 
         current_time = time.time()
 
-        with get_db() as conn:
-            conn.execute("""
-                INSERT OR REPLACE INTO media_index
-                (id, category_id, rel_path, parent_path, name, size, mtime, hash, type, is_hidden, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                entry_id,
-                category_id,
-                rel_path,
-                parent_path,
-                os.path.basename(rel_path),
-                int(size),
-                float(mtime),
-                file_hash,
-                file_type,
-                is_hid,
-                current_time,
-                current_time
-            ))
+        run_write(_upsert_media_index_rows, [(
+            entry_id,
+            category_id,
+            rel_path,
+            parent_path,
+            os.path.basename(rel_path),
+            int(size),
+            float(mtime),
+            file_hash,
+            file_type,
+            is_hid,
+            current_time,
+            current_time
+        )])
 
         return True
     except Exception as e:
@@ -362,17 +396,7 @@ def batch_upsert_media_index_entries(category_id, category_path, file_entries):
         if not rows:
             return True, 0
 
-        with get_db() as conn:
-            conn.executemany(
-                """
-                INSERT OR REPLACE INTO media_index
-                (id, category_id, rel_path, parent_path, name, size, mtime, hash, type, is_hidden, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                rows,
-            )
-
-        return True, len(rows)
+        return True, run_write(_upsert_media_index_rows, rows)
     except Exception as e:
         logger.error(f"Error batch upserting media_index entries for {category_id}: {e}")
         return False, 0
@@ -394,12 +418,74 @@ def clear_all_media_index():
         logger.error(f"Error clearing media_index: {e}")
         return False, 0
 
+def encode_media_cursor(sort_by, sort_order, row=None, offset=None):
+    """
+    Build an opaque pagination cursor.
+
+    Keyset cursors carry the last row's sort key and id so the next page can
+    seek directly in the index. Offset cursors are used by in-memory orders
+    (shuffle, TV) and deduplicated listings that cannot seek.
+    """
+    payload = {
+        'v': MEDIA_CURSOR_VERSION,
+        's': MEDIA_CURSOR_SORT_COLUMNS.get(sort_by, sort_by),
+        'd': 'DESC' if str(sort_order).upper() == 'DESC' else 'ASC',
+    }
+    if row is not None:
+        payload['k'] = row[payload['s']]
+        payload['i'] = row['id']
+    else:
+        payload['o'] = max(0, int(offset or 0))
+
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_media_cursor(token):
+    """
+    Decode a cursor produced by encode_media_cursor.
+
+    Raises:
+        ValueError: If the token is malformed or from an unsupported version.
+    """
+    try:
+        padded = str(token) + '=' * (-len(str(token)) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError) as err:
+        raise ValueError(f"Invalid media cursor: {err}") from err
+
+    if not isinstance(payload, dict) or payload.get('v') != MEDIA_CURSOR_VERSION:
+        raise ValueError("Invalid media cursor: unsupported version")
+
+    cursor = {
+        'sort_by': payload.get('s'),
+        'sort_order': payload.get('d', 'ASC'),
+    }
+    if 'o' in payload:
+        try:
+            cursor['offset'] = max(0, int(payload['o']))
+        except (TypeError, ValueError) as err:
+            raise ValueError(f"Invalid media cursor: {err}") from err
+        return cursor
+
+    if cursor['sort_by'] not in MEDIA_CURSOR_SORT_COLUMNS.values() or 'i' not in payload:
+        raise ValueError("Invalid media cursor: missing seek key")
+    cursor['key'] = payload.get('k')
+    cursor['id'] = payload['i']
+    return cursor
+
+
 def get_paginated_media(category_id=None, subfolder='', sort_by='name', sort_order='ASC',
                          limit=100, offset=0, filter_type='all', show_hidden=False,
-                         deduplicate_by_hash=False, columns=None):
+                         deduplicate_by_hash=False, columns=None, after=None):
     """
     Query the media index with advanced filtering and sorting.
     Optimized for Scalable Indexing Layer.
+
+    `after` is a decoded keyset cursor ({'key', 'id'}); when given, rows are
+    seeked past that position instead of skipped with OFFSET so deep pages
+    cost the same as the first. Keyset seeks are not supported together
+    with `deduplicate_by_hash`.
     """
     try:
         from app.services.media.hidden_content_service import should_block_category_access
@@ -416,6 +502,13 @@ def get_paginated_media(category_id=None, subfolder='', sort_by='name', sort_ord
             safe_cols = [c for c in columns if c in valid_cols]
             col_select = ", ".join(safe_cols) if safe_cols else "*"
 
+        valid_sort_cols = {'name': 'name', 'mtime': 'mtime', 'size': 'size'}
+        sort_col = valid_sort_cols.get(sort_by, 'name')
+        # Whitelist sort_order to prevent SQL injection
+        sort_dir = 'ASC' if sort_order.upper() != 'DESC' else 'DESC'
+        if after is not None and deduplicate_by_hash:
+            raise ValueError("Keyset pagination is not supported for deduplicated queries")
+
         # Base query selection
         if deduplicate_by_hash:
             # When deduplicating, we pick the first occurrence in the group.
@@ -460,31 +553,44 @@ def get_paginated_media(category_id=None, subfolder='', sort_by='name', sort_ord
             else:
                 where_clauses.append(_hidden_category_clause())
 
+        # 4. Keyset seek. Expanded form of (key, id) > (?, ?) so SQLite can
+        # range-scan the (category_id, is_hidden, ..., key) indexes.
+        if after is not None:
+            seek_op = '<' if sort_dir == 'DESC' else '>'
+            seek_col = "name COLLATE NOCASE" if sort_col == 'name' else sort_col
+            where_clauses.append(
+                f"{seek_col} {seek_op}= ? AND ({seek_col} {seek_op} ? OR id {seek_op} ?)"
+            )
+            params.extend([after.get('key'), after.get('key'), after.get('id')])
+
         if where_clauses:
             query_parts.append("WHERE " + " AND ".join(where_clauses))
 
-        # 4. Deduplication
+        # 5. Deduplication
         if deduplicate_by_hash:
             query_parts.append("GROUP BY hash")
 
-        # 5. Sorting
-        valid_sort_cols = {'name': 'name', 'mtime': 'mtime', 'size': 'size'}
-        sort_col = valid_sort_cols.get(sort_by, 'name')
-        # Whitelist sort_order to prevent SQL injection
-        sort_dir = 'ASC' if sort_order.upper() != 'DESC' else 'DESC'
-
+        # 6. Sorting
         # Use the group_mtime if deduplicating and sorting by mtime
         if deduplicate_by_hash and sort_col == 'mtime':
             query_parts.append(f"ORDER BY group_mtime {sort_dir}")
-        elif sort_col == 'name':
-            # COLLATE NOCASE for alphabetical sorting
+        elif deduplicate_by_hash and sort_col == 'name':
             query_parts.append(f"ORDER BY name COLLATE NOCASE {sort_dir}")
-        else:
+        elif deduplicate_by_hash:
             query_parts.append(f"ORDER BY {sort_col} {sort_dir}")
+        elif sort_col == 'name':
+            # COLLATE NOCASE for alphabetical sorting; id keeps ties stable for keyset pages
+            query_parts.append(f"ORDER BY name COLLATE NOCASE {sort_dir}, id {sort_dir}")
+        else:
+            query_parts.append(f"ORDER BY {sort_col} {sort_dir}, id {sort_dir}")
 
-        # 6. Pagination
-        query_parts.append("LIMIT ? OFFSET ?")
-        params.extend([limit, offset])
+        # 7. Pagination
+        if after is not None:
+            query_parts.append("LIMIT ?")
+            params.append(limit)
+        else:
+            query_parts.append("LIMIT ? OFFSET ?")
+            params.extend([limit, offset])
 
         query = " ".join(query_parts)
 
@@ -496,48 +602,63 @@ def get_paginated_media(category_id=None, subfolder='', sort_by='name', sort_ord
         logger.error(f"Error in get_paginated_media: {e}")
         return []
 
+def _media_scope_clauses(category_id, subfolder, filter_type, show_hidden):
+    """
+    Build WHERE clauses for a listing scope (consistent with get_paginated_media).
+
+    Returns (where_clauses, params), or None when the category is hidden
+    and the scope cannot contain any visible rows.
+    """
+    from app.services.media.hidden_content_service import should_block_category_access
+
+    params = []
+    where_clauses = []
+
+    if category_id:
+        where_clauses.append("category_id = ?")
+        params.append(category_id)
+
+    if subfolder == '__all__':
+        pass
+    elif subfolder and str(subfolder).lower() != 'none':
+        # Keep scope semantics aligned with get_paginated_media for folder navigation.
+        norm_subfolder = str(subfolder).replace('\\', '/').strip('/')
+        where_clauses.append("(parent_path = ? OR parent_path LIKE ?)")
+        params.append(norm_subfolder)
+        params.append(f"{norm_subfolder}/%")
+    elif subfolder == '' or (subfolder and str(subfolder).lower() == 'none'):
+        # Root of category only
+        where_clauses.append("parent_path = ''")
+
+    if filter_type != 'all':
+        t_map = {'videos': 'video', 'photos': 'image'}
+        where_clauses.append("type = ?")
+        params.append(t_map.get(filter_type, filter_type))
+
+    if not show_hidden:
+        where_clauses.append("is_hidden = 0")
+        if category_id:
+            if should_block_category_access(category_id, show_hidden=False):
+                return None
+        else:
+            where_clauses.append(_hidden_category_clause())
+
+    return where_clauses, params
+
+
 def get_media_count(category_id=None, subfolder=None, filter_type='all', show_hidden=False,
                     deduplicate_by_hash=False):
     """Get total count of matching media items (consistent with get_paginated_media)."""
     try:
-        from app.services.media.hidden_content_service import should_block_category_access
-
         if deduplicate_by_hash:
             query_parts = ["SELECT COUNT(DISTINCT hash) as count FROM media_index"]
         else:
             query_parts = ["SELECT COUNT(*) as count FROM media_index"]
-        
-        params = []
-        where_clauses = []
-
-        if category_id:
-            where_clauses.append("category_id = ?")
-            params.append(category_id)
-
-        if subfolder == '__all__':
-            pass
-        elif subfolder and str(subfolder).lower() != 'none':
-            # Keep count semantics aligned with get_paginated_media for folder navigation.
-            norm_subfolder = str(subfolder).replace('\\', '/').strip('/')
-            where_clauses.append("(parent_path = ? OR parent_path LIKE ?)")
-            params.append(norm_subfolder)
-            params.append(f"{norm_subfolder}/%")
-        elif subfolder == '' or (subfolder and str(subfolder).lower() == 'none'):
-            # Root of category only
-            where_clauses.append("parent_path = ''")
-
-        if filter_type != 'all':
-            t_map = {'videos': 'video', 'photos': 'image'}
-            where_clauses.append("type = ?")
-            params.append(t_map.get(filter_type, filter_type))
 
-        if not show_hidden:
-            where_clauses.append("is_hidden = 0")
-            if category_id:
-                if should_block_category_access(category_id, show_hidden=False):
-                    return 0
-            else:
-                where_clauses.append(_hidden_category_clause())
+        scope = _media_scope_clauses(category_id, subfolder, filter_type, show_hidden)
+        if scope is None:
+            return 0
+        where_clauses, params = scope
 
         if where_clauses:
             query_parts.append("WHERE " + " AND ".join(where_clauses))
@@ -644,27 +765,298 @@ def get_rel_paths_batch(category_id, limit=5000, offset=0):
         return []
 
 
+def get_rel_paths_for_parents(category_id, parent_paths):
+    """
+    Get indexed relative paths whose parent directory is one of parent_paths.
+    Used by incremental indexing to diff only the directories that changed.
+    """
+    parent_paths = list(parent_paths or ())
+    if not parent_paths:
+        return set()
+
+    try:
+        rel_paths = set()
+        with get_db() as conn:
+            for index in range(0, len(parent_paths), 500):
+                chunk = parent_paths[index:index + 500]
+                placeholders = ', '.join(['?'] * len(chunk))
+                cursor = conn.execute(
+                    f"""
+                    SELECT rel_path FROM media_index
+                    WHERE category_id = ? AND parent_path IN ({placeholders})
+                    """,
+                    [category_id] + chunk,
+                )
+                rel_paths.update(row['rel_path'] for row in cursor)
+        return rel_paths
+    except Exception as e:
+        logger.error(f"Error in get_rel_paths_for_parents: {e}")
+        return set()
+
+
+def _delete_media_rows_under_directory(conn, category_id, rel_dir, escaped):
+    return conn.execute(
+        """
+        DELETE FROM media_index
+        WHERE category_id = ?
+          AND (parent_path = ? OR parent_path LIKE ? ESCAPE '\\')
+        """,
+        (category_id, rel_dir, escaped + '/%'),
+    ).rowcount
+
+
+def delete_media_index_under_directory(category_id, rel_dir):
+    """
+    Delete index entries inside rel_dir (recursively) for one category.
+
+    Returns:
+        Number of entries deleted
+    """
+    if not rel_dir:
+        return 0
+
+    escaped = rel_dir.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    try:
+        return run_write(_delete_media_rows_under_directory, category_id, rel_dir, escaped)
+    except Exception as e:
+        logger.error(f"Error deleting media_index under {rel_dir} for {category_id}: {e}")
+        return 0
+
+
+def get_directory_scan_state(category_id):
+    """
+    Load the directory mtime snapshot recorded by the last index pass.
+
+    Returns:
+        dict with 'dirs' ({rel_dir: mtime}), 'file_count', 'indexed_count'
+        and 'reconciled_at', or None when the category has no snapshot.
+    """
+    try:
+        with get_db() as conn:
+            state = conn.execute(
+                "SELECT file_count, reconciled_at FROM media_index_scan_state WHERE category_id = ?",
+                (category_id,)
+            ).fetchone()
+            if not state:
+                return None
+
+            dirs = {
+                row['rel_dir']: row['mtime']
+                for row in conn.execute(
+                    "SELECT rel_dir, mtime FROM media_index_dirs WHERE category_id = ?",
+                    (category_id,)
+                )
+            }
+            indexed = conn.execute(
+                "SELECT COUNT(*) AS count FROM media_index WHERE category_id = ?",
+                (category_id,)
+            ).fetchone()
+            return {
+                'dirs': dirs,
+                'file_count': state['file_count'],
+                'indexed_count': indexed['count'] if indexed else 0,
+                'reconciled_at': state['reconciled_at'],
+            }
+    except Exception as e:
+        logger.error(f"Error loading directory scan state for {category_id}: {e}")
+        return None
+
+
+def _write_directory_scan_state(conn, category_id, dir_mtimes, removed_dirs, replace, reconciled_at):
+    now = time.time()
+    if replace:
+        conn.execute("DELETE FROM media_index_dirs WHERE category_id = ?", (category_id,))
+    for rel_dir in removed_dirs:
+        escaped = rel_dir.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        conn.execute(
+            """
+            DELETE FROM media_index_dirs
+            WHERE category_id = ? AND (rel_dir = ? OR rel_dir LIKE ? ESCAPE '\\')
+            """,
+            (category_id, rel_dir, escaped + '/%'),
+        )
+    conn.executemany(
+        "INSERT OR REPLACE INTO media_index_dirs (category_id, rel_dir, mtime) VALUES (?, ?, ?)",
+        [(category_id, rel_dir, mtime) for rel_dir, mtime in dir_mtimes.items()],
+    )
+    conn.execute(
+        """
+        INSERT INTO media_index_scan_state (category_id, file_count, reconciled_at, updated_at)
+        VALUES (?, (SELECT COUNT(*) FROM media_index WHERE category_id = ?), ?, ?)
+        ON CONFLICT(category_id) DO UPDATE SET
+            file_count = excluded.file_count,
+            reconciled_at = CASE WHEN ? IS NULL
+                THEN media_index_scan_state.reconciled_at
+                ELSE excluded.reconciled_at END,
+            updated_at = excluded.updated_at
+        """,
+        (category_id, category_id, reconciled_at or 0, now, reconciled_at),
+    )
+
+
+def save_directory_scan_state(category_id, dir_mtimes, removed_dirs=(), replace=False,
+                              reconciled_at=None):
+    """
+    Persist directory mtimes after an index pass.
+
+    Args:
+        category_id: Category the snapshot belongs to.
+        dir_mtimes: {rel_dir: mtime} for directories listed by this pass.
+        removed_dirs: Directories that no longer exist (descendants included).
+        replace: Drop the previous snapshot first (full scans).
+        reconciled_at: Timestamp of a full reconcile; None keeps the previous one.
+    """
+    try:
+        run_write(
+            _write_directory_scan_state,
+            category_id,
+            dir_mtimes,
+            removed_dirs,
+            replace,
+            reconciled_at,
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Error saving directory scan state for {category_id}: {e}")
+        return False
+
+
+def _refresh_scan_state_count(conn, category_id):
+    conn.execute(
+        """
+        UPDATE media_index_scan_state
+        SET file_count = (SELECT COUNT(*) FROM media_index WHERE category_id = ?),
+            updated_at = ?
+        WHERE category_id = ?
+        """,
+        (category_id, time.time(), category_id),
+    )
+
+
+def refresh_directory_scan_count(category_id):
+    """Re-sync the snapshot file count after out-of-band index edits (watch deltas)."""
+    try:
+        run_write(_refresh_scan_state_count, category_id)
+        return True
+    except Exception as e:
+        logger.error(f"Error refreshing directory scan count for {category_id}: {e}")
+        return False
+
+
+def _delete_scan_state(conn, category_id):
+    conn.execute("DELETE FROM media_index_dirs WHERE category_id = ?", (category_id,))
+    conn.execute("DELETE FROM media_index_scan_state WHERE category_id = ?", (category_id,))
+
+
+def clear_directory_scan_state(category_id):
+    """Forget the directory snapshot so the next index pass is a full scan."""
+    try:
+        run_write(_delete_scan_state, category_id)
+        return True
+    except Exception as e:
+        logger.error(f"Error clearing directory scan state for {category_id}: {e}")
+        return False
+
+
+def get_media_probe(category_id, rel_path, size, mtime):
+    """
+    Return the stored ffprobe result for a file if it is still current.
+
+    Returns:
+        dict with 'has_video' and 'duration', or None when missing or the
+        file's size/mtime changed since it was probed.
+    """
+    try:
+        with get_db() as conn:
+            row = conn.execute(
+                """
+                SELECT has_video, duration FROM media_probe
+                WHERE category_id = ? AND rel_path = ? AND size = ? AND mtime = ?
+                """,
+                (category_id, rel_path, size, mtime),
+            ).fetchone()
+            if not row:
+                return None
+            return {'has_video': bool(row['has_video']), 'duration': row['duration']}
+    except Exception as e:
+        logger.error(f"Error loading media probe for {rel_path}: {e}")
+        return None
+
+
+def save_media_probe(category_id, rel_path, size, mtime, has_video, duration):
+    """Store an ffprobe result keyed by the file's size and mtime."""
+    try:
+        run_write(
+            execute_write,
+            """
+            INSERT OR REPLACE INTO media_probe
+                (category_id, rel_path, size, mtime, has_video, duration, probed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (category_id, rel_path, size, mtime, int(bool(has_video)), duration, time.time()),
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Error saving media probe for {rel_path}: {e}")
+        return False
+
+
+def _delete_orphaned_media_probes(conn):
+    cursor = conn.execute(
+        """
+        DELETE FROM media_probe
+        WHERE NOT EXISTS (
+            SELECT 1 FROM media_index
+            WHERE media_index.category_id = media_probe.category_id
+              AND media_index.rel_path = media_probe.rel_path
+        )
+        """
+    )
+    return cursor.rowcount
+
+
+def prune_orphaned_media_probes():
+    """
+    Remove stored probes whose file is no longer indexed.
+
+    Returns:
+        Number of probe rows deleted.
+    """
+    try:
+        deleted = run_write(_delete_orphaned_media_probes)
+        if deleted:
+            logger.info(f"Pruned {deleted} orphaned media probe rows")
+        return deleted
+    except Exception as e:
+        logger.error(f"Error pruning orphaned media probes: {e}")
+        return 0
+
+
 def get_all_category_media_summaries(show_hidden=False):
     """
     Fetch media summaries for all categories in a single query.
     Returns dict {category_id: {count, contains_video, image_rel_path, video_rel_path}}
+
+    Reads the trigger-maintained category_media_summary table, so the cost
+    is a few rows per category rather than one per indexed file.
     """
     try:
-        where = "1=1"
+        where = "count > 0"
         if not show_hidden:
-            where = f"is_hidden = 0 AND {_hidden_category_clause()}"
+            where += (
+                " AND is_hidden = 0"
+                f" AND {_hidden_category_clause('category_media_summary.category_id')}"
+            )
 
         with get_db() as conn:
-            # We use MIN(rel_path) as a representative path.
-            # This is MUCH faster than individual queries per category.
             cursor = conn.execute(f"""
                 SELECT
                     category_id,
-                    COUNT(*) as count,
-                    SUM(CASE WHEN type = 'video' THEN 1 ELSE 0 END) as video_count,
-                    MIN(CASE WHEN type = 'image' THEN rel_path END) as image_rel_path,
-                    MIN(CASE WHEN type = 'video' THEN rel_path END) as video_rel_path
-                FROM media_index
+                    SUM(count) as count,
+                    SUM(CASE WHEN type = 'video' THEN count ELSE 0 END) as video_count,
+                    MIN(CASE WHEN type = 'image' THEN first_rel_path END) as image_rel_path,
+                    MIN(CASE WHEN type = 'video' THEN first_rel_path END) as video_rel_path
+                FROM category_media_summary
                 WHERE {where}
                 GROUP BY category_id
             """)
@@ -683,8 +1075,18 @@ def get_all_category_media_summaries(show_hidden=False):
         return {}
 
 
+def _split_summary_pick(pick):
+    """Split a ``category_id<US>rel_path`` summary pick into its parts."""
+    if not pick:
+        return None, None
+    parts = str(pick).split('\x1f', 1)
+    if len(parts) != 2:
+        return None, None
+    return parts[0], parts[1]
+
+
 def _build_category_summary_scope(category_id, show_hidden=False, include_descendants=False):
-    """Build a reusable SQL scope for category summary queries."""
+    """Build a reusable SQL scope for category_media_summary queries."""
     if include_descendants:
         where = "(category_id = ? OR category_id LIKE ?)"
         params = [category_id, f"{category_id}::%"]
@@ -694,7 +1096,7 @@ def _build_category_summary_scope(category_id, show_hidden=False, include_descen
 
     if not show_hidden:
         where += " AND is_hidden = 0"
-        where += f" AND {_hidden_category_clause()}"
+        where += f" AND {_hidden_category_clause('category_media_summary.category_id')}"
 
     return where, params
 
@@ -708,6 +1110,14 @@ def get_category_media_summary(
     Get media summary for a category using the SQLite index.
     Returns dict with count, contains_video, image/video rel paths, and source category IDs.
     """
+    empty = {
+        'count': 0,
+        'contains_video': False,
+        'image_rel_path': None,
+        'video_rel_path': None,
+        'image_category_id': None,
+        'video_category_id': None,
+    }
     try:
         where, params = _build_category_summary_scope(
             category_id,
@@ -716,70 +1126,50 @@ def get_category_media_summary(
         )
 
         with get_db() as conn:
-            count_row = conn.execute(
-                f"SELECT COUNT(*) as count FROM media_index WHERE {where}",
-                params
-            ).fetchone()
-            count = count_row['count'] if count_row else 0
-
-            if count == 0:
-                return {
-                    'count': 0,
-                    'contains_video': False,
-                    'image_rel_path': None,
-                    'video_rel_path': None,
-                    'image_category_id': None,
-                    'video_category_id': None,
-                }
-
-            image_row = conn.execute(
-                f"""
-                SELECT category_id, rel_path FROM media_index
-                WHERE {where} AND type = 'image'
-                ORDER BY name COLLATE NOCASE ASC
-                LIMIT 1
-                """,
-                params
-            ).fetchone()
-            video_row = conn.execute(
+            row = conn.execute(
                 f"""
-                SELECT category_id, rel_path FROM media_index
-                WHERE {where} AND type = 'video'
-                ORDER BY name COLLATE NOCASE ASC
-                LIMIT 1
+                SELECT
+                    SUM(count) AS count,
+                    MIN(
+                        CASE WHEN type = 'image'
+                        THEN category_id || char(31) || first_rel_path END
+                    ) AS image_pick,
+                    MIN(
+                        CASE WHEN type = 'video'
+                        THEN category_id || char(31) || first_rel_path END
+                    ) AS video_pick
+                FROM category_media_summary
+                WHERE {where}
                 """,
                 params
             ).fetchone()
 
-            image_rel = image_row['rel_path'] if image_row else None
-            video_rel = video_row['rel_path'] if video_row else None
+        count = int(row['count'] or 0) if row else 0
+        if count == 0:
+            return empty
 
-            return {
-                'count': count,
-                'contains_video': video_rel is not None,
-                'image_rel_path': image_rel,
-                'video_rel_path': video_rel,
-                'image_category_id': image_row['category_id'] if image_row else None,
-                'video_category_id': video_row['category_id'] if video_row else None,
-            }
-    except Exception as e:
-        logger.error(f"Error getting category media summary for {category_id}: {e}")
+        image_category_id, image_rel = _split_summary_pick(row['image_pick'])
+        video_category_id, video_rel = _split_summary_pick(row['video_pick'])
         return {
-            'count': 0,
-            'contains_video': False,
-            'image_rel_path': None,
-            'video_rel_path': None,
-            'image_category_id': None,
-            'video_category_id': None,
+            'count': count,
+            'contains_video': video_rel is not None,
+            'image_rel_path': image_rel,
+            'video_rel_path': video_rel,
+            'image_category_id': image_category_id,
+            'video_category_id': video_category_id,
         }
+    except Exception as e:
+        logger.error(f"Error getting category media summary for {category_id}: {e}")
+        return empty
 
 
 def get_subfolder_media_summaries(category_id, subfolder_prefix=None, show_hidden=False):
     """
     Return immediate subfolder summaries for a category.
 
-    For `auto::` categories, summaries are derived from descendant category IDs.
-    For standard categories, summaries are derived from the rel_path hierarchy.
+    For `auto::` categories, summaries roll up descendant rows of
+    category_media_summary. For standard categories, they roll up the
+    per-directory rows of category_dir_media_summary.
     """
     if not category_id:
         return []
@@ -809,10 +1199,10 @@ def get_subfolder_media_summaries(category_id, subfolder_prefix=None, show_hidde
                             ELSE substr(category_id, ?)
                         END AS sub_name,
                         category_id,
-                        rel_path,
-                        name,
+                        first_rel_path,
+                        count,
                         type
-                    FROM media_index
+                    FROM category_media_summary
                     WHERE category_id LIKE ?
             """
             params = [
@@ -825,31 +1215,26 @@ def get_subfolder_media_summaries(category_id, subfolder_prefix=None, show_hidde
 
             if not show_hidden:
                 query += " AND is_hidden = 0"
-                query += f" AND {_hidden_category_clause()}"
+                query += f" AND {_hidden_category_clause('category_media_summary.category_id')}"
 
             query += """
                 )
                 SELECT
                     sub_name,
-                    COUNT(*) AS count,
-                    SUM(CASE WHEN type = 'video' THEN 1 ELSE 0 END) AS video_count,
+                    SUM(count) AS count,
+                    SUM(CASE WHEN type = 'video' THEN count ELSE 0 END) AS video_count,
                     MIN(
-                        CASE
-                            WHEN type = 'image'
-                            THEN lower(name) || char(31) || category_id || char(31) || rel_path
-                            ELSE NULL
-                        END
+                        CASE WHEN type = 'image'
+                        THEN category_id || char(31) || first_rel_path END
                     ) AS image_pick,
                     MIN(
-                        CASE
-                            WHEN type = 'video'
-                            THEN lower(name) || char(31) || category_id || char(31) || rel_path
-                            ELSE NULL
-                        END
+                        CASE WHEN type = 'video'
+                        THEN category_id || char(31) || first_rel_path END
                     ) AS video_pick
                 FROM scoped
                 WHERE sub_name IS NOT NULL AND sub_name != ''
                 GROUP BY sub_name
+                HAVING SUM(count) > 0
                 ORDER BY sub_name COLLATE NOCASE ASC
             """
 
@@ -862,22 +1247,8 @@ def get_subfolder_media_summaries(category_id, subfolder_prefix=None, show_hidde
                 if not sub_name:
                     continue
 
-                image_category_id = None
-                image_rel_path = None
-                if row['image_pick']:
-                    parts = str(row['image_pick']).split('\x1f', 2)
-                    if len(parts) == 3:
-                        image_category_id = parts[1]
-                        image_rel_path = parts[2]
-
-                video_category_id = None
-                video_rel_path = None
-                if row['video_pick']:
-                    parts = str(row['video_pick']).split('\x1f', 2)
-                    if len(parts) == 3:
-                        video_category_id = parts[1]
-                        video_rel_path = parts[2]
-
+                image_category_id, image_rel_path = _split_summary_pick(row['image_pick'])
+                video_category_id, video_rel_path = _split_summary_pick(row['video_pick'])
                 summaries.append({
                     'name': sub_name,
                     'count': int(row['count'] or 0),
@@ -897,35 +1268,40 @@ def get_subfolder_media_summaries(category_id, subfolder_prefix=None, show_hidde
             if prefix:
                 prefix += '/'
 
-        prefix_len = len(prefix)
-        start_index = prefix_len + 1  # SQLite substr is 1-based
+        start_index = len(prefix) + 1  # SQLite substr is 1-based
         query = """
             SELECT
                 CASE
-                    WHEN instr(substr(rel_path, ?), '/') > 0
-                    THEN substr(rel_path, ?, instr(substr(rel_path, ?), '/') - 1)
-                    ELSE NULL
+                    WHEN instr(substr(parent_path, ?), '/') > 0
+                    THEN substr(parent_path, ?, instr(substr(parent_path, ?), '/') - 1)
+                    ELSE substr(parent_path, ?)
                 END AS sub_name,
-                COUNT(*) AS count,
-                SUM(CASE WHEN type = 'video' THEN 1 ELSE 0 END) AS video_count,
-                MIN(CASE WHEN type = 'image' THEN rel_path END) AS image_rel,
-                MIN(CASE WHEN type = 'video' THEN rel_path END) AS video_rel
-            FROM media_index
-            WHERE category_id = ? AND rel_path LIKE ?
+                SUM(count) AS count,
+                SUM(CASE WHEN type = 'video' THEN count ELSE 0 END) AS video_count,
+                MIN(CASE WHEN type = 'image' THEN first_rel_path END) AS image_rel,
+                MIN(CASE WHEN type = 'video' THEN first_rel_path END) AS video_rel
+            FROM category_dir_media_summary
+            WHERE category_id = ? AND parent_path LIKE ? AND length(parent_path) > ?
         """
-        params = [start_index, start_index, start_index, category_id, f"{prefix}%"]
+        params = [
+            start_index,
+            start_index,
+            start_index,
+            start_index,
+            category_id,
+            f"{prefix}%",
+            len(prefix),
+        ]
 
         if not show_hidden:
             query += " AND is_hidden = 0"
-            query += f" AND {_hidden_category_clause()}"
+            query += f" AND {_hidden_category_clause('category_dir_media_summary.category_id')}"
 
         query += """
-            AND instr(substr(rel_path, ?), '/') > 0
             GROUP BY sub_name
-            HAVING sub_name IS NOT NULL
+            HAVING sub_name IS NOT NULL AND sub_name != '' AND SUM(count) > 0
             ORDER BY sub_name COLLATE NOCASE ASC
         """
-        params.append(start_index)
 
         with get_db() as conn:
             rows = conn.execute(query, params).fetchall()
@@ -969,15 +1345,176 @@ def get_media_rows_by_filenames(category_id, filenames):
         return {}
 
 
+def get_media_rows_by_rowids(rowids, category_id=None, subfolder='__all__',
+                             filter_type='all', show_hidden=True):
+    """
+    Return media-index rows for a set of rowids, keyed by rowid.
+
+    Rows outside the listing scope (including rows hidden since a cached
+    order was built) are left out.
+    """
+    if not rowids:
+        return {}
+
+    try:
+        scope = _media_scope_clauses(category_id, subfolder, filter_type, show_hidden)
+        if scope is None:
+            return {}
+        where_clauses, params = scope
+
+        rows = {}
+        rowids = list(rowids)
+        with get_db() as conn:
+            for i in range(0, len(rowids), MEDIA_ROWID_CHUNK_SIZE):
+                chunk = rowids[i:i + MEDIA_ROWID_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                query = f"SELECT rowid AS row_id, * FROM media_index WHERE rowid IN ({placeholders})"
+                if where_clauses:
+                    query += " AND " + " AND ".join(where_clauses)
+                cursor = conn.execute(query, chunk + params)
+                for row in cursor:
+                    rows[row['row_id']] = dict(row)
+        return rows
+    except Exception as e:
+        logger.error(f"Error getting media rows by rowids: {e}")
+        return {}
+
+
+def get_media_rowid_basis(category_id, subfolder, filter_type='all', show_hidden=False):
+    """
+    Return a cheap fingerprint of the rowids in a listing scope.
+
+    Computed by an aggregate over the scope's index, so no rows are
+    materialized in Python. The sum of squares keeps visibility flips that
+    preserve count, sum and max from reusing a stale order, and the basis
+    stays stable across restarts. Returns '' for an empty or blocked scope.
+    """
+    try:
+        scope = _media_scope_clauses(category_id, subfolder, filter_type, show_hidden)
+        if scope is None:
+            return ''
+        where_clauses, params = scope
+
+        query = (
+            "SELECT COUNT(*) AS n, TOTAL(rowid) AS s, TOTAL(rowid * rowid) AS q, "
+            "MAX(rowid) AS m FROM media_index"
+        )
+        if where_clauses:
+            query += " WHERE " + " AND ".join(where_clauses)
+
+        with get_db() as conn:
+            row = conn.execute(query, params).fetchone()
+            if not row or not row['n']:
+                return ''
+            return f"{row['n']}:{int(row['s'])}:{int(row['q'])}:{row['m']}"
+    except Exception as e:
+        logger.error(f"Error computing media rowid basis for {category_id}: {e}")
+        return ''
+
+
+def get_media_rowids(category_id, subfolder, filter_type='all', show_hidden=False):
+    """Return the rowids in a listing scope as a compact array('I'), rowid ordered."""
+    rowids = array('I')
+    try:
+        scope = _media_scope_clauses(category_id, subfolder, filter_type, show_hidden)
+        if scope is None:
+            return rowids
+        where_clauses, params = scope
+
+        query = "SELECT rowid FROM media_index"
+        if where_clauses:
+            query += " WHERE " + " AND ".join(where_clauses)
+        query += " ORDER BY rowid"
+
+        with get_db() as conn:
+            cursor = conn.execute(query, params)
+            while True:
+                batch = cursor.fetchmany(MEDIA_ROWID_FETCH_SIZE)
+                if not batch:
+                    break
+                rowids.extend(row[0] for row in batch)
+        return rowids
+    except Exception as e:
+        logger.error(f"Error fetching media rowids for {category_id}: {e}")
+        return array('I')
+
+
+def get_shuffle_order_slice(category_id, subfolder, filter_type, show_hidden, basis, start, limit):
+    """
+    Read one page of a persisted shuffle order without loading the whole blob.
+
+    Returns an array('I') of rowids, or None when no order is stored for
+    the scope or it was built from a different basis.
+    """
+    try:
+        itemsize = array('I').itemsize
+        with get_db() as conn:
+            row = conn.execute(
+                """
+                SELECT substr(rowid_order, ?, ?) AS page FROM media_shuffle_orders
+                WHERE category_id = ? AND subfolder = ? AND filter_type = ?
+                  AND show_hidden = ? AND basis = ?
+                """,
+                (
+                    max(0, int(start)) * itemsize + 1,
+                    max(0, int(limit)) * itemsize,
+                    category_id,
+                    subfolder,
+                    filter_type,
+                    int(bool(show_hidden)),
+                    basis,
+                ),
+            ).fetchone()
+            if row is None:
+                return None
+            page = array('I')
+            page.frombytes(bytes(row['page'] or b''))
+            return page
+    except Exception as e:
+        logger.error(f"Error loading shuffle order for {category_id}: {e}")
+        return None
+
+
+def save_shuffle_order(category_id, subfolder, filter_type, show_hidden, basis, order):
+    """Persist a shuffle permutation (array('I') of rowids) for a listing scope."""
+    try:
+        run_write(
+            execute_write,
+            """
+            INSERT OR REPLACE INTO media_shuffle_orders
+                (category_id, subfolder, filter_type, show_hidden, basis, rowid_order, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                category_id,
+                subfolder,
+                filter_type,
+                int(bool(show_hidden)),
+                basis,
+                order.tobytes(),
+                time.time(),
+            ),
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Error saving shuffle order for {category_id}: {e}")
+        return False
+
+
 def get_timeline_date_counts(category_id=None, filter_type='all', show_hidden=False):
-    """Return timeline date counts keyed by `YYYY-MM-DD`."""
+    """
+    Return timeline date counts keyed by `YYYY-MM-DD`.
+
+    Reads the trigger-maintained media_timeline_rollup table, so the cost
+    scales with the number of distinct days rather than indexed files.
+    """
     try:
         query = """
-            SELECT date(mtime, 'unixepoch') as date_key, COUNT(*) as count
-            FROM media_index
+            SELECT date_key, SUM(count) as count
+            FROM media_timeline_rollup
         """
         params = []
-        where_clauses = []
+        where_clauses = ["date_key != ''"]
 
         if category_id:
             where_clauses.append("category_id = ?")
@@ -989,11 +1526,9 @@ def get_timeline_date_counts(category_id=None, filter_type='all', show_hidden=Fa
 
         if not show_hidden:
             where_clauses.append("is_hidden = 0")
-            where_clauses.append(_hidden_category_clause())
-
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
+            where_clauses.append(_hidden_category_clause("media_timeline_rollup.category_id"))
 
+        query += " WHERE " + " AND ".join(where_clauses)
         query += " GROUP BY date_key ORDER BY date_key DESC"
 
         with get_db() as conn:
@@ -1012,7 +1547,11 @@ def get_media_rows_for_date(
     offset=0,
     show_hidden=False,
 ):
-    """Return raw media-index rows for a specific timeline date."""
+    """
+    Return raw media-index rows for a specific timeline date.
+
+    The date predicate matches the idx_media_index_day expression index.
+    """
     try:
         query = """
             SELECT * FROM media_index
@@ -1042,60 +1581,133 @@ def get_media_rows_for_date(
         logger.error(f"Error getting media rows for date {date_key}: {e}")
         return []
 
-def search_media_index(search_query, limit=50, show_hidden=False):
-    """Search for media items across the index."""
+def _media_search_index_available(conn):
+    """Return True when the FTS5 media search index exists in this database."""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (MEDIA_SEARCH_INDEX_TABLE,),
+    ).fetchone()
+    return row is not None
+
+
+def _media_search_match_expression(query_term, columns):
+    """
+    Build an FTS5 MATCH expression for a literal substring search.
+
+    Returns None when the trigram index cannot serve the term (fewer than
+    three characters), so callers fall back to LIKE scans.
+    """
+    if len(query_term) < MEDIA_SEARCH_MIN_TERM_LENGTH:
+        return None
+    phrase = '"' + query_term.replace('"', '""') + '"'
+    return "{" + " ".join(columns) + "} : " + phrase
+
+
+def search_media_index(search_query, limit=50, show_hidden=False, offset=0):
+    """
+    Search for media items across the index.
+
+    Uses the FTS5 trigram index when available (ranked by prefix match, then
+    bm25 relevance) and falls back to LIKE scans otherwise.
+    """
     try:
         query_term = str(search_query or '').strip()
         if not query_term:
             return []
 
         safe_limit = max(1, min(int(limit or 50), 5000))
+        safe_offset = max(0, int(offset or 0))
         like_any = f"%{query_term}%"
         like_prefix = f"{query_term}%"
 
-        query_parts = [
-            """
-            SELECT
-                id,
-                category_id,
-                rel_path,
-                parent_path,
-                name,
-                size,
-                mtime,
-                hash,
-                type,
-                is_hidden,
-                created_at,
-                updated_at
-            FROM media_index
-            WHERE (name LIKE ? OR rel_path LIKE ?)
-            """
-        ]
-        params = [like_any, like_any]
-
-        if not show_hidden:
-            query_parts.append("AND is_hidden = 0")
-            query_parts.append(f"AND {_hidden_category_clause()}")
-
-        query_parts.append(
-            """
-            ORDER BY
-                CASE
-                    WHEN name LIKE ? THEN 0
-                    WHEN rel_path LIKE ? THEN 1
-                    ELSE 2
-                END,
-                mtime DESC,
-                name COLLATE NOCASE ASC
-            LIMIT ?
-            """
-        )
-        params.extend([like_prefix, like_prefix, safe_limit])
+        with get_db() as conn:
+            match_expr = None
+            if _media_search_index_available(conn):
+                match_expr = _media_search_match_expression(query_term, ('name', 'rel_path'))
 
-        query = " ".join(query_parts)
+            if match_expr:
+                query_parts = [
+                    """
+                    SELECT
+                        m.id,
+                        m.category_id,
+                        m.rel_path,
+                        m.parent_path,
+                        m.name,
+                        m.size,
+                        m.mtime,
+                        m.hash,
+                        m.type,
+                        m.is_hidden,
+                        m.created_at,
+                        m.updated_at
+                    FROM media_index_fts
+                    JOIN media_index m ON m.rowid = media_index_fts.rowid
+                    WHERE media_index_fts MATCH ?
+                    """
+                ]
+                params = [match_expr]
+
+                if not show_hidden:
+                    query_parts.append("AND m.is_hidden = 0")
+                    query_parts.append(f"AND {_hidden_category_clause('m.category_id')}")
+
+                query_parts.append(
+                    """
+                    ORDER BY
+                        CASE
+                            WHEN m.name LIKE ? THEN 0
+                            WHEN m.rel_path LIKE ? THEN 1
+                            ELSE 2
+                        END,
+                        media_index_fts.rank,
+                        m.mtime DESC,
+                        m.name COLLATE NOCASE ASC
+                    LIMIT ? OFFSET ?
+                    """
+                )
+            else:
+                query_parts = [
+                    """
+                    SELECT
+                        id,
+                        category_id,
+                        rel_path,
+                        parent_path,
+                        name,
+                        size,
+                        mtime,
+                        hash,
+                        type,
+                        is_hidden,
+                        created_at,
+                        updated_at
+                    FROM media_index
+                    WHERE (name LIKE ? OR rel_path LIKE ?)
+                    """
+                ]
+                params = [like_any, like_any]
+
+                if not show_hidden:
+                    query_parts.append("AND is_hidden = 0")
+                    query_parts.append(f"AND {_hidden_category_clause()}")
+
+                query_parts.append(
+                    """
+                    ORDER BY
+                        CASE
+                            WHEN name LIKE ? THEN 0
+                            WHEN rel_path LIKE ? THEN 1
+                            ELSE 2
+                        END,
+                        mtime DESC,
+                        name COLLATE NOCASE ASC
+                    LIMIT ? OFFSET ?
+                    """
+                )
+            params.extend([like_prefix, like_prefix, safe_limit, safe_offset])
 
-        with get_db() as conn:
+            query = " ".join(query_parts)
             cursor = conn.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
     except Exception as e:
@@ -1118,47 +1730,69 @@ def search_media_paths_for_folder_matches(search_query, limit=20000, show_hidden
         safe_offset = max(0, int(offset or 0))
         like_any = f"%{query_term}%"
 
-        # Group by parent_path and return a deterministic sample rel_path per folder.
-        query_parts = [
-            """
-            SELECT
-                category_id,
-                parent_path,
-                MIN(rel_path) AS rel_path
-            FROM media_index
-            WHERE (parent_path LIKE ? OR name LIKE ?)
-            """
-        ]
-        params = [like_any, like_any]
-
-        if not show_hidden:
-            query_parts.append("AND is_hidden = 0")
-            query_parts.append(f"AND {_hidden_category_clause()}")
-
-        query_parts.append("GROUP BY category_id, parent_path")
-
-        # Prefer exact/prefix path matches, then stable alphabetical ordering.
-        query_parts.append(
-            """
-            ORDER BY
-                CASE
-                    WHEN parent_path = ? THEN 0
-                    WHEN parent_path LIKE ? THEN 1
-                    ELSE 2
-                END,
-                parent_path COLLATE NOCASE ASC
-            LIMIT ?
-            """
-        )
-        normalized_term = query_term.replace('\\', '/').strip('/')
-        params.extend([normalized_term, f"{normalized_term}/%", safe_limit])
-        if safe_offset > 0:
-            query_parts.append("OFFSET ?")
-            params.append(safe_offset)
-
-        query = " ".join(query_parts)
-
         with get_db() as conn:
+            match_expr = None
+            if _media_search_index_available(conn):
+                match_expr = _media_search_match_expression(query_term, ('name', 'rel_path'))
+
+            # Group by parent_path and return a deterministic sample rel_path per folder.
+            if match_expr:
+                # The FTS index narrows candidates; the LIKE re-check keeps the
+                # exact parent_path/name semantics of the scan path below.
+                query_parts = [
+                    """
+                    SELECT
+                        m.category_id,
+                        m.parent_path,
+                        MIN(m.rel_path) AS rel_path
+                    FROM media_index_fts
+                    JOIN media_index m ON m.rowid = media_index_fts.rowid
+                    WHERE media_index_fts MATCH ?
+                    AND (m.parent_path LIKE ? OR m.name LIKE ?)
+                    """
+                ]
+                params = [match_expr, like_any, like_any]
+                if not show_hidden:
+                    query_parts.append("AND m.is_hidden = 0")
+                    query_parts.append(f"AND {_hidden_category_clause('m.category_id')}")
+                query_parts.append("GROUP BY m.category_id, m.parent_path")
+            else:
+                query_parts = [
+                    """
+                    SELECT
+                        category_id,
+                        parent_path,
+                        MIN(rel_path) AS rel_path
+                    FROM media_index
+                    WHERE (parent_path LIKE ? OR name LIKE ?)
+                    """
+                ]
+                params = [like_any, like_any]
+                if not show_hidden:
+                    query_parts.append("AND is_hidden = 0")
+                    query_parts.append(f"AND {_hidden_category_clause()}")
+                query_parts.append("GROUP BY category_id, parent_path")
+
+            # Prefer exact/prefix path matches, then stable alphabetical ordering.
+            query_parts.append(
+                """
+                ORDER BY
+                    CASE
+                        WHEN parent_path = ? THEN 0
+                        WHEN parent_path LIKE ? THEN 1
+                        ELSE 2
+                    END,
+                    parent_path COLLATE NOCASE ASC
+                LIMIT ?
+                """
+            )
+            normalized_term = query_term.replace('\\', '/').strip('/')
+            params.extend([normalized_term, f"{normalized_term}/%", safe_limit])
+            if safe_offset > 0:
+                query_parts.append("OFFSET ?")
+                params.append(safe_offset)
+
+            query = " ".join(query_parts)
             cursor = conn.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
     except Exception as e:
@@ -1183,33 +1817,53 @@ def search_media_category_ids(search_query, limit=5000, show_hidden=False, offse
         safe_offset = max(0, int(offset or 0))
         like_any = f"%{query_term}%"
 
-        query_parts = [
-            """
-            SELECT
-                category_id,
-                COUNT(*) AS file_count,
-                MAX(mtime) AS last_mtime
-            FROM media_index
-            WHERE category_id LIKE ?
-            """
-        ]
-        params = [like_any]
-
-        if not show_hidden:
-            query_parts.append("AND is_hidden = 0")
-            query_parts.append(f"AND {_hidden_category_clause()}")
-
-        query_parts.append("GROUP BY category_id")
-        query_parts.append("ORDER BY last_mtime DESC")
-        query_parts.append("LIMIT ?")
-        params.append(safe_limit)
-        if safe_offset > 0:
-            query_parts.append("OFFSET ?")
-            params.append(safe_offset)
-
-        query = " ".join(query_parts)
-
         with get_db() as conn:
+            match_expr = None
+            if _media_search_index_available(conn):
+                match_expr = _media_search_match_expression(query_term, ('category_id',))
+
+            if match_expr:
+                query_parts = [
+                    """
+                    SELECT
+                        m.category_id,
+                        COUNT(*) AS file_count,
+                        MAX(m.mtime) AS last_mtime
+                    FROM media_index_fts
+                    JOIN media_index m ON m.rowid = media_index_fts.rowid
+                    WHERE media_index_fts MATCH ?
+                    """
+                ]
+                params = [match_expr]
+                if not show_hidden:
+                    query_parts.append("AND m.is_hidden = 0")
+                    query_parts.append(f"AND {_hidden_category_clause('m.category_id')}")
+                query_parts.append("GROUP BY m.category_id")
+            else:
+                query_parts = [
+                    """
+                    SELECT
+                        category_id,
+                        COUNT(*) AS file_count,
+                        MAX(mtime) AS last_mtime
+                    FROM media_index
+                    WHERE category_id LIKE ?
+                    """
+                ]
+                params = [like_any]
+                if not show_hidden:
+                    query_parts.append("AND is_hidden = 0")
+                    query_parts.append(f"AND {_hidden_category_clause()}")
+                query_parts.append("GROUP BY category_id")
+
+            query_parts.append("ORDER BY last_mtime DESC")
+            query_parts.append("LIMIT ?")
+            params.append(safe_limit)
+            if safe_offset > 0:
+                query_parts.append("OFFSET ?")
+                params.append(safe_offset)
+
+            query = " ".join(query_parts)
             cursor = conn.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
     except Exception as e:
@@ -1695,20 +2349,23 @@ def get_category_version_hash(category_id):
     except Exception:
         return None
 
+def _write_category_version_hash(conn, category_id, version_hash):
+    cursor = conn.execute(
+        "UPDATE categories SET version_hash = ? WHERE id = ?",
+        (version_hash, category_id)
+    )
+    if cursor.rowcount == 0:
+        conn.execute(
+            "INSERT OR REPLACE INTO schema_info (key, value) VALUES (?, ?)",
+            (f"category_version_hash:{category_id}", version_hash)
+        )
+
+
 def update_category_version_hash(category_id, version_hash):
     """Update the version hash for a category in SQLite."""
     try:
-        with get_db() as conn:
-            cursor = conn.execute(
-                "UPDATE categories SET version_hash = ? WHERE id = ?",
-                (version_hash, category_id)
-            )
-            if cursor.rowcount == 0:
-                conn.execute(
-                    "INSERT OR REPLACE INTO schema_info (key, value) VALUES (?, ?)",
-                    (f"category_version_hash:{category_id}", version_hash)
-                )
-            return True
+        run_write(_write_category_version_hash, category_id, version_hash)
+        return True
     except Exception as e:
         logger.error(f"Error updating version_hash for {category_id}: {e}")
         return False
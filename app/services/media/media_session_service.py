@@ -4,6 +4,7 @@ import hashlib
 import logging
 import random
 import time
+from array import array
 
 import gevent
 
@@ -169,15 +170,19 @@ def determine_file_order(
             raw_order = session_data.get("order") or []
             raw_seen = session_data.get("seen") or set()
 
-            normalized_order = []
-            for entry in raw_order:
-                if isinstance(entry, int):
-                    if 0 <= entry < total_files_in_directory:
-                        normalized_order.append(entry)
-                elif isinstance(entry, str):
-                    idx = filename_to_index.get(entry)
-                    if idx is not None:
-                        normalized_order.append(idx)
+            if isinstance(raw_order, array):
+                # Compact orders are index permutations for the current basis.
+                normalized_order = raw_order
+            else:
+                normalized_order = array('I')
+                for entry in raw_order:
+                    if isinstance(entry, int):
+                        if 0 <= entry < total_files_in_directory:
+                            normalized_order.append(entry)
+                    elif isinstance(entry, str):
+                        idx = filename_to_index.get(entry)
+                        if idx is not None:
+                            normalized_order.append(idx)
 
             normalized_seen = set()
             for entry in raw_seen:
@@ -216,7 +221,7 @@ def determine_file_order(
                     )
                     seen_indices_from_session.clear()
 
-                order_indices = list(range(total_files_in_directory))
+                order_indices = array('I', range(total_files_in_directory))
                 random.shuffle(order_indices)
                 session_data["order"] = order_indices
                 session_data["order_basis_hash"] = order_basis_hash
@@ -0,0 +1,349 @@
+"""Specter-owned inotify watcher that applies filesystem deltas to media_index."""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import socket
+import struct
+import sys
+import traceback
+
+from gevent.socket import wait_read
+
+from specter import Service, registry
+from app.services.media import media_index_service
+from app.services.media.indexing_processor import EXCLUDED_DIR_NAMES
+from app.utils.cache_utils import invalidate_cached_path
+from app.utils.hash_utils import generate_file_hash
+from app.utils.media_utils import get_media_type, is_media_file
+
+logger = logging.getLogger(__name__)
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+)
+MAX_WATCHES = 8192
+DEBOUNCE_SECONDS = 1.0
+READ_POLL_SECONDS = 1.0
+READ_BUFFER_SIZE = 64 * 1024
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_inotify():
+    """Return libc with inotify bound, or None when the platform lacks it."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class MediaWatchService(Service):
+    """Apply add/remove/rename events from indexed directories without a rescan.
+
+    Watches are registered for the directories the indexer just walked. File
+    events are debounced per category and written to media_index directly;
+    new directories queue an incremental reindex so they get listed (and
+    watched) too. When inotify is unavailable or the kernel queue overflows,
+    the periodic library scan covers the gap.
+    """
+
+    def __init__(self):
+        super().__init__('media_watch', {
+            'available': False,
+            'watches': 0,
+            'categories': 0,
+            'events': 0,
+            'files_updated': 0,
+            'files_removed': 0,
+            'overflows': 0,
+        })
+        self._libc = None
+        self._fd = None
+        self._watches = {}
+        self._category_watches = {}
+        self._pending = {}
+        self._flush_timer = None
+        self._watch_limit_logged = False
+
+    def on_start(self):
+        """Open the inotify descriptor and start the event reader."""
+        self._libc = _load_inotify()
+        if self._libc is None:
+            logger.info("inotify unavailable; media changes are picked up by library scans")
+            return
+
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            logger.warning(
+                "inotify_init1 failed: %s",
+                os.strerror(ctypes.get_errno()),
+            )
+            return
+
+        self._fd = fd
+        self.set_state({'available': True})
+        self.spawn(self._watch_loop, label='media-watch')
+
+    def on_stop(self):
+        """Close the inotify descriptor and drop all watches."""
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._watches.clear()
+        self._category_watches.clear()
+        self._pending.clear()
+        self._flush_timer = None
+        self.set_state({'available': False, 'watches': 0, 'categories': 0})
+
+    def watch_category(self, category_id, category_path, category_name, rel_dirs):
+        """Replace the watch set for a category with the given directories."""
+        if self._fd is None or not category_id or not category_path:
+            return False
+
+        self.unwatch_category(category_id)
+        target = (category_id, category_path, category_name)
+        wds = set()
+        for rel_dir in rel_dirs or ('',):
+            if len(self._watches) >= MAX_WATCHES:
+                if not self._watch_limit_logged:
+                    logger.warning(
+                        "Media watch limit (%s) reached; remaining directories rely on library scans",
+                        MAX_WATCHES,
+                    )
+                    self._watch_limit_logged = True
+                break
+
+            full_dir = os.path.join(category_path, rel_dir) if rel_dir else category_path
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(full_dir), WATCH_MASK)
+            if wd < 0:
+                continue
+            self._watches.setdefault(wd, {})[category_id] = (target, rel_dir)
+            wds.add(wd)
+
+        self._category_watches[category_id] = wds
+        self._publish_counts()
+        return bool(wds)
+
+    def unwatch_category(self, category_id):
+        """Stop watching every directory registered for a category."""
+        for wd in self._category_watches.pop(category_id, ()):
+            targets = self._watches.get(wd)
+            if targets is None:
+                continue
+            targets.pop(category_id, None)
+            if not targets:
+                del self._watches[wd]
+                if self._fd is not None:
+                    self._libc.inotify_rm_watch(self._fd, wd)
+        self._pending.pop(category_id, None)
+        self._publish_counts()
+
+    def _publish_counts(self):
+        self.set_state({
+            'watches': len(self._watches),
+            'categories': len(self._category_watches),
+        })
+
+    def _watch_loop(self):
+        while self.running and self._fd is not None:
+            fd = self._fd
+            try:
+                wait_read(fd, timeout=READ_POLL_SECONDS, timeout_exc=socket.timeout)
+                data = os.read(fd, READ_BUFFER_SIZE)
+            except (socket.timeout, BlockingIOError):
+                continue
+            except OSError as exc:
+                if self._fd is not None:
+                    logger.warning("Media watch read failed: %s", exc)
+                break
+
+            offset = 0
+            events = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                start = offset + _EVENT_HEADER.size
+                name = os.fsdecode(data[start:start + length].rstrip(b'\0'))
+                offset = start + length
+                self._handle_event(wd, mask, name)
+                events += 1
+
+            self.set_state({'events': self.get_state()['events'] + events})
+            if self._pending and self._flush_timer is None:
+                self._flush_timer = self.timeout(self._flush_pending, DEBOUNCE_SECONDS)
+
+    def _handle_event(self, wd, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            self.set_state({'overflows': self.get_state()['overflows'] + 1})
+            for targets in self._watches.values():
+                for target, _rel_dir in targets.values():
+                    self._pending_for(target)['rescan'] = True
+            return
+
+        if mask & IN_IGNORED:
+            for category_id in self._watches.pop(wd, {}):
+                self._category_watches.get(category_id, set()).discard(wd)
+            self._publish_counts()
+            return
+
+        if not name:
+            return
+
+        for target, rel_dir in list(self._watches.get(wd, {}).values()):
+            rel_path = f"{rel_dir}/{name}" if rel_dir else name
+            pending = self._pending_for(target)
+            if mask & IN_ISDIR:
+                if name.lower() in EXCLUDED_DIR_NAMES:
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    pending['rescan'] = True
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    pending['removed_dirs'].add(rel_path)
+                continue
+
+            # Mirror the indexer: only auto:: (root-only) scans skip dotfiles.
+            if not is_media_file(name) or (
+                name.startswith('.') and str(target[0]).startswith('auto::')
+            ):
+                continue
+            if mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                pending['upserts'].add(rel_path)
+                pending['deletes'].discard(rel_path)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                pending['deletes'].add(rel_path)
+                pending['upserts'].discard(rel_path)
+
+    def _pending_for(self, target):
+        category_id = target[0]
+        pending = self._pending.get(category_id)
+        if pending is None:
+            pending = {
+                'target': target,
+                'upserts': set(),
+                'deletes': set(),
+                'removed_dirs': set(),
+                'rescan': False,
+            }
+            self._pending[category_id] = pending
+        return pending
+
+    def _flush_pending(self):
+        self._flush_timer = None
+        pending, self._pending = self._pending, {}
+        for delta in pending.values():
+            try:
+                self._apply_delta(delta)
+            except Exception as exc:
+                logger.error("Failed to apply media watch delta: %s", exc)
+                logger.debug(traceback.format_exc())
+
+    def _apply_delta(self, delta):
+        category_id, category_path, category_name = delta['target']
+        deletes = set(delta['deletes'])
+        stale_verifier = registry.resolve('stale_media_cleanup_runtime')
+        if stale_verifier is not None and delta['upserts']:
+            stale_verifier.invalidate_directories({
+                os.path.dirname(os.path.join(category_path, rel_path))
+                for rel_path in delta['upserts']
+            })
+        entries = []
+        for rel_path in sorted(delta['upserts']):
+            try:
+                stats = os.stat(os.path.join(category_path, rel_path))
+            except OSError:
+                deletes.add(rel_path)
+                continue
+            entries.append({
+                'name': rel_path,
+                'size': stats.st_size,
+                'mtime': stats.st_mtime,
+                'type': get_media_type(rel_path),
+                'hash': generate_file_hash(rel_path, stats.st_size, stats.st_mtime),
+            })
+
+        updated = 0
+        if entries:
+            ok, updated = media_index_service.batch_upsert_media_index_entries(
+                category_id,
+                category_path,
+                entries,
+            )
+            if not ok:
+                delta['rescan'] = True
+                updated = 0
+
+        for rel_path in delta['upserts'] | deletes:
+            invalidate_cached_path(os.path.join(category_path, rel_path))
+
+        removed = media_index_service.delete_media_index_entries_batch(
+            [(category_id, rel_path) for rel_path in deletes]
+        )
+        for rel_dir in delta['removed_dirs']:
+            removed += media_index_service.delete_media_index_under_directory(
+                category_id,
+                rel_dir,
+            )
+
+        if updated or removed:
+            state = self.get_state()
+            self.set_state({
+                'files_updated': state['files_updated'] + updated,
+                'files_removed': state['files_removed'] + removed,
+            })
+            media_index_service.refresh_directory_scan_count(category_id)
+            media_index_service.bump_category_version_hash(category_id)
+            registry.require('library_events').emit_category_updated({
+                'category_id': category_id,
+                'category_name': category_name,
+                'reason': 'filesystem_change',
+            })
+
+        if entries and updated:
+            self._queue_thumbnails(category_id, category_path, entries)
+
+        if delta['rescan']:
+            indexing = registry.resolve('indexing_runtime')
+            if indexing is not None:
+                indexing.start_async_indexing(category_id, category_path, category_name)
+
+    @staticmethod
+    def _queue_thumbnails(category_id, category_path, entries):
+        try:
+            from app.services.media.thumbnail_processing_service import (
+                process_category_thumbnails_smart,
+            )
+
+            process_category_thumbnails_smart(
+                category_path,
+                [],
+                category_id,
+                False,
+                files_to_process=[
+                    {'name': e['name'], 'type': e['type'], 'size': e['size'], 'mtime': e['mtime']}
+                    for e in entries
+                ],
+            )
+        except Exception as exc:
+            logger.warning("Thumbnail queueing failed for watched changes in %s: %s", category_id, exc)
@@ -0,0 +1,163 @@
+"""Specter-owned write-behind buffer for video progress saves."""
+
+import logging
+
+import gevent
+
+from specter import Service
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_FLUSH_INTERVAL = 15
+PROGRESS_BUFFER_MAX_ENTRIES = 500
+
+
+class ProgressWriteBehindService(Service):
+    """Coalesce playback progress ticks and flush them in one transaction.
+
+    Only the latest row per (profile_id, video_path) is kept, so a viewer
+    reporting every few seconds costs one write per flush interval instead
+    of one WAL commit per tick. Rows are the ``video_progress`` column tuple
+    used by ``video_progress_service._write_progress_row``.
+    """
+
+    def __init__(self):
+        super().__init__('progress_write_behind', {
+            'pending': 0,
+            'buffered': 0,
+            'coalesced': 0,
+            'flushes': 0,
+            'flushed_rows': 0,
+            'failed_flushes': 0,
+        })
+        self._pending = {}
+        self._inflight = {}
+        self._loop_active = False
+
+    def on_start(self):
+        """Start the periodic flush loop."""
+        self.spawn(self._flush_loop, label='progress_write_behind')
+
+    def on_stop(self):
+        """Flush buffered progress so shutdown does not lose positions."""
+        self._loop_active = False
+        self.flush()
+
+    def accepts_writes(self):
+        """Return True when saves can be deferred to the flush loop."""
+        return self.running and self._loop_active
+
+    def buffer(self, row):
+        """Buffer the latest progress row for its (profile, video) pair."""
+        key = (row[1], row[0])
+        if key in self._pending:
+            self.set_state({'coalesced': self.state.get('coalesced', 0) + 1})
+        self._pending[key] = row
+        self.set_state({
+            'pending': len(self._pending),
+            'buffered': self.state.get('buffered', 0) + 1,
+        })
+        if len(self._pending) >= PROGRESS_BUFFER_MAX_ENTRIES:
+            self.flush()
+
+    def flush(self, key=None):
+        """Write buffered rows (or just ``key``) to SQLite in one transaction."""
+        from app.services.core.sqlite_runtime_service import run_write
+        from app.services.media.video_progress_service import _write_progress_rows
+
+        if key is not None:
+            row = self._pending.pop(key, None)
+            batch = {key: row} if row is not None else {}
+        else:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+
+        self._inflight.update(batch)
+
+        def _live_rows():
+            # discard() drops rows from _inflight, so a delete or direct save
+            # that ran after this batch was queued is never undone by it.
+            return [
+                (batch_key, row)
+                for batch_key, row in batch.items()
+                if self._inflight.get(batch_key) is row
+            ]
+
+        def _write_batch(conn):
+            return _write_progress_rows(conn, [row for _, row in _live_rows()])
+
+        try:
+            written = run_write(_write_batch)
+        except Exception as exc:
+            # Requeue rows that were neither superseded nor discarded.
+            for batch_key, row in _live_rows():
+                self._pending.setdefault(batch_key, row)
+            self.set_state({
+                'pending': len(self._pending),
+                'failed_flushes': self.state.get('failed_flushes', 0) + 1,
+            })
+            logger.error("Failed to flush %s buffered progress rows: %s", len(batch), exc)
+            return 0
+        finally:
+            for batch_key, row in batch.items():
+                if self._inflight.get(batch_key) is row:
+                    del self._inflight[batch_key]
+
+        self.set_state({
+            'pending': len(self._pending),
+            'flushes': self.state.get('flushes', 0) + 1,
+            'flushed_rows': self.state.get('flushed_rows', 0) + written,
+        })
+        logger.debug("Flushed %s buffered progress rows", written)
+        return written
+
+    def get_row(self, profile_id, video_path):
+        """Return the buffered row for a (profile, video) pair, if any."""
+        key = (str(profile_id), str(video_path))
+        return self._pending.get(key) or self._inflight.get(key)
+
+    def rows_for_profile(self, profile_id):
+        """Return all buffered rows for a profile."""
+        profile_id = str(profile_id)
+        rows = dict(self._inflight)
+        rows.update(self._pending)
+        return [row for (row_profile, _), row in rows.items() if row_profile == profile_id]
+
+    def discard(self, video_path=None, profile_id=None):
+        """Drop buffered rows for a video and/or profile (None matches any).
+
+        Returns the number of rows discarded.
+        """
+        def _matches(key):
+            row_profile, row_path = key
+            return (
+                (video_path is None or row_path == str(video_path)) and
+                (profile_id is None or row_profile == str(profile_id))
+            )
+
+        discarded = 0
+        for rows in (self._pending, self._inflight):
+            for key in [key for key in rows if _matches(key)]:
+                del rows[key]
+                discarded += 1
+        if discarded:
+            self.set_state({'pending': len(self._pending)})
+        return discarded
+
+    def rename(self, old_path, new_path):
+        """Move buffered rows to a renamed video's path."""
+        old_path = str(old_path)
+        for key in [key for key in self._pending if key[1] == old_path]:
+            row = self._pending.pop(key)
+            self._pending[(key[0], str(new_path))] = (str(new_path),) + row[1:]
+
+    def _flush_loop(self):
+        self._loop_active = True
+        try:
+            while self.running:
+                gevent.sleep(PROGRESS_FLUSH_INTERVAL)
+                if self._pending:
+                    self.flush()
+        finally:
+            self._loop_active = False
@@ -1,20 +1,18 @@
 import logging
 import os
 import re
-import time
 import hashlib
 import random
 from app.services.core.runtime_config_service import get_runtime_config_value
 from app.services.media import media_index_service
 from app.services.media.hidden_content_service import should_block_category_access
-from app.services.media.sort_runtime_store import sort_runtime_store
 from app.utils.media_utils import get_thumbnail_url, IMAGE_THUMBNAIL_MIN_SIZE
+from specter import registry
 from urllib.parse import quote
 
 logger = logging.getLogger(__name__)
 
 SHUFFLE_FETCH_BATCH_SIZE = 5000
-MAX_SHARED_SHUFFLE_CACHE_ENTRIES = 256
 _RE_TV_TAG = re.compile(r"\b(tv|anime|series)\b", re.IGNORECASE)
 _RE_TV_COMPOSITE = re.compile(
     r"\b(tv|television)\s*(show|shows|series)\b", re.IGNORECASE
@@ -29,16 +27,6 @@ _RE_S_ONLY = re.compile(r"\bs(?:eason)?\s*(\d{1,2})\b", re.IGNORECASE)
 _RE_LEADING_NUM = re.compile(r"^\s*(\d{1,3})\b")
 
 
-def _sort_runtime_access(reader):
-    """Read sort runtime state atomically."""
-    return sort_runtime_store.access(reader)
-
-
-def _update_sort_runtime(mutator):
-    """Mutate sort runtime state atomically."""
-    return sort_runtime_store.update(mutator)
-
-
 class SortService:
     """Service for handling backend-side sorting and pagination using SQLite index."""
 
@@ -55,8 +43,14 @@ class SortService:
     def _fetch_all_items(
         category_id, subfolder, filter_type, show_hidden, columns=None
     ):
+        # Seek columns are always needed to continue from the last batch row.
+        if columns is not None:
+            columns = list(columns) + [
+                column for column in ("name", "id") if column not in columns
+            ]
+
         rows = []
-        offset = 0
+        after = None
         while True:
             batch = media_index_service.get_paginated_media(
                 category_id=category_id,
@@ -64,101 +58,70 @@ class SortService:
                 sort_by="name",
                 sort_order="ASC",
                 limit=SHUFFLE_FETCH_BATCH_SIZE,
-                offset=offset,
+                offset=0,
                 filter_type=filter_type,
                 show_hidden=show_hidden,
                 deduplicate_by_hash=False,
                 columns=columns,
+                after=after,
             )
             if not batch:
                 break
             rows.extend(batch)
             if len(batch) < SHUFFLE_FETCH_BATCH_SIZE:
                 break
-            offset += SHUFFLE_FETCH_BATCH_SIZE
+            after = {"key": batch[-1]["name"], "id": batch[-1]["id"]}
         return rows
 
     @staticmethod
-    def _paginate_items(items, page, limit):
+    def _paginate_items(items, page, limit, start=None):
         total = len(items)
-        start_idx = (page - 1) * limit
+        start_idx = (page - 1) * limit if start is None else max(0, int(start))
         end_idx = min(start_idx + limit, total)
         return items[start_idx:end_idx] if start_idx < total else []
 
+    @staticmethod
+    def _shuffle_scope(subfolder):
+        """Normalize the subfolder component of a shuffle-order key."""
+        if subfolder is None:
+            # No subfolder filter spans the whole category, like '__all__'.
+            return "__all__"
+        return str(subfolder).replace("\\", "/").strip("/")
+
     @staticmethod
     def _build_shared_shuffle_order(
-        category_id, subfolder, filter_type, show_hidden, all_items
+        category_id, subfolder, filter_type, show_hidden, basis
     ):
         """
-        Build/reuse a shared shuffled filename order for all clients.
-        Order only changes when the underlying file basis changes.
+        Build the shared shuffled rowid order for all clients and persist it.
+        The seed derives from the scope and its rowid basis, so the order
+        only changes when the underlying file basis changes.
         """
-        filenames = sorted(
-            [item.get("rel_path") for item in all_items if item.get("rel_path")],
-            key=lambda value: value.lower(),
+        rowids = media_index_service.get_media_rowids(
+            category_id, subfolder, filter_type=filter_type, show_hidden=show_hidden
         )
-        if not filenames:
-            return []
+        if not rowids:
+            return rowids
 
-        basis_hasher = hashlib.sha1()
-        for name in filenames:
-            basis_hasher.update(name.encode("utf-8", errors="ignore"))
-            basis_hasher.update(b"\0")
-        basis_hash = basis_hasher.hexdigest()
+        scope = SortService._shuffle_scope(subfolder)
+        seed_input = (
+            f"{category_id}|{scope}|{filter_type}|{int(bool(show_hidden))}|{basis}"
+        )
+        seed = int(
+            hashlib.sha1(seed_input.encode("utf-8", errors="ignore")).hexdigest()[:16],
+            16,
+        )
+        random.Random(seed).shuffle(rowids)
 
-        cache_key = (
+        media_index_service.save_shuffle_order(
+            category_id, scope, filter_type, show_hidden, basis, rowids
+        )
+        logger.debug(
+            "Built shuffle order (%s files) for category %s",
+            len(rowids),
             category_id,
-            (subfolder or "").strip("/"),
-            filter_type,
-            int(bool(show_hidden)),
         )
-        order_result = {}
-
-        def mutate(state):
-            shared_shuffle_cache = dict(state.get("shared_shuffle_cache", {}))
-            cached = shared_shuffle_cache.get(cache_key)
-            now = time.time()
-
-            if cached and cached.get("basis_hash") == basis_hash:
-                updated_cached = dict(cached)
-                updated_cached["last_access"] = now
-                shared_shuffle_cache[cache_key] = updated_cached
-                state["shared_shuffle_cache"] = shared_shuffle_cache
-                order_result["order"] = list(updated_cached.get("order") or [])
-                return
-
-            seed_input = (
-                f"{category_id}|{cache_key[1]}|{filter_type}|"
-                f"{int(bool(show_hidden))}|{basis_hash}"
-            )
-            seed = int(
-                hashlib.sha1(seed_input.encode("utf-8", errors="ignore")).hexdigest()[
-                    :16
-                ],
-                16,
-            )
-            rng = random.Random(seed)
-            order = list(filenames)
-            rng.shuffle(order)
-
-            shared_shuffle_cache[cache_key] = {
-                "basis_hash": basis_hash,
-                "order": list(order),
-                "last_access": now,
-            }
-
-            if len(shared_shuffle_cache) > MAX_SHARED_SHUFFLE_CACHE_ENTRIES:
-                oldest_key = min(
-                    shared_shuffle_cache.items(),
-                    key=lambda entry: entry[1].get("last_access", 0),
-                )[0]
-                shared_shuffle_cache.pop(oldest_key, None)
-
-            state["shared_shuffle_cache"] = shared_shuffle_cache
-            order_result["order"] = list(order)
-
-        _update_sort_runtime(mutate)
-        return order_result["order"]
+        return rowids
 
     @staticmethod
     def _sort_shuffle(
@@ -170,36 +133,55 @@ class SortService:
         force_refresh,
         page,
         limit,
+        start=None,
     ):
-        # Optimization: only fetch required columns for shuffle filenames order.
-        # Full metadata for the current page is fetched later.
-        all_items = SortService._fetch_all_items(
-            category_id=category_id,
-            subfolder=subfolder,
-            filter_type=filter_type,
-            show_hidden=show_hidden,
-            columns=["rel_path"],
+        # Orders are array('I') permutations of media_index rowids stored in
+        # SQLite; a page is a byte slice of that blob joined back to the index.
+        basis = media_index_service.get_media_rowid_basis(
+            category_id, subfolder, filter_type=filter_type, show_hidden=show_hidden
         )
+        if not basis:
+            return []
 
-        if not all_items:
+        start_idx = (page - 1) * limit if start is None else max(0, int(start))
+        page_rowids = media_index_service.get_shuffle_order_slice(
+            category_id,
+            SortService._shuffle_scope(subfolder),
+            filter_type,
+            show_hidden,
+            basis,
+            start_idx,
+            limit,
+        )
+        if page_rowids is None:
+            order = SortService._build_shared_shuffle_order(
+                category_id=category_id,
+                subfolder=subfolder,
+                filter_type=filter_type,
+                show_hidden=show_hidden,
+                basis=basis,
+            )
+            page_rowids = order[start_idx:start_idx + limit]
+        if not page_rowids:
             return []
 
-        shuffled_filenames = SortService._build_shared_shuffle_order(
+        rows_by_rowid = media_index_service.get_media_rows_by_rowids(
+            page_rowids,
             category_id=category_id,
             subfolder=subfolder,
             filter_type=filter_type,
             show_hidden=show_hidden,
-            all_items=all_items,
         )
-        paginated_filenames = SortService._paginate_items(
-            shuffled_filenames, page, limit
+        filenames = []
+        rows_by_rel_path = {}
+        for rowid in page_rowids:
+            row = rows_by_rowid.get(rowid)
+            if row and row.get("rel_path"):
+                filenames.append(row["rel_path"])
+                rows_by_rel_path[row["rel_path"]] = row
+        return SortService._enrich_items_by_filenames(
+            category_id, filenames, rows_by_rel_path
         )
-        if not paginated_filenames:
-            return []
-
-        # all_items may contain only rel_path (for performance), so load
-        # complete metadata for just the page slice before enrichment.
-        return SortService.get_media_by_filenames(category_id, paginated_filenames)
 
     @staticmethod
     def _sort_tv(
@@ -211,6 +193,7 @@ class SortService:
         page,
         limit,
         force_refresh=False,
+        start=None,
     ):
         # TV sort needs rel_path, category_id, and all metadata columns for enrichment.
         all_items = SortService._fetch_all_items(
@@ -226,7 +209,9 @@ class SortService:
         if str(sort_order).upper() == "DESC":
             sorted_items.reverse()
 
-        paged_items = SortService._paginate_items(sorted_items, page, limit)
+        paged_items = SortService._paginate_items(
+            sorted_items, page, limit, start=start
+        )
         return SortService._enrich_items(paged_items, check_exists=force_refresh)
 
     @staticmethod
@@ -240,21 +225,52 @@ class SortService:
         filter_type,
         show_hidden,
         force_refresh=False,
+        cursor=None,
     ):
-        offset = (page - 1) * limit
+        """
+        Return (items, next_cursor) for SQL-sorted listings.
+
+        Category listings seek on (sort key, id) when given a keyset cursor;
+        the deduplicated cross-category listing can only page by offset.
+        """
         dedup = category_id is None
-        items = media_index_service.get_paginated_media(
+        sort_col = media_index_service.MEDIA_CURSOR_SORT_COLUMNS.get(sort_by, "name")
+        offset = (page - 1) * limit
+        after = None
+        if cursor:
+            if "offset" in cursor:
+                offset = cursor["offset"]
+            elif dedup:
+                raise ValueError("Keyset cursors are not supported for cross-category listings")
+            else:
+                after = cursor
+
+        rows = media_index_service.get_paginated_media(
             category_id=category_id,
             subfolder=subfolder,
-            sort_by=sort_by,
+            sort_by=sort_col,
             sort_order=sort_order,
-            limit=limit,
+            limit=limit + 1,
             offset=offset,
             filter_type=filter_type,
             show_hidden=show_hidden,
             deduplicate_by_hash=dedup,
+            after=after,
         )
-        return SortService._enrich_items(items, check_exists=force_refresh)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            if dedup:
+                next_cursor = media_index_service.encode_media_cursor(
+                    sort_col, sort_order, offset=offset + limit
+                )
+            else:
+                next_cursor = media_index_service.encode_media_cursor(
+                    sort_col, sort_order, row=rows[-1]
+                )
+
+        return SortService._enrich_items(rows, check_exists=force_refresh), next_cursor
 
     @staticmethod
     def _is_tv_sort_enabled(sort_by):
@@ -361,9 +377,18 @@ class SortService:
 
     @staticmethod
     def _enrich_items(items, check_exists=True):
+        """
+        Build API media payloads for index rows.
+
+        With check_exists, existence is verified in the background by the
+        stale media cleanup runtime (one scandir per parent directory);
+        rows its cached listings already show as missing are dropped here.
+        """
         enriched_items = []
-        stale_entries = []
-        category_path_cache = {}
+        verify_entries = []
+        verifier = (
+            registry.resolve("stale_media_cleanup_runtime") if check_exists else None
+        )
 
         for item in items:
             cat_id = item.get("category_id")
@@ -376,26 +401,11 @@ class SortService:
 
             rel_path = str(rel_path)
 
-            if check_exists:
-                if cat_id not in category_path_cache:
-                    from app.services.media.category_query_service import get_category_by_id
-
-                    cat = get_category_by_id(cat_id)
-                    category_path_cache[cat_id] = cat.get("path") if cat else None
-
-                cat_path = category_path_cache[cat_id]
-                if not cat_path:
-                    stale_entries.append((cat_id, rel_path))
-                    logger.debug(
-                        f"Skipping media from unmounted/missing category: {cat_id}/{rel_path}"
-                    )
-                    continue
-
-                full_path = os.path.join(cat_path, rel_path)
-                if not os.path.exists(full_path):
-                    stale_entries.append((cat_id, rel_path))
-                    logger.debug(f"Skipping stale media entry: {full_path}")
+            if verifier is not None:
+                if verifier.is_known_missing(cat_id, rel_path):
+                    logger.debug(f"Skipping stale media entry: {cat_id}/{rel_path}")
                     continue
+                verify_entries.append((cat_id, rel_path))
 
             enriched = {
                 "name": rel_path,
@@ -420,18 +430,11 @@ class SortService:
 
             enriched_items.append(enriched)
 
-        if stale_entries:
-            logger.warning(
-                f"FOUND {len(stale_entries)} STALE MEDIA ENTRIES - CLEANING UP"
-            )
+        if verify_entries:
             try:
-                for cat_id, rel_path in stale_entries:
-                    media_index_service.delete_media_index_entry(cat_id, rel_path)
-                logger.info(
-                    f"Cleaned up {len(stale_entries)} stale media entries from SortService"
-                )
+                verifier.queue_verification(verify_entries)
             except Exception as e:
-                logger.debug(f"Failed to cleanup stale entries: {e}")
+                logger.debug(f"Failed to queue stale media verification: {e}")
 
         return enriched_items
 
@@ -448,13 +451,57 @@ class SortService:
         session_id=None,
         force_refresh=False,
         shuffle=None,
+        cursor=None,
     ):
         """
         Get a sorted and paginated slice of media from the index.
         Seamlessly handles 'shuffle' as a sorting method using session-persistent orders.
         """
+        items, _next_cursor = SortService.get_sorted_media_page(
+            category_id=category_id,
+            subfolder=subfolder,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            page=page,
+            limit=limit,
+            filter_type=filter_type,
+            show_hidden=show_hidden,
+            session_id=session_id,
+            force_refresh=force_refresh,
+            shuffle=shuffle,
+            cursor=cursor,
+        )
+        return items
+
+    @staticmethod
+    def get_sorted_media_page(
+        category_id=None,
+        subfolder=None,
+        sort_by="name",
+        sort_order="ASC",
+        page=1,
+        limit=50,
+        filter_type="all",
+        show_hidden=False,
+        session_id=None,
+        force_refresh=False,
+        shuffle=None,
+        cursor=None,
+    ):
+        """
+        Get a sorted page of media plus an opaque cursor for the next page.
+
+        `cursor` is a token from a previous call; when given it takes the place
+        of `page`. Returns (items, next_cursor) with next_cursor None on the
+        last page.
+
+        Raises:
+            ValueError: If the cursor is malformed or was issued for a different sort.
+        """
         from app.services.media import media_catalog_service
 
+        position = media_index_service.decode_media_cursor(cursor) if cursor else None
+
         # Ensure category is indexed if it hasn't been already
         if category_id:
             media_catalog_service.ensure_category_indexed(category_id, force_refresh)
@@ -485,7 +532,8 @@ class SortService:
 
         # 1. Handle Shuffle Mode
         if sort_by == "shuffle" and category_id and session_id:
-            return SortService._sort_shuffle(
+            start = SortService._cursor_start(position, "shuffle", sort_order)
+            items = SortService._sort_shuffle(
                 category_id=category_id,
                 subfolder=subfolder,
                 filter_type=filter_type,
@@ -493,7 +541,11 @@ class SortService:
                 session_id=session_id,
                 force_refresh=force_refresh,
                 page=page,
-                limit=limit,
+                limit=limit + 1,
+                start=start if start is not None else (page - 1) * limit,
+            )
+            return SortService._offset_page(
+                items, "shuffle", sort_order, start, page, limit
             )
 
         # 2. TV Sorting (season/episode aware)
@@ -504,18 +556,24 @@ class SortService:
         )
 
         if tv_sort_active and category_id:
-            return SortService._sort_tv(
+            start = SortService._cursor_start(position, "tv", sort_order)
+            items = SortService._sort_tv(
                 category_id=category_id,
                 subfolder=subfolder,
                 filter_type=filter_type,
                 show_hidden=show_hidden,
                 sort_order=sort_order,
                 page=page,
-                limit=limit,
+                limit=limit + 1,
                 force_refresh=force_refresh,
+                start=start if start is not None else (page - 1) * limit,
             )
+            return SortService._offset_page(items, "tv", sort_order, start, page, limit)
 
         # 3. Standard Sorted Mode (Pure SQLite)
+        if position is not None:
+            sort_col = media_index_service.MEDIA_CURSOR_SORT_COLUMNS.get(sort_by, "name")
+            SortService._check_cursor_sort(position, sort_col, sort_order)
         return SortService._sort_standard(
             category_id=category_id,
             subfolder=subfolder,
@@ -526,8 +584,37 @@ class SortService:
             filter_type=filter_type,
             show_hidden=show_hidden,
             force_refresh=force_refresh,
+            cursor=position,
         )
 
+    @staticmethod
+    def _check_cursor_sort(position, sort_key, sort_order):
+        expected_dir = "DESC" if str(sort_order).upper() == "DESC" else "ASC"
+        if position.get("sort_by") != sort_key or position.get("sort_order") != expected_dir:
+            raise ValueError("Media cursor was issued for a different sort order")
+
+    @staticmethod
+    def _cursor_start(position, sort_key, sort_order):
+        """Return the offset carried by an in-memory-order cursor, if any."""
+        if position is None:
+            return None
+        SortService._check_cursor_sort(position, sort_key, sort_order)
+        if "offset" not in position:
+            raise ValueError("Media cursor does not carry an offset")
+        return position["offset"]
+
+    @staticmethod
+    def _offset_page(items, sort_key, sort_order, start, page, limit):
+        """Trim an over-fetched in-memory page and build its offset cursor."""
+        start = start if start is not None else (page - 1) * limit
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = media_index_service.encode_media_cursor(
+                sort_key, sort_order, offset=start + limit
+            )
+        return items, next_cursor
+
     @staticmethod
     def get_total_count(
         category_id=None, subfolder=None, filter_type="all", show_hidden=False
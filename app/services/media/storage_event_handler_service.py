@@ -14,16 +14,23 @@ from app.services.media import (
     category_persistence_service,
 )
 from app.services.media.category_query_service import get_all_categories_with_details, get_category_by_id
+from app.utils.cache_utils import invalidate_cached_path
 from app.utils.media_utils import get_media_type, is_video_file
 
 logger = logging.getLogger(__name__)
 
+UPLOAD_REFRESH_DEBOUNCE_SECONDS = 1.0
+
 
 class MediaStorageEventHandlerService(Service):
     """Listens to storage bus events and applies media domain state updates."""
 
     def __init__(self):
         super().__init__('media_storage_event_handler')
+        self._pending_upload_categories = set()
+        self._pending_upload_dirs = set()
+        self._pending_upload_count = 0
+        self._upload_refresh_timer = None
 
     def on_start(self):
         """Bind storage bus events to internal media handlers."""
@@ -41,6 +48,9 @@ class MediaStorageEventHandlerService(Service):
         filename = payload.get('filename')
         category_id = payload.get('category_id')
 
+        if target_path:
+            # An upload may overwrite a file whose old bytes are still cached.
+            invalidate_cached_path(target_path)
         if not category_id:
             return
 
@@ -55,10 +65,9 @@ class MediaStorageEventHandlerService(Service):
                 mtime=stats.st_mtime,
                 file_type=media_type,
             )
-            media_index_service.recalculate_category_version_hash(category_id)
-            media_session_service.clear_session_tracker(category_id=category_id)
+            self._pending_upload_categories.add(category_id)
 
-            if media_type == 'video':
+            if media_type in ('video', 'image'):
                 try:
                     runtime = registry.require('thumbnail_runtime')
                     runtime.start_thumbnail_batch(category_id, 1)
@@ -67,16 +76,49 @@ class MediaStorageEventHandlerService(Service):
                         category_id,
                         {'name': filename},
                         force_refresh=False,
+                        priority='front',
                     )
                     runtime.finish_thumbnail_batch(category_id)
                 except Exception as exc:
                     logger.debug("Thumbnail enqueue skipped for %s: %s", filename, exc)
         except Exception as exc:
             logger.error("Media index update skipped for %s: %s", filename, exc)
+        self._schedule_upload_refresh()
 
     def _handle_batch_uploaded(self, payload: dict):
-        uploaded_categories = payload.get('uploaded_categories', [])
-        success_count = payload.get('success_count', 0)
+        self._pending_upload_dirs.update(payload.get('uploaded_categories', []))
+        self._pending_upload_count += payload.get('success_count', 0)
+        self._schedule_upload_refresh()
+
+    def _schedule_upload_refresh(self):
+        """Coalesce per-file upload refreshes into one pass per debounce window.
+
+        Chunked uploads finalize one file at a time, so a 500-photo batch
+        would otherwise rehash each category and broadcast 500 updates.
+        """
+        if not self.running:
+            self._flush_upload_refresh()
+        elif self._upload_refresh_timer is None:
+            self._upload_refresh_timer = self.timeout(
+                self._flush_upload_refresh,
+                UPLOAD_REFRESH_DEBOUNCE_SECONDS,
+            )
+
+    def _flush_upload_refresh(self):
+        self._upload_refresh_timer = None
+        category_ids, self._pending_upload_categories = self._pending_upload_categories, set()
+        uploaded_categories, self._pending_upload_dirs = self._pending_upload_dirs, set()
+        success_count, self._pending_upload_count = self._pending_upload_count, 0
+
+        for category_id in category_ids:
+            try:
+                media_index_service.recalculate_category_version_hash(category_id)
+                media_session_service.clear_session_tracker(category_id=category_id)
+            except Exception as exc:
+                logger.error("Failed to refresh uploaded category %s: %s", category_id, exc)
+
+        if not uploaded_categories:
+            return
 
         for category_dir in uploaded_categories:
             category_id = None
@@ -98,7 +140,7 @@ class MediaStorageEventHandlerService(Service):
             registry.require('library_events').emit_category_updated({
                 'reason': 'upload_complete',
                 'count': success_count,
-                'categories': uploaded_categories,
+                'categories': sorted(uploaded_categories),
                 'force_refresh': True,
                 'timestamp': time.time()
             })
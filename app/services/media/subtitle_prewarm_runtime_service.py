@@ -0,0 +1,100 @@
+"""Specter-owned background subtitle pre-extraction after indexing."""
+
+import logging
+from collections import OrderedDict
+
+import gevent
+
+from specter import Service
+
+logger = logging.getLogger(__name__)
+
+SUBTITLE_PREWARM_MAX_PENDING = 500
+SUBTITLE_PREWARM_IDLE_SECONDS = 5
+
+
+class SubtitlePrewarmRuntimeService(Service):
+    """Probe and extract subtitles for newly indexed videos ahead of playback.
+
+    Indexing queues changed video paths here; a single worker drains them
+    one at a time through ``get_subtitles_for_video`` so the first play of a
+    video finds its probe cached and its tracks already converted to VTT.
+    The queue is bounded and de-duplicated; overflow drops the oldest path,
+    which is still extracted on demand when played.
+    """
+
+    def __init__(self):
+        super().__init__('subtitle_prewarm_runtime', {
+            'pending': 0,
+            'queued': 0,
+            'processed': 0,
+            'dropped': 0,
+            'failed': 0,
+        })
+        self._pending = OrderedDict()
+
+    def on_start(self):
+        """Start the pre-extraction worker."""
+        self.spawn(self._run_subtitle_worker, label='subtitle_prewarm_worker')
+
+    def on_stop(self):
+        self._pending.clear()
+        self.set_state({'pending': 0})
+
+    def queue_videos(self, video_paths):
+        """Queue video paths for pre-extraction. Returns the number queued."""
+        from app.services.media.subtitle_service import is_subtitles_enabled
+
+        if not self.running or not is_subtitles_enabled():
+            return 0
+
+        queued = 0
+        dropped = 0
+        for video_path in video_paths:
+            if video_path in self._pending:
+                continue
+            self._pending[video_path] = True
+            queued += 1
+            if len(self._pending) > SUBTITLE_PREWARM_MAX_PENDING:
+                self._pending.popitem(last=False)
+                dropped += 1
+
+        if queued:
+            self.set_state({
+                'pending': len(self._pending),
+                'queued': self.state.get('queued', 0) + queued,
+                'dropped': self.state.get('dropped', 0) + dropped,
+            })
+        return queued
+
+    def process_pending(self, limit=None):
+        """Pre-extract queued videos in order. Returns the number processed."""
+        from app.services.media.subtitle_service import get_subtitles_for_video
+
+        processed = 0
+        failed = 0
+        while self._pending and (limit is None or processed + failed < limit):
+            video_path, _ = self._pending.popitem(last=False)
+            try:
+                get_subtitles_for_video(video_path)
+                processed += 1
+            except Exception as exc:
+                failed += 1
+                logger.debug("Subtitle pre-extraction failed for %s: %s", video_path, exc)
+            # Yield between videos so request greenlets are not starved.
+            gevent.sleep(0)
+
+        if processed or failed:
+            self.set_state({
+                'pending': len(self._pending),
+                'processed': self.state.get('processed', 0) + processed,
+                'failed': self.state.get('failed', 0) + failed,
+            })
+        return processed
+
+    def _run_subtitle_worker(self):
+        while self.running:
+            if self._pending:
+                self.process_pending()
+            else:
+                gevent.sleep(SUBTITLE_PREWARM_IDLE_SECONDS)
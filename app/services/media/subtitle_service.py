@@ -4,7 +4,8 @@ Subtitle Service for GhostHub
 -----------------------------
 Handles subtitle detection, extraction, and conversion for video files.
 - Detects embedded subtitle tracks in any container (MP4, MKV, etc.) using ffprobe
-- Extracts text-based subtitle tracks to .vtt using ffmpeg
+- Caches ffprobe subtitle metadata in SQLite keyed by the video hash
+- Extracts all text-based subtitle tracks to .vtt in a single ffmpeg pass
 - Detects external .srt or .vtt files matching video filename
 - Converts .srt → .vtt when needed
 - Marks image-based subtitles (PGS, VobSub) as unsupported
@@ -17,9 +18,11 @@ import logging
 import subprocess
 import hashlib
 import re
+import time
 from pathlib import Path
 
 from app.services.core.runtime_config_service import get_runtime_config_value, get_runtime_instance_path
+from app.services.core.sqlite_runtime_service import get_db, run_write
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +41,9 @@ IMAGE_SUBTITLE_CODECS = ['hdmv_pgs_subtitle', 'dvd_subtitle', 'dvdsub', 'pgssub'
 # All supported subtitle codecs for detection
 ALL_SUBTITLE_CODECS = TEXT_SUBTITLE_CODECS + IMAGE_SUBTITLE_CODECS
 
+# One demux pass covers every track, so the timeout does not scale with track count
+SUBTITLE_EXTRACT_TIMEOUT = 120
+
 
 def is_subtitles_enabled():
     """Check if subtitles feature is enabled in config."""
@@ -55,16 +61,24 @@ def get_subtitle_cache_dir():
     return cache_dir
 
 
-def get_video_hash(video_path):
-    """Generate a hash for a video file based on path and mtime for cache invalidation."""
+def _stat_video_hash(video_path):
+    """Return the path/mtime/size hash, or None when the file cannot be stat'd."""
     try:
         stat = os.stat(video_path)
-        # Use path + mtime + size for a unique but stable hash
-        hash_input = f"{video_path}:{stat.st_mtime}:{stat.st_size}"
-        return hashlib.md5(hash_input.encode()).hexdigest()[:16]
     except OSError:
+        return None
+    # Use path + mtime + size for a unique but stable hash
+    hash_input = f"{video_path}:{stat.st_mtime}:{stat.st_size}"
+    return hashlib.md5(hash_input.encode()).hexdigest()[:16]
+
+
+def get_video_hash(video_path):
+    """Generate a hash for a video file based on path and mtime for cache invalidation."""
+    video_hash = _stat_video_hash(video_path)
+    if video_hash is None:
         # Fallback to just path hash
         return hashlib.md5(video_path.encode()).hexdigest()[:16]
+    return video_hash
 
 
 def get_cached_subtitle_path(video_path, track_index, format='vtt'):
@@ -82,24 +96,69 @@ def get_video_start_time(video_path):
     Get the video stream's start time offset.
     Many containers (especially MKV) have non-zero start times that cause subtitle desync.
     """
+    return probe_subtitle_streams(video_path)['start_time']
+
+
+def _load_subtitle_probe(video_hash):
+    """Return a cached probe for an unchanged video, or None."""
     try:
-        cmd = [
-            'ffprobe',
-            '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_entries', 'format=start_time',
-            video_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        if result.returncode == 0:
-            data = json.loads(result.stdout)
-            start_time = float(data.get('format', {}).get('start_time', 0))
-            if start_time > 0:
-                logger.debug(f"Video has start_time offset: {start_time}s")
-            return start_time
+        with get_db() as conn:
+            row = conn.execute(
+                "SELECT start_time, tracks_json FROM subtitle_probe WHERE video_hash = ?",
+                (video_hash,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {'tracks': json.loads(row['tracks_json']), 'start_time': row['start_time']}
+    except Exception as e:
+        logger.debug(f"Could not load cached subtitle probe: {e}")
+        return None
+
+
+def _write_subtitle_probe(conn, row):
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO subtitle_probe
+            (video_hash, start_time, tracks_json, probed_at)
+        VALUES (?, ?, ?, ?)
+        """,
+        row,
+    )
+
+
+def _save_subtitle_probe(video_hash, probe):
+    """Persist a probe result; changed files get a new hash and a new row."""
+    try:
+        run_write(
+            _write_subtitle_probe,
+            (video_hash, probe['start_time'], json.dumps(probe['tracks']), time.time()),
+        )
     except Exception as e:
-        logger.debug(f"Could not get video start time: {e}")
-    return 0.0
+        logger.debug(f"Could not cache subtitle probe: {e}")
+
+
+def probe_subtitle_streams(video_path):
+    """
+    Return subtitle tracks and the container start time for a video.
+
+    Results are cached in SQLite by video hash, so each unchanged file is
+    probed once. Failed probes are not cached.
+
+    Returns:
+        dict with 'tracks' (list) and 'start_time' (float seconds)
+    """
+    video_hash = _stat_video_hash(video_path)
+    if video_hash is not None:
+        cached = _load_subtitle_probe(video_hash)
+        if cached is not None:
+            return cached
+
+    probe = _run_subtitle_probe(video_path)
+    if probe is None:
+        return {'tracks': [], 'start_time': 0.0}
+    if video_hash is not None:
+        _save_subtitle_probe(video_hash, probe)
+    return probe
 
 
 def run_ffprobe(video_path):
@@ -107,9 +166,14 @@ def run_ffprobe(video_path):
     Run ffprobe to get subtitle stream information from a video file.
     Returns list of subtitle tracks with their metadata.
     """
+    return probe_subtitle_streams(video_path)['tracks']
+
+
+def _run_subtitle_probe(video_path):
+    """Run one ffprobe for subtitle streams and start time; None on failure."""
     if not os.path.exists(video_path):
         logger.warning(f"Video file not found for ffprobe: {video_path}")
-        return []
+        return None
     
     try:
         cmd = [
@@ -118,6 +182,7 @@ def run_ffprobe(video_path):
             '-print_format', 'json',
             '-show_streams',
             '-select_streams', 's',  # Only subtitle streams
+            '-show_entries', 'format=start_time',
             video_path
         ]
         
@@ -130,10 +195,17 @@ def run_ffprobe(video_path):
         
         if result.returncode != 0:
             logger.debug(f"ffprobe returned non-zero for {video_path}: {result.stderr}")
-            return []
+            return None
         
         data = json.loads(result.stdout)
         streams = data.get('streams', [])
+
+        try:
+            start_time = max(0.0, float((data.get('format') or {}).get('start_time', 0) or 0))
+        except (TypeError, ValueError):
+            start_time = 0.0
+        if start_time > 0:
+            logger.debug(f"Video has start_time offset: {start_time}s")
         
         subtitle_tracks = []
         for i, stream in enumerate(streams):
@@ -168,20 +240,20 @@ def run_ffprobe(video_path):
                 })
         
         logger.debug(f"Found {len(subtitle_tracks)} embedded subtitle tracks in {video_path}")
-        return subtitle_tracks
+        return {'tracks': subtitle_tracks, 'start_time': start_time}
         
     except subprocess.TimeoutExpired:
         logger.warning(f"ffprobe timed out for {video_path}")
-        return []
+        return None
     except json.JSONDecodeError as e:
         logger.warning(f"Failed to parse ffprobe output for {video_path}: {e}")
-        return []
+        return None
     except FileNotFoundError:
         logger.warning("ffprobe not found. Please install ffmpeg.")
-        return []
+        return None
     except Exception as e:
         logger.error(f"Error running ffprobe on {video_path}: {e}")
-        return []
+        return None
 
 
 def get_language_name(code):
@@ -218,58 +290,102 @@ def extract_subtitle_track(video_path, stream_index, output_path):
     Compensates for video start_time offset to ensure proper sync.
     Returns True if successful, False otherwise.
     """
+    return stream_index in extract_subtitle_tracks(video_path, [(stream_index, output_path)])
+
+
+def extract_subtitle_tracks(video_path, outputs):
+    """
+    Extract several subtitle tracks to VTT with a single ffmpeg invocation.
+
+    The video is demuxed once no matter how many tracks are requested. If
+    the combined run fails (one bad track aborts the whole command), each
+    track is retried on its own so good tracks are still produced.
+
+    Args:
+        video_path: Source video
+        outputs: list of (stream_index, output_path)
+
+    Returns:
+        set of stream indices that were extracted successfully
+    """
+    if not outputs:
+        return set()
+
     try:
-        # Ensure output directory exists
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        # Get video start time to compensate for container offset
+        for _, output_path in outputs:
+            # Ensure output directory exists
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+        # Get video start time to compensate for container offset (cached probe)
         start_time = get_video_start_time(video_path)
-        
+
         cmd = [
             'ffmpeg',
             '-y',  # Overwrite output
             '-i', video_path,
-            '-map', f'0:s:{stream_index}',  # Select specific subtitle stream
-            '-c:s', 'webvtt',  # Convert to WebVTT
         ]
-        
-        # If video has a start time offset, shift subtitles back to sync with playback
+        for stream_index, output_path in outputs:
+            cmd.extend([
+                '-map', f'0:s:{stream_index}',  # Select specific subtitle stream
+                '-c:s', 'webvtt',  # Convert to WebVTT
+            ])
+            # If video has a start time offset, shift subtitles back to sync with playback
+            if start_time > 0:
+                cmd.extend(['-output_ts_offset', f'-{start_time}'])
+            cmd.append(output_path)
+
         if start_time > 0:
-            cmd.extend(['-output_ts_offset', f'-{start_time}'])
             logger.info(f"Applying subtitle offset: -{start_time}s to compensate for video start_time")
-        
-        cmd.append(output_path)
-        
+
         result = subprocess.run(
             cmd,
             capture_output=True,
             text=True,
-            timeout=120  # 2 minute timeout for extraction
+            timeout=SUBTITLE_EXTRACT_TIMEOUT
         )
-        
+
         if result.returncode != 0:
             logger.warning(f"ffmpeg subtitle extraction failed: {result.stderr[:500]}")
-            return False
-        
-        # Verify output file was created and has content
-        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-            # Post-process VTT to fix formatting (offset already applied by ffmpeg)
-            _fix_vtt_formatting(output_path)
-            logger.info(f"Extracted subtitle track {stream_index} to {output_path}")
-            return True
-        else:
-            logger.warning(f"Subtitle extraction produced empty or missing file: {output_path}")
-            return False
-            
+            for _, output_path in outputs:
+                _remove_partial_output(output_path)
+            if len(outputs) > 1:
+                extracted = set()
+                for output in outputs:
+                    extracted |= extract_subtitle_tracks(video_path, [output])
+                return extracted
+            return set()
+
+        extracted = set()
+        for stream_index, output_path in outputs:
+            # Verify output file was created and has content
+            if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+                # Post-process VTT to fix formatting (offset already applied by ffmpeg)
+                _fix_vtt_formatting(output_path)
+                extracted.add(stream_index)
+            else:
+                logger.warning(f"Subtitle extraction produced empty or missing file: {output_path}")
+                _remove_partial_output(output_path)
+
+        logger.info(f"Extracted {len(extracted)} of {len(outputs)} subtitle tracks from {video_path}")
+        return extracted
+
     except subprocess.TimeoutExpired:
         logger.warning(f"Subtitle extraction timed out for {video_path}")
-        return False
     except FileNotFoundError:
         logger.warning("ffmpeg not found. Please install ffmpeg.")
-        return False
     except Exception as e:
-        logger.error(f"Error extracting subtitle track: {e}")
-        return False
+        logger.error(f"Error extracting subtitle tracks: {e}")
+
+    for _, output_path in outputs:
+        _remove_partial_output(output_path)
+    return set()
+
+
+def _remove_partial_output(output_path):
+    try:
+        os.remove(output_path)
+    except OSError:
+        pass
 
 
 def _fix_vtt_formatting(vtt_path):
@@ -590,17 +706,29 @@ def get_subtitles_for_video(video_path, category_id=None):
     
     # 2. Detect and extract embedded subtitle tracks
     embedded_tracks = run_ffprobe(video_path)
+
+    # Only extract text-based subtitles (image-based ones cannot be converted to VTT).
+    # Every missing track is extracted in one ffmpeg pass over the file.
+    cache_paths = {
+        track['stream_index']: get_cached_subtitle_path(video_path, track['stream_index'], 'vtt')
+        for track in embedded_tracks
+        if track.get('is_text_based', False)
+    }
+    missing = [
+        (stream_idx, cache_path)
+        for stream_idx, cache_path in cache_paths.items()
+        if not os.path.exists(cache_path)
+    ]
+    extracted = extract_subtitle_tracks(video_path, missing) if missing else set()
+    missing_indices = {stream_idx for stream_idx, _ in missing}
+
     for track in embedded_tracks:
         stream_idx = track['stream_index']
         
-        # Only extract text-based subtitles (image-based ones cannot be converted to VTT)
         if track.get('is_text_based', False):
-            cache_path = get_cached_subtitle_path(video_path, stream_idx, 'vtt')
-            
-            # Check if we need to extract
-            if not os.path.exists(cache_path):
-                if not extract_subtitle_track(video_path, stream_idx, cache_path):
-                    continue
+            cache_path = cache_paths[stream_idx]
+            if stream_idx in missing_indices and stream_idx not in extracted:
+                continue
             
             subtitles.append({
                 'url': f"/api/subtitles/cache?file={os.path.basename(cache_path)}",
@@ -657,3 +785,13 @@ def cleanup_old_cache(max_age_days=30):
                     logger.debug(f"Removed old cached subtitle: {entry.name}")
     except Exception as e:
         logger.error(f"Error cleaning up subtitle cache: {e}")
+
+    # Probes for files that were since modified or deleted are never hit again
+    try:
+        with get_db() as conn:
+            conn.execute(
+                "DELETE FROM subtitle_probe WHERE probed_at < ?",
+                (now - max_age_seconds,),
+            )
+    except Exception as e:
+        logger.debug(f"Could not prune subtitle probe cache: {e}")
@@ -21,6 +21,8 @@ from app.utils.media_utils import (
     THUMBNAIL_SIZE_PI,
     generate_image_thumbnail,
     generate_thumbnail,
+    generate_video_thumbnails_batch,
+    probe_video,
 )
 
 logger = logging.getLogger(__name__)
@@ -30,6 +32,7 @@ GC_INTERVAL = 60
 STALE_CATEGORY_STATUS_SECONDS = 30
 CATEGORY_PRIORITY_BOOST_SECONDS = 90
 THUMBNAIL_INDEX_BATCH_SIZE = 500
+VIDEO_THUMBNAIL_BATCH_SIZE = 8
 
 
 class PerformanceMonitor:
@@ -38,19 +41,53 @@ class PerformanceMonitor:
     def __init__(self, window_size=10):
         self.window_size = window_size
         self.tasks_processed = 0
+        self.files_processed = 0
         self.task_times = []
+        self.batches = 0
+        self.ffmpeg_runs = 0
+        self.probe_cache_hits = 0
+        self.probe_cache_misses = 0
         self.start_time = time.time()
 
-    def record_task(self, duration):
+    def record_task(self, duration, files=1):
         self.tasks_processed += 1
+        self.files_processed += files
         self.task_times.append(duration)
         if len(self.task_times) > self.window_size:
             self.task_times.pop(0)
 
+    def record_batch(self, ffmpeg_runs):
+        self.batches += 1
+        self.ffmpeg_runs += ffmpeg_runs
+
+    def record_probe(self, cached):
+        if cached:
+            self.probe_cache_hits += 1
+        else:
+            self.probe_cache_misses += 1
+
     def get_tasks_per_minute(self):
         elapsed_minutes = (time.time() - self.start_time) / 60
         return self.tasks_processed / max(1, elapsed_minutes)
 
+    def get_files_per_minute(self):
+        elapsed_minutes = (time.time() - self.start_time) / 60
+        return self.files_processed / max(1, elapsed_minutes)
+
+    def get_stats(self):
+        recent = self.task_times
+        return {
+            'tasks_processed': self.tasks_processed,
+            'files_processed': self.files_processed,
+            'tasks_per_minute': round(self.get_tasks_per_minute(), 2),
+            'files_per_minute': round(self.get_files_per_minute(), 2),
+            'avg_task_seconds': round(sum(recent) / len(recent), 3) if recent else 0.0,
+            'video_batches': self.batches,
+            'ffmpeg_runs': self.ffmpeg_runs,
+            'probe_cache_hits': self.probe_cache_hits,
+            'probe_cache_misses': self.probe_cache_misses,
+        }
+
 
 def get_max_queue_size():
     """Get tier-aware max thumbnail queue size."""
@@ -599,6 +636,7 @@ class ThumbnailRuntimeService(Service):
             except Empty:
                 continue
 
+            tasks = [task] + self._take_video_batch(task)
             self.set_state({'queue_size': self._get_total_queue_size()})
 
             try:
@@ -608,112 +646,252 @@ class ThumbnailRuntimeService(Service):
                         active_tasks = self._thumbnail_active_tasks
                     self.set_state({'active_tasks': active_tasks})
                     started_at = time.time()
-                    self._process_thumbnail_task(task)
-                    self._thumbnail_perf.record_task(time.time() - started_at)
+                    if len(tasks) > 1:
+                        self._process_thumbnail_batch(tasks)
+                    else:
+                        self._process_thumbnail_task(task)
+                    self._thumbnail_perf.record_task(time.time() - started_at, files=len(tasks))
             except Exception as exc:
                 logger.error("Thumbnail worker error: %s", exc)
                 logger.debug(traceback.format_exc())
             finally:
-                task_key = task.get('task_key') if isinstance(task, dict) else None
-                if task_key:
-                    with self._thumbnail_queue_lock:
-                        self._queued_thumbnail_task_keys.discard(task_key)
+                for finished in tasks:
+                    task_key = finished.get('task_key') if isinstance(finished, dict) else None
+                    if task_key:
+                        with self._thumbnail_queue_lock:
+                            self._queued_thumbnail_task_keys.discard(task_key)
+                    try:
+                        if isinstance(finished, dict) and finished.get('_queue_origin') != 'priority':
+                            self._thumbnail_queue.task_done()
+                    except Exception:
+                        pass
                 with self._thumbnail_state_lock:
                     self._thumbnail_active_tasks = max(0, self._thumbnail_active_tasks - 1)
                     active_tasks = self._thumbnail_active_tasks
-                try:
-                    if isinstance(task, dict) and task.get('_queue_origin') != 'priority':
-                        self._thumbnail_queue.task_done()
-                except Exception:
-                    pass
                 self.set_state({
                     'queue_size': self._get_total_queue_size(),
                     'active_tasks': active_tasks,
+                    'files_per_minute': round(self._thumbnail_perf.get_files_per_minute(), 2),
                 })
                 if time.time() - self._thumbnail_gc_at > GC_INTERVAL:
                     gc.collect()
                     self._thumbnail_gc_at = time.time()
 
-    def _process_thumbnail_task(self, task):
-        category_path = task.get('category_path')
-        file_meta = task.get('file_meta') or {}
-        category_id = task.get('category_id')
-        force_refresh = bool(task.get('force_refresh', False))
-        rel_path = file_meta.get('path', file_meta.get('name', ''))
-        filename = rel_path
-        abs_path = os.path.join(category_path, rel_path)
+    def get_performance_stats(self):
+        """Return thumbnail throughput, batching and probe-cache counters."""
+        return self._thumbnail_perf.get_stats()
 
+    def _process_thumbnail_task(self, task):
+        job = None
         try:
-            manager = registry.require('service_manager')
-            app = getattr(manager, 'app', None)
-            if app is None:
-                raise RuntimeError('Flask app is not available for thumbnail runtime')
-
-            with app.app_context():
-                if not os.path.exists(abs_path) or not os.path.isfile(abs_path):
-                    logger.warning("Media file not found at path: %s", abs_path)
-                    self._update_thumbnail_category_stats(
-                        category_id,
-                        success=False,
-                        filename=filename,
-                    )
+            with self._thumbnail_app_context():
+                job = self._prepare_thumbnail_job(task)
+                if job is None:
                     return
 
-                ghosthub_dir = os.path.join(category_path, '.ghosthub')
-                thumbnail_dir = os.path.join(ghosthub_dir, 'thumbnails')
-                try:
-                    os.makedirs(ghosthub_dir, exist_ok=True)
-                    os.makedirs(thumbnail_dir, exist_ok=True)
-                except Exception as exc:
-                    logger.error("Failed to prepare thumbnail directories for %s: %s", abs_path, exc)
-                    self._update_thumbnail_category_stats(
-                        category_id,
-                        success=False,
-                        filename=filename,
-                    )
-                    return
-
-                from app.utils.media_utils import get_media_type, get_thumbnail_filename, get_thumbnail_url
-
-                thumbnail_path = os.path.join(
-                    thumbnail_dir,
-                    get_thumbnail_filename(filename),
-                )
-                if get_media_type(filename) == 'image':
+                if job['media_type'] == 'image':
                     success = generate_image_thumbnail(
-                        abs_path,
-                        thumbnail_path,
+                        job['abs_path'],
+                        job['thumbnail_path'],
                         size=THUMBNAIL_SIZE_PI,
                     )
                 else:
                     success = generate_thumbnail(
-                        abs_path,
-                        thumbnail_path,
-                        force_refresh=force_refresh,
+                        job['abs_path'],
+                        job['thumbnail_path'],
+                        force_refresh=job['force_refresh'],
                         size=THUMBNAIL_SIZE_PI,
+                        probe=self._resolve_video_probe(job),
                     )
+                self._complete_thumbnail_job(job, success)
+        except Exception as exc:
+            self._fail_thumbnail_task(task, exc)
 
-                thumbnail_url = None
-                media_url = None
-                if success:
-                    thumbnail_url = get_thumbnail_url(category_id, filename)
-                    media_url = f"/media/{category_id}/{quote(filename)}"
+    def _process_thumbnail_batch(self, tasks):
+        """Generate thumbnails for several queued videos with one ffmpeg run."""
+        try:
+            with self._thumbnail_app_context():
+                jobs = []
+                for task in tasks:
+                    try:
+                        job = self._prepare_thumbnail_job(task)
+                    except Exception as exc:
+                        self._fail_thumbnail_task(task, exc)
+                        continue
+                    if job is None:
+                        continue
+                    if job['media_type'] != 'video':
+                        self._process_thumbnail_task(task)
+                        continue
+                    job['probe'] = self._resolve_video_probe(job)
+                    jobs.append(job)
 
-                self._update_thumbnail_category_stats(
-                    category_id,
-                    success=success,
-                    thumbnail_url=thumbnail_url,
-                    media_url=media_url,
-                    filename=filename,
+                if not jobs:
+                    return
+
+                results, ffmpeg_runs = generate_video_thumbnails_batch(
+                    [
+                        {
+                            'media_path': job['abs_path'],
+                            'thumbnail_path': job['thumbnail_path'],
+                            'force_refresh': job['force_refresh'],
+                            'probe': job['probe'],
+                        }
+                        for job in jobs
+                    ],
+                    size=THUMBNAIL_SIZE_PI,
                 )
+                self._thumbnail_perf.record_batch(ffmpeg_runs)
+                for job in jobs:
+                    self._complete_thumbnail_job(job, bool(results.get(job['thumbnail_path'])))
         except Exception as exc:
-            logger.error("Failed to process thumbnail for %s: %s", filename, exc)
-            logger.debug(traceback.format_exc())
+            for task in tasks:
+                self._fail_thumbnail_task(task, exc)
+
+    def _thumbnail_app_context(self):
+        manager = registry.require('service_manager')
+        app = getattr(manager, 'app', None)
+        if app is None:
+            raise RuntimeError('Flask app is not available for thumbnail runtime')
+        return app.app_context()
+
+    def _prepare_thumbnail_job(self, task):
+        """Resolve paths for a task; records a failure and returns None if unusable."""
+        category_path = task.get('category_path')
+        file_meta = task.get('file_meta') or {}
+        category_id = task.get('category_id')
+        rel_path = file_meta.get('path', file_meta.get('name', ''))
+        filename = rel_path
+        abs_path = os.path.join(category_path, rel_path)
+
+        if not os.path.exists(abs_path) or not os.path.isfile(abs_path):
+            logger.warning("Media file not found at path: %s", abs_path)
             self._update_thumbnail_category_stats(
                 category_id,
                 success=False,
                 filename=filename,
             )
+            return None
+
+        ghosthub_dir = os.path.join(category_path, '.ghosthub')
+        thumbnail_dir = os.path.join(ghosthub_dir, 'thumbnails')
+        try:
+            os.makedirs(ghosthub_dir, exist_ok=True)
+            os.makedirs(thumbnail_dir, exist_ok=True)
+        except Exception as exc:
+            logger.error("Failed to prepare thumbnail directories for %s: %s", abs_path, exc)
+            self._update_thumbnail_category_stats(
+                category_id,
+                success=False,
+                filename=filename,
+            )
+            return None
+
+        from app.utils.media_utils import get_media_type, get_thumbnail_filename
+
+        return {
+            'category_id': category_id,
+            'filename': filename,
+            'abs_path': abs_path,
+            'thumbnail_path': os.path.join(thumbnail_dir, get_thumbnail_filename(filename)),
+            'media_type': get_media_type(filename),
+            'force_refresh': bool(task.get('force_refresh', False)),
+            'file_meta': file_meta,
+        }
+
+    def _complete_thumbnail_job(self, job, success):
+        from app.utils.media_utils import get_thumbnail_url
+
+        category_id = job['category_id']
+        filename = job['filename']
+        thumbnail_url = None
+        media_url = None
+        if success:
+            thumbnail_url = get_thumbnail_url(category_id, filename)
+            media_url = f"/media/{category_id}/{quote(filename)}"
+
+        self._update_thumbnail_category_stats(
+            category_id,
+            success=success,
+            thumbnail_url=thumbnail_url,
+            media_url=media_url,
+            filename=filename,
+        )
+
+    def _fail_thumbnail_task(self, task, exc):
+        file_meta = task.get('file_meta') or {}
+        filename = file_meta.get('path', file_meta.get('name', ''))
+        logger.error("Failed to process thumbnail for %s: %s", filename, exc)
+        logger.debug(traceback.format_exc())
+        self._update_thumbnail_category_stats(
+            task.get('category_id'),
+            success=False,
+            filename=filename,
+        )
+
+    def _resolve_video_probe(self, job):
+        """Reuse the stored ffprobe result for unchanged files, probing otherwise."""
+        from app.services.media import media_index_service
+
+        try:
+            stats = os.stat(job['abs_path'])
+        except OSError:
+            return None
+
+        category_id = job['category_id']
+        rel_path = job['filename']
+        probe = media_index_service.get_media_probe(
+            category_id, rel_path, stats.st_size, stats.st_mtime
+        )
+        self._thumbnail_perf.record_probe(cached=probe is not None)
+        if probe is not None:
+            return probe
+
+        probe = probe_video(job['abs_path'])
+        if probe is not None:
+            media_index_service.save_media_probe(
+                category_id,
+                rel_path,
+                stats.st_size,
+                stats.st_mtime,
+                probe['has_video'],
+                probe['duration'],
+            )
+        return probe
+
+    def _take_video_batch(self, task):
+        """Pull more queued video tasks to share one ffmpeg run with ``task``."""
+        if VIDEO_THUMBNAIL_BATCH_SIZE <= 1 or not self._is_video_task(task):
+            return []
+
+        batch = []
+        with self._thumbnail_queue_lock:
+            while len(batch) < VIDEO_THUMBNAIL_BATCH_SIZE - 1:
+                if self._thumbnail_priority_queue:
+                    if not self._is_video_task(self._thumbnail_priority_queue[0]):
+                        break
+                    batch.append(self._thumbnail_priority_queue.popleft())
+                    continue
+                try:
+                    queued = self._thumbnail_queue.get_nowait()
+                except Empty:
+                    break
+                batch.append(queued)
+                if not self._is_video_task(queued):
+                    break
+        return batch
+
+    @staticmethod
+    def _is_video_task(task):
+        if not isinstance(task, dict):
+            return False
+        file_meta = task.get('file_meta') or {}
+        media_type = file_meta.get('type')
+        if media_type is None:
+            from app.utils.media_utils import get_media_type
+
+            media_type = get_media_type(file_meta.get('path', file_meta.get('name', '')))
+        return media_type == 'video'
 
     def _update_thumbnail_category_stats(
         self,
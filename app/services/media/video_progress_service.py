@@ -6,7 +6,7 @@ import sqlite3
 import time
 
 from app.services.core.runtime_config_service import get_runtime_config_value
-from app.services.core.sqlite_runtime_service import get_db
+from app.services.core.sqlite_runtime_service import get_db, run_write
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +28,67 @@ def _profile_exists(conn, profile_id):
     return row is not None
 
 
+def _progress_buffer():
+    """Return the progress write-behind service when it is registered."""
+    from specter import registry
+
+    return registry.resolve('progress_write_behind')
+
+
+def _buffered_rows(profile_id):
+    """Return buffered (not yet flushed) progress rows for a profile."""
+    buffer = _progress_buffer()
+    if buffer is None:
+        return []
+    return buffer.rows_for_profile(profile_id)
+
+
+def _row_progress(row):
+    """Map a buffered ``video_progress`` row tuple to a result dict."""
+    return {
+        'video_path': row[0],
+        'category_id': row[2],
+        'video_timestamp': row[3],
+        'video_duration': row[4],
+        'thumbnail_url': row[5],
+        'last_watched': row[6],
+    }
+
+
+def _write_progress_row(conn, row):
+    """Write one progress row; returns False when the profile is gone."""
+    if not _profile_exists(conn, row[1]):
+        return False
+
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO video_progress
+        (
+            video_path,
+            profile_id,
+            category_id,
+            video_timestamp,
+            video_duration,
+            thumbnail_url,
+            last_watched,
+            updated_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        row,
+    )
+    return True
+
+
+def _write_progress_rows(conn, rows):
+    """Write buffered progress rows in one transaction; returns rows written."""
+    written = 0
+    for row in rows:
+        if _write_progress_row(conn, row):
+            written += 1
+    return written
+
+
 def save_video_progress(
     video_path,
     category_id,
@@ -35,52 +96,51 @@ def save_video_progress(
     video_duration=None,
     thumbnail_url=None,
     profile_id=None,
+    defer=False,
 ):
     """
     Save playback progress for a specific video/profile pair.
     Returns ``(success, message)``.
+
+    With ``defer`` the row is coalesced in the progress write-behind
+    buffer and flushed with other saves on its next interval.
     """
     if not _is_progress_enabled():
         return False, "Progress saving is disabled."
     if not profile_id:
         return False, "Active profile is required."
 
+    now = time.time()
+    row = (
+        str(video_path),
+        str(profile_id),
+        str(category_id) if category_id else None,
+        float(video_timestamp)
+        if video_timestamp is not None and video_timestamp >= 0
+        else None,
+        float(video_duration)
+        if video_duration is not None and video_duration > 0
+        else None,
+        str(thumbnail_url) if thumbnail_url else None,
+        now,
+        now,
+    )
+
+    buffer = _progress_buffer()
     try:
-        with get_db() as conn:
-            if not _profile_exists(conn, profile_id):
-                logger.info("Rejected progress save for deleted profile %s", profile_id)
-                return False, "Active profile is invalid."
-
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO video_progress
-                (
-                    video_path,
-                    profile_id,
-                    category_id,
-                    video_timestamp,
-                    video_duration,
-                    thumbnail_url,
-                    last_watched,
-                    updated_at
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    str(video_path),
-                    str(profile_id),
-                    str(category_id) if category_id else None,
-                    float(video_timestamp)
-                    if video_timestamp is not None and video_timestamp >= 0
-                    else None,
-                    float(video_duration)
-                    if video_duration is not None and video_duration > 0
-                    else None,
-                    str(thumbnail_url) if thumbnail_url else None,
-                    time.time(),
-                    time.time(),
-                ),
-            )
+        if defer and buffer is not None and buffer.accepts_writes():
+            with get_db() as conn:
+                if not _profile_exists(conn, profile_id):
+                    logger.info("Rejected progress save for deleted profile %s", profile_id)
+                    return False, "Active profile is invalid."
+            buffer.buffer(row)
+            return True, "Video progress saved successfully."
+
+        if buffer is not None:
+            buffer.discard(video_path, profile_id)
+        if not run_write(_write_progress_row, row):
+            logger.info("Rejected progress save for deleted profile %s", profile_id)
+            return False, "Active profile is invalid."
 
         logger.debug(
             "save_video_progress success: %s @ %ss for profile %s",
@@ -104,14 +164,19 @@ def get_video_progress(video_path, profile_id=None):
             if not _profile_exists(conn, profile_id):
                 return None
 
-            row = conn.execute(
-                """
-                SELECT video_timestamp, video_duration, thumbnail_url, last_watched
-                FROM video_progress
-                WHERE video_path = ? AND profile_id = ?
-                """,
-                (str(video_path), str(profile_id)),
-            ).fetchone()
+            buffer = _progress_buffer()
+            buffered = buffer.get_row(profile_id, video_path) if buffer is not None else None
+            if buffered is not None:
+                row = _row_progress(buffered)
+            else:
+                row = conn.execute(
+                    """
+                    SELECT video_timestamp, video_duration, thumbnail_url, last_watched
+                    FROM video_progress
+                    WHERE video_path = ? AND profile_id = ?
+                    """,
+                    (str(video_path), str(profile_id)),
+                ).fetchone()
 
             if not row:
                 return None
@@ -152,13 +217,19 @@ def get_category_video_progress(category_id, profile_id=None):
                 (str(category_id), str(profile_id)),
             )
 
+            rows = [dict(row) for row in cursor.fetchall()]
+            rows.extend(
+                _row_progress(row)
+                for row in _buffered_rows(profile_id)
+                if row[2] == str(category_id)
+            )
             return {
                 row['video_path']: {
                     'video_timestamp': row['video_timestamp'],
                     'video_duration': row['video_duration'],
                     'thumbnail_url': row['thumbnail_url'],
                 }
-                for row in cursor.fetchall()
+                for row in rows
                 if row['video_timestamp'] is not None
             }
     except sqlite3.Error as exc:
@@ -188,8 +259,15 @@ def get_video_progress_batch(category_ids, profile_id=None):
                 [*category_ids, str(profile_id)],
             )
 
+            rows = [dict(row) for row in cursor.fetchall()]
+            rows.extend(
+                _row_progress(row)
+                for row in _buffered_rows(profile_id)
+                if row[3] is not None
+            )
+
             result = {cat_id: {} for cat_id in category_ids}
-            for row in cursor.fetchall():
+            for row in rows:
                 cat_id = row['category_id']
                 if cat_id in result:
                     result[cat_id][row['video_path']] = {
@@ -204,32 +282,26 @@ def get_video_progress_batch(category_ids, profile_id=None):
         return {}
 
 
+def _delete_all_video_progress_rows(conn, profile_id):
+    if profile_id:
+        count = conn.execute(
+            "DELETE FROM video_progress WHERE profile_id = ?",
+            (str(profile_id),),
+        ).rowcount
+        return count, 0
+
+    count = conn.execute("DELETE FROM video_progress").rowcount
+    alias_count = conn.execute("DELETE FROM file_path_aliases").rowcount
+    return count, alias_count
+
+
 def delete_all_video_progress(profile_id=None):
     """Delete video progress rows, scoped to a profile when provided."""
+    buffer = _progress_buffer()
+    if buffer is not None:
+        buffer.discard(profile_id=profile_id)
     try:
-        with get_db() as conn:
-            if profile_id:
-                progress_cursor = conn.execute(
-                    "SELECT COUNT(*) FROM video_progress WHERE profile_id = ?",
-                    (str(profile_id),),
-                )
-            else:
-                progress_cursor = conn.execute("SELECT COUNT(*) FROM video_progress")
-            count = progress_cursor.fetchone()[0]
-
-            alias_cursor = conn.execute("SELECT COUNT(*) FROM file_path_aliases")
-            alias_count = alias_cursor.fetchone()[0]
-
-            if profile_id:
-                conn.execute(
-                    "DELETE FROM video_progress WHERE profile_id = ?",
-                    (str(profile_id),),
-                )
-                deleted_alias_count = 0
-            else:
-                conn.execute("DELETE FROM video_progress")
-                conn.execute("DELETE FROM file_path_aliases")
-                deleted_alias_count = alias_count
+        count, deleted_alias_count = run_write(_delete_all_video_progress_rows, profile_id)
 
         logger.info(
             "Deleted %s video progress entries and %s file path aliases",
@@ -268,6 +340,11 @@ def get_all_video_progress(limit=50, profile_id=None):
                 (str(profile_id), limit),
             )
 
+            rows = {row['video_path']: dict(row) for row in cursor.fetchall()}
+            for buffered in _buffered_rows(profile_id):
+                if buffered[3] is not None and buffered[3] >= 0:
+                    rows[buffered[0]] = _row_progress(buffered)
+
             results = [
                 {
                     'video_path': row['video_path'],
@@ -278,7 +355,11 @@ def get_all_video_progress(limit=50, profile_id=None):
                     'thumbnail_url': row['thumbnail_url'],
                     'last_watched': row['last_watched'],
                 }
-                for row in cursor.fetchall()
+                for row in sorted(
+                    rows.values(),
+                    key=lambda row: row['last_watched'] or 0,
+                    reverse=True,
+                )[:limit]
             ]
 
             logger.debug("get_all_video_progress returning %s videos", len(results))
@@ -290,6 +371,9 @@ def get_all_video_progress(limit=50, profile_id=None):
 
 def update_video_progress_path(old_path, new_path):
     """Update stored progress and thumbnail metadata after a media rename."""
+    buffer = _progress_buffer()
+    if buffer is not None:
+        buffer.rename(old_path, new_path)
     try:
         from app.utils.media_utils import get_thumbnail_url
 
@@ -336,32 +420,41 @@ def update_video_progress_path(old_path, new_path):
         return False
 
 
+def _delete_video_progress_rows(conn, video_path, profile_id):
+    if profile_id:
+        cursor = conn.execute(
+            """
+            DELETE FROM video_progress
+            WHERE video_path = ? AND profile_id = ?
+            """,
+            (str(video_path), str(profile_id)),
+        )
+    else:
+        cursor = conn.execute(
+            "DELETE FROM video_progress WHERE video_path = ?",
+            (str(video_path),),
+        )
+    return cursor.rowcount
+
+
 def delete_video_progress(video_path, profile_id=None):
-    """Delete a specific video's progress entry."""
-    try:
-        with get_db() as conn:
-            if profile_id:
-                cursor = conn.execute(
-                    """
-                    DELETE FROM video_progress
-                    WHERE video_path = ? AND profile_id = ?
-                    """,
-                    (str(video_path), str(profile_id)),
-                )
-            else:
-                cursor = conn.execute(
-                    "DELETE FROM video_progress WHERE video_path = ?",
-                    (str(video_path),),
-                )
+    """Delete a specific video's progress entry.
 
-            if cursor.rowcount > 0:
-                logger.info(
-                    "Deleted video progress for %s (profile=%s)",
-                    video_path,
-                    profile_id,
-                )
-                return True
-            return False
+    The DELETE goes through the writer queue so it commits after any
+    progress flush that was already queued.
+    """
+    buffer = _progress_buffer()
+    discarded = buffer.discard(video_path, profile_id) if buffer is not None else 0
+    try:
+        deleted = run_write(_delete_video_progress_rows, video_path, profile_id)
+        if deleted > 0 or discarded:
+            logger.info(
+                "Deleted video progress for %s (profile=%s)",
+                video_path,
+                profile_id,
+            )
+            return True
+        return False
     except sqlite3.Error as exc:
         logger.error("Error deleting video progress for %s: %s", video_path, exc)
         return False
@@ -470,6 +563,14 @@ def get_most_recent_video_progress(category_id, profile_id=None):
                 (str(category_id), str(profile_id)),
             ).fetchone()
 
+            for buffered in _buffered_rows(profile_id):
+                if (
+                    buffered[2] == str(category_id) and
+                    buffered[3] is not None and
+                    (not row or buffered[6] > row['last_watched'])
+                ):
+                    row = _row_progress(buffered)
+
             if not row:
                 return None
 
@@ -1,22 +1,41 @@
 """ZIP/archive download helpers for storage-backed transfers."""
 
-import io
+import hashlib
 import logging
 import os
-import platform
-import subprocess
-import tempfile
-import zipfile
-from typing import Dict, List, Optional, Tuple
+import struct
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 from app.services.core.runtime_config_service import get_runtime_config_value
+from app.services.core.sqlite_runtime_service import get_db, run_write
 from app.services.system.system_stats_service import get_hardware_tier
 
 logger = logging.getLogger(__name__)
 
 STREAM_CHUNK_SIZE = 2 * 1024 * 1024
-PIPE_SIZE_LIMIT = 4 * 1024 * 1024 * 1024
 MAX_ZIP_PART_SIZE = 200 * 1024 * 1024
+CRC_LOOKUP_BATCH_SIZE = 500
+# CRCs computed while streaming are written in one writer job per batch.
+CRC_SAVE_BATCH_SIZE = 500
+
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP_FLAGS = 0x0808  # sizes/CRC in a data descriptor, UTF-8 names
+ZIP_EXTERNAL_ATTR = 0o100644 << 16
+ZIP_MADE_BY = (3 << 8) | 45  # Unix, spec 4.5
+
+_LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+_CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+_DESCRIPTOR = struct.Struct('<IIII')
+_DESCRIPTOR64 = struct.Struct('<IIQQ')
+_LOCAL_ZIP64_EXTRA = struct.Struct('<HHQQ')
+_CENTRAL_ZIP64_EXTRA = struct.Struct('<HHQQQ')
+_END_RECORD = struct.Struct('<IHHHHIIH')
+_END_RECORD64 = struct.Struct('<IQHHIIQQQQ')
+_END_LOCATOR64 = struct.Struct('<IIQI')
+
+Segment = Union[bytes, Tuple[str, int, int]]
 
 
 def _storage_io():
@@ -32,115 +51,399 @@ def _is_managed_storage_path(path: str) -> bool:
     return is_managed_storage_path(path)
 
 
-def stream_zip_from_pipe(file_paths: List[str], folder_path: str):
-    """Stream a ZIP directly from the system zip command when possible."""
-    if platform.system() == 'Windows':
-        yield from _stream_zip_windows_fallback(file_paths, folder_path)
-        return
+def get_cached_crc32s(files: List[Tuple[str, int, float]]) -> Dict[str, int]:
+    """Return cached CRC-32 values for (path, size, mtime) entries still current."""
+    cached = {}
+    try:
+        with get_db() as conn:
+            for index in range(0, len(files), CRC_LOOKUP_BATCH_SIZE):
+                batch = files[index:index + CRC_LOOKUP_BATCH_SIZE]
+                current = {path: (size, mtime) for path, size, mtime in batch}
+                placeholders = ','.join('?' * len(current))
+                rows = conn.execute(
+                    f"SELECT path, size, mtime, crc32 FROM file_crc_cache WHERE path IN ({placeholders})",
+                    list(current),
+                ).fetchall()
+                for row in rows:
+                    if current.get(row['path']) == (row['size'], row['mtime']):
+                        cached[row['path']] = row['crc32']
+    except Exception as exc:
+        logger.error("Error loading cached CRC-32 values: %s", exc)
+    return cached
 
+
+def _write_crc32s(conn, rows):
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO file_crc_cache (path, size, mtime, crc32, computed_at)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    return len(rows)
+
+
+def save_crc32s(entries: List[Tuple[str, int, float, int]]) -> bool:
+    """Store (path, size, mtime, crc32) entries keyed by each file's size and mtime."""
+    if not entries:
+        return True
+    now = time.time()
     try:
-        cmd = ['zip', '-0', '-q', '-j', '-']
-        cmd.extend(file_paths)
-
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            cwd=folder_path,
-            close_fds=True,
+        run_write(_write_crc32s, [(path, size, mtime, crc, now) for path, size, mtime, crc in entries])
+        return True
+    except Exception as exc:
+        logger.error("Error saving %s CRC-32 values: %s", len(entries), exc)
+        return False
+
+
+def _dos_datetime(mtime: float) -> Tuple[int, int]:
+    """Return the (time, date) pair ZIP headers use for a timestamp."""
+    year, month, day, hour, minute, second = time.localtime(mtime)[:6]
+    if year < 1980:
+        return 0, (1 << 5) | 1
+    return (
+        (hour << 11) | (minute << 5) | (second // 2),
+        ((year - 1980) << 9) | (month << 5) | day,
+    )
+
+
+class ZipStreamPlan:
+    """Byte-exact layout of a STORED ZIP64 archive built from file metadata.
+
+    Members carry a data descriptor, so a local header never needs the CRC
+    and the archive length is known before any file is read. CRCs are taken
+    from ``file_crc_cache`` or computed while a member streams, which lets
+    any byte range be produced on demand for resumed downloads.
+    """
+
+    def __init__(self, files: List[Tuple[str, str, int, float]]):
+        cached = get_cached_crc32s([(path, size, mtime) for path, _, size, mtime in files])
+        self.members = []
+        self._unsaved_crcs = []
+        self._pieces = []
+        self._central = None
+
+        offset = 0
+        for path, arcname, size, mtime in files:
+            name = arcname.replace(os.sep, '/').encode('utf-8')
+            zip64 = size >= ZIP64_LIMIT or offset >= ZIP64_LIMIT
+            member = {
+                'path': path,
+                'name': name,
+                'size': size,
+                'mtime': mtime,
+                'crc': 0 if size == 0 else cached.get(path),
+                'zip64': zip64,
+                'header_offset': offset,
+            }
+            self.members.append(member)
+            index = len(self.members) - 1
+
+            header_length = _LOCAL_HEADER.size + len(name) + (_LOCAL_ZIP64_EXTRA.size if zip64 else 0)
+            descriptor_length = (_DESCRIPTOR64 if zip64 else _DESCRIPTOR).size
+            self._pieces.append((offset, header_length, 'local', index))
+            offset += header_length
+            self._pieces.append((offset, size, 'data', index))
+            offset += size
+            self._pieces.append((offset, descriptor_length, 'descriptor', index))
+            offset += descriptor_length
+
+        self.central_offset = offset
+        self.central_size = sum(
+            _CENTRAL_HEADER.size + len(member['name']) +
+            (_CENTRAL_ZIP64_EXTRA.size if member['zip64'] else 0)
+            for member in self.members
         )
+        self._pieces.append((offset, self.central_size, 'central', None))
+        offset += self.central_size
 
-        while True:
-            chunk = process.stdout.read(STREAM_CHUNK_SIZE)
-            if not chunk:
-                break
-            yield chunk
-
-        process.wait()
-        if process.returncode != 0:
-            stderr = process.stderr.read().decode()
-            logger.error("zip command failed: %s", stderr)
-    except FileNotFoundError:
-        logger.error("zip command not found - install with: sudo apt install zip")
-    except Exception as exc:
-        logger.error("Error streaming ZIP: %s", exc)
+        self.zip64_end = (
+            len(self.members) >= 0xFFFF or
+            self.central_offset >= ZIP64_LIMIT or
+            self.central_size >= ZIP64_LIMIT
+        )
+        end_length = _END_RECORD.size
+        if self.zip64_end:
+            end_length += _END_RECORD64.size + _END_LOCATOR64.size
+        self._pieces.append((offset, end_length, 'end', None))
+        self.total_size = offset + end_length
+
+        digest = hashlib.md5()
+        for member in self.members:
+            digest.update(b'%s\0%d\0%r\0' % (member['name'], member['size'], member['mtime']))
+        self.etag = f'"zip-{digest.hexdigest()[:16]}"'
+
+    def iter_segments(self, start: int = 0, end: Optional[int] = None) -> Iterator[Segment]:
+        """Yield archive bytes in [start, end] as bytes or (path, offset, count).
+
+        File segments are only produced for member data whose CRC is already
+        known; a member streamed whole for the first time is read here so its
+        CRC can be recorded on the way through. New CRCs are saved in batches
+        and when the iteration ends or is closed.
+        """
+        if end is None:
+            end = self.total_size - 1
+        try:
+            for offset, length, kind, index in self._pieces:
+                if length == 0 or offset + length <= start:
+                    continue
+                if offset > end:
+                    break
+                lo = max(start, offset) - offset
+                hi = min(end + 1, offset + length) - offset
 
+                if kind != 'data':
+                    yield self._piece_bytes(kind, index)[lo:hi]
+                    continue
 
-def stream_zip_from_temp_file(file_paths: List[str], folder_path: str):
-    """Create a ZIP in a temp file and then stream it."""
-    zip_path = None
-    try:
-        fd, zip_path = tempfile.mkstemp(suffix='.zip')
-        os.close(fd)
-
-        if platform.system() != 'Windows':
-            try:
-                os.unlink(zip_path)
-                cmd = ['zip', '-0', '-q', '-j', zip_path]
-                cmd.extend(file_paths)
-
-                result = subprocess.run(
-                    cmd,
-                    cwd=folder_path,
-                    capture_output=True,
-                    timeout=600,
-                )
-
-                if result.returncode != 0:
-                    logger.error("zip command failed: %s", result.stderr.decode())
-                    return
-            except Exception as exc:
-                logger.error("System zip to file failed: %s", exc)
-                return
+                member = self.members[index]
+                if member['crc'] is None and lo == 0 and hi == length:
+                    yield from self._read_member(member, compute_crc=True)
+                else:
+                    yield member['path'], lo, hi - lo
+        finally:
+            self.flush_crcs()
+
+    def flush_crcs(self) -> None:
+        """Save CRCs computed since the last flush."""
+        unsaved, self._unsaved_crcs = self._unsaved_crcs, []
+        save_crc32s(unsaved)
+
+    def iter_bytes(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield archive bytes in [start, end], reading file segments in chunks."""
+        for segment in self.iter_segments(start, end):
+            if isinstance(segment, bytes):
+                if segment:
+                    yield segment
+                continue
+            path, offset, count = segment
+            yield from self._read_range(path, offset, count)
+
+    def _piece_bytes(self, kind: str, index: Optional[int]) -> bytes:
+        if kind == 'local':
+            return self._local_header(self.members[index])
+        if kind == 'descriptor':
+            member = self.members[index]
+            crc = self._ensure_crc(member)
+            if member['zip64']:
+                return _DESCRIPTOR64.pack(0x08074b50, crc, member['size'], member['size'])
+            return _DESCRIPTOR.pack(0x08074b50, crc, member['size'], member['size'])
+        if kind == 'central':
+            if self._central is None:
+                self._central = b''.join(self._central_header(member) for member in self.members)
+            return self._central
+        return self._end_records()
+
+    def _local_header(self, member: Dict) -> bytes:
+        dos_time, dos_date = _dos_datetime(member['mtime'])
+        if member['zip64']:
+            extra = _LOCAL_ZIP64_EXTRA.pack(0x0001, 16, member['size'], member['size'])
+            size_field = ZIP64_LIMIT
         else:
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as zip_file:
-                for file_path in file_paths:
-                    if os.path.exists(file_path):
-                        zip_file.write(file_path, os.path.basename(file_path))
-
-        if os.path.exists(zip_path):
-            with open(zip_path, 'rb') as handle:
-                while True:
-                    chunk = handle.read(STREAM_CHUNK_SIZE)
-                    if not chunk:
-                        break
-                    yield chunk
-    except Exception as exc:
-        logger.error("Temp file ZIP error: %s", exc)
-    finally:
-        if zip_path:
-            try:
-                os.unlink(zip_path)
-            except OSError:
+            extra = b''
+            size_field = member['size']
+        return _LOCAL_HEADER.pack(
+            0x04034b50, 45 if member['zip64'] else 20, ZIP_FLAGS, 0,
+            dos_time, dos_date, 0, size_field, size_field,
+            len(member['name']), len(extra),
+        ) + member['name'] + extra
+
+    def _central_header(self, member: Dict) -> bytes:
+        dos_time, dos_date = _dos_datetime(member['mtime'])
+        crc = self._ensure_crc(member)
+        if member['zip64']:
+            extra = _CENTRAL_ZIP64_EXTRA.pack(
+                0x0001, 24, member['size'], member['size'], member['header_offset'],
+            )
+            size_field = offset_field = ZIP64_LIMIT
+        else:
+            extra = b''
+            size_field = member['size']
+            offset_field = member['header_offset']
+        return _CENTRAL_HEADER.pack(
+            0x02014b50, ZIP_MADE_BY, 45 if member['zip64'] else 20, ZIP_FLAGS, 0,
+            dos_time, dos_date, crc, size_field, size_field,
+            len(member['name']), len(extra), 0, 0, 0, ZIP_EXTERNAL_ATTR, offset_field,
+        ) + member['name'] + extra
+
+    def _end_records(self) -> bytes:
+        count = len(self.members)
+        if not self.zip64_end:
+            return _END_RECORD.pack(
+                0x06054b50, 0, 0, count, count, self.central_size, self.central_offset, 0,
+            )
+        end64_offset = self.central_offset + self.central_size
+        return (
+            _END_RECORD64.pack(
+                0x06064b50, _END_RECORD64.size - 12, ZIP_MADE_BY, 45, 0, 0,
+                count, count, self.central_size, self.central_offset,
+            ) +
+            _END_LOCATOR64.pack(0x07064b50, 0, end64_offset, 1) +
+            _END_RECORD.pack(
+                0x06054b50, 0, 0,
+                min(count, 0xFFFF), min(count, 0xFFFF),
+                min(self.central_size, ZIP64_LIMIT), min(self.central_offset, ZIP64_LIMIT), 0,
+            )
+        )
+
+    def _ensure_crc(self, member: Dict) -> int:
+        if member['crc'] is None:
+            for _ in self._read_member(member, compute_crc=True):
                 pass
+        return member['crc']
+
+    def _read_member(self, member: Dict, *, compute_crc: bool) -> Iterator[bytes]:
+        crc = 0
+        remaining = member['size']
+        with open(member['path'], 'rb') as handle:
+            while remaining > 0:
+                chunk = handle.read(min(STREAM_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if compute_crc:
+                    crc = zlib.crc32(chunk, crc)
+                remaining -= len(chunk)
+                yield chunk
+        if remaining:
+            # The layout promised these bytes; a short file would corrupt it.
+            raise OSError(f"{member['path']} changed size while archiving")
+        if compute_crc:
+            member['crc'] = crc
+            self._unsaved_crcs.append((member['path'], member['size'], member['mtime'], crc))
+            if len(self._unsaved_crcs) >= CRC_SAVE_BATCH_SIZE:
+                self.flush_crcs()
+
+    @staticmethod
+    def _read_range(path: str, offset: int, count: int) -> Iterator[bytes]:
+        with open(path, 'rb') as handle:
+            handle.seek(offset)
+            while count > 0:
+                chunk = handle.read(min(STREAM_CHUNK_SIZE, count))
+                if not chunk:
+                    raise OSError(f"{path} changed size while archiving")
+                count -= len(chunk)
+                yield chunk
+
+
+class ZipStreamBody:
+    """WSGI body for one byte range of a :class:`ZipStreamPlan`.
+
+    Iterating yields bytes for any server. ``sendfile_segments`` is picked up
+    by ``gunicorn_worker.SendfileWebSocketHandler``, which writes the
+    header bytes itself and pushes member data with ``os.sendfile``.
+    """
+
+    throttle = None
+    deadline = None
+
+    def __init__(self, plan: ZipStreamPlan, start: int, end: int, *, use_sendfile: bool = True):
+        self.plan = plan
+        self.start = start
+        self.end = end
+        self.use_sendfile = use_sendfile
+
+    def __iter__(self):
+        try:
+            yield from self.plan.iter_bytes(self.start, self.end)
+        except OSError as exc:
+            logger.error("ZIP stream aborted: %s", exc)
+
+    def sendfile_segments(self):
+        """Yield bytes or (fd, offset, count) for each piece of the range."""
+        if not self.use_sendfile:
+            yield from self
+            return
+        try:
+            for segment in self.plan.iter_segments(self.start, self.end):
+                if isinstance(segment, bytes):
+                    yield segment
+                    continue
+                path, offset, count = segment
+                with open(path, 'rb') as handle:
+                    yield handle.fileno(), offset, count
+        except OSError as exc:
+            logger.error("ZIP stream aborted: %s", exc)
+
 
+def build_zip_plan(file_list: List[Tuple[str, str]]) -> Optional[ZipStreamPlan]:
+    """Stat managed files and return the archive layout, or None if none remain."""
+    files = []
+    for file_path, arcname in file_list:
+        if not _is_managed_storage_path(file_path):
+            continue
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        if not os.path.isfile(file_path):
+            continue
+        files.append((file_path, arcname, stat.st_size, stat.st_mtime))
 
-def _stream_zip_windows_fallback(file_paths: List[str], folder_path: str):
-    """Windows fallback using temp-file ZIP creation."""
-    yield from stream_zip_from_temp_file(file_paths, folder_path)
+    if not files:
+        return None
+    return ZipStreamPlan(files)
+
+
+def build_zip_response(plan: ZipStreamPlan, zip_filename: str, headers: Optional[Dict] = None):
+    """Return a ZIP download response honoring Range and If-Range."""
+    from flask import Response, request
+    from app.services.streaming.streaming_service import parse_range_header
+
+    total = plan.total_size
+    start, end, range_status = parse_range_header(request.headers.get('Range'), total)
+    if range_status == 'invalid':
+        return Response(
+            'Range Not Satisfiable',
+            status=416,
+            headers={'Content-Range': f'bytes */{total}'},
+        )
+
+    if_range = request.headers.get('If-Range', '')
+    if range_status is True and if_range and if_range != plan.etag:
+        start, end, range_status = 0, total - 1, False
+
+    response_headers = {
+        'Content-Disposition': f'attachment; filename="{zip_filename}"',
+        'Content-Length': str(end - start + 1),
+        'Accept-Ranges': 'bytes',
+        'ETag': plan.etag,
+        'Cache-Control': 'no-cache',
+    }
+    if range_status is True:
+        response_headers['Content-Range'] = f'bytes {start}-{end}/{total}'
+    if headers:
+        response_headers.update(headers)
+
+    body = ZipStreamBody(
+        plan,
+        start,
+        end,
+        use_sendfile=bool(get_runtime_config_value('STREAM_USE_SENDFILE', True)),
+    )
+    return Response(
+        body,
+        status=206 if range_status is True else 200,
+        mimetype='application/zip',
+        headers=response_headers,
+        direct_passthrough=True,
+    )
 
 
 def stream_folder_zip(folder_path: str):
-    """Stream a folder as a ZIP, choosing pipe or temp-file mode by size."""
+    """Stream a folder as a ZIP."""
     if not _is_managed_storage_path(folder_path):
         return
     if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
         return
 
-    files_list = get_folder_file_list(folder_path)
-    if not files_list:
+    plan = build_zip_plan([
+        (file_path, arcname) for file_path, arcname, _ in get_folder_file_list(folder_path)
+    ])
+    if plan is None:
         return
 
-    file_paths = [file_path for file_path, _, _ in files_list]
-    total_size = sum(size for _, _, size in files_list)
-
-    if total_size < PIPE_SIZE_LIMIT:
-        logger.info("ZIP streaming via pipe (%s)", _storage_io().format_bytes(total_size))
-        yield from stream_zip_from_pipe(file_paths, folder_path)
-        return
-
-    logger.info("ZIP streaming via temp file (%s)", _storage_io().format_bytes(total_size))
-    yield from stream_zip_from_temp_file(file_paths, folder_path)
+    logger.info("ZIP streaming %s", _storage_io().format_bytes(plan.total_size))
+    yield from ZipStreamBody(plan, 0, plan.total_size - 1)
 
 
 def get_max_zip_part_size() -> int:
@@ -261,102 +564,23 @@ def stream_folder_zip_part(folder_path: str, part_num: int, total_parts: int):
     if part_num < 1 or part_num > len(parts):
         return
 
-    files_to_zip = parts[part_num - 1]
-    file_paths = [file_path for file_path, _, _ in files_to_zip]
-    part_size = sum(size for _, _, size in files_to_zip)
-
-    if part_size < PIPE_SIZE_LIMIT:
-        yield from stream_zip_from_pipe(file_paths, folder_path)
-        return
-
-    yield from stream_zip_from_temp_file(file_paths, folder_path)
+    plan = build_zip_plan([(file_path, arcname) for file_path, arcname, _ in parts[part_num - 1]])
+    if plan is not None:
+        yield from ZipStreamBody(plan, 0, plan.total_size - 1)
 
 
 def stream_zip_from_file_list(file_list: List[Tuple[str, str]]):
     """Stream a ZIP for an arbitrary list of files."""
-    if not file_list:
-        return
-
-    total_size = 0
-    valid_files = []
-    for file_path, arcname in file_list:
-        if not _is_managed_storage_path(file_path):
-            continue
-        if not os.path.isfile(file_path):
-            continue
-        try:
-            total_size += os.path.getsize(file_path)
-            valid_files.append((file_path, arcname))
-        except OSError:
-            pass
-
-    if not valid_files:
-        return
-
-    if total_size < PIPE_SIZE_LIMIT:
-        logger.info(
-            "Gallery ZIP streaming via pipe (%s, %s files)",
-            _storage_io().format_bytes(total_size),
-            len(valid_files),
-        )
-        yield from _stream_zip_file_list_pipe(valid_files)
+    plan = build_zip_plan(file_list) if file_list else None
+    if plan is None:
         return
 
     logger.info(
-        "Gallery ZIP streaming via temp file (%s, %s files)",
-        _storage_io().format_bytes(total_size),
-        len(valid_files),
+        "Gallery ZIP streaming %s (%s files)",
+        _storage_io().format_bytes(plan.total_size),
+        len(plan.members),
     )
-    yield from _stream_zip_file_list_temp(valid_files)
-
-
-def _stream_zip_file_list_pipe(file_list: List[Tuple[str, str]]):
-    """Stream a smaller file list ZIP from memory."""
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_STORED) as zip_file:
-        for file_path, arcname in file_list:
-            try:
-                zip_file.write(file_path, arcname)
-            except Exception as exc:
-                logger.warning("Error adding %s to zip: %s", file_path, exc)
-
-    zip_buffer.seek(0)
-    while True:
-        chunk = zip_buffer.read(STREAM_CHUNK_SIZE)
-        if not chunk:
-            break
-        yield chunk
-
-
-def _stream_zip_file_list_temp(file_list: List[Tuple[str, str]]):
-    """Stream a larger file list ZIP from a temp file."""
-    zip_path = None
-    try:
-        fd, zip_path = tempfile.mkstemp(suffix='.zip')
-        os.close(fd)
-
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as zip_file:
-            for file_path, arcname in file_list:
-                try:
-                    zip_file.write(file_path, arcname)
-                except Exception as exc:
-                    logger.warning("Error adding %s to zip: %s", file_path, exc)
-
-        if os.path.exists(zip_path):
-            with open(zip_path, 'rb') as handle:
-                while True:
-                    chunk = handle.read(STREAM_CHUNK_SIZE)
-                    if not chunk:
-                        break
-                    yield chunk
-    except Exception as exc:
-        logger.error("Temp file ZIP error: %s", exc)
-    finally:
-        if zip_path:
-            try:
-                os.unlink(zip_path)
-            except OSError:
-                pass
+    yield from ZipStreamBody(plan, 0, plan.total_size - 1)
 
 
 def stream_file_direct(file_path: str):
@@ -149,6 +149,10 @@ def delete_file(file_path: str) -> Tuple[bool, str]:
 
         storage_io_service.get_file_io_pool().spawn(os.remove, file_path).get()
 
+        from app.utils.cache_utils import invalidate_cached_path
+
+        invalidate_cached_path(file_path)
+
         try:
             from specter import bus
             from app.constants import BUS_EVENTS
@@ -219,6 +223,10 @@ def rename_file(file_path: str, new_name: str) -> Tuple[bool, str, Optional[str]
 
         storage_io_service.get_file_io_pool().spawn(os.rename, file_path, new_path).get()
 
+        from app.utils.cache_utils import invalidate_cached_path
+
+        invalidate_cached_path(file_path, new_path)
+
         try:
             from specter import bus
             from app.constants import BUS_EVENTS
@@ -1,5 +1,6 @@
 """Chunked upload session lifecycle for storage uploads. Built on Specter."""
 
+import errno
 import hashlib
 import logging
 import os
@@ -31,6 +32,154 @@ logger = logging.getLogger(__name__)
 
 CHUNK_UPLOAD_TIMEOUT = 3600
 CLEANUP_INTERVAL = 3600
+CHUNK_WRITE_BLOCK_SIZE = 1024 * 1024
+FINALIZE_SENDFILE_BLOCK_SIZE = 64 * 1024 * 1024
+_COPY_RANGE_FALLBACK_ERRNOS = frozenset(
+    code for code in (
+        errno.EXDEV,
+        errno.ENOSYS,
+        errno.EINVAL,
+        errno.EOPNOTSUPP,
+        getattr(errno, 'ENOTSUP', None),
+    )
+    if code is not None
+)
+
+
+def _open_staging_file(temp_path: str, total_size: int, preallocate: bool = False) -> int:
+    """Create the staging file and return a descriptor held for the session.
+
+    With ``preallocate`` the file is reserved at ``total_size`` up front so a
+    full tmpfs fails the init instead of a chunk halfway through. Drive
+    staging skips it: on FAT/exFAT glibc emulates fallocate by writing zeros.
+    """
+    fd = os.open(temp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+    if preallocate and total_size > 0 and hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(fd, 0, total_size)
+        except OSError as exc:
+            logger.debug("Preallocation skipped for %s: %s", temp_path, exc)
+    return fd
+
+
+def _write_chunk_at(fd: int, offset: int, chunk_data) -> int:
+    """Write chunk bytes or a readable stream at ``offset`` with ``os.pwrite``.
+
+    Streams are copied through one reusable block buffer so a chunk is never
+    held in memory as a whole. Returns the number of bytes written.
+    """
+    if not hasattr(chunk_data, 'read'):
+        view = memoryview(chunk_data)
+        written = 0
+        while written < len(view):
+            written += os.pwrite(fd, view[written:], offset + written)
+        return written
+
+    if hasattr(chunk_data, 'seek'):
+        chunk_data.seek(0)
+    buffer = bytearray(CHUNK_WRITE_BLOCK_SIZE)
+    view = memoryview(buffer)
+    readinto = getattr(chunk_data, 'readinto', None)
+    written = 0
+    while True:
+        if readinto is not None:
+            count = readinto(buffer)
+        else:
+            block = chunk_data.read(CHUNK_WRITE_BLOCK_SIZE)
+            count = len(block)
+            view[:count] = block
+        if not count:
+            return written
+        position = 0
+        while position < count:
+            position += os.pwrite(fd, view[position:count], offset + written + position)
+        written += count
+
+
+def _close_staging_fd(upload: Dict) -> None:
+    """Close a session's staging descriptor unless chunk writes still use it.
+
+    Callers hold ``upload_lock``. When writes are in flight the close is
+    deferred to the last writer.
+    """
+    if upload.get('writing_chunks'):
+        upload['close_pending'] = True
+        return
+    fd = upload.pop('fd', None)
+    if fd is not None:
+        try:
+            os.close(fd)
+        except OSError as exc:
+            logger.debug("Could not close staging file %s: %s", upload.get('temp_path'), exc)
+
+
+def _copy_staged_bytes(src_fd: int, dst_fd: int, size: int) -> int:
+    """Copy ``size`` bytes between descriptors without a userspace buffer.
+
+    Uses ``copy_file_range`` (reflink/server-side copy where the filesystem
+    supports it) and falls back to ``sendfile`` when the kernel refuses the
+    cross-filesystem range copy. Returns the number of bytes copied.
+    """
+    copied = 0
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while copied < size:
+                count = os.copy_file_range(src_fd, dst_fd, size - copied, copied, copied)
+                if not count:
+                    break
+                copied += count
+            return copied
+        except OSError as exc:
+            if copied or exc.errno not in _COPY_RANGE_FALLBACK_ERRNOS:
+                raise
+
+    while copied < size:
+        count = os.sendfile(
+            dst_fd,
+            src_fd,
+            copied,
+            min(size - copied, FINALIZE_SENDFILE_BLOCK_SIZE),
+        )
+        if not count:
+            break
+        copied += count
+    return copied
+
+
+def _move_staged_file(fd: Optional[int], temp_path: str, target_path: str) -> int:
+    """Move a finished staging file into place and return its size.
+
+    Same-filesystem staging is a plain ``os.rename``. RAM staging (or a drive
+    other than the target) is copied kernel-side from the session descriptor
+    and the staging file is removed afterwards.
+    """
+    try:
+        os.rename(temp_path, target_path)
+        return os.path.getsize(target_path)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+
+    src_fd = fd if fd is not None else os.open(temp_path, os.O_RDONLY)
+    try:
+        size = os.fstat(src_fd).st_size
+        dst_fd = os.open(target_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            copied = _copy_staged_bytes(src_fd, dst_fd, size)
+        except BaseException:
+            os.close(dst_fd)
+            os.unlink(target_path)
+            raise
+        os.close(dst_fd)
+    finally:
+        if fd is None:
+            os.close(src_fd)
+
+    if copied != size:
+        os.unlink(target_path)
+        raise OSError(errno.EIO, f"Short copy finalizing upload ({copied} of {size} bytes)")
+    os.unlink(temp_path)
+    return size
 
 
 class UploadSessionRuntimeService(Service):
@@ -220,6 +369,9 @@ class UploadSessionRuntimeService(Service):
                 temp_path = os.path.join(temp_dir, f"{upload_id}.tmp")
 
             os.makedirs(temp_dir, exist_ok=True)
+            fd = get_file_io_pool().spawn(
+                _open_staging_file, temp_path, total_size, use_ram,
+            ).get()
 
             with self.upload_lock:
                 self.active_uploads[upload_id] = {
@@ -231,11 +383,13 @@ class UploadSessionRuntimeService(Service):
                     'total_size': total_size,
                     'chunk_size': chunk_size,
                     'received_chunks': set(),
+                    'writing_chunks': set(),
                     'bytes_received': 0,
+                    'bytes_end': 0,
                     'last_activity': time.time(),
+                    'fd': fd,
                 }
 
-            open(temp_path, 'wb').close()
             logger.info(
                 "Initialized chunked upload %s: %s (%s chunks, %s)",
                 upload_id,
@@ -271,32 +425,34 @@ class UploadSessionRuntimeService(Service):
                         'complete': len(upload['received_chunks']) == upload['total_chunks'],
                     }
 
+                if chunk_index in upload['writing_chunks']:
+                    return False, "Chunk already in progress", None
+
+                upload['writing_chunks'].add(chunk_index)
                 upload['last_activity'] = time.time()
-                temp_path = upload['temp_path']
+                fd = upload['fd']
                 expected_chunk_size = upload['chunk_size']
 
-            actual_chunk_size = chunk_size if chunk_size is not None else len(chunk_data)
             offset = chunk_index * expected_chunk_size
-
-            def _write_chunk_async():
-                if hasattr(chunk_data, 'read'):
-                    if hasattr(chunk_data, 'seek'):
-                        chunk_data.seek(0)
-                    data_to_write = chunk_data.read()
-                else:
-                    data_to_write = chunk_data
-
-                with open(temp_path, 'r+b') as handle:
-                    handle.seek(offset)
-                    handle.write(data_to_write)
-                    handle.flush()
-
-            get_file_io_pool().spawn(_write_chunk_async).get()
+            # Chunks of one upload write concurrently; pwrite needs no shared
+            # file position, so only the bookkeeping above is serialized.
+            try:
+                written = get_file_io_pool().spawn(
+                    _write_chunk_at, fd, offset, chunk_data,
+                ).get()
+            finally:
+                with self.upload_lock:
+                    upload['writing_chunks'].discard(chunk_index)
+                    if upload.get('close_pending'):
+                        _close_staging_fd(upload)
             gevent.sleep(0)
 
             with self.upload_lock:
+                if upload.get('close_pending'):
+                    return False, "Upload session not found or expired", None
                 upload['received_chunks'].add(chunk_index)
-                upload['bytes_received'] += actual_chunk_size
+                upload['bytes_received'] += chunk_size if chunk_size is not None else written
+                upload['bytes_end'] = max(upload['bytes_end'], offset + written)
                 chunks_done = len(upload['received_chunks'])
                 total = upload['total_chunks']
                 progress = chunks_done / total * 100
@@ -323,7 +479,12 @@ class UploadSessionRuntimeService(Service):
             return False, str(exc), None
 
     def finalize_chunked_upload(self, upload_id: str) -> Tuple[bool, str]:
-        """Finalize a completed chunked upload by moving it into place."""
+        """Finalize a completed chunked upload by moving it into place.
+
+        The staging descriptor stays with the session until the move
+        succeeds. If the move fails the session is dropped and its staging
+        file removed, so later requests get a clean "not found".
+        """
         try:
             with self.upload_lock:
                 if upload_id not in self.active_uploads:
@@ -333,10 +494,14 @@ class UploadSessionRuntimeService(Service):
                 target_path = upload['target_path']
                 filename = upload['filename']
                 drive_path = upload.get('drive_path', '')
+                fd = upload.get('fd')
+                bytes_end = upload.get('bytes_end', 0)
 
             def _move_file_async():
-                shutil.move(temp_path, target_path)
-                actual_size = os.path.getsize(target_path)
+                if fd is not None and os.fstat(fd).st_size > bytes_end:
+                    # Drop preallocated space past the last written byte.
+                    os.ftruncate(fd, bytes_end)
+                actual_size = _move_staged_file(fd, temp_path, target_path)
                 logger.info(
                     "Finalized chunked upload %s: %s (%s)",
                     upload_id,
@@ -345,13 +510,17 @@ class UploadSessionRuntimeService(Service):
                 )
                 return actual_size
 
-            get_file_io_pool().spawn(_move_file_async).get()
+            try:
+                get_file_io_pool().spawn(_move_file_async).get()
+            except Exception:
+                self._drop_failed_upload(upload_id)
+                raise
             gevent.sleep(0)
-            _auto_hide_if_parent_hidden(target_path, drive_path)
 
             with self.upload_lock:
-                if upload_id in self.active_uploads:
-                    del self.active_uploads[upload_id]
+                self.active_uploads.pop(upload_id, None)
+                _close_staging_fd(upload)
+            _auto_hide_if_parent_hidden(target_path, drive_path)
 
             category_dir = os.path.dirname(target_path)
             category_id = None
@@ -383,6 +552,19 @@ class UploadSessionRuntimeService(Service):
             logger.error("Error finalizing upload %s: %s", upload_id, exc)
             return False, str(exc)
 
+    def _drop_failed_upload(self, upload_id: str) -> None:
+        """Forget a session whose finalize failed and remove its staging file."""
+        with self.upload_lock:
+            upload = self.active_uploads.pop(upload_id, None)
+            if upload is None:
+                return
+            _close_staging_fd(upload)
+        try:
+            if os.path.exists(upload['temp_path']):
+                os.remove(upload['temp_path'])
+        except OSError as exc:
+            logger.warning("Could not remove staging file %s: %s", upload['temp_path'], exc)
+
     def cancel_chunked_upload(self, upload_id: str) -> Tuple[bool, str]:
         """Cancel an in-progress chunked upload and clean up temp files."""
         try:
@@ -390,6 +572,7 @@ class UploadSessionRuntimeService(Service):
                 if upload_id not in self.active_uploads:
                     return False, "Upload session not found"
                 upload = self.active_uploads.pop(upload_id)
+                _close_staging_fd(upload)
 
             if os.path.exists(upload['temp_path']):
                 os.remove(upload['temp_path'])
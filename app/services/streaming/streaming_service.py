@@ -83,6 +83,9 @@ ULTRA_FAST_CHUNK_SIZE = 16 * 1024  # 16KB for immediate response
 SLEEP_EVERY_N_CHUNKS = 4  # Sleep every 4 chunks (~1MB for 256KB chunks)
 SLEEP_EVERY_N_BYTES = 1 * 1024 * 1024  # Or every 1MB, whichever comes first
 
+# Block size handed to os.sendfile per call when the server supports it
+SENDFILE_BLOCK_SIZE = 1024 * 1024
+
 # Socket error handling
 SOCKET_ERRORS = (ConnectionError, ConnectionResetError, ConnectionAbortedError,
                 BrokenPipeError, socket.timeout, socket.error)
@@ -146,6 +149,48 @@ def enable_readahead(file_obj, file_size, offset=0):
         logger.debug(f"Failed to enable readahead: {e}")
         return False
 
+def _open_sendfile_body(filepath, file_size, offset, client_ip):
+    """
+    Open a ``wsgi.file_wrapper`` body so the server can stream with sendfile.
+
+    Only the production worker (gunicorn_worker.SendfileWebSocketWorker)
+    provides a wrapper that transmits via ``os.sendfile``; other servers, and
+    Tailscale clients that need small low-jitter chunks, get None and fall
+    back to the generator path. Download rate limits and the stream duration
+    cap are applied per sendfile block through the wrapper's hooks.
+
+    Returns:
+        File wrapper positioned at ``offset``, or None
+    """
+    file_wrapper = request.environ.get('wsgi.file_wrapper')
+    if file_wrapper is None or not hasattr(file_wrapper, 'throttle'):
+        return None
+    if not get_runtime_config_value('STREAM_USE_SENDFILE', True):
+        return None
+    if is_tailscale_connection(client_ip):
+        return None
+
+    try:
+        f = open(filepath, 'rb')
+    except Exception as e:
+        logger.error(f"Error opening file {filepath}: {e}")
+        return None
+
+    try:
+        enable_readahead(f, file_size, offset=offset)
+        f.seek(offset)
+        body = file_wrapper(f, SENDFILE_BLOCK_SIZE)
+    except Exception as e:
+        f.close()
+        logger.debug(f"Sendfile body unavailable for {filepath}: {e}")
+        return None
+
+    body.throttle = rate_limit_service.create_download_throttle(client_ip)
+    max_duration, _ = _get_stream_limits()
+    if max_duration > 0:
+        body.deadline = time.time() + max_duration
+    return body
+
 def _set_common_response_headers(response, filepath, mime_type, file_size, etag, is_video, is_range_request=False, range_start=None, range_end=None):
     """Helper function to set common headers for streaming responses."""
     response.headers['Content-Length'] = file_size if not is_range_request else (range_end - range_start + 1)
@@ -343,6 +388,17 @@ def stream_video_file(filepath, mime_type, file_size, etag=None):
 
     # Capture client IP BEFORE generator starts (while in request context)
     client_ip = request.remote_addr
+    status_code = 206 if is_range_request else 200
+
+    # Hand the file to the server for sendfile when it supports it
+    sendfile_body = _open_sendfile_body(filepath, file_size, start_byte, client_ip)
+    if sendfile_body is not None:
+        return Response(
+            sendfile_body,
+            status=status_code,
+            headers=headers,
+            direct_passthrough=True
+        )
 
     # Define the generator function for streaming
     def generate():
@@ -368,6 +424,9 @@ def stream_video_file(filepath, mime_type, file_size, etag=None):
                 # Track timeout (reusable object to reduce GC pressure)
                 timeout_obj = gevent.Timeout(read_timeout)
 
+                # Paces this stream against the download limits
+                throttle = rate_limit_service.create_download_throttle(client_ip)
+
                 # Stream the file in chunks
                 try:
                     while bytes_to_send > 0:
@@ -395,13 +454,11 @@ def stream_video_file(filepath, mime_type, file_size, etag=None):
                         if not chunk:
                             break
 
-                        # Rate limiting check - throttle if limit exceeded
-                        # Loopback requests (kiosk) are exempted in rate_limit_service.
-                        # Bounded retry: sleep once and continue to avoid stalling
-                        # the stream with repeated 50ms busy-wait loops that cause
-                        # playback jitter.
-                        if not rate_limit_service.check_download_limit(client_ip, len(chunk)):
-                            gevent.sleep(0.1)
+                        # Rate limiting: sleeps only as long as the buckets
+                        # need to refill. Loopback requests (kiosk) are exempt.
+                        if throttle.wait(len(chunk)) > 0:
+                            chunks_since_sleep = 0
+                            bytes_since_sleep = 0
 
                         # Update counters
                         bytes_sent += len(chunk)
@@ -435,7 +492,6 @@ def stream_video_file(filepath, mime_type, file_size, etag=None):
             logger.debug(traceback.format_exc())
     
     # Create and return the streaming response
-    status_code = 206 if is_range_request else 200
     return Response(
         generate(),
         status=status_code,
@@ -615,9 +671,12 @@ def serve_large_file_non_blocking(filepath, mime_type, file_size, etag, is_video
             except (OSError, Exception):
                 pass
     
-    # Create streaming response
+    # Create streaming response (sendfile body when the server supports it)
+    sendfile_body = _open_sendfile_body(
+        filepath, file_size, range_start if is_range_request else 0, client_ip
+    )
     response = Response(
-        generate(),
+        sendfile_body if sendfile_body is not None else generate(),
         mimetype=mime_type, # Initial mimetype
         direct_passthrough=True
     )
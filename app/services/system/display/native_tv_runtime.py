@@ -31,6 +31,22 @@ def check_dependencies():
 MPV_IPC_PATH = "/tmp/mpv-socket"
 SERVER_URL = "http://127.0.0.1:5000"
 
+# mpv pushes changes to these via observe_property; reads use the local mirror.
+# time-pos is not observed (it changes every frame); position is extrapolated
+# from the last sync and re-read after seeks or every POSITION_RESYNC_INTERVAL.
+# core-idle is true whenever playback is not advancing (pause, seek or a
+# paused-for-cache buffering stall), so the estimate freezes while it is set.
+OBSERVED_MPV_PROPERTIES = ("duration", "pause", "idle-active", "seeking", "core-idle")
+POSITION_RESYNC_INTERVAL = 10.0
+# tv_report_state cadence while playing, and heartbeat when nothing changes
+STATE_REPORT_INTERVAL = 1.0
+STATE_REPORT_HEARTBEAT = 5.0
+# Faster cadence right after a cast starts so the UI picks up the TV quickly
+STATE_REPORT_STARTUP_WINDOW = 5.0
+STATE_REPORT_STARTUP_INTERVAL = 0.5
+# Bursts of property changes (load, seek) are folded into one emit
+STATE_REPORT_COALESCE = 0.1
+
 # Dynamically determine the logo path relative to the script installation
 def get_base_dir():
     try:
@@ -133,6 +149,9 @@ class MPVController:
         self._response_futures = {} # ID -> Event() + Data
         self._dispatcher_thread = None
         self.on_event = None # Callback for mpv events
+        self.on_property_change = None # Callback(name, value) for observed properties
+        self._properties = {} # Mirror of observed mpv properties
+        self._observing = False
         
         log_immediate("MPVController: Cleaning up stale instances...")
         try:
@@ -450,6 +469,7 @@ class MPVController:
                         log_immediate(f"Socket found after {i*0.1:.1f}s")
                         if self._connect_socket():
                             self._start_dispatcher()
+                            self.observe_properties()
                             return True
                     if self.process.poll() is not None:
                         log_immediate(f"MPV process died immediately with code {self.process.poll()}")
@@ -611,10 +631,32 @@ class MPVController:
             if future:
                 future['data'] = msg
                 future['event'].set()
+        elif msg.get('event') == 'property-change':
+            name = msg.get('name')
+            value = msg.get('data')
+            with self._lock:
+                self._properties[name] = value
+                self._observing = True
+            if self.on_property_change:
+                self.on_property_change(name, value)
         elif 'event' in msg:
             if self.on_event:
                 self.on_event(msg['event'], msg)
 
+    def observe_properties(self, names=OBSERVED_MPV_PROPERTIES):
+        """Ask mpv to push changes for ``names`` instead of being polled."""
+        for observe_id, name in enumerate(names, start=1):
+            self.send_command(["observe_property", observe_id, name], async_cmd=True)
+
+    def is_observing(self) -> bool:
+        """True once mpv has pushed at least one observed property."""
+        return self._observing
+
+    def get_observed(self, prop: str):
+        """Return the last pushed value of an observed property (no IPC)."""
+        with self._lock:
+            return self._properties.get(prop)
+
     def send_command(self, cmd: list, async_cmd=False):
         if not self._running or not self.socket: return None
         
@@ -661,6 +703,9 @@ class MPVController:
     def stop(self):
         log_immediate("Stopping MPVController")
         self._running = False
+        with self._lock:
+            self._properties.clear()
+            self._observing = False
         if self.socket:
             try: self.socket.close()
             except Exception: pass
@@ -785,6 +830,7 @@ class GhostHubRuntime:
         self.mpv = MPVController(MPV_IPC_PATH)
         log_immediate("GhostHubRuntime: MPVController initialized")
         self.mpv.on_event = self._handle_mpv_event
+        self.mpv.on_property_change = self._handle_mpv_property
         self.running = True
         self.mode = "IDLE"
         
@@ -800,7 +846,12 @@ class GhostHubRuntime:
         self.estimated_time = 0.0
         self.estimated_wallclock = 0.0
         self.estimated_paused = False
+        self.estimated_stalled = False
+        self._position_synced_at = 0.0 # 0 forces a time-pos read on next report
         self._playback_attempt_id = 0
+        self._report_wakeup = threading.Event()
+        self._report_urgent = False
+        self._report_reason = "progress"
         
         self._setup_handlers()
 
@@ -827,40 +878,85 @@ class GhostHubRuntime:
                 return False
         return bool(value)
 
-    def _emit_state_snapshot(self, reason: str = "snapshot"):
+    def _read_playback_state(self):
+        """Return (time, duration, paused, idle_active) from the property mirror.
+
+        Falls back to get_property round-trips only if mpv never pushed an
+        observed property (observe_property unsupported or not yet started).
+        """
+        mpv = self.mpv
+        if mpv.is_observing():
+            d = self._coerce_float(mpv.get_observed("duration"))
+            p = self._coerce_bool(mpv.get_observed("pause"))
+            idle_raw = mpv.get_observed("idle-active")
+            t = None if self._coerce_bool(idle_raw) else self._synced_position()
+        else:
+            t = self._coerce_float(mpv.get_property("time-pos"))
+            if t is None:
+                t = self._coerce_float(mpv.get_property("playback-time"))
+            d = self._coerce_float(mpv.get_property("duration"))
+            if d is None:
+                d = self._coerce_float(mpv.get_property("file-duration"))
+            p = self._coerce_bool(mpv.get_property("pause"))
+            idle_raw = mpv.get_property("idle-active") if t is None else None
+        idle_active = None if idle_raw is None else self._coerce_bool(idle_raw)
+        return t, d, p, idle_active
+
+    def _synced_position(self):
+        """Extrapolated position, re-read from mpv after seeks or periodically."""
+        now = time.time()
+        if now - self._position_synced_at < POSITION_RESYNC_INTERVAL:
+            return self._estimated_position(now)
+        t = self._coerce_float(self.mpv.get_property("time-pos"))
+        if t is None:
+            return None
+        self.estimated_time = t
+        self.estimated_wallclock = now
+        self._position_synced_at = now
+        return t
+
+    def _estimated_position(self, now: float) -> float:
+        if self.estimated_paused or self.estimated_stalled:
+            return self.estimated_time
+        return self.estimated_time + max(0.0, now - self.estimated_wallclock)
+
+    def _report_state(self, reason: str, force: bool = False):
+        """Emit tv_report_state from the mirror when something worth reporting changed."""
         if not self.sio.connected or self.mode != "CASTING":
             return
         try:
-            t = self._coerce_float(self.mpv.get_property("time-pos"))
-            if t is None:
-                t = self._coerce_float(self.mpv.get_property("playback-time"))
-            d = self._coerce_float(self.mpv.get_property("duration"))
-            if d is None:
-                d = self._coerce_float(self.mpv.get_property("file-duration"))
-            p_raw = self.mpv.get_property("pause")
-            p = self._coerce_bool(p_raw)
-
+            t, d, p, idle_active = self._read_playback_state()
+            now = time.time()
             if t is None:
-                idle_raw = self.mpv.get_property("idle-active")
-                idle_active = None if idle_raw is None else self._coerce_bool(idle_raw)
                 if idle_active is True:
                     # MPV is idle, so there is no authoritative playback position.
                     return
-                now = time.time()
-                if not self.estimated_paused:
-                    t = self.estimated_time + max(0.0, now - self.estimated_wallclock)
-                else:
-                    t = self.estimated_time
+                # Fallback: estimate time progression if MPV doesn't report time
+                t = self._estimated_position(now)
 
-            if t is None:
-                return
-
-            now = time.time()
             # Keep the fallback clock aligned to mpv when we have real data.
             self.estimated_time = float(t)
             self.estimated_wallclock = now
             self.estimated_paused = p
 
+            should_emit = force
+            if self.last_reported_time < 0:
+                should_emit = True
+            elif abs(float(t) - self.last_reported_time) > 0.8:
+                should_emit = True
+            elif self.last_reported_pause is None or p != self.last_reported_pause:
+                should_emit = True
+            elif now - self.last_reported_emit_time > STATE_REPORT_HEARTBEAT:
+                should_emit = True
+            elif (
+                self.cast_start_time and
+                (now - self.cast_start_time) < STATE_REPORT_STARTUP_WINDOW and
+                (now - self.last_reported_emit_time) > STATE_REPORT_STARTUP_INTERVAL
+            ):
+                should_emit = True
+            if not should_emit:
+                return
+
             self.sio.emit('tv_report_state', {
                 'currentTime': t,
                 'duration': d,
@@ -869,22 +965,75 @@ class GhostHubRuntime:
             self.last_reported_time = float(t)
             self.last_reported_pause = p
             self.last_reported_emit_time = now
-            log_immediate(f"State snapshot emitted ({reason}): t={t}, d={d}, p={p}")
+            if force:
+                log_immediate(f"State snapshot emitted ({reason}): t={t}, d={d}, p={p}")
         except Exception as e:
-            log_immediate(f"State snapshot error ({reason}): {e}")
+            log_immediate(f"State report error ({reason}): {e}")
 
-    def _burst_state_reports(self):
-        # Emit quick state snapshots right after cast starts
-        for _ in range(10):
-            if not self.running or self.mode != "CASTING":
-                return
-            self._emit_state_snapshot("burst")
-            time.sleep(0.5)
+    def _emit_state_snapshot(self, reason: str = "snapshot"):
+        self._report_state(reason, force=True)
+
+    def _request_state_report(self, reason: str, urgent: bool = False):
+        """Wake the reporter; requests arriving together become one emit."""
+        self._report_reason = reason
+        if urgent:
+            self._report_urgent = True
+        self._report_wakeup.set()
+
+    def _handle_mpv_property(self, name, value):
+        """Track pushed mpv properties and decide whether a report is due."""
+        if self.mode != "CASTING":
+            return
+        if name == "pause":
+            paused = self._coerce_bool(value)
+            if paused != self.estimated_paused:
+                now = time.time()
+                self.estimated_time = self._estimated_position(now)
+                self.estimated_wallclock = now
+                self.estimated_paused = paused
+            self._position_synced_at = 0.0
+            self._request_state_report("pause", urgent=True)
+        elif name == "seeking":
+            if not self._coerce_bool(value):
+                self._position_synced_at = 0.0
+                self._request_state_report("seek", urgent=True)
+        elif name == "core-idle":
+            stalled = self._coerce_bool(value)
+            if stalled != self.estimated_stalled:
+                now = time.time()
+                self.estimated_time = self._estimated_position(now)
+                self.estimated_wallclock = now
+                self.estimated_stalled = stalled
+            # Re-read time-pos on both edges of a buffering stall.
+            self._position_synced_at = 0.0
+            self._request_state_report("buffering")
+        elif name in ("duration", "idle-active"):
+            self._position_synced_at = 0.0
+            self._request_state_report(name, urgent=True)
+
+    def _state_reporter_loop(self):
+        log_immediate("State reporter thread started")
+        while self.running:
+            now = time.time()
+            timeout = STATE_REPORT_INTERVAL
+            if self.cast_start_time and (now - self.cast_start_time) < STATE_REPORT_STARTUP_WINDOW:
+                timeout = STATE_REPORT_STARTUP_INTERVAL
+            if self._report_wakeup.wait(timeout=timeout):
+                time.sleep(STATE_REPORT_COALESCE)
+                self._report_wakeup.clear()
+            urgent, self._report_urgent = self._report_urgent, False
+            reason, self._report_reason = self._report_reason, "progress"
+            self._report_state(reason, force=urgent)
 
     def _handle_mpv_event(self, event, data):
         if event == "file-loaded":
             log_immediate("Media loaded - resetting geometry")
             self.mpv.reset_video_geometry()
+        elif event in ("seek", "playback-restart"):
+            # Any seek, however small, invalidates the extrapolated position.
+            self._position_synced_at = 0.0
+            if event == "playback-restart" and self.mode == "CASTING":
+                self._request_state_report("seek", urgent=True)
 
     def _setup_handlers(self):
         @self.sio.on('connect')
@@ -922,6 +1071,8 @@ class GhostHubRuntime:
             self.estimated_time = float(start_time) if start_time is not None else 0.0
             self.estimated_wallclock = time.time()
             self.estimated_paused = False
+            self.estimated_stalled = False
+            self._position_synced_at = 0.0
             
             # BULLSEYE FIX: Handle subtitle URL before playing video
             subtitle_url = data.get('subtitle_url')
@@ -958,9 +1109,6 @@ class GhostHubRuntime:
                 daemon=True
             ).start()
 
-            # Burst state reports for first few seconds to ensure UI updates immediately
-            threading.Thread(target=self._burst_state_reports, daemon=True).start()
-
         @self.sio.on('tv_playback_control')
         def on_playback_control(data):
             if self.mode != "CASTING": return
@@ -987,10 +1135,9 @@ class GhostHubRuntime:
                 self.mpv.send_command(["set_property", "time-pos", seek_t], async_cmd=True)
                 self.estimated_time = seek_t
                 self.estimated_wallclock = time.time()
-            # Force a quick state snapshot so clients reflect TV immediately
-            timer = threading.Timer(0.25, self._emit_state_snapshot, args=(f"control:{action}",))
-            timer.daemon = True
-            timer.start()
+            # Force a quick state snapshot so clients reflect TV immediately;
+            # the property pushes that follow the command report the result.
+            self._request_state_report(f"control:{action}", urgent=True)
 
         @self.sio.on('tv_request_state')
         def on_request_state(data=None):
@@ -1033,62 +1180,7 @@ class GhostHubRuntime:
         self.mpv.stop_playback()
         log_immediate("Screen cleared. Starting state reporter...")
         
-        def reporter():
-            log_immediate("State reporter thread started")
-            while self.running:
-                try:
-                    if self.sio.connected and self.mode == "CASTING":
-                        t = self._coerce_float(self.mpv.get_property("time-pos"))
-                        if t is None:
-                            t = self._coerce_float(self.mpv.get_property("playback-time"))
-                        d = self._coerce_float(self.mpv.get_property("duration"))
-                        if d is None:
-                            d = self._coerce_float(self.mpv.get_property("file-duration"))
-                        p = self._coerce_bool(self.mpv.get_property("pause"))
-
-                        now = time.time()
-                        if t is None:
-                            # Fallback: estimate time progression if MPV doesn't report time
-                            idle_raw = self.mpv.get_property("idle-active")
-                            idle_active = None if idle_raw is None else self._coerce_bool(idle_raw)
-                            if idle_active is not True:
-                                if not self.estimated_paused:
-                                    t = self.estimated_time + max(0.0, now - self.estimated_wallclock)
-                                else:
-                                    t = self.estimated_time
-
-                        if t is not None:
-                            # Keep the fallback clock aligned to mpv when we have real data.
-                            self.estimated_time = float(t)
-                            self.estimated_wallclock = now
-                            self.estimated_paused = p
-
-                            should_emit = False
-                            if self.last_reported_time < 0:
-                                should_emit = True
-                            elif abs(float(t) - self.last_reported_time) > 0.8:
-                                should_emit = True
-                            elif self.last_reported_pause is None or p != self.last_reported_pause:
-                                should_emit = True
-                            elif now - self.last_reported_emit_time > 5.0:
-                                should_emit = True
-                            elif self.cast_start_time and (now - self.cast_start_time) < 5.0 and (now - self.last_reported_emit_time) > 0.5:
-                                should_emit = True
-
-                            if should_emit:
-                                self.sio.emit('tv_report_state', {
-                                    'currentTime': t,
-                                    'duration': d,
-                                    'paused': p
-                                })
-                                self.last_reported_time = float(t)
-                                self.last_reported_pause = p
-                                self.last_reported_emit_time = now
-                except Exception as e: 
-                    log_immediate(f"Reporter error: {e}")
-                time.sleep(1)
-        
-        threading.Thread(target=reporter, name="tv-state-reporter", daemon=True).start()
+        threading.Thread(target=self._state_reporter_loop, name="tv-state-reporter", daemon=True).start()
         
         while self.running:
             try:
@@ -1114,21 +1206,13 @@ class GhostHubRuntime:
             time.sleep(1.0 + retry * 0.8)
 
             try:
-                idle_active = self.mpv.get_property("idle-active")
-                playback_time = self._coerce_float(self.mpv.get_property("time-pos"))
-                if playback_time is None:
-                    playback_time = self._coerce_float(self.mpv.get_property("playback-time"))
-                duration = self._coerce_float(self.mpv.get_property("duration"))
+                playback_time, duration, _, idle_active_bool = self._read_playback_state()
             except Exception:
-                idle_active = None
+                idle_active_bool = None
                 playback_time = None
                 duration = None
 
             started = False
-            idle_active_bool = None
-            if idle_active is not None:
-                idle_active_bool = self._coerce_bool(idle_active)
-
             if idle_active_bool is False:
                 started = True
             elif playback_time is not None:
@@ -7,10 +7,11 @@ Connection-aware: Ethernet gets higher limits than AP/WiFi.
 """
 import time
 import logging
-from typing import Dict, Optional, Tuple
-from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Tuple
 import ipaddress
 
+import gevent
 # Use gevent locks instead of threading.Lock to avoid greenlet assertion warnings
 # when called from streaming generators. gevent.lock.BoundedSemaphore(1) is
 # equivalent to threading.Lock but greenlet-aware.
@@ -31,14 +32,32 @@ def _update_rate_limit_runtime(mutator):
     """Mutate rate-limit runtime state atomically."""
     return rate_limit_runtime_store.update(mutator)
 
+
+# Streams prepay this many chunks' worth of tokens per bucket visit...
+RATE_LIMIT_RESERVE_CHUNKS = 4
+# ...but never more than this much of the slowest applicable rate.
+RATE_LIMIT_MAX_RESERVE_SECONDS = 0.25
+# Client buckets idle for this long are dropped by the periodic sweep.
+RATE_LIMIT_CLIENT_IDLE_SECONDS = 300
+
+# Hot-path reference to the store-owned limiter (see _get_rate_limiter).
+_rate_limiter = None
+
 # ============== Token Bucket Rate Limiter ==============
 
 class TokenBucket:
     """
     Token bucket algorithm for rate limiting.
     Allows bursts while enforcing average rate limits.
+
+    Buckets are only touched from greenlets and no method yields, so each
+    call is atomic with respect to other streams without taking a lock.
+    Refill uses the monotonic clock so wall-clock jumps (NTP sync on a Pi
+    without an RTC) cannot drain or overfill a bucket.
     """
 
+    __slots__ = ('capacity', 'refill_rate', 'tokens', 'last_refill')
+
     def __init__(self, capacity: float, refill_rate: float):
         """
         Initialize token bucket.
@@ -50,8 +69,7 @@ class TokenBucket:
         self.capacity = capacity
         self.refill_rate = refill_rate
         self.tokens = capacity
-        self.last_refill = time.time()
-        self.lock = BoundedSemaphore(1)  # gevent-aware lock
+        self.last_refill = time.monotonic()
 
     def consume(self, tokens: float) -> bool:
         """
@@ -63,17 +81,32 @@ class TokenBucket:
         Returns:
             True if tokens consumed, False if rate limit exceeded
         """
-        with self.lock:
-            self._refill()
+        self._refill()
 
-            if tokens <= self.tokens:
-                self.tokens -= tokens
-                return True
-            return False
+        if tokens <= self.tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def reserve(self, tokens: float) -> float:
+        """
+        Take tokens unconditionally, borrowing against future refill.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            Seconds until the bucket is out of debt (0.0 if it never was)
+        """
+        self._refill()
+        self.tokens -= tokens
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.refill_rate
 
     def _refill(self):
         """Refill tokens based on elapsed time."""
-        now = time.time()
+        now = time.monotonic()
         elapsed = now - self.last_refill
 
         # Add tokens based on refill rate
@@ -91,14 +124,13 @@ class TokenBucket:
         Returns:
             Estimated wait time in seconds
         """
-        with self.lock:
-            self._refill()
+        self._refill()
 
-            if tokens <= self.tokens:
-                return 0.0
+        if tokens <= self.tokens:
+            return 0.0
 
-            deficit = tokens - self.tokens
-            return deficit / self.refill_rate
+        deficit = tokens - self.tokens
+        return deficit / self.refill_rate
 
 
 # ============== Global Rate Limiter ==============
@@ -109,11 +141,13 @@ class RateLimiter:
     """
 
     def __init__(self):
-        self.client_buckets: Dict[str, Dict[str, TokenBucket]] = defaultdict(dict)
+        # client_ip -> {operation: TokenBucket}; built once per client with
+        # every limited operation, or empty for exempt (loopback/unlimited) clients.
+        self.client_buckets: Dict[str, Dict[str, TokenBucket]] = {}
         self.global_buckets: Dict[str, TokenBucket] = {}
-        self.lock = BoundedSemaphore(1)  # gevent-aware lock
+        self.lock = BoundedSemaphore(1)  # gevent-aware lock for limit changes and sweeps
         self.cleanup_interval = 300  # Clean up stale clients every 5 minutes
-        self.last_cleanup = time.time()
+        self.last_cleanup = time.monotonic()
         self.per_client_limits = {}  # Initialize to empty to avoid AttributeError if used before init_limits
 
     def init_limits(self, upload_per_client_mbps: float, upload_global_mbps: float,
@@ -155,6 +189,9 @@ class RateLimiter:
             if download_per_client_bps > 0:
                 self.per_client_limits['download'] = (download_per_client_bps * 10, download_per_client_bps)
 
+            # Rebuild client buckets lazily under the new limits.
+            self.client_buckets = {}
+
         logger.info(
             f"Rate limiter initialized: "
             f"Upload={upload_per_client_mbps}Mbps/client, {upload_global_mbps}Mbps global | "
@@ -174,76 +211,96 @@ class RateLimiter:
             True if allowed, False if rate limited
         """
         # Loopback traffic (kiosk on the same Pi using localhost) should never be throttled.
-        try:
-            if client_ip and ipaddress.ip_address(client_ip).is_loopback:
-                return True
-        except ValueError:
-            pass
+        if _is_loopback_client(client_ip):
+            return True
 
         # Periodically cleanup stale clients
         self._maybe_cleanup()
 
         # Check global limit first
-        with self.lock:
-            global_bucket = self.global_buckets.get(operation)
+        global_bucket = self.global_buckets.get(operation)
         if global_bucket and not global_bucket.consume(bytes_count):
-            logger.warning(f"Global {operation} rate limit exceeded")
+            logger.warning("Global %s rate limit exceeded", operation)
             return False
 
         # Check per-client limit
-        client_bucket = self._get_client_bucket(client_ip, operation)
+        client_bucket = self._get_client_buckets(client_ip).get(operation)
         if client_bucket and not client_bucket.consume(bytes_count):
-            logger.debug(f"Client {client_ip} {operation} rate limit exceeded")
+            logger.debug("Client %s %s rate limit exceeded", client_ip, operation)
             return False
 
         return True
 
-    def _get_client_bucket(self, client_ip: str, operation: str) -> Optional[TokenBucket]:
-        """Get or create token bucket for client, applying connection-type multiplier."""
-        with self.lock:
-            if operation not in self.per_client_limits:
-                return None
-
-            if operation not in self.client_buckets[client_ip]:
-                base_capacity, base_refill_rate = self.per_client_limits[operation]
-
-                # Apply connection-type multiplier
-                multiplier = _get_rate_limit_multiplier(client_ip)
-                if multiplier == 0.0:
-                    # Multiplier of 0 means no limit for this connection type
-                    return None
+    def reserve(self, client_ip: str, operation: str, bytes_count: int,
+                prepay_bytes: int = 0) -> Tuple[float, int]:
+        """
+        Take tokens from the global and client buckets without rejecting.
 
-                capacity = base_capacity * multiplier
-                refill_rate = base_refill_rate * multiplier
+        Buckets may go into debt; the caller sleeps the returned wait time
+        instead of retrying. ``prepay_bytes`` extra tokens are taken in the
+        same visit (capped at RATE_LIMIT_MAX_RESERVE_SECONDS of the slowest
+        bucket) so a stream can spend them without touching the buckets.
 
-                self.client_buckets[client_ip][operation] = TokenBucket(
-                    capacity=capacity,
-                    refill_rate=refill_rate
-                )
+        Returns:
+            (wait_seconds, reserved_bytes); reserved_bytes includes the prepaid
+            tokens and equals bytes_count when no limit applies.
+        """
+        if _is_loopback_client(client_ip):
+            return 0.0, bytes_count
+        self._maybe_cleanup()
 
+        buckets = [
+            bucket for bucket in (
+                self.global_buckets.get(operation),
+                self._get_client_buckets(client_ip).get(operation),
+            )
+            if bucket is not None
+        ]
+        if not buckets:
+            return 0.0, bytes_count
+
+        slowest_rate = min(bucket.refill_rate for bucket in buckets)
+        reserved = bytes_count + int(min(prepay_bytes, slowest_rate * RATE_LIMIT_MAX_RESERVE_SECONDS))
+        wait = max(bucket.reserve(reserved) for bucket in buckets)
+        return wait, reserved
+
+    def _get_client_buckets(self, client_ip: str) -> Dict[str, TokenBucket]:
+        """Return the client's buckets, creating all of them on first sight."""
+        buckets = self.client_buckets.get(client_ip)
+        if buckets is not None:
+            return buckets
+
+        buckets = {}
+        if self.per_client_limits:
+            # Apply connection-type multiplier (may yield on interface detection).
+            multiplier = _get_rate_limit_multiplier(client_ip)
+            # Multiplier of 0 means no limit for this connection type
+            if multiplier != 0.0:
+                for operation, (base_capacity, base_refill_rate) in self.per_client_limits.items():
+                    buckets[operation] = TokenBucket(
+                        capacity=base_capacity * multiplier,
+                        refill_rate=base_refill_rate * multiplier,
+                    )
                 if multiplier != 1.0:
-                    logger.debug(f"Client {client_ip} gets {multiplier}x rate limit ({refill_rate / 1024 / 1024:.1f} Mbps)")
+                    logger.debug("Client %s gets %sx rate limit", client_ip, multiplier)
 
-            return self.client_buckets[client_ip][operation]
+        return self.client_buckets.setdefault(client_ip, buckets)
 
     def _maybe_cleanup(self):
         """Clean up stale client buckets to prevent memory leak."""
-        now = time.time()
+        now = time.monotonic()
         if now - self.last_cleanup < self.cleanup_interval:
             return
 
         with self.lock:
             # Remove clients with no recent activity (5 min idle)
-            stale_threshold = now - 300
-            stale_clients = []
-            for client_ip, buckets in self.client_buckets.items():
+            stale_threshold = now - RATE_LIMIT_CLIENT_IDLE_SECONDS
+            stale_clients = [
+                client_ip
+                for client_ip, buckets in self.client_buckets.items()
                 # Stale if all buckets haven't been accessed recently
-                all_idle = all(
-                    bucket.last_refill < stale_threshold
-                    for bucket in buckets.values()
-                )
-                if all_idle:
-                    stale_clients.append(client_ip)
+                if all(bucket.last_refill < stale_threshold for bucket in buckets.values())
+            ]
 
             for client_ip in stale_clients:
                 del self.client_buckets[client_ip]
@@ -251,7 +308,7 @@ class RateLimiter:
             self.last_cleanup = now
 
             if stale_clients:
-                logger.debug(f"Cleaned up {len(stale_clients)} stale client rate limiters")
+                logger.debug("Cleaned up %s stale client rate limiters", len(stale_clients))
 
     def get_stats(self) -> Dict:
         """Get rate limiter statistics."""
@@ -263,21 +320,72 @@ class RateLimiter:
             }
 
 
+class StreamThrottle:
+    """
+    Per-stream pacing for chunked transfers.
+
+    Tokens for several chunks are reserved per bucket visit and spent locally,
+    and when the buckets are in debt the stream sleeps exactly the wait time
+    instead of polling check_limit.
+    """
+
+    __slots__ = ('client_ip', 'operation', 'credit')
+
+    def __init__(self, client_ip: str, operation: str = 'download'):
+        self.client_ip = client_ip
+        self.operation = operation
+        self.credit = 0
+
+    def wait(self, bytes_count: int) -> float:
+        """Account for ``bytes_count`` bytes, sleeping if the limits require it."""
+        if bytes_count <= self.credit:
+            self.credit -= bytes_count
+            return 0.0
+
+        needed = bytes_count - self.credit
+        wait, reserved = _get_rate_limiter().reserve(
+            self.client_ip,
+            self.operation,
+            needed,
+            prepay_bytes=bytes_count * (RATE_LIMIT_RESERVE_CHUNKS - 1),
+        )
+        self.credit = reserved - needed
+        if wait > 0:
+            gevent.sleep(wait)
+        return wait
+
+    __call__ = wait
+
+
 def _get_rate_limiter() -> RateLimiter:
     """Get or create the shared rate limiter owner."""
+    global _rate_limiter
+    if _rate_limiter is not None:
+        return _rate_limiter
+
     rate_limiter = _rate_limit_runtime_access(
         lambda state: state.get('rate_limiter')
     )
-    if rate_limiter is not None:
-        return rate_limiter
-
-    created_rate_limiter = RateLimiter()
-    _update_rate_limit_runtime(
-        lambda state: state.update({
-            'rate_limiter': state.get('rate_limiter') or created_rate_limiter,
-        })
-    )
-    return _rate_limit_runtime_access(lambda state: state.get('rate_limiter'))
+    if rate_limiter is None:
+        created_rate_limiter = RateLimiter()
+        _update_rate_limit_runtime(
+            lambda state: state.update({
+                'rate_limiter': state.get('rate_limiter') or created_rate_limiter,
+            })
+        )
+        rate_limiter = _rate_limit_runtime_access(lambda state: state.get('rate_limiter'))
+
+    _rate_limiter = rate_limiter
+    return rate_limiter
+
+
+@lru_cache(maxsize=1024)
+def _is_loopback_client(client_ip: str) -> bool:
+    """Return True for loopback addresses (parsed once per distinct IP)."""
+    try:
+        return bool(client_ip) and ipaddress.ip_address(client_ip).is_loopback
+    except ValueError:
+        return False
 
 
 def _get_rate_limit_multiplier(client_ip: str) -> float:
@@ -349,6 +457,11 @@ def check_download_limit(client_ip: str, bytes_count: int) -> bool:
     return _get_rate_limiter().check_limit(client_ip, 'download', bytes_count)
 
 
+def create_download_throttle(client_ip: str) -> StreamThrottle:
+    """Create a pacing throttle for one download stream."""
+    return StreamThrottle(client_ip, 'download')
+
+
 def get_rate_limiter_stats() -> Dict:
     """Get rate limiter statistics."""
     return _get_rate_limiter().get_stats()
@@ -433,6 +433,28 @@ def get_hardware_tier():
         return 'LITE'
 
 
+def get_database_stats():
+    """Get SQLite connection pool and writer metrics."""
+    try:
+        from app.services.core.sqlite_runtime_service import get_connection_pool_stats
+
+        return get_connection_pool_stats()
+    except Exception as e:
+        logger.debug(f"Error getting database stats: {e}")
+        return None
+
+
+def get_file_cache_stats():
+    """Get small-file and metadata cache sizes and hit/miss counters."""
+    try:
+        from app.utils.cache_utils import get_cache_stats
+
+        return get_cache_stats()
+    except Exception as e:
+        logger.debug(f"Error getting file cache stats: {e}")
+        return None
+
+
 def get_all_stats():
     """Get all system statistics."""
     is_pi = is_raspberry_pi()
@@ -452,7 +474,9 @@ def get_all_stats():
         'disks': get_disk_usage(),
         'network': get_network_info(),
         'uptime': get_uptime(),
-        'load_average': get_load_average()
+        'load_average': get_load_average(),
+        'database': get_database_stats(),
+        'file_caches': get_file_cache_stats(),
     }
     
     # Add Pi-specific info
@@ -19,6 +19,7 @@ class SystemWorkerBootService(Service):
         result = {
             'hdmi_runtime_initialized': False,
             'rate_limiter_initialized': False,
+            'static_precompress_started': False,
             'tunnel_auto_start_attempted': False,
         }
 
@@ -45,6 +46,24 @@ class SystemWorkerBootService(Service):
         except Exception as exc:
             logger.error("Failed to init rate limiter: %s", exc)
 
+        if app.config.get('PRECOMPRESS_STATIC_ASSETS', True) and app.static_folder:
+            try:
+                from app.services.storage.storage_io_service import get_file_io_pool
+                from app.utils.static_asset_utils import precompress_static_assets
+
+                static_root = app.static_folder
+
+                def _precompress_static_background():
+                    try:
+                        precompress_static_assets(static_root)
+                    except Exception as exc:
+                        logger.warning("Static asset precompression failed: %s", exc)
+
+                get_file_io_pool().spawn(_precompress_static_background)
+                result['static_precompress_started'] = True
+            except Exception as exc:
+                logger.error("Failed to start static asset precompression: %s", exc)
+
         if not app.config.get('TUNNEL_AUTO_START'):
             return result
 
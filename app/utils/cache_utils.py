@@ -8,6 +8,7 @@ Provides caching mechanisms for media files to improve performance.
 import os
 import time
 import logging
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
@@ -15,15 +16,24 @@ logger = logging.getLogger(__name__)
 # Reduced from 8MB to 4MB for Pi 4 memory optimization
 SMALL_FILE_THRESHOLD = 4 * 1024 * 1024  # 4MB
 
-# Cache of recently accessed files to speed up repeated access
-# Structure: {filepath: (last_access_time, file_data, file_size, mime_type, etag)}
-small_file_cache = {}
+# Fallback byte budgets when hardware tier detection is disabled or fails
+DEFAULT_SMALL_FILE_CACHE_BYTES = 32 * 1024 * 1024  # 32MB
+DEFAULT_METADATA_CACHE_BYTES = 256 * 1024  # 256KB
 
-# Cache of file metadata for large files (no open file descriptors)
-# Structure: {filepath: (last_access_time, file_size, mime_type, etag, mtime)}
-# Note: We cache only metadata, not file descriptors, to avoid concurrency issues.
-# The OS kernel page cache + fadvise provides the real I/O performance benefit.
-metadata_cache = {}
+# Per-tier byte budgets for the small file cache (LITE / STANDARD / PRO)
+SMALL_FILE_CACHE_BYTES_BY_TIER = {
+    'LITE': DEFAULT_SMALL_FILE_CACHE_BYTES,
+    'STANDARD': 96 * 1024 * 1024,
+    'PRO': 256 * 1024 * 1024,
+}
+METADATA_CACHE_BYTES_BY_TIER = {
+    'LITE': DEFAULT_METADATA_CACHE_BYTES,
+    'STANDARD': 1024 * 1024,
+    'PRO': 4 * 1024 * 1024,
+}
+
+# Approximate per-entry overhead (tuple, key, dict slot) charged to the budget
+CACHE_ENTRY_OVERHEAD = 200
 
 # Maximum number of metadata entries to cache
 # Metadata is cheap (just a few integers/strings per entry)
@@ -37,29 +47,234 @@ MAX_SMALL_FILE_CACHE_SIZE = 50
 # Reduced from 10 minutes to 5 minutes for Pi 4 memory optimization
 CACHE_EXPIRY = 300  # 5 minutes
 
+
+class ByteBudgetLRU:
+    """
+    Least-recently-used mapping bounded by total bytes (and optionally entries).
+
+    Values are tuples whose first element is the last access time; the cache
+    keeps keys in access order so touching and evicting are O(1) and expiry
+    sweeps stop at the first fresh entry.
+    """
+
+    def __init__(self, name, max_bytes, sizeof, max_entries=None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._sizeof = sizeof
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __getitem__(self, key):
+        return self._entries[key]
+
+    def __setitem__(self, key, value):
+        size = self._sizeof(key, value) + CACHE_ENTRY_OVERHEAD
+        if key in self._entries:
+            self._discard(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = value
+        self._sizes[key] = size
+        self.total_bytes += size
+        self._evict_to_budget()
+
+    def __delitem__(self, key):
+        if key not in self._entries:
+            raise KeyError(key)
+        self._discard(key)
+
+    def items(self):
+        return list(self._entries.items())
+
+    def clear(self):
+        self._entries.clear()
+        self._sizes.clear()
+        self.total_bytes = 0
+
+    def get(self, key):
+        """Return the entry and mark it most recently used, counting hit/miss."""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def touch(self, key, value):
+        """Replace an entry in place (same size) and mark it most recently used."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+    def expire(self, key):
+        """Drop an entry that outlived CACHE_EXPIRY or failed validation."""
+        if key in self._entries:
+            self._discard(key)
+            self.expirations += 1
+
+    def invalidate(self, key):
+        """Drop an entry whose backing file changed; returns True if present."""
+        if key not in self._entries:
+            return False
+        self._discard(key)
+        self.invalidations += 1
+        return True
+
+    def expire_older_than(self, cutoff):
+        """Drop entries last accessed before ``cutoff`` (oldest first)."""
+        expired = 0
+        while self._entries:
+            key, value = next(iter(self._entries.items()))
+            if value[0] >= cutoff:
+                break
+            self._discard(key)
+            expired += 1
+        self.expirations += expired
+        return expired
+
+    def resize(self, max_bytes):
+        """Change the byte budget, evicting LRU entries if it shrank."""
+        self.max_bytes = max_bytes
+        self._evict_to_budget()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
+
+    def _discard(self, key):
+        del self._entries[key]
+        self.total_bytes -= self._sizes.pop(key, 0)
+
+    def _evict_to_budget(self):
+        while self._entries and (
+            self.total_bytes > self.max_bytes
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            key = next(iter(self._entries))
+            self._discard(key)
+            self.evictions += 1
+
+
+def _small_file_entry_size(filepath, entry):
+    # (last_access_time, file_data, file_size, mime_type, etag)
+    return len(filepath) + len(entry[1])
+
+
+def _metadata_entry_size(filepath, entry):
+    # (last_access_time, file_size, mime_type, etag, mtime)
+    return len(filepath) + len(entry[2] or '') + len(entry[3] or '')
+
+
+# Cache of recently accessed files to speed up repeated access
+# Structure: {filepath: (last_access_time, file_data, file_size, mime_type, etag)}
+small_file_cache = ByteBudgetLRU(
+    'small_files', DEFAULT_SMALL_FILE_CACHE_BYTES, _small_file_entry_size,
+    max_entries=MAX_SMALL_FILE_CACHE_SIZE,
+)
+
+# Cache of file metadata for large files (no open file descriptors)
+# Structure: {filepath: (last_access_time, file_size, mime_type, etag, mtime)}
+# Note: We cache only metadata, not file descriptors, to avoid concurrency issues.
+# The OS kernel page cache + fadvise provides the real I/O performance benefit.
+metadata_cache = ByteBudgetLRU(
+    'metadata', DEFAULT_METADATA_CACHE_BYTES, _metadata_entry_size,
+    max_entries=MAX_METADATA_CACHE_SIZE,
+)
+
+_budgets_configured = False
+
+
+def configure_cache_budgets(tier=None):
+    """
+    Size the cache byte budgets for the hardware tier.
+
+    Args:
+        tier: 'LITE', 'STANDARD' or 'PRO'; detected when omitted. Falls back to
+              the LITE budgets when AUTO_OPTIMIZE_FOR_HARDWARE is disabled.
+    """
+    global _budgets_configured
+    _budgets_configured = True
+
+    if tier is None:
+        try:
+            from app.services.core.runtime_config_service import get_runtime_config_value
+
+            if get_runtime_config_value('AUTO_OPTIMIZE_FOR_HARDWARE', True):
+                from app.services.system.system_stats_service import get_hardware_tier
+
+                tier = get_hardware_tier()
+        except Exception as e:
+            logger.debug(f"Hardware tier unavailable for cache sizing: {e}")
+
+    small_file_cache.resize(
+        SMALL_FILE_CACHE_BYTES_BY_TIER.get(tier, DEFAULT_SMALL_FILE_CACHE_BYTES)
+    )
+    metadata_cache.resize(
+        METADATA_CACHE_BYTES_BY_TIER.get(tier, DEFAULT_METADATA_CACHE_BYTES)
+    )
+    logger.debug(
+        f"File cache budgets for tier {tier or 'default'}: "
+        f"small files {small_file_cache.max_bytes} bytes, metadata {metadata_cache.max_bytes} bytes"
+    )
+
+
+def _ensure_budgets():
+    if not _budgets_configured:
+        configure_cache_budgets()
+
+
+def get_cache_stats():
+    """Return size and hit/miss/eviction counters for the file caches."""
+    return {
+        'small_files': small_file_cache.stats(),
+        'metadata': metadata_cache.stats(),
+    }
+
+
+def invalidate_cached_path(filepath, new_path=None):
+    """
+    Drop cached data for a file that was renamed, deleted or rewritten.
+
+    Args:
+        filepath: Path that no longer holds the cached content
+        new_path: Destination path for renames (any stale entry is dropped too)
+    """
+    small_file_cache.invalidate(filepath)
+    metadata_cache.invalidate(filepath)
+    if new_path:
+        small_file_cache.invalidate(new_path)
+        metadata_cache.invalidate(new_path)
+
+
 def clean_caches():
     """Remove expired entries from file caches to prevent memory leaks."""
-    current_time = time.time()
-    
-    # Clean small file cache
-    expired_keys = [k for k, (access_time, _, _, _, _) in small_file_cache.items() 
-                   if current_time - access_time > CACHE_EXPIRY]
-    for k in expired_keys:
-        del small_file_cache[k]
-    
-    # Clean metadata cache
-    expired_metadata_keys = [k for k, (access_time, _, _, _, _) in metadata_cache.items() 
-                            if current_time - access_time > CACHE_EXPIRY]
-    for k in expired_metadata_keys:
-        del metadata_cache[k]
-    
-    # If metadata cache is still too large, remove the least recently used ones
-    if len(metadata_cache) > MAX_METADATA_CACHE_SIZE:
-        # Sort by access time (oldest first)
-        sorted_items = sorted(metadata_cache.items(), key=lambda x: x[1][0])
-        # Remove oldest entries until we're under the limit
-        for k, _ in sorted_items[:len(metadata_cache) - MAX_METADATA_CACHE_SIZE]:
-            del metadata_cache[k]
+    cutoff = time.time() - CACHE_EXPIRY
+    small_file_cache.expire_older_than(cutoff)
+    metadata_cache.expire_older_than(cutoff)
 
 def get_from_small_cache(filepath):
     """
@@ -71,24 +286,29 @@ def get_from_small_cache(filepath):
     Returns:
         Tuple of (file_data, file_size, mime_type, etag) or None if not in cache or expired
     """
-    if filepath in small_file_cache:
-        access_time, file_data, file_size, mime_type, etag = small_file_cache[filepath]
-        now = time.time()
-        # Evict expired entries on read to prevent stale data
-        if now - access_time > CACHE_EXPIRY:
-            del small_file_cache[filepath]
-            logger.debug(f"Evicted expired small file cache entry: {filepath}")
-            return None
-        # Update access time (LRU touch)
-        small_file_cache[filepath] = (now, file_data, file_size, mime_type, etag)
-        logger.debug(f"Serving small file from cache: {filepath}")
-        return file_data, file_size, mime_type, etag
-    return None
+    entry = small_file_cache.get(filepath)
+    if entry is None:
+        return None
+
+    access_time, file_data, file_size, mime_type, etag = entry
+    now = time.time()
+    # Evict expired entries on read to prevent stale data
+    if now - access_time > CACHE_EXPIRY:
+        small_file_cache.expire(filepath)
+        logger.debug(f"Evicted expired small file cache entry: {filepath}")
+        return None
+    # Update access time (LRU touch)
+    small_file_cache.touch(filepath, (now, file_data, file_size, mime_type, etag))
+    logger.debug(f"Serving small file from cache: {filepath}")
+    return file_data, file_size, mime_type, etag
 
 def add_to_small_cache(filepath, file_data, file_size, mime_type, etag):
     """
     Add a file to the small file cache.
-    
+
+    Least recently used entries are evicted once the tier's byte budget is
+    exceeded; files larger than the whole budget are not cached.
+
     Args:
         filepath: Path to the file
         file_data: Binary data of the file
@@ -96,11 +316,7 @@ def add_to_small_cache(filepath, file_data, file_size, mime_type, etag):
         mime_type: MIME type of the file
         etag: ETag for the file
     """
-    # Evict oldest entry when at capacity to prevent unbounded memory growth on LITE hardware
-    if len(small_file_cache) >= MAX_SMALL_FILE_CACHE_SIZE:
-        oldest_key = min(small_file_cache, key=lambda k: small_file_cache[k][0])
-        del small_file_cache[oldest_key]
-
+    _ensure_budgets()
     small_file_cache[filepath] = (time.time(), file_data, file_size, mime_type, etag)
     logger.debug(f"Loaded small file into cache: {filepath} ({file_size} bytes)")
 
@@ -114,26 +330,27 @@ def get_from_metadata_cache(filepath):
     Returns:
         Tuple of (file_size, mime_type, etag, mtime) or None if not in cache or invalid
     """
-    if filepath in metadata_cache:
-        access_time, file_size, mime_type, etag, cached_mtime = metadata_cache[filepath]
-        
-        # Verify the file hasn't changed by checking mtime
-        try:
-            current_mtime = os.path.getmtime(filepath)
-            if current_mtime == cached_mtime:
-                # Update access time
-                metadata_cache[filepath] = (time.time(), file_size, mime_type, etag, cached_mtime)
-                logger.debug(f"Using cached metadata for: {filepath}")
-                return file_size, mime_type, etag, cached_mtime
-            else:
-                # File has changed, invalidate cache entry
-                logger.debug(f"Cached metadata stale for {filepath}, mtime changed")
-                del metadata_cache[filepath]
-        except Exception as e:
-            logger.warning(f"Error validating cached metadata for {filepath}: {e}")
-            # Remove invalid cache entry
-            if filepath in metadata_cache:
-                del metadata_cache[filepath]
+    entry = metadata_cache.get(filepath)
+    if entry is None:
+        return None
+
+    _, file_size, mime_type, etag, cached_mtime = entry
+
+    # Verify the file hasn't changed by checking mtime
+    try:
+        current_mtime = os.path.getmtime(filepath)
+        if current_mtime == cached_mtime:
+            # Update access time
+            metadata_cache.touch(filepath, (time.time(), file_size, mime_type, etag, cached_mtime))
+            logger.debug(f"Using cached metadata for: {filepath}")
+            return file_size, mime_type, etag, cached_mtime
+        # File has changed, invalidate cache entry
+        logger.debug(f"Cached metadata stale for {filepath}, mtime changed")
+        metadata_cache.invalidate(filepath)
+    except Exception as e:
+        logger.warning(f"Error validating cached metadata for {filepath}: {e}")
+        # Remove invalid cache entry
+        metadata_cache.expire(filepath)
     return None
 
 def add_to_metadata_cache(filepath, file_size, mime_type, etag, mtime):
@@ -147,9 +364,6 @@ def add_to_metadata_cache(filepath, file_size, mime_type, etag, mtime):
         etag: ETag for the file
         mtime: File modification time
     """
-    # If cache is full, clean it first
-    if len(metadata_cache) >= MAX_METADATA_CACHE_SIZE:
-        clean_caches()
-    
+    _ensure_budgets()
     metadata_cache[filepath] = (time.time(), file_size, mime_type, etag, mtime)
     logger.debug(f"Cached metadata for: {filepath}")
@@ -1,10 +1,17 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import re
 
 class LogObfuscationFilter(logging.Filter):
     """
     A custom logging filter to obfuscate sensitive information such as
     file paths, filenames, and chat messages from log records.
+
+    Attach it to handlers rather than loggers: handler filters only run for
+    records that pass the level checks and are about to be emitted. Each
+    record is obfuscated once, however many handlers it reaches.
     """
     # Simplified and broadened path regex
     PATH_REGEX = re.compile(
@@ -16,52 +23,114 @@ class LogObfuscationFilter(logging.Filter):
     # Regex for URL paths, including query strings
     URL_PATH_REGEX = re.compile(r"(/[^?\s<>\"|*\r\n]+(\?[^?\s<>\"|*\r\n]*)?)")
 
+    # All three patterns as one alternation, tried in the same priority
+    # order (URL, then path, then filename) at each position of a single scan.
+    COMBINED_REGEX = re.compile(
+        r"(?P<url>/[^?\s<>\"|*\r\n]+(?:\?[^?\s<>\"|*\r\n]*)?)|"
+        r"(?P<path>[a-zA-Z]:\\(?:[^\\<>:\"/|?*\r\n]+\\)*[^\\<>:\"/|?*\r\n]*|"
+        r"/(?:[^/<>:\"|?*\r\n]+/)*[^/<>:\"|?*\r\n]*)|"
+        r"(?P<filename>\b[\w.-]+\.[a-zA-Z0-9]{2,5}\b)"
+    )
+
+    # Set on records that have already been through the filter.
+    OBFUSCATED_ATTR = '_ghosthub_obfuscated'
+
     def __init__(self, name=''):
         super().__init__(name)
         self.path_replacement = "[PATH_REDACTED]"
         self.filename_replacement = "[FILENAME_REDACTED]"
         self.url_path_replacement = "[URL_REDACTED]"
         self.chat_replacement = "[CHAT_MESSAGE_REDACTED]"
+        self._replacements = {
+            'url': self.url_path_replacement,
+            'path': self.path_replacement,
+            'filename': self.filename_replacement,
+        }
+
+    def _replace_match(self, match):
+        return self._replacements[match.lastgroup]
 
     def _obfuscate_paths_and_filenames(self, text_element):
         if not isinstance(text_element, str):
             return text_element
+        return self.COMBINED_REGEX.sub(self._replace_match, text_element)
 
-        # Step 1: Obfuscate URL paths first, as they are more specific for access logs.
-        obfuscated_text = self.URL_PATH_REGEX.sub(self.url_path_replacement, text_element)
-        
-        # Step 2: Obfuscate entire file system paths.
-        # This will turn "C:/path/to/file.txt" into "[PATH_REDACTED]".
-        # This might catch parts of URLs if URL_PATH_REGEX didn't match fully, or other path-like strings.
-        obfuscated_text = self.PATH_REGEX.sub(self.path_replacement, obfuscated_text)
-
-        # Step 3: Obfuscate any remaining standalone filenames.
-        obfuscated_text = self.FILENAME_REGEX.sub(self.filename_replacement, obfuscated_text)
-        
-        return obfuscated_text
+    def _is_chat_record(self, record):
+        return bool(record.name) and '.chat' in record.name
 
     def filter(self, record):
-        # Handle chat message redaction first
-        is_chat_message = False
-        if record.name and (
-            '.chat' in record.name or 
-            'streaming.chat' in record.name
+        if getattr(record, self.OBFUSCATED_ATTR, False):
+            return True
+        setattr(record, self.OBFUSCATED_ATTR, True)
+
+        # Chat runtime messages that don't look like a path or filename are
+        # assumed to be user chat and dropped entirely.
+        if (
+            self._is_chat_record(record)
+            and isinstance(record.msg, str)
+            and not self.COMBINED_REGEX.search(record.msg)
         ):
-            if isinstance(record.msg, str) and not self.PATH_REGEX.search(record.msg) and not self.FILENAME_REGEX.search(record.msg) :
-                # If it's from the chat runtime and doesn't look like a path or filename, assume it's a chat message.
-                record.msg = self.chat_replacement
-                record.args = () # Clear args for chat messages to prevent further processing
-                is_chat_message = True
-
-        # Obfuscate paths and filenames if not already processed as a chat message
-        if not is_chat_message:
-            if record.msg and isinstance(record.msg, str):
-                record.msg = self._obfuscate_paths_and_filenames(record.msg)
+            record.msg = self.chat_replacement
+            record.args = ()
+            return True
 
-            if record.args:
-                new_args = []
-                for arg in record.args:
-                    new_args.append(self._obfuscate_paths_and_filenames(arg))
-                record.args = tuple(new_args)
+        # Format once and obfuscate the final message in a single pass.
+        try:
+            message = record.getMessage()
+        except Exception:
+            # Leave mismatched format/args to the handler's own error path,
+            # but still scrub the parts.
+            if isinstance(record.msg, str):
+                record.msg = self._obfuscate_paths_and_filenames(record.msg)
+            if isinstance(record.args, tuple):
+                record.args = tuple(
+                    self._obfuscate_paths_and_filenames(arg) for arg in record.args
+                )
+            return True
 
+        record.msg = self._obfuscate_paths_and_filenames(message)
+        record.args = ()
         return True
+
+
+def create_async_log_handler(handlers, max_queue_size=10000):
+    """Route records through a queue so handler I/O and obfuscation run off the caller.
+
+    Returns ``(queue_handler, listener)``. The listener is already started and
+    is stopped at interpreter exit. Records are dropped (not blocked on) when
+    the queue is full.
+    """
+    log_queue = queue.Queue(maxsize=max_queue_size)
+    queue_handler = _DroppingQueueHandler(log_queue)
+    listener = logging.handlers.QueueListener(
+        log_queue,
+        *handlers,
+        respect_handler_level=True,
+    )
+    listener.start()
+    atexit.register(_stop_listener, listener)
+    return queue_handler, listener
+
+
+def _stop_listener(listener):
+    # QueueListener.stop() is not idempotent.
+    if listener._thread is not None:
+        listener.stop()
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller on a full queue."""
+
+    def prepare(self, record):
+        # Defer formatting and obfuscation to the listener's handlers; only
+        # snapshot exception text, which cannot cross the queue as exc_info.
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
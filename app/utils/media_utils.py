@@ -210,7 +210,6 @@ def _get_ffmpeg_cmd(media_path, output_path, size, seek_time='2'):
     Returns:
         list: Command arguments for subprocess
     """
-    width, height = size
     seek_time_str = str(int(float(seek_time)))
     
     # Optimized base command for Pi
@@ -226,36 +225,36 @@ def _get_ffmpeg_cmd(media_path, output_path, size, seek_time='2'):
         '-an',                          # No audio
     ]
     
+    return base_opts + _thumbnail_output_opts(size) + [output_path]
+
+def _thumbnail_output_opts(size):
+    """ffmpeg output options (filter, frame count, quality) for one thumbnail."""
+    width, height = size
+
     # Fast scaling filter with bilinear (much faster than default bicubic)
     scale_filter = f"scale={width}:{height}:force_original_aspect_ratio=decrease:flags=fast_bilinear"
-    
+
     # Hardware specific options
     if HW_ACCEL == 'v4l2m2m':
-        cmd = base_opts + [
+        return [
             "-c:v", "h264_v4l2m2m",
             "-vf", f"scale_v4l2m2m={width}:{height}",
             "-frames:v", "1",
             "-q:v", "5",
-            output_path
         ]
-    elif HW_ACCEL == 'mmal':
-        cmd = base_opts + [
+    if HW_ACCEL == 'mmal':
+        return [
             '-hwaccel', 'mmal',
             '-vf', scale_filter,
             '-frames:v', '1',
             '-q:v', '5',
-            output_path
         ]
-    else:
-        # Software - most common on Pi 4 and desktop
-        cmd = base_opts + [
-            "-vf", scale_filter,
-            "-frames:v", "1",
-            "-q:v", "5",                # Quality (2-31, lower=better)
-            output_path
-        ]
-
-    return cmd
+    # Software - most common on Pi 4 and desktop
+    return [
+        "-vf", scale_filter,
+        "-frames:v", "1",
+        "-q:v", "5",                # Quality (2-31, lower=better)
+    ]
 
 def get_video_duration(video_path):
     """
@@ -292,22 +291,24 @@ def get_video_duration(video_path):
         logger.warning(f"Failed to get duration for {os.path.basename(video_path)}: {e}")
         return None
 
-def _has_video_stream(video_path):
+def probe_video(video_path):
     """
-    Check if a file contains at least one video stream using ffprobe.
-    Catches stub/fake MP4s that have valid container headers but no actual
-    video data (e.g. stress-test files, corrupt downloads).
+    Probe a video once for its first video stream and duration.
+
+    Replaces separate stream-check and duration ffprobe runs with a single
+    invocation; the result is cacheable per (size, mtime).
 
     Returns:
-        bool: True if the file has a decodable video stream, False otherwise.
+        dict: {'has_video': bool, 'duration': float or None}, or None when
+        ffprobe is unavailable or errored (callers let ffmpeg try anyway).
     """
     try:
         cmd = [
             FFPROBE_CMD,
             '-v', 'error',
             '-select_streams', 'v:0',
-            '-show_entries', 'stream=codec_type',
-            '-of', 'csv=p=0',
+            '-show_entries', 'stream=codec_type:format=duration',
+            '-of', 'json',
             video_path
         ]
         result = subprocess.run(
@@ -317,12 +318,72 @@ def _has_video_stream(video_path):
             check=False,
             timeout=5
         )
-        output = result.stdout.decode('utf-8').strip()
-        return result.returncode == 0 and 'video' in output
+        if result.returncode != 0:
+            return {'has_video': False, 'duration': None}
+
+        import json
+        data = json.loads(result.stdout.decode('utf-8') or '{}')
+        has_video = any(
+            stream.get('codec_type') == 'video' for stream in data.get('streams') or []
+        )
+        try:
+            duration = float((data.get('format') or {}).get('duration'))
+        except (TypeError, ValueError):
+            duration = None
+        return {'has_video': has_video, 'duration': duration}
     except Exception as e:
-        logger.debug(f"ffprobe stream check failed for {os.path.basename(video_path)}: {e}")
-        # If ffprobe isn't available or errors out, let ffmpeg try anyway
-        return True
+        logger.debug(f"ffprobe failed for {os.path.basename(video_path)}: {e}")
+        return None
+
+
+def _thumbnail_seek_times(duration):
+    """Seek candidates (seconds) that skip intros/black frames, best first."""
+    if duration:
+        if duration > 600:      # >10 mins
+            seek_times = [min(duration * 0.15, 600), 120, 30, 5, 0]
+        elif duration > 120:    # 2-10 mins
+            seek_times = [duration * 0.20, 30, 5, 0]
+        elif duration > 30:     # 30s-2mins
+            seek_times = [duration * 0.25, 5, 0]
+        else:                   # <30s
+            seek_times = [duration * 0.10, 0]
+        return [seek_time for seek_time in seek_times if seek_time <= duration]
+    return [120, 30, 5, 0]  # Fallback if duration unknown
+
+
+def _has_enough_memory_for_ffmpeg():
+    """Check memory before starting ffmpeg (Pi optimization)."""
+    try:
+        if psutil.virtual_memory().available < 50 * 1024 * 1024:
+            gc.collect()
+            if psutil.virtual_memory().available < 25 * 1024 * 1024:
+                logger.warning("Extremely low memory, skipping thumbnail generation")
+                return False
+    except Exception:
+        pass
+    return True
+
+
+def _ensure_thumbnail_dir(thumbnail_save_path):
+    """Ensure the thumbnail directory exists with proper permissions."""
+    thumbnail_dir = os.path.dirname(thumbnail_save_path)
+    if not os.path.exists(thumbnail_dir):
+        os.makedirs(thumbnail_dir, exist_ok=True)
+        try:
+            os.chmod(thumbnail_dir, 0o777)
+        except Exception:
+            pass
+
+
+def _is_valid_thumbnail_output(thumbnail_save_path):
+    """True when ffmpeg wrote a non-empty thumbnail; fixes up permissions."""
+    if not os.path.exists(thumbnail_save_path) or os.path.getsize(thumbnail_save_path) <= 100:
+        return False
+    try:
+        os.chmod(thumbnail_save_path, 0o666)
+    except Exception:
+        pass
+    return True
 
 
 def _default_thumbnail_path(original_media_path):
@@ -420,7 +481,8 @@ def should_retry_thumbnail(thumbnail_path, media_path):
         # If marker is corrupt, retry anyway
         return True
 
-def generate_thumbnail(original_media_path, thumbnail_save_path=None, force_refresh=False, size=None):
+def generate_thumbnail(original_media_path, thumbnail_save_path=None, force_refresh=False, size=None,
+                       probe=None):
     """
     Generate a thumbnail for an image or video file using ffmpeg with hardware acceleration.
     Args:
@@ -428,6 +490,7 @@ def generate_thumbnail(original_media_path, thumbnail_save_path=None, force_refr
         thumbnail_save_path: Path to save thumbnail
         force_refresh: Redo even if exists
         size: Tuple (width, height)
+        probe: Cached probe_video() result; probed here when omitted
     """
     if size is None:
         size = THUMBNAIL_SIZE_PI
@@ -453,52 +516,24 @@ def generate_thumbnail(original_media_path, thumbnail_save_path=None, force_refr
             return False
 
     # Validate the file has a real video stream before wasting CPU on ffmpeg
-    if not _has_video_stream(original_media_path):
+    if probe is None:
+        probe = probe_video(original_media_path)
+    if probe is not None and not probe.get('has_video'):
         logger.debug(f"No video stream found, skipping thumbnail: {os.path.basename(original_media_path)}")
         _create_permanent_failure_marker(thumbnail_save_path, 'no_video_stream')
         return False
 
-    # Ensure directory exists with proper permissions
-    thumbnail_dir = os.path.dirname(thumbnail_save_path)
-    if not os.path.exists(thumbnail_dir):
-        os.makedirs(thumbnail_dir, exist_ok=True)
-        try:
-            os.chmod(thumbnail_dir, 0o777)
-        except Exception:
-            pass
-
-    # Check memory before starting (Pi optimization)
-    try:
-        if psutil.virtual_memory().available < 50 * 1024 * 1024:
-            gc.collect()
-            if psutil.virtual_memory().available < 25 * 1024 * 1024:
-                logger.warning("Extremely low memory, skipping thumbnail generation")
-                return False
-    except Exception:
-        pass
+    _ensure_thumbnail_dir(thumbnail_save_path)
+    if not _has_enough_memory_for_ffmpeg():
+        return False
 
     try:
         # Get duration for smart seeking (skips intros/black frames)
-        duration = get_video_duration(original_media_path)
-        
-        if duration:
-            if duration > 600:      # >10 mins
-                seek_times = [min(duration * 0.15, 600), 120, 30, 5, 0]
-            elif duration > 120:    # 2-10 mins
-                seek_times = [duration * 0.20, 30, 5, 0]
-            elif duration > 30:     # 30s-2mins
-                seek_times = [duration * 0.25, 5, 0]
-            else:                   # <30s
-                seek_times = [duration * 0.10, 0]
-        else:
-            seek_times = [120, 30, 5, 0] # Fallback if duration unknown
+        duration = probe.get('duration') if probe else None
+        seek_times = _thumbnail_seek_times(duration)
 
         # Try each seek time until success
         for seek_time in seek_times:
-            # Skip seek times beyond duration
-            if duration and seek_time > duration:
-                continue
-                
             cmd = _get_ffmpeg_cmd(original_media_path, thumbnail_save_path, size, seek_time)
             
             try:
@@ -511,11 +546,7 @@ def generate_thumbnail(original_media_path, thumbnail_save_path=None, force_refr
                 )
                 
                 if result.returncode == 0 and os.path.exists(thumbnail_save_path):
-                    if os.path.getsize(thumbnail_save_path) > 100: # Ensure not an empty file
-                        try:
-                            os.chmod(thumbnail_save_path, 0o666)
-                        except Exception:
-                            pass
+                    if _is_valid_thumbnail_output(thumbnail_save_path): # Ensure not an empty file
                         logger.info(f"Thumb generated for {os.path.basename(original_media_path)} at {seek_time:.1f}s")
                         return True
                     else:
@@ -562,6 +593,111 @@ def generate_thumbnail(original_media_path, thumbnail_save_path=None, force_refr
         logger.error(f"Error generating thumbnail for {original_media_path}: {str(e)}")
         return False
 
+def generate_video_thumbnails_batch(jobs, size=None):
+    """
+    Generate thumbnails for several videos with a single ffmpeg invocation.
+
+    Each input is opened with a fast seek to its best candidate frame and
+    mapped to its own output, so one process start covers the whole batch.
+    Outputs are written to temporary paths and moved into place only when
+    valid, so a failed run never passes off an existing thumbnail as fresh.
+    Files without a valid output fall back to generate_thumbnail (which
+    walks the remaining seek times and records failure markers).
+
+    Args:
+        jobs: List of dicts with 'media_path', 'thumbnail_path' and optional
+              'force_refresh' and 'probe' (a probe_video() result).
+        size: Tuple (width, height)
+
+    Returns:
+        tuple: ({thumbnail_path: bool}, ffmpeg runs: batch plus per-file fallbacks)
+    """
+    if size is None:
+        size = THUMBNAIL_SIZE_PI
+
+    results = {}
+    runnable = []
+    for job in jobs:
+        media_path = job['media_path']
+        thumbnail_path = job['thumbnail_path']
+        force_refresh = bool(job.get('force_refresh', False))
+        if not os.path.exists(media_path):
+            logger.error(f"Original media file does not exist: {media_path}")
+            results[thumbnail_path] = False
+            continue
+        if not force_refresh:
+            if os.path.exists(thumbnail_path):
+                results[thumbnail_path] = True
+                continue
+            if not should_retry_thumbnail(thumbnail_path, media_path):
+                results[thumbnail_path] = False
+                continue
+
+        probe = job.get('probe')
+        if probe is None:
+            probe = probe_video(media_path)
+        if probe is not None and not probe.get('has_video'):
+            logger.debug(f"No video stream found, skipping thumbnail: {os.path.basename(media_path)}")
+            _create_permanent_failure_marker(thumbnail_path, 'no_video_stream')
+            results[thumbnail_path] = False
+            continue
+        runnable.append((media_path, thumbnail_path, force_refresh, probe))
+
+    invocations = 0
+    if len(runnable) > 1 and _has_enough_memory_for_ffmpeg():
+        cmd = [FFMPEG_CMD, '-y']
+        outputs = []
+        for media_path, thumbnail_path, _, probe in runnable:
+            seek_time = _thumbnail_seek_times(probe.get('duration') if probe else None)[0]
+            cmd += ['-ss', str(int(float(seek_time))), '-t', '3', '-i', media_path]
+        for index, (_, thumbnail_path, _, _) in enumerate(runnable):
+            _ensure_thumbnail_dir(thumbnail_path)
+            root, ext = os.path.splitext(thumbnail_path)
+            temp_path = f"{root}.batch{ext}"
+            cmd += ['-map', f'{index}:v:0', '-an'] + _thumbnail_output_opts(size) + [temp_path]
+            outputs.append((thumbnail_path, temp_path))
+
+        invocations += 1
+        try:
+            subprocess.run(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=False,
+                timeout=PROCESS_TIMEOUT + 5 * len(runnable)
+            )
+        except subprocess.TimeoutExpired:
+            logger.warning(f"Batched ffmpeg timed out for {len(runnable)} thumbnails")
+        except Exception as e:
+            logger.warning(f"Batched ffmpeg failed for {len(runnable)} thumbnails: {e}")
+
+        for thumbnail_path, temp_path in outputs:
+            try:
+                if _is_valid_thumbnail_output(temp_path):
+                    os.replace(temp_path, thumbnail_path)
+                    results[thumbnail_path] = True
+                elif os.path.exists(temp_path):
+                    os.remove(temp_path)
+            except OSError as e:
+                logger.warning(f"Could not finalize batched thumbnail {thumbnail_path}: {e}")
+
+    for media_path, thumbnail_path, force_refresh, probe in runnable:
+        if thumbnail_path in results:
+            continue
+        invocations += 1
+        results[thumbnail_path] = generate_thumbnail(
+            media_path,
+            thumbnail_path,
+            force_refresh=True,
+            size=size,
+            probe=probe,
+        )
+
+    generated = sum(1 for _, thumbnail_path, _, _ in runnable if results.get(thumbnail_path))
+    if runnable:
+        logger.info(f"Batched thumbnails: {generated} of {len(runnable)} videos generated")
+    return results, invocations
+
 def generate_image_thumbnail(source_path, thumbnail_save_path, size=None):
     """
     Generate a thumbnail for an image file using PIL (no ffmpeg needed).
@@ -198,7 +198,7 @@ def run_server(app, port):
                     # This is standard practice for process managers.
                     args = [
                         gunicorn_path,
-                        '-k', 'geventwebsocket.gunicorn.workers.GeventWebSocketWorker', # Specify the gevent worker for SocketIO
+                        '-k', 'gunicorn_worker.SendfileWebSocketWorker', # gevent-websocket worker with sendfile file responses
                         '-w', workers,
                         '--bind', bind_address,
                         '--log-level', 'info', # Adjust log level as needed
@@ -0,0 +1,182 @@
+"""
+Precompressed static asset helpers.
+
+Writes ``.br`` and ``.gz`` siblings next to compressible files under
+``static/`` so requests can be answered from disk instead of compressing on
+the fly. Needs only the standard library and ``brotli`` (listed in
+requirements.txt) so build tooling can load this file without importing the
+app package. Without brotli only ``.gz`` siblings are written; pass
+``--require-brotli`` to fail instead.
+
+Usage:
+    python app/utils/static_asset_utils.py [--require-brotli] [STATIC_ROOT]
+"""
+
+import gzip
+import logging
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+PRECOMPRESS_SUFFIXES = (
+    '.css',
+    '.html',
+    '.js',
+    '.json',
+    '.map',
+    '.mjs',
+    '.svg',
+    '.txt',
+    '.webmanifest',
+    '.xml',
+)
+PRECOMPRESS_MIN_SIZE = 1024
+PRECOMPRESS_GZIP_LEVEL = 9
+PRECOMPRESS_BROTLI_QUALITY = 11
+PRECOMPRESS_SKIP_DIRS = {'node_modules', '__pycache__'}
+
+# Preference order when a client accepts several encodings.
+PRECOMPRESSED_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def available_encodings():
+    """Return the encodings this interpreter can precompress, best first."""
+    return tuple(
+        (encoding, suffix)
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS
+        if encoding != 'br' or brotli is not None
+    )
+
+
+def is_variant_fresh(source_stat, variant_path):
+    """Return True when a sibling was written for the source's current mtime."""
+    try:
+        return os.stat(variant_path).st_mtime_ns == source_stat.st_mtime_ns
+    except OSError:
+        return False
+
+
+def _compress(encoding, payload):
+    if encoding == 'br':
+        return brotli.compress(payload, quality=PRECOMPRESS_BROTLI_QUALITY)
+    return gzip.compress(payload, compresslevel=PRECOMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def _write_variant(variant_path, data, source_stat):
+    """Atomically write a sibling and stamp it with the source mtime."""
+    temp_path = f"{variant_path}.tmp-{os.getpid()}"
+    try:
+        with open(temp_path, 'wb') as handle:
+            handle.write(data)
+        os.utime(temp_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        os.replace(temp_path, variant_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def precompress_file(source_path, min_size=PRECOMPRESS_MIN_SIZE):
+    """Write missing or stale compressed siblings for one file.
+
+    Returns the number of siblings written.
+    """
+    source_stat = os.stat(source_path)
+    encodings = available_encodings()
+    if source_stat.st_size < min_size:
+        for _, suffix in encodings:
+            _remove_quietly(source_path + suffix)
+        return 0
+
+    stale = [
+        (encoding, source_path + suffix)
+        for encoding, suffix in encodings
+        if not is_variant_fresh(source_stat, source_path + suffix)
+    ]
+    if not stale:
+        return 0
+
+    with open(source_path, 'rb') as handle:
+        payload = handle.read()
+
+    written = 0
+    for encoding, variant_path in stale:
+        compressed = _compress(encoding, payload)
+        if len(compressed) >= len(payload):
+            _remove_quietly(variant_path)
+            continue
+        _write_variant(variant_path, compressed, source_stat)
+        written += 1
+    return written
+
+
+def precompress_static_assets(static_root, min_size=PRECOMPRESS_MIN_SIZE):
+    """Bring ``.br``/``.gz`` siblings under ``static_root`` up to date.
+
+    Unchanged files are skipped by mtime, so repeat runs only stat the tree.
+    Siblings whose source was deleted are removed.
+    """
+    stats = {'written': 0, 'files': 0, 'removed': 0, 'failed': 0}
+    if not static_root or not os.path.isdir(static_root):
+        return stats
+
+    variant_suffixes = tuple(suffix for _, suffix in PRECOMPRESSED_ENCODINGS)
+    for root, dirs, files in os.walk(static_root):
+        dirs[:] = [name for name in dirs if name not in PRECOMPRESS_SKIP_DIRS]
+        for name in files:
+            path = os.path.join(root, name)
+            if name.endswith(variant_suffixes):
+                source_path = path[:-3]
+                if source_path.endswith(PRECOMPRESS_SUFFIXES) and not os.path.exists(source_path):
+                    _remove_quietly(path)
+                    stats['removed'] += 1
+                continue
+            if not name.endswith(PRECOMPRESS_SUFFIXES):
+                continue
+
+            stats['files'] += 1
+            try:
+                stats['written'] += precompress_file(path, min_size=min_size)
+            except OSError as exc:
+                stats['failed'] += 1
+                logger.warning("Could not precompress %s: %s", path, exc)
+
+    logger.info(
+        "Precompressed static assets in %s: %s files, %s variants written, %s failed",
+        static_root,
+        stats['files'],
+        stats['written'],
+        stats['failed'],
+    )
+    return stats
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    default_root = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        'static',
+    )
+    args = sys.argv[1:]
+    if '--require-brotli' in args:
+        args.remove('--require-brotli')
+        if brotli is None:
+            logger.error("brotli is not installed; run: pip install -r requirements.txt")
+            sys.exit(1)
+    result = precompress_static_assets(args[0] if args else default_root)
+    sys.exit(1 if result['failed'] else 0)
@@ -0,0 +1,156 @@
+"""Gunicorn worker for GhostHub production deployments.
+
+Extends the gevent-websocket worker with a ``wsgi.file_wrapper`` whose
+responses are pushed to the client with ``os.sendfile`` instead of being read
+into Python bytes and written chunk by chunk. Response bodies exposing a
+``sendfile_segments()`` method (multi-file archives) get the same treatment
+per file segment. Gunicorn imports this module in the master process to
+resolve ``worker_class``, so it must not import ``app``.
+"""
+
+import os
+import socket
+import time
+
+import gevent
+from gevent.socket import wait_write
+from geventwebsocket.gunicorn.workers import GeventWebSocketWorker
+from geventwebsocket.handler import WebSocketHandler
+
+SENDFILE_BLOCK_SIZE = 1024 * 1024
+HAS_SENDFILE = hasattr(os, 'sendfile')
+
+
+class SendfileFileWrapper:
+    """PEP 3333 file wrapper the handler can transmit with ``os.sendfile``.
+
+    The body starts at the file's current position and stops after the
+    response's Content-Length, so Range responses only need to seek first.
+    ``throttle`` (called with each block's byte count) and ``deadline`` (epoch
+    seconds) let the application keep rate limits and stream caps in force.
+    """
+
+    throttle = None
+    deadline = None
+
+    def __init__(self, filelike, blksize=SENDFILE_BLOCK_SIZE):
+        self.filelike = filelike
+        self.blksize = blksize
+        if hasattr(filelike, 'close'):
+            self.close = filelike.close
+
+    def __iter__(self):
+        read = self.filelike.read
+        while True:
+            data = read(self.blksize)
+            if not data:
+                return
+            yield data
+            if self.throttle is not None:
+                self.throttle(len(data))
+
+
+class SendfileWebSocketHandler(WebSocketHandler):
+    """WebSocket-capable pywsgi handler with a zero-copy file response path."""
+
+    def get_environ(self):
+        environ = super().get_environ()
+        environ['wsgi.file_wrapper'] = SendfileFileWrapper
+        return environ
+
+    def process_result(self):
+        result = self.result
+        if isinstance(result, SendfileFileWrapper) and self._can_sendfile(result):
+            self._sendfile_result(result)
+        elif callable(getattr(result, 'sendfile_segments', None)) and self._can_sendfile_response():
+            self._sendfile_segments_result(result)
+        else:
+            super().process_result()
+
+    def _can_sendfile_response(self):
+        if not HAS_SENDFILE or self.provided_content_length is None:
+            return False
+        return self.code not in (204, 304) and not hasattr(self.socket, 'getpeercert')
+
+    def _can_sendfile(self, wrapper):
+        if not self._can_sendfile_response():
+            return False
+        try:
+            wrapper.filelike.fileno()
+        except (AttributeError, OSError, ValueError):
+            return False
+        return True
+
+    def _sendfile_result(self, wrapper):
+        # Flush the status line and headers through the normal path first.
+        self.write(b'')
+
+        remaining = int(self.provided_content_length)
+        sent = self._sendfile_range(
+            wrapper.filelike.fileno(),
+            wrapper.filelike.tell(),
+            remaining,
+            wrapper,
+        )
+        if sent < remaining:
+            # Fewer bytes than Content-Length: the connection cannot be reused.
+            self.close_connection = True
+
+    def _sendfile_segments_result(self, body):
+        """Send a body made of byte strings and (fd, offset, count) segments."""
+        self.write(b'')
+
+        remaining = int(self.provided_content_length)
+        segments = body.sendfile_segments()
+        try:
+            for segment in segments:
+                if isinstance(segment, (bytes, bytearray, memoryview)):
+                    if segment:
+                        self.write(segment)
+                        remaining -= len(segment)
+                    continue
+                in_fd, offset, count = segment
+                sent = self._sendfile_range(in_fd, offset, count, body)
+                remaining -= sent
+                if sent < count:
+                    break
+        finally:
+            segments.close()
+
+        if remaining > 0:
+            self.close_connection = True
+
+    def _sendfile_range(self, in_fd, offset, count, hooks):
+        """Push ``count`` bytes of ``in_fd`` from ``offset``; returns bytes sent."""
+        out_fd = self.socket.fileno()
+        write_timeout = self.socket.gettimeout()
+        throttle = getattr(hooks, 'throttle', None)
+        deadline = getattr(hooks, 'deadline', None)
+        blksize = getattr(hooks, 'blksize', SENDFILE_BLOCK_SIZE)
+        remaining = count
+
+        while remaining > 0:
+            if deadline is not None and time.time() > deadline:
+                break
+            try:
+                sent = os.sendfile(out_fd, in_fd, offset, min(blksize, remaining))
+            except BlockingIOError:
+                wait_write(out_fd, timeout=write_timeout, timeout_exc=socket.timeout)
+                continue
+            if sent == 0:
+                break
+
+            offset += sent
+            remaining -= sent
+            self.response_length += sent
+            if throttle is not None:
+                throttle(sent)
+            gevent.sleep(0)
+
+        return count - remaining
+
+
+class SendfileWebSocketWorker(GeventWebSocketWorker):
+    """GeventWebSocketWorker serving file responses via ``os.sendfile``."""
+
+    wsgi_handler = SendfileWebSocketHandler
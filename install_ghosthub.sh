@@ -701,7 +701,7 @@ sys.unraisablehook = _ghosthub_unraisablehook
 
 # Single worker is required for Socket.IO without Redis/sticky sessions.
 workers = 1
-worker_class = "geventwebsocket.gunicorn.workers.GeventWebSocketWorker"
+worker_class = "gunicorn_worker.SendfileWebSocketWorker"
 worker_connections = 1000
 timeout = 300
 bind = "0.0.0.0:" + str(os.getenv("PORT", 5000))
@@ -18,6 +18,7 @@ Usage:
 """
 
 import argparse
+import importlib.util
 import marshal
 import os
 import re
@@ -348,7 +349,7 @@ class GhostPack:
         self.stats = {
             "copied": 0, "minified_css": 0, "minified_js": 0,
             "compiled_py": 0, "removed_py": 0, "errors": [],
-            "orig_size": 0, "packed_size": 0
+            "orig_size": 0, "packed_size": 0, "precompressed": 0
         }
         self.dist_dir = Path(args.dist).resolve() / "Ghosthub_pi_github"
         self.zip_path = self.dist_dir.parent / f"Ghosthub_pi_github.zip"
@@ -442,6 +443,7 @@ class GhostPack:
             self._phase_prepare()
             self._phase_collect()
             self._phase_optimize()
+            self._phase_precompress()
             self._phase_compile()
             self._phase_entry_points()
             self._phase_validate()
@@ -542,6 +544,33 @@ class GhostPack:
         save = (self.stats["orig_size"] - self.stats["packed_size"]) / 1024
         self.success(f"Optimized {len(css_files)} CSS and {len(js_files)} JS files (Saved {save:.1f} KB)")
 
+    def _phase_precompress(self):
+        self.phase("Precompressing Static Assets")
+        if self.args.dry_run:
+            self.log("Dry run: skipping .br/.gz generation")
+            return
+
+        # Load by path so the build does not import the app package.
+        helper_path = PROJECT_ROOT / "app" / "utils" / "static_asset_utils.py"
+        spec = importlib.util.spec_from_file_location("ghostpack_static_assets", helper_path)
+        helper = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(helper)
+        if helper.brotli is None:
+            raise RuntimeError(
+                "brotli is not installed, so no .br static assets would be built. "
+                "Install it with: pip install -r requirements.txt"
+            )
+
+        result = helper.precompress_static_assets(str(self.dist_dir / "static"))
+        self.stats["precompressed"] = result["written"]
+        if result["failed"]:
+            self.error(f"Static precompression failed for {result['failed']} files")
+        encodings = ", ".join(encoding for encoding, _ in helper.available_encodings())
+        self.success(
+            f"Wrote {result['written']} precompressed variants ({encodings}) "
+            f"for {result['files']} static files"
+        )
+
     def _phase_compile(self):
         self.phase("Bytecode Compilation & Protection")
         tasks = []
@@ -549,7 +578,7 @@ class GhostPack:
         
         # Identity protection logic
         for p in self.dist_dir.rglob("*.py"):
-            if p.name in ("main.py", "wsgi.py", "tv_runtime.py") or "stress_tests" in p.parts:
+            if p.name in ("main.py", "wsgi.py", "tv_runtime.py", "gunicorn_worker.py") or "stress_tests" in p.parts:
                 continue
             py_files.append(p)
 
@@ -717,6 +746,7 @@ except Exception as e:
         print(f"Files Processed: {self.stats['copied']}")
         print(f"JS Minified:    {self.stats['minified_js']}")
         print(f"CSS Minified:   {self.stats['minified_css']}")
+        print(f"Precompressed:  {self.stats['precompressed']}")
         print(f"Py Compiled:    {self.stats['compiled_py']}")
         print(f"Py Removed:     {self.stats['removed_py']}")
         print(f"Asset Savings:  {CLR_GREEN}{ (self.stats['orig_size'] - self.stats['packed_size']) / 1024:.1f} KB{CLR_RESET}")
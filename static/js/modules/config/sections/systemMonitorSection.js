@@ -168,6 +168,33 @@ function updateSystemStatsDisplay(stats) {
         html += `</div>`;
     }
 
+    // SQLite pool / writer metrics
+    if (stats.database && stats.database.pool) {
+        const pool = stats.database.pool;
+        const writer = stats.database.writer;
+        html += `<div class="system-stat-group">`;
+        html += `<div class="system-stat-header">Database</div>`;
+        html += `<div class="system-stat-row">`;
+        html += `<span class="system-stat-label">Connections:</span>`;
+        html += `<span class="system-stat-value">${pool.in_use} in use / ${pool.open} open (max ${pool.size})</span>`;
+        html += `</div>`;
+        html += `<div class="system-stat-row">`;
+        html += `<span class="system-stat-label">Pool hit rate:</span>`;
+        html += `<span class="system-stat-value">${Math.round(pool.hit_rate * 100)}% of ${pool.checkouts}</span>`;
+        html += `</div>`;
+        html += `<div class="system-stat-row">`;
+        html += `<span class="system-stat-label">Waits:</span>`;
+        html += `<span class="system-stat-value ${pool.overflow > 0 ? 'yellow' : ''}">${pool.waits} (max ${pool.wait_ms_max} ms, ${pool.overflow} overflow)</span>`;
+        html += `</div>`;
+        if (writer) {
+            html += `<div class="system-stat-row">`;
+            html += `<span class="system-stat-label">Writer:</span>`;
+            html += `<span class="system-stat-value">${writer.jobs} jobs / ${writer.batches} commits, queue ${writer.queue_size}</span>`;
+            html += `</div>`;
+        }
+        html += `</div>`;
+    }
+
     // Throttle status (Pi specific)
     if (stats.throttle) {
         const t = stats.throttle;
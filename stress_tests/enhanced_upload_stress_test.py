@@ -14,11 +14,13 @@ Tests:
 - 16GB upload limit enforcement
 - Progress tracking accuracy
 - Background upload queue behavior
+- Chunk write throughput, sequential vs parallel chunks of one upload
 
 Usage:
     python3 enhanced_upload_stress_test.py --url http://localhost:5000
     python3 enhanced_upload_stress_test.py --url http://localhost:5000 --test concurrent
     python3 enhanced_upload_stress_test.py --url http://localhost:5000 --test large_file
+    python3 enhanced_upload_stress_test.py --url http://localhost:5000 --test chunk_throughput --size 200
 """
 
 import os
@@ -206,8 +208,27 @@ class EnhancedUploadStressTest:
                 pass
             raise e
 
+    def _post_chunk(self, filepath: str, upload_id: str, chunk_index: int,
+                    chunk_size: int, total_chunks: int) -> bool:
+        """Read one chunk from disk and POST it; returns True on HTTP 200"""
+        with open(filepath, 'rb') as f:
+            f.seek(chunk_index * chunk_size)
+            chunk_data = f.read(chunk_size)
+        chunk_resp = self.session.post(
+            f"{self.base_url}/api/storage/upload/chunk",
+            data={
+                'upload_id': upload_id,
+                'chunk_index': chunk_index,
+                'total_chunks': total_chunks
+            },
+            files={'chunk': chunk_data},
+            timeout=30
+        )
+        return chunk_resp.status_code == 200
+
     def _upload_file_chunked(self, filepath: str, drive_path: str, 
-                           chunk_size_mb: int = 2, simulate_drops: bool = False) -> Tuple[bool, Dict]:
+                           chunk_size_mb: int = 2, simulate_drops: bool = False,
+                           parallel_chunks: int = 1) -> Tuple[bool, Dict]:
         """Upload a file using chunked upload API"""
         try:
             file_size = os.path.getsize(filepath)
@@ -245,36 +266,56 @@ class EnhancedUploadStressTest:
             failed_chunks = 0
             start_time = time.time()
             
-            with open(filepath, 'rb') as f:
-                for chunk_index in range(total_chunks):
-                    chunk_data = f.read(chunk_size)
+            if parallel_chunks > 1:
+                # All but the last chunk go out concurrently; the last one
+                # completes the upload, so it is sent once the rest landed.
+                with ThreadPoolExecutor(max_workers=parallel_chunks) as executor:
+                    futures = [
+                        executor.submit(self._post_chunk, filepath, upload_id, i,
+                                        chunk_size, total_chunks)
+                        for i in range(total_chunks - 1)
+                    ]
+                    for future in as_completed(futures):
+                        if future.result():
+                            uploaded_chunks += 1
+                        else:
+                            failed_chunks += 1
+                if self._post_chunk(filepath, upload_id, total_chunks - 1,
+                                    chunk_size, total_chunks):
+                    uploaded_chunks += 1
+                else:
+                    failed_chunks += 1
+            else:
+                with open(filepath, 'rb') as f:
+                    for chunk_index in range(total_chunks):
+                        chunk_data = f.read(chunk_size)
                     
-                    # Simulate network drop on some chunks if requested
-                    if simulate_drops and chunk_index % 5 == 3:
-                        time.sleep(2)  # Simulate network pause
-                        continue  # Skip this chunk to test resume
+                        # Simulate network drop on some chunks if requested
+                        if simulate_drops and chunk_index % 5 == 3:
+                            time.sleep(2)  # Simulate network pause
+                            continue  # Skip this chunk to test resume
                     
-                    chunk_resp = self.session.post(
-                        f"{self.base_url}/api/storage/upload/chunk",
-                        data={
-                            'upload_id': upload_id,
-                            'chunk_index': chunk_index,
-                            'total_chunks': total_chunks
-                        },
-                        files={'chunk': chunk_data},
-                        timeout=30
-                    )
+                        chunk_resp = self.session.post(
+                            f"{self.base_url}/api/storage/upload/chunk",
+                            data={
+                                'upload_id': upload_id,
+                                'chunk_index': chunk_index,
+                                'total_chunks': total_chunks
+                            },
+                            files={'chunk': chunk_data},
+                            timeout=30
+                        )
                     
-                    if chunk_resp.status_code == 200:
-                        uploaded_chunks += 1
+                        if chunk_resp.status_code == 200:
+                            uploaded_chunks += 1
                         
-                        # Log progress every 10 chunks
-                        if (chunk_index + 1) % 10 == 0:
-                            progress = (chunk_index + 1) / total_chunks * 100
-                            self._log(f"Upload progress: {progress:.1f}% ({chunk_index + 1}/{total_chunks})")
-                    else:
-                        failed_chunks += 1
-                        self._log(f"Chunk {chunk_index} failed: {chunk_resp.status_code}", "WARN")
+                            # Log progress every 10 chunks
+                            if (chunk_index + 1) % 10 == 0:
+                                progress = (chunk_index + 1) / total_chunks * 100
+                                self._log(f"Upload progress: {progress:.1f}% ({chunk_index + 1}/{total_chunks})")
+                        else:
+                            failed_chunks += 1
+                            self._log(f"Chunk {chunk_index} failed: {chunk_resp.status_code}", "WARN")
             
             elapsed = time.time() - start_time
             
@@ -371,6 +412,78 @@ class EnhancedUploadStressTest:
             self._record_result("Large File Upload", False, {'error': str(e)})
             return False
 
+    def test_chunk_write_throughput(self, file_size_mb: int = 200, parallel_chunks: int = 4) -> bool:
+        """Compare throughput of sequential vs parallel chunks for one upload"""
+        self._log(
+            f"Testing chunk write throughput ({file_size_mb}MB, "
+            f"1 vs {parallel_chunks} chunks in flight)...",
+            "HEADER",
+        )
+
+        if not self._validate_session_password():
+            self._record_result("Chunk Write Throughput", False, {'error': 'session_password_required'})
+            return False
+
+        try:
+            drives = self._get_available_drives()
+            if not drives:
+                self._log("No drives available for test", "ERROR")
+                return False
+
+            drive_path = drives[0]
+            test_file = self._create_test_file(file_size_mb)
+            initial_memory = self._get_memory_usage()
+
+            runs = {}
+            for in_flight in (1, parallel_chunks):
+                success, result = self._upload_file_chunked(
+                    test_file, drive_path, parallel_chunks=in_flight,
+                )
+                runs[in_flight] = {
+                    'success': success,
+                    'elapsed_seconds': result.get('elapsed_seconds', 0),
+                    'throughput_mbps': result.get('throughput_mbps', 0),
+                    'error': result.get('error'),
+                }
+                status = "✓" if success else "✗"
+                self._log(
+                    f"  {in_flight} in flight: {status} "
+                    f"{runs[in_flight]['throughput_mbps']:.1f} Mbps "
+                    f"({runs[in_flight]['elapsed_seconds']:.1f}s)"
+                )
+
+            memory_growth = self._get_memory_usage()['rss_mb'] - initial_memory['rss_mb']
+
+            os.remove(test_file)
+            self.temp_files.remove(test_file)
+
+            sequential = runs[1]['throughput_mbps']
+            parallel = runs[parallel_chunks]['throughput_mbps']
+            speedup = parallel / sequential if sequential else 0.0
+            passed = all(run['success'] for run in runs.values())
+
+            self._log(f"  Parallel speedup: {speedup:.2f}x")
+            self._log(f"  Memory growth: {memory_growth:+.1f} MB")
+            if passed:
+                self._log("✓ Chunk throughput measured", "SUCCESS")
+            else:
+                self._log("✗ Chunk throughput run failed", "ERROR")
+
+            self._record_result("Chunk Write Throughput", passed, {
+                'file_size_mb': file_size_mb,
+                'parallel_chunks': parallel_chunks,
+                'sequential': runs[1],
+                'parallel': runs[parallel_chunks],
+                'speedup': speedup,
+                'memory_growth_mb': memory_growth,
+            })
+            return passed
+
+        except Exception as e:
+            self._log(f"Chunk throughput test error: {e}", "ERROR")
+            self._record_result("Chunk Write Throughput", False, {'error': str(e)})
+            return False
+
     def test_concurrent_uploads(self, num_uploads: int = 5, file_size_mb: int = 50) -> bool:
         """Test multiple concurrent uploads"""
         self._log(f"Testing concurrent uploads ({num_uploads} files, {file_size_mb}MB each)...", "HEADER")
@@ -793,11 +906,14 @@ def main():
                        help='GhostHub base URL')
     parser.add_argument('--password', help='Session password for upload operations')
     parser.add_argument('--test', default='all',
-                       choices=['all', 'large_file', 'concurrent', 'resume', 'limit_16gb', 'rate_limit'],
+                       choices=['all', 'large_file', 'concurrent', 'resume', 'limit_16gb', 'rate_limit',
+                                'chunk_throughput'],
                        help='Specific test to run')
     parser.add_argument('--output', help='Output JSON file for results')
     parser.add_argument('--size', type=int, default=500,
-                       help='File size for large file test (MB)')
+                       help='File size for large file and chunk throughput tests (MB)')
+    parser.add_argument('--parallel-chunks', type=int, default=4,
+                       help='Chunks in flight for the chunk throughput test')
     parser.add_argument('--duration', type=int, default=30,
                        help='Duration for rate limiting test (seconds)')
 
@@ -818,6 +934,8 @@ def main():
             success = tester.test_16gb_limit_enforcement()
         elif args.test == 'rate_limit':
             success = tester.test_rate_limiting(args.duration)
+        elif args.test == 'chunk_throughput':
+            success = tester.test_chunk_write_throughput(args.size, args.parallel_chunks)
         else:
             print(f"Unknown test: {args.test}")
             success = False
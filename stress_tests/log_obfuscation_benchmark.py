@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+GhostHub Log Obfuscation Benchmark
+----------------------------------
+Measures per-record cost of LogObfuscationFilter against the previous
+three-pass implementation (URL, path and filename substitutions over the
+message and every argument, applied at the root logger and again at each
+handler).
+
+Also reports caller-side cost of a logger.info() call through a synchronous
+StreamHandler versus the queue handler from create_async_log_handler.
+
+Pass --gevent to monkey-patch first, as the production workers do; the
+queue listener then runs as a greenlet instead of competing for the GIL.
+
+Usage:
+    python3 log_obfuscation_benchmark.py
+    python3 log_obfuscation_benchmark.py --gevent --records 50000
+"""
+
+import sys
+
+if '--gevent' in sys.argv:
+    from gevent import monkey
+    monkey.patch_all()
+
+import argparse
+import io
+import logging
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.utils.log_utils import LogObfuscationFilter, create_async_log_handler  # noqa: E402
+
+SAMPLE_RECORDS = [
+    ("app.services.streaming", "Streaming %s for %s (range %s-%s)",
+     ("/media/usb/Movies/Some Film (2019)/film.mkv", "10.0.0.5", 0, 1048575)),
+    ("app.services.media.indexing", "Indexed %s files in %s",
+     (1250, "/media/usb/TV/Show/Season 01")),
+    ("app.services.media.thumbnail", "Generated thumbnail for %s in %.2fs",
+     ("episode.s01e02.mp4", 0.42)),
+    ("app.controllers.media", "GET /api/categories?page=1&limit=50 served", ()),
+    ("app.services.core", "Session refreshed for client", ()),
+]
+
+
+class LegacyObfuscationFilter(LogObfuscationFilter):
+    """The previous three-pass filter, kept here as the baseline."""
+
+    def _obfuscate_paths_and_filenames(self, text_element):
+        if not isinstance(text_element, str):
+            return text_element
+        text = self.URL_PATH_REGEX.sub(self.url_path_replacement, text_element)
+        text = self.PATH_REGEX.sub(self.path_replacement, text)
+        return self.FILENAME_REGEX.sub(self.filename_replacement, text)
+
+    def filter(self, record):
+        if record.msg and isinstance(record.msg, str):
+            record.msg = self._obfuscate_paths_and_filenames(record.msg)
+        if record.args:
+            record.args = tuple(
+                self._obfuscate_paths_and_filenames(arg) for arg in record.args
+            )
+        return True
+
+
+def make_records(count):
+    records = []
+    for index in range(count):
+        name, msg, args = SAMPLE_RECORDS[index % len(SAMPLE_RECORDS)]
+        records.append(logging.LogRecord(name, logging.INFO, __file__, 1, msg, args, None))
+    return records
+
+
+def bench_filter(filter_factory, count, passes):
+    """Per-record microseconds for ``passes`` filter applications (root + handlers)."""
+    filters = [filter_factory() for _ in range(passes)]
+    records = make_records(count)
+    start = time.perf_counter()
+    for record in records:
+        for current in filters:
+            current.filter(record)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def bench_logger(count, use_queue):
+    """Caller-side microseconds per logger.info() through one handler."""
+    stream_handler = logging.StreamHandler(io.StringIO())
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(message)s'))
+    stream_handler.addFilter(LogObfuscationFilter())
+
+    logger = logging.getLogger(f"ghosthub.bench.{'queue' if use_queue else 'sync'}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    listener = None
+    if use_queue:
+        queue_handler, listener = create_async_log_handler([stream_handler], max_queue_size=count + 1)
+        logger.addHandler(queue_handler)
+    else:
+        logger.addHandler(stream_handler)
+
+    start = time.perf_counter()
+    for index in range(count):
+        _, msg, args = SAMPLE_RECORDS[index % len(SAMPLE_RECORDS)]
+        logger.info(msg, *args)
+    elapsed = time.perf_counter() - start
+
+    if listener is not None:
+        listener.stop()
+    logger.handlers.clear()
+    return elapsed / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark log obfuscation per-record cost")
+    parser.add_argument('--records', type=int, default=20000, help='Records per measurement')
+    parser.add_argument('--handlers', type=int, default=1, help='Handlers the legacy filter ran on')
+    parser.add_argument('--gevent', action='store_true', help='Monkey-patch with gevent before measuring')
+    args = parser.parse_args()
+
+    # The legacy setup filtered at the root logger and again on every handler.
+    legacy = bench_filter(LegacyObfuscationFilter, args.records, 1 + args.handlers)
+    current = bench_filter(LogObfuscationFilter, args.records, args.handlers)
+
+    print(f"Records: {args.records} ({'gevent' if args.gevent else 'threads'})")
+    print(f"Obfuscation, legacy three-pass: {legacy:8.2f} us/record")
+    print(f"Obfuscation, single-pass:       {current:8.2f} us/record ({legacy / current:.1f}x)")
+    print(f"logger.info, sync handler:      {bench_logger(args.records, False):8.2f} us/record (caller)")
+    print(f"logger.info, queue handler:     {bench_logger(args.records, True):8.2f} us/record (caller)")
+
+
+if __name__ == '__main__':
+    main()
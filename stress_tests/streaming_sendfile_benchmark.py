@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+GhostHub Streaming Sendfile Benchmark
+-------------------------------------
+Compares server CPU cost of the generator streaming path against the
+wsgi.file_wrapper / os.sendfile path used by gunicorn_worker.
+
+Runs a local gevent WSGI server with the production handler
+(SendfileWebSocketHandler) and drives it from a separate client process so
+only server-side CPU is measured. Reports CPU seconds per Mbit served for
+full-file and Range requests in both modes.
+
+Usage:
+    python3 streaming_sendfile_benchmark.py
+    python3 streaming_sendfile_benchmark.py --size-mb 256 --clients 4 --requests 8
+"""
+
+import argparse
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+GENERATOR_CHUNK_SIZE = 256 * 1024
+SENDFILE_BLOCK_SIZE = 1024 * 1024
+
+
+def build_app(filepath, file_size, mode):
+    """WSGI app serving one file with the given streaming mode."""
+
+    def app(environ, start_response):
+        start, end = 0, file_size - 1
+        status = '200 OK'
+        range_header = environ.get('HTTP_RANGE', '')
+        if range_header.startswith('bytes='):
+            first, _, last = range_header[6:].partition('-')
+            start = int(first)
+            end = min(int(last) if last else file_size - 1, file_size - 1)
+            status = '206 Partial Content'
+
+        length = end - start + 1
+        headers = [
+            ('Content-Type', 'video/mp4'),
+            ('Content-Length', str(length)),
+            ('Accept-Ranges', 'bytes'),
+        ]
+        if status.startswith('206'):
+            headers.append(('Content-Range', f'bytes {start}-{end}/{file_size}'))
+        start_response(status, headers)
+
+        f = open(filepath, 'rb')
+        f.seek(start)
+        if mode == 'sendfile':
+            return environ['wsgi.file_wrapper'](f, SENDFILE_BLOCK_SIZE)
+
+        def generate():
+            remaining = length
+            try:
+                while remaining > 0:
+                    chunk = f.read(min(GENERATOR_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+            finally:
+                f.close()
+
+        return generate()
+
+    return app
+
+
+def fetch(port, path_range):
+    """Issue one GET and drain the body; returns bytes received."""
+    sock = socket.create_connection(('127.0.0.1', port))
+    try:
+        request = 'GET /video.mp4 HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n'
+        if path_range:
+            request += f'Range: bytes={path_range[0]}-{path_range[1]}\r\n'
+        sock.sendall((request + '\r\n').encode('ascii'))
+        received = 0
+        buf = bytearray(1024 * 1024)
+        while True:
+            n = sock.recv_into(buf)
+            if not n:
+                break
+            received += n
+        return received
+    finally:
+        sock.close()
+
+
+def run_clients(args):
+    """Client process: concurrent requests against the benchmark server."""
+    rng = random.Random(42)
+    file_size = args.size_mb * 1024 * 1024
+    span = args.range_mb * 1024 * 1024
+
+    def worker():
+        for _ in range(args.requests):
+            rng_range = None
+            if args.ranges:
+                start = rng.randrange(0, max(1, file_size - span))
+                rng_range = (start, start + span - 1)
+            fetch(args.port, rng_range)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def run_server(filepath, file_size, mode, args, ranges):
+    """Serve one benchmark round and return (cpu_seconds, wall_seconds, bytes)."""
+    import gevent.subprocess
+    from gevent.pywsgi import WSGIServer
+    from gunicorn_worker import SendfileWebSocketHandler
+
+    server = WSGIServer(
+        ('127.0.0.1', 0),
+        build_app(filepath, file_size, mode),
+        handler_class=SendfileWebSocketHandler,
+        log=None,
+    )
+    server.start()
+    port = server.server_port
+
+    client_args = [
+        sys.executable, __file__, '--client',
+        '--port', str(port),
+        '--size-mb', str(args.size_mb),
+        '--range-mb', str(args.range_mb),
+        '--clients', str(args.clients),
+        '--requests', str(args.requests),
+    ]
+    if ranges:
+        client_args.append('--ranges')
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    gevent.subprocess.Popen(client_args).wait()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    server.stop()
+
+    per_request = args.range_mb * 1024 * 1024 if ranges else file_size
+    total_bytes = per_request * args.clients * args.requests
+    return cpu, wall, total_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='GhostHub sendfile streaming benchmark')
+    parser.add_argument('--size-mb', type=int, default=128, help='Test file size in MB')
+    parser.add_argument('--range-mb', type=int, default=8, help='Bytes per Range request in MB')
+    parser.add_argument('--clients', type=int, default=4, help='Concurrent clients')
+    parser.add_argument('--requests', type=int, default=4, help='Requests per client')
+    parser.add_argument('--file', help='Serve an existing file instead of a temp file')
+    parser.add_argument('--client', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--ranges', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.client:
+        run_clients(args)
+        return 0
+
+    if not hasattr(os, 'sendfile'):
+        print("ERROR: os.sendfile is not available on this platform")
+        return 1
+
+    tmp_path = None
+    if args.file:
+        filepath = args.file
+        args.size_mb = max(1, os.path.getsize(filepath) // (1024 * 1024))
+    else:
+        fd, tmp_path = tempfile.mkstemp(suffix='.mp4')
+        with os.fdopen(fd, 'wb') as f:
+            block = os.urandom(1024 * 1024)
+            for _ in range(args.size_mb):
+                f.write(block)
+        filepath = tmp_path
+    file_size = args.size_mb * 1024 * 1024
+    args.range_mb = min(args.range_mb, args.size_mb)
+
+    print("=" * 70)
+    print("GhostHub Streaming Benchmark: generator vs sendfile")
+    print(f"File: {args.size_mb}MB | Clients: {args.clients} | Requests/client: {args.requests}")
+    print("=" * 70)
+    print(f"{'Mode':<12}{'Request':<10}{'Mbit':>10}{'Wall s':>10}{'Mbit/s':>10}{'CPU s':>9}{'CPU ms/Mbit':>13}")
+
+    results = {}
+    try:
+        for ranges in (False, True):
+            for mode in ('generator', 'sendfile'):
+                cpu, wall, total_bytes = run_server(filepath, file_size, mode, args, ranges)
+                mbit = total_bytes * 8 / 1_000_000
+                per_mbit = cpu * 1000 / mbit if mbit else 0.0
+                results[(mode, ranges)] = per_mbit
+                print(
+                    f"{mode:<12}{'range' if ranges else 'full':<10}{mbit:>10.0f}"
+                    f"{wall:>10.2f}{mbit / wall if wall else 0:>10.0f}{cpu:>9.2f}{per_mbit:>13.3f}"
+                )
+    finally:
+        if tmp_path:
+            os.unlink(tmp_path)
+
+    print("-" * 70)
+    for ranges in (False, True):
+        generator = results[('generator', ranges)]
+        sendfile = results[('sendfile', ranges)]
+        if sendfile > 0:
+            print(
+                f"{'Range' if ranges else 'Full'} requests: sendfile uses "
+                f"{generator / sendfile:.1f}x less server CPU per Mbit"
+            )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -210,6 +210,7 @@ def app():
     original_instance_path = Config.INSTANCE_FOLDER_PATH
     original_save_video_progress = Config.SAVE_VIDEO_PROGRESS
     original_debug = Config.DEBUG_MODE
+    original_precompress = Config.PRECOMPRESS_STATIC_ASSETS
 
     # Set test configuration values BEFORE importing create_app
     Config.INSTANCE_FOLDER_PATH = test_instance_dir
@@ -217,12 +218,14 @@ def app():
     Config.ENABLE_SESSION_PROGRESS = True
     Config.ENABLE_SUBTITLES = True
     Config.DEBUG_MODE = True
+    Config.PRECOMPRESS_STATIC_ASSETS = False
 
     # Also update config_by_name entries
     for cfg in config_by_name.values():
         cfg.INSTANCE_FOLDER_PATH = test_instance_dir
         cfg.SAVE_VIDEO_PROGRESS = True
         cfg.DEBUG_MODE = True
+        cfg.PRECOMPRESS_STATIC_ASSETS = False
 
     # NOW import create_app
     from app import create_app
@@ -239,11 +242,13 @@ def app():
     Config.INSTANCE_FOLDER_PATH = original_instance_path
     Config.SAVE_VIDEO_PROGRESS = original_save_video_progress
     Config.DEBUG_MODE = original_debug
+    Config.PRECOMPRESS_STATIC_ASSETS = original_precompress
 
     for cfg in config_by_name.values():
         cfg.INSTANCE_FOLDER_PATH = original_instance_path
         cfg.SAVE_VIDEO_PROGRESS = original_save_video_progress
         cfg.DEBUG_MODE = original_debug
+        cfg.PRECOMPRESS_STATIC_ASSETS = original_precompress
 
     # Cleanup
     shutil.rmtree(test_instance_dir, ignore_errors=True)
@@ -284,10 +289,22 @@ def app_context(app):
                 'profiles',
                 'categories',
                 'hidden_categories',
+                'hidden_category_closure',
                 'hidden_files',
                 'file_path_aliases',
                 'media_index',
+                'media_index_dirs',
+                'media_index_scan_state',
+                'media_probe',
+                'subtitle_probe',
+                'media_shuffle_orders',
+                'media_timeline_rollup',
+                'category_media_summary',
+                'category_dir_media_summary',
                 'drive_labels',
+                'file_crc_cache',
+                'transcode_cache',
+                'transcode_cache_totals',
             ):
                 conn.execute(f"DELETE FROM {table_name}")
 
@@ -303,6 +320,9 @@ def app_context(app):
         })
         session_store.configure_admin_lock(app.instance_path)
 
+        from app.services.media.category_snapshot_service import invalidate_category_snapshots
+        invalidate_category_snapshots()
+
         storage_runtime_store.set({
             'last_mount_hash': None,
             'last_mount_snapshot': None,
@@ -416,9 +436,9 @@ class TestDatabaseProxy:
         from app.services.media.media_index_service import cleanup_media_index_by_category_path_check
         return cleanup_media_index_by_category_path_check()
 
-    def search_media_index(self, query, limit=50, show_hidden=False):
+    def search_media_index(self, query, limit=50, show_hidden=False, offset=0):
         from app.services.media.media_index_service import search_media_index
-        return search_media_index(query, limit, show_hidden)
+        return search_media_index(query, limit, show_hidden, offset)
 
     def search_media_paths_for_folder_matches(self, query, limit=20000,
                                                show_hidden=False, offset=0):
@@ -21,7 +21,7 @@ class TestCategoryEndpoints:
 
     def test_get_categories(self, client, app_context):
         """Test GET /api/categories endpoint."""
-        with patch("app.controllers.media.category_controller.get_all_categories_with_details", return_value=[]), \
+        with patch("app.services.media.category_snapshot_service.get_all_categories_with_details", return_value=[]), \
              patch("app.controllers.media.category_controller.get_show_hidden_flag", return_value=False):
             response = client.get("/api/categories")
 
@@ -47,7 +47,7 @@ class TestCategoryEndpoints:
         }
 
         with patch("app.controllers.media.category_controller.get_show_hidden_flag", return_value=False), \
-             patch("app.controllers.media.category_controller.get_all_categories_with_details", return_value=[]), \
+             patch("app.services.media.category_snapshot_service.get_all_categories_with_details", return_value=[]), \
              patch("app.services.media.hidden_content_service.should_block_category_access", return_value=False), \
              patch("app.controllers.media.category_controller.get_category_by_id", return_value=resolved), \
              patch.object(CategoryController, "_build_category_summary_payload", return_value=enriched):
@@ -62,7 +62,7 @@ class TestCategoryEndpoints:
         """Filtered category requests should return only filtered categories."""
         category = {"id": "auto::movies::action", "name": "Action", "path": "/media/Movies/Action"}
         with patch("app.controllers.media.category_controller.get_show_hidden_flag", return_value=False), \
-             patch("app.controllers.media.category_controller.get_all_categories_with_details", return_value=[category]), \
+             patch("app.services.media.category_snapshot_service.get_all_categories_with_details", return_value=[category]), \
              patch("app.controllers.media.category_controller.PlaylistService.get_virtual_category", return_value={"id": "session-playlist", "name": "Session Playlist"}):
             response = client.get("/api/categories?category_id=auto::movies::action")
 
@@ -71,6 +71,28 @@ class TestCategoryEndpoints:
         category_ids = [c.get("id") for c in data.get("categories", [])]
         assert category_ids == ["auto::movies::action"]
 
+    def test_get_categories_serves_snapshot_with_strong_etag(self, client, app_context):
+        """Unchanged listings revalidate with 304 and large ones ship pre-gzipped."""
+        categories = [
+            {"id": f"cat-{index}", "name": f"Category {index}", "mediaCount": 1}
+            for index in range(100)
+        ]
+        with patch("app.controllers.media.category_controller.get_show_hidden_flag", return_value=False), \
+             patch("app.services.media.category_snapshot_service.get_all_categories_with_details", return_value=categories), \
+             patch("app.controllers.media.category_controller.PlaylistService.get_virtual_category", return_value=None):
+            plain = client.get("/api/categories", headers={"Accept-Encoding": "identity"})
+            revalidated = client.get(
+                "/api/categories",
+                headers={"Accept-Encoding": "identity", "If-None-Match": plain.headers["ETag"]},
+            )
+            compressed = client.get("/api/categories", headers={"Accept-Encoding": "gzip"})
+
+        assert plain.status_code == 200
+        assert len(plain.get_json()["categories"]) == 100
+        assert revalidated.status_code == 304
+        assert compressed.headers["Content-Encoding"] == "gzip"
+        assert compressed.headers["ETag"] != plain.headers["ETag"]
+
     def test_add_category(self, admin_client, app_context, tmp_path):
         """Test POST /api/categories endpoint (requires admin)."""
         # Create test directory
@@ -227,6 +249,37 @@ class TestCategoryEndpoints:
         assert resp_with_subfolder.headers.get('ETag')
         assert resp_no_subfolder.headers.get('ETag') != resp_with_subfolder.headers.get('ETag')
 
+    def test_get_category_media_cursor_mode_returns_next_cursor(self, client, app_context):
+        """Cursor requests should return the next keyset token instead of page math."""
+        with patch('app.controllers.media.media_controller.get_show_hidden_flag', return_value=False), \
+             patch('app.services.media.hidden_content_service.should_block_category_access', return_value=False), \
+             patch('app.controllers.media.media_controller.media_index_service.has_media_index_entries', return_value=True), \
+             patch('app.controllers.media.media_controller.media_catalog_service.get_async_index_status', return_value=None), \
+             patch('app.controllers.media.media_controller.media_index_service.get_category_version_hash', return_value='v1'), \
+             patch('app.controllers.media.media_controller.SortService.get_sorted_media_page', return_value=([{'name': 'a.mp4'}], 'next-token')) as mock_page, \
+             patch('app.controllers.media.media_controller.SortService.get_total_count', return_value=0) as mock_total, \
+             patch('app.controllers.media.media_controller.SortService.get_subfolders', return_value=[]):
+            response = client.get('/api/categories/test-cat/media?cursor=prev-token&limit=1')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['pagination']['nextCursor'] == 'next-token'
+        assert data['pagination']['hasMore'] is True
+        assert 'subfolders' not in data
+        assert mock_page.call_args.kwargs['cursor'] == 'prev-token'
+        mock_total.assert_not_called()
+
+    def test_get_category_media_invalid_cursor_returns_400(self, client, app_context):
+        """Malformed cursors should be rejected rather than silently restarting."""
+        with patch('app.controllers.media.media_controller.get_show_hidden_flag', return_value=False), \
+             patch('app.services.media.hidden_content_service.should_block_category_access', return_value=False), \
+             patch('app.controllers.media.media_controller.media_index_service.has_media_index_entries', return_value=True), \
+             patch('app.controllers.media.media_controller.media_catalog_service.get_async_index_status', return_value=None), \
+             patch('app.controllers.media.media_controller.media_index_service.get_category_version_hash', return_value='v1'):
+            response = client.get('/api/categories/test-cat/media?cursor=garbage')
+
+        assert response.status_code == 400
+
     def test_get_category_media_304_with_matching_etag(self, client, app_context):
         """Matching If-None-Match header should return 304."""
         with patch('app.controllers.media.media_controller.get_show_hidden_flag', return_value=False), \
@@ -324,7 +377,7 @@ class TestCategoryEndpoints:
             response = client.get('/api/search?q=deep&limit=7')
 
         assert response.status_code == 200
-        mock_search.assert_called_once_with('deep', limit=7, show_hidden=False)
+        mock_search.assert_called_once_with('deep', limit=7, show_hidden=False, offset=0)
         # Folder matches now streamed in 2000-row batches; first (and only) call has offset=0
         mock_folder_paths.assert_called_once_with('deep', limit=2000, show_hidden=False, offset=0)
         # Auto category IDs streamed in 2000-row batches; first call has offset=0
@@ -700,7 +753,7 @@ class TestPagination:
 
     def test_categories_pagination(self, client, app_context):
         """Test category list pagination parameters."""
-        with patch("app.controllers.media.category_controller.get_all_categories_with_details", return_value=[]), \
+        with patch("app.services.media.category_snapshot_service.get_all_categories_with_details", return_value=[]), \
              patch("app.controllers.media.category_controller.get_show_hidden_flag", return_value=False):
             response = client.get(
                 "/api/categories", query_string={"page": 1, "per_page": 10}
@@ -726,7 +779,7 @@ class TestPagination:
 
     def test_pagination_invalid_page(self, client, app_context):
         """Test handling of invalid page parameter."""
-        with patch("app.controllers.media.category_controller.get_all_categories_with_details", return_value=[]), \
+        with patch("app.services.media.category_snapshot_service.get_all_categories_with_details", return_value=[]), \
              patch("app.controllers.media.category_controller.get_show_hidden_flag", return_value=False):
             response = client.get("/api/categories", query_string={"page": -1})
 
@@ -735,7 +788,7 @@ class TestPagination:
 
     def test_pagination_invalid_per_page(self, client, app_context):
         """Test handling of invalid per_page parameter."""
-        with patch("app.controllers.media.category_controller.get_all_categories_with_details", return_value=[]), \
+        with patch("app.services.media.category_snapshot_service.get_all_categories_with_details", return_value=[]), \
              patch("app.controllers.media.category_controller.get_show_hidden_flag", return_value=False):
             response = client.get("/api/categories", query_string={"per_page": 10000})
 
@@ -748,7 +801,7 @@ class TestFilteringAndSorting:
 
     def test_categories_filter_by_type(self, client, app_context):
         """Test filtering categories by type."""
-        with patch("app.controllers.media.category_controller.get_all_categories_with_details", return_value=[]), \
+        with patch("app.services.media.category_snapshot_service.get_all_categories_with_details", return_value=[]), \
              patch("app.controllers.media.category_controller.get_show_hidden_flag", return_value=False):
             response = client.get("/api/categories", query_string={"type": "video"})
 
@@ -756,7 +809,7 @@ class TestFilteringAndSorting:
 
     def test_categories_sort(self, client, app_context):
         """Test sorting categories."""
-        with patch("app.controllers.media.category_controller.get_all_categories_with_details", return_value=[]), \
+        with patch("app.services.media.category_snapshot_service.get_all_categories_with_details", return_value=[]), \
              patch("app.controllers.media.category_controller.get_show_hidden_flag", return_value=False):
             response = client.get(
                 "/api/categories", query_string={"sort": "name", "order": "asc"}
@@ -805,3 +858,39 @@ class TestCategoryDownload:
 
         # May require admin or return 404
         assert response.status_code in [200, 401, 403, 404]
+
+    def test_download_category_zip_resumes_with_range(self, client, app_context, tmp_path):
+        """Test that category ZIPs report their length and serve byte ranges."""
+        folder = tmp_path / "Clips"
+        folder.mkdir()
+        (folder / "a.mp4").write_bytes(os.urandom(20000))
+        (folder / "b.mp4").write_bytes(os.urandom(30000))
+
+        with patch(
+            "app.controllers.system.system_transfer_controller.get_category_by_id",
+            return_value={"id": "clips", "path": str(folder)},
+        ), patch(
+            "app.services.media.hidden_content_service.should_block_category_access",
+            return_value=False,
+        ), patch(
+            "app.services.storage.storage_archive_service._is_managed_storage_path",
+            return_value=True,
+        ):
+            full = client.get("/api/categories/clips/download")
+            partial = client.get(
+                "/api/categories/clips/download",
+                headers={"Range": "bytes=1000-", "If-Range": full.headers["ETag"]},
+            )
+            stale = client.get(
+                "/api/categories/clips/download",
+                headers={"Range": "bytes=1000-", "If-Range": '"zip-stale"'},
+            )
+
+        assert full.status_code == 200
+        assert full.headers["Accept-Ranges"] == "bytes"
+        assert int(full.headers["Content-Length"]) == len(full.data)
+        assert partial.status_code == 206
+        assert partial.headers["Content-Range"] == f"bytes 1000-{len(full.data) - 1}/{len(full.data)}"
+        assert partial.data == full.data[1000:]
+        assert stale.status_code == 200
+        assert stale.data == full.data
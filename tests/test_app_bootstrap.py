@@ -9,6 +9,7 @@ def test_build_specter_services_returns_expected_service_manifest():
 
     assert [service.name for service in services] == [
         'app_startup',
+        'sqlite_writer',
         'storage_drive_runtime',
         'admin_events',
         'app_request_lifecycle',
@@ -24,13 +25,16 @@ def test_build_specter_services_returns_expected_service_manifest():
         'library_events',
         'library_runtime',
         'media_storage_event_handler',
+        'media_watch',
         'mesh_watchdog',
         'progress_events',
+        'progress_write_behind',
         'runtime_config',
         'socket_transport',
         'stale_media_cleanup_runtime',
         'storage_events',
         'storage_worker_boot',
+        'subtitle_prewarm_runtime',
         'sync_events',
         'thumbnail_runtime',
         'tunnel_url_capture',
@@ -53,10 +53,13 @@ def test_startup_cleanup_scans_mounts_without_registry_runtime():
         return_value=[{'id': 7}],
     ), patch(
         'app.services.media.media_index_service.cleanup_orphaned_media_index',
-    ) as mock_cleanup_orphans:
+    ) as mock_cleanup_orphans, patch(
+        'app.services.media.media_index_service.prune_orphaned_media_probes',
+    ) as mock_prune_probes:
         result = AppStartupService._run_startup_cleanup()
 
     assert result is True
     mock_mounts.assert_called_once_with()
     mock_cleanup_paths.assert_called_once_with({'/media/usb1'})
     mock_cleanup_orphans.assert_called_once_with([7])
+    mock_prune_probes.assert_called_once_with()
@@ -16,6 +16,7 @@ class TestCacheUtils:
         import app.utils.cache_utils as cu
         cu.small_file_cache.clear()
         cu.metadata_cache.clear()
+        cu.configure_cache_budgets('LITE')
         yield
         cu.small_file_cache.clear()
         cu.metadata_cache.clear()
@@ -126,3 +127,104 @@ class TestCacheUtils:
         from app.utils.cache_utils import SMALL_FILE_THRESHOLD
         
         assert SMALL_FILE_THRESHOLD == 4 * 1024 * 1024  # 4MB
+
+    def test_small_cache_evicts_least_recently_used_by_bytes(self):
+        """Test small file cache stays within its byte budget, evicting LRU first."""
+        from app.utils.cache_utils import (
+            add_to_small_cache, get_from_small_cache, small_file_cache,
+        )
+
+        small_file_cache.resize(3000)
+        add_to_small_cache('/a.jpg', b'a' * 1000, 1000, 'image/jpeg', 'ea')
+        add_to_small_cache('/b.jpg', b'b' * 1000, 1000, 'image/jpeg', 'eb')
+        get_from_small_cache('/a.jpg')
+        add_to_small_cache('/c.jpg', b'c' * 1000, 1000, 'image/jpeg', 'ec')
+
+        assert '/a.jpg' in small_file_cache
+        assert '/b.jpg' not in small_file_cache
+        assert '/c.jpg' in small_file_cache
+        assert small_file_cache.total_bytes <= 3000
+        assert small_file_cache.stats()['evictions'] == 1
+
+    def test_small_cache_skips_entries_larger_than_budget(self):
+        """Test a file bigger than the whole budget is not cached."""
+        from app.utils.cache_utils import add_to_small_cache, small_file_cache
+
+        small_file_cache.resize(1000)
+        add_to_small_cache('/huge.jpg', b'x' * 5000, 5000, 'image/jpeg', 'e')
+
+        assert '/huge.jpg' not in small_file_cache
+        assert small_file_cache.total_bytes == 0
+
+    def test_budgets_follow_hardware_tier(self):
+        """Test byte budgets are sized from the hardware tier."""
+        from app.utils.cache_utils import (
+            SMALL_FILE_CACHE_BYTES_BY_TIER, configure_cache_budgets, small_file_cache,
+        )
+
+        configure_cache_budgets('PRO')
+        assert small_file_cache.max_bytes == SMALL_FILE_CACHE_BYTES_BY_TIER['PRO']
+
+        configure_cache_budgets('LITE')
+        assert small_file_cache.max_bytes == SMALL_FILE_CACHE_BYTES_BY_TIER['LITE']
+
+    def test_cache_stats_count_hits_and_misses(self):
+        """Test hit/miss counters are reported by get_cache_stats."""
+        from app.utils.cache_utils import (
+            add_to_small_cache, get_cache_stats, get_from_small_cache,
+        )
+
+        before = get_cache_stats()['small_files']
+        add_to_small_cache('/stats.jpg', b'data', 4, 'image/jpeg', 'e')
+        get_from_small_cache('/stats.jpg')
+        get_from_small_cache('/missing.jpg')
+        after = get_cache_stats()['small_files']
+
+        assert after['hits'] == before['hits'] + 1
+        assert after['misses'] == before['misses'] + 1
+        assert after['entries'] == 1
+
+    def test_invalidate_cached_path_drops_entries(self):
+        """Test rename/delete invalidation clears both caches."""
+        import app.utils.cache_utils as cu
+
+        cu.add_to_small_cache('/old.jpg', b'data', 4, 'image/jpeg', 'e')
+        cu.add_to_metadata_cache('/old.jpg', 4, 'image/jpeg', 'e', 1.0)
+        cu.add_to_small_cache('/new.jpg', b'stale', 5, 'image/jpeg', 'e2')
+        cu.invalidate_cached_path('/old.jpg', '/new.jpg')
+
+        assert '/old.jpg' not in cu.small_file_cache
+        assert '/old.jpg' not in cu.metadata_cache
+        assert '/new.jpg' not in cu.small_file_cache
+
+    def test_small_file_cache_caps_entry_count(self):
+        """Test the small file cache holds at most MAX_SMALL_FILE_CACHE_SIZE entries."""
+        from app.utils.cache_utils import (
+            MAX_SMALL_FILE_CACHE_SIZE,
+            add_to_small_cache,
+            small_file_cache,
+        )
+
+        for i in range(MAX_SMALL_FILE_CACHE_SIZE + 5):
+            add_to_small_cache(f'/small{i}.jpg', b'x', 1, 'image/jpeg', f'e{i}')
+
+        assert len(small_file_cache) == MAX_SMALL_FILE_CACHE_SIZE
+        assert '/small0.jpg' not in small_file_cache
+
+    def test_delete_file_invalidates_cache(self, tmp_path):
+        """Test storage delete_file drops the deleted file from the caches."""
+        from app.services.storage import storage_media_file_service
+        from app.utils.cache_utils import add_to_small_cache, small_file_cache
+
+        media = tmp_path / 'photo.jpg'
+        media.write_bytes(b'data')
+        add_to_small_cache(str(media), b'data', 4, 'image/jpeg', 'e')
+
+        with patch(
+            'app.services.storage.storage_drive_service.is_managed_storage_path',
+            return_value=True,
+        ), patch('specter.bus.emit'):
+            success, _ = storage_media_file_service.delete_file(str(media))
+
+        assert success is True
+        assert str(media) not in small_file_cache
@@ -0,0 +1,104 @@
+"""Tests for pre-serialized category listing snapshots."""
+
+import gzip
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.services.media import category_snapshot_service
+from app.services.media.category_cache_service import invalidate_cache, store_cached_categories
+
+
+CATEGORIES = [
+    {'id': 'movies', 'name': 'Movies', 'path': '/media/movies', 'mediaCount': 4, 'containsVideo': True},
+    {'id': 'photos', 'name': 'Photos', 'path': '/media/photos', 'mediaCount': 9, 'containsVideo': False},
+    {'id': 'empty', 'name': 'Empty', 'path': '/media/empty', 'mediaCount': 0, 'containsVideo': False},
+    {
+        'id': 'auto::usb::TV::ShowA',
+        'name': 'ShowA (USB › TV)',
+        'path': '/media/usb/TV/ShowA',
+        'mediaCount': 3,
+        'containsVideo': True,
+    },
+]
+
+
+@pytest.fixture
+def snapshot_env(app_context):
+    """Serve the fixture categories from a fresh category cache."""
+    store_cached_categories([dict(category) for category in CATEGORIES], int(time.time()))
+    with (
+        patch.object(
+            category_snapshot_service,
+            'get_all_categories_with_details',
+            side_effect=lambda **_: [dict(category) for category in CATEGORIES],
+        ) as build,
+        patch.object(category_snapshot_service, 'get_runtime_overlays', return_value={}) as overlays,
+        patch.object(category_snapshot_service, 'check_content_changes', return_value=False),
+    ):
+        yield build, overlays
+    invalidate_cache()
+
+
+class TestCategorySnapshotService:
+    """Snapshot reuse, indexes and serialized pages."""
+
+    def test_snapshot_is_reused_until_the_category_cache_changes(self, snapshot_env):
+        build, _ = snapshot_env
+
+        first = category_snapshot_service.get_category_snapshot()
+        second = category_snapshot_service.get_category_snapshot()
+        assert second is first
+        assert build.call_count == 1
+
+        store_cached_categories([dict(category) for category in CATEGORIES], int(time.time()))
+        third = category_snapshot_service.get_category_snapshot()
+        assert build.call_count == 2
+        assert third is not first
+
+    def test_runtime_overlay_changes_version_without_rebuilding_base(self, snapshot_env):
+        build, overlays = snapshot_env
+
+        first = category_snapshot_service.get_category_snapshot()
+        overlays.return_value = {
+            'movies': {'processingStatus': 'generating', 'processingData': {'status': 'pending'}},
+        }
+        second = category_snapshot_service.get_category_snapshot()
+
+        assert build.call_count == 1
+        assert second.version != first.version
+        assert second.by_id['movies']['processingStatus'] == 'generating'
+        assert 'processingStatus' not in first.by_id['movies']
+
+    def test_secondary_indexes_match_listing_filters(self, snapshot_env):
+        snapshot = category_snapshot_service.get_category_snapshot()
+
+        assert [c['id'] for c in snapshot.select(media_filter='video')] == ['movies', 'auto::usb::TV::ShowA']
+        assert [c['id'] for c in snapshot.select(media_filter='image')] == ['photos']
+        assert [c['id'] for c in snapshot.select(parent_name='TV')] == ['auto::usb::TV::ShowA']
+        assert [c['id'] for c in snapshot.select(category_ids='photos, movies')] == ['movies', 'photos']
+        assert snapshot.select(category_id='photos', media_filter='video') == []
+
+    def test_pages_are_cached_bytes_with_stable_etags(self, snapshot_env):
+        snapshot = category_snapshot_service.get_category_snapshot()
+
+        page = snapshot.page(page=2, limit=1, media_filter='video')
+        payload = json.loads(page.body)
+        assert [c['id'] for c in payload['categories']] == ['auto::usb::TV::ShowA']
+        assert payload['pagination'] == {
+            'page': 2, 'limit': 1, 'total': 2, 'totalPages': 2, 'hasMore': False,
+        }
+        assert snapshot.page(page=2, limit=1, media_filter='video') is page
+        assert snapshot.page(page=1, limit=1, media_filter='video').etag != page.etag
+
+    def test_large_pages_carry_a_gzip_variant(self, snapshot_env):
+        snapshot = category_snapshot_service.CategorySnapshot('v1', [
+            {'id': f'cat-{index}', 'name': f'Category {index}', 'mediaCount': 1}
+            for index in range(100)
+        ])
+
+        page = snapshot.page()
+        assert page.gzip_body is not None
+        assert gzip.decompress(page.gzip_body) == page.body
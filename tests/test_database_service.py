@@ -761,6 +761,138 @@ class TestThreadSafety:
 
 
 
+class TestConnectionPoolAndWriter:
+    """Tests for pooled connections and the group-commit writer."""
+
+    def test_get_db_reuses_pooled_connection(self, test_db):
+        """Sequential blocks should reuse one warm connection instead of reopening."""
+        from app.services.core import sqlite_runtime_service
+
+        with sqlite_runtime_service.get_db() as first:
+            with sqlite_runtime_service.get_db() as nested:
+                assert nested is first
+        before = sqlite_runtime_service.get_connection_pool_stats()['pool']
+
+        with sqlite_runtime_service.get_db() as second:
+            assert second is first
+        after = sqlite_runtime_service.get_connection_pool_stats()['pool']
+
+        assert after['hits'] == before['hits'] + 1
+        assert after['in_use'] == 0
+
+    def test_writer_batch_isolates_failing_job(self, test_db):
+        """A failing job rolls back alone while the rest of the batch commits."""
+        from app.services.core.sqlite_writer_service import SqliteWriterService, _WriteJob
+
+        def insert_label(conn, key):
+            conn.execute(
+                "INSERT INTO drive_labels (device_key, label, updated_at) VALUES (?, ?, 0)",
+                (key, key.upper()),
+            )
+            return key
+
+        def insert_then_fail(conn):
+            insert_label(conn, 'rolled-back')
+            raise ValueError('boom')
+
+        writer = SqliteWriterService()
+        jobs = [
+            _WriteJob(insert_label, ('first',), {}),
+            _WriteJob(insert_then_fail, (), {}),
+            _WriteJob(insert_label, ('second',), {}),
+        ]
+        try:
+            writer._commit_batch(jobs)
+        finally:
+            writer._close_connection()
+
+        assert jobs[0].result.get() == 'first'
+        assert jobs[2].result.get() == 'second'
+        with pytest.raises(ValueError):
+            jobs[1].result.get()
+
+        with test_db.get_db() as conn:
+            keys = {row['device_key'] for row in conn.execute("SELECT device_key FROM drive_labels")}
+        assert keys == {'first', 'second'}
+        assert writer.get_state()['batches'] == 1
+        assert writer.get_state()['failed_jobs'] == 1
+
+    def test_writer_timeout_cancels_only_unstarted_jobs(self, test_db):
+        """A queued job is dropped on timeout; a started job is awaited."""
+        import gevent
+        from gevent.queue import Queue
+        from app.services.core.sqlite_writer_service import SqliteWriterService
+
+        def insert_label(conn, key):
+            conn.execute(
+                "INSERT INTO drive_labels (device_key, label, updated_at) VALUES (?, ?, 0)",
+                (key, key.upper()),
+            )
+            return key
+
+        class _SlowResult:
+            """Outlives the submit timeout, then commits."""
+
+            def get(self, timeout=None):
+                if timeout is not None:
+                    raise gevent.Timeout(timeout)
+                return 'late'
+
+        class _SlowQueue(Queue):
+            start_jobs = False
+
+            def put(self, job):
+                job.started = self.start_jobs
+                job.result = _SlowResult()
+                super().put(job)
+
+        writer = SqliteWriterService()
+        writer._queue = _SlowQueue()
+        with pytest.raises(sqlite3.OperationalError):
+            writer.submit(insert_label, 'never')
+        writer.on_stop()
+        with test_db.get_db() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM drive_labels").fetchone()[0] == 0
+
+        writer._queue.start_jobs = True
+        assert writer.submit(insert_label, 'started') == 'late'
+
+    def test_run_write_falls_back_inline_without_writer(self, test_db):
+        """Writes still commit when the writer greenlet is not running."""
+        from app.services.core.sqlite_runtime_service import run_write
+
+        def write(conn):
+            conn.execute(
+                "INSERT INTO drive_labels (device_key, label, updated_at) VALUES ('inline', 'x', 0)"
+            )
+            return conn.in_transaction
+
+        assert run_write(write) is True
+        with test_db.get_db() as conn:
+            assert conn.execute(
+                "SELECT COUNT(*) FROM drive_labels WHERE device_key = 'inline'"
+            ).fetchone()[0] == 1
+
+    def test_media_index_writes_go_through_writer(self, test_db):
+        """Indexing, watch-delta and upload writes are queued on the writer."""
+        from app.services.core import sqlite_runtime_service
+        from app.services.media import media_index_service
+
+        with patch.object(
+            media_index_service,
+            'run_write',
+            wraps=sqlite_runtime_service.run_write,
+        ) as mock_run_write:
+            media_index_service.batch_upsert_media_index_entries(
+                'writer-cat', None, [{'name': 'a.mp4', 'size': 1, 'mtime': 1.0}],
+            )
+            media_index_service.upsert_media_index_entry('writer-cat', None, 'b.mp4', 1, 1.0)
+            deleted = media_index_service.delete_media_index_entries_batch([('writer-cat', 'a.mp4')])
+            media_index_service.delete_media_index_under_directory('writer-cat', 'gone')
+
+        assert deleted == 1
+        assert mock_run_write.call_count == 4
+
 
 class TestEdgeCases:
     """Tests for edge cases and error handling."""
@@ -819,6 +951,287 @@ class TestMediaIndexBatchUpserts:
             assert row['count'] == 2
 
 
+class TestMediaProbeCache:
+    """Tests for stored ffprobe results."""
+
+    def test_probes_survive_full_reindex_and_orphans_are_pruned(self, test_db):
+        from app.services.media.media_index_service import (
+            get_media_probe,
+            prune_orphaned_media_probes,
+            save_media_probe,
+            update_media_index_batch,
+        )
+
+        files = [
+            {'name': 'keep.mp4', 'size': 10, 'mtime': 1.0, 'type': 'video'},
+            {'name': 'gone.mp4', 'size': 20, 'mtime': 2.0, 'type': 'video'},
+        ]
+        with patch(
+            'app.services.media.category_query_service.get_category_by_id',
+            return_value=None,
+        ):
+            update_media_index_batch('probe-cat', files)
+            save_media_probe('probe-cat', 'keep.mp4', 10, 1.0, True, 12.5)
+            save_media_probe('probe-cat', 'gone.mp4', 20, 2.0, True, 3.0)
+
+            update_media_index_batch('probe-cat', files[:1])
+
+        assert get_media_probe('probe-cat', 'keep.mp4', 10, 1.0) == {
+            'has_video': True,
+            'duration': 12.5,
+        }
+        assert prune_orphaned_media_probes() == 1
+        assert get_media_probe('probe-cat', 'gone.mp4', 20, 2.0) is None
+        assert get_media_probe('probe-cat', 'keep.mp4', 10, 1.0) is not None
+
+
+class TestMediaIndexReplace:
+    """Tests for full-category re-index merges."""
+
+    def test_replace_merges_in_chunks_and_keeps_unchanged_rowids(self, test_db):
+        from app.services.core import sqlite_runtime_service
+        from app.services.media import media_index_service
+
+        def rowids():
+            with test_db.get_db() as conn:
+                return {
+                    row['rel_path']: (row['rowid'], row['size'])
+                    for row in conn.execute(
+                        "SELECT rowid, rel_path, size FROM media_index WHERE category_id = 'merge-cat'"
+                    )
+                }
+
+        with patch(
+            'app.services.media.category_query_service.get_category_by_id',
+            return_value=None,
+        ):
+            media_index_service.update_media_index_batch('merge-cat', [
+                {'name': 'a.mp4', 'size': 1, 'mtime': 1.0},
+                {'name': 'b.mp4', 'size': 2, 'mtime': 1.0},
+                {'name': 'c.mp4', 'size': 3, 'mtime': 1.0},
+            ])
+            before = rowids()
+
+            with patch.object(media_index_service, 'MEDIA_REPLACE_CHUNK_SIZE', 1), patch.object(
+                media_index_service,
+                'run_write',
+                wraps=sqlite_runtime_service.run_write,
+            ) as mock_run_write:
+                ok, count = media_index_service.update_media_index_batch('merge-cat', [
+                    {'name': 'a.mp4', 'size': 1, 'mtime': 1.0},
+                    {'name': 'b.mp4', 'size': 20, 'mtime': 2.0},
+                    {'name': 'd.mp4', 'size': 4, 'mtime': 1.0},
+                ], version_hash='v2')
+
+        after = rowids()
+        assert (ok, count) == (True, 3)
+        assert set(after) == {'a.mp4', 'b.mp4', 'd.mp4'}
+        assert after['a.mp4'] == before['a.mp4']
+        assert after['b.mp4'] == (before['b.mp4'][0], 20)
+        # Three merge chunks, one delete chunk and the version hash.
+        assert mock_run_write.call_count == 5
+        assert media_index_service.get_category_version_hash('merge-cat') == 'v2'
+
+
+class TestMediaTimelineRollup:
+    """Tests for the trigger-maintained per-day timeline rollup."""
+
+    @staticmethod
+    def _raw_counts(test_db):
+        with test_db.get_db() as conn:
+            rows = conn.execute(
+                """
+                SELECT date(mtime, 'unixepoch') AS date_key, COUNT(*) AS count
+                FROM media_index WHERE is_hidden = 0
+                GROUP BY date_key
+                """
+            ).fetchall()
+        return {row['date_key']: row['count'] for row in rows}
+
+    def test_rollup_tracks_inserts_updates_and_deletes(self, test_db):
+        """Counts stay equal to a full media_index aggregate after every write."""
+        from app.services.media.media_index_service import (
+            delete_media_index_entry,
+            get_timeline_date_counts,
+        )
+
+        day_one = 1700000000.0
+        day_two = day_one + 86400
+        test_db.batch_upsert_media_index_entries(
+            category_id='timeline-cat',
+            category_path=None,
+            file_entries=[
+                {'name': 'a.jpg', 'size': 1, 'mtime': day_one, 'type': 'image'},
+                {'name': 'b.jpg', 'size': 1, 'mtime': day_one + 60, 'type': 'image'},
+                {'name': 'c.mp4', 'size': 1, 'mtime': day_two, 'type': 'video'},
+            ],
+        )
+        assert get_timeline_date_counts() == self._raw_counts(test_db)
+        assert get_timeline_date_counts(filter_type='video') == {'2023-11-15': 1}
+
+        # Re-upserting with a new mtime moves the file to the other day.
+        test_db.batch_upsert_media_index_entries(
+            category_id='timeline-cat',
+            category_path=None,
+            file_entries=[{'name': 'b.jpg', 'size': 1, 'mtime': day_two, 'type': 'image'}],
+        )
+        with test_db.get_db() as conn:
+            conn.execute(
+                "UPDATE media_index SET is_hidden = 1 WHERE rel_path = 'a.jpg'"
+            )
+        delete_media_index_entry('timeline-cat', 'c.mp4')
+
+        assert get_timeline_date_counts() == {'2023-11-15': 1}
+        assert get_timeline_date_counts() == self._raw_counts(test_db)
+        assert get_timeline_date_counts(show_hidden=True) == {
+            '2023-11-15': 1,
+            '2023-11-14': 1,
+        }
+
+    def test_bootstrap_backfills_missing_rollup(self, test_db):
+        """Upgrading databases rebuild the rollup from existing rows."""
+        from app.services.core.database_bootstrap_service import ensure_database_ready
+        from app.services.media.media_index_service import get_timeline_date_counts
+
+        test_db.batch_upsert_media_index_entries(
+            category_id='timeline-cat',
+            category_path=None,
+            file_entries=[{'name': 'a.jpg', 'size': 1, 'mtime': 1700000000.0, 'type': 'image'}],
+        )
+        with test_db.get_db() as conn:
+            conn.execute("DROP TABLE media_timeline_rollup")
+
+        ensure_database_ready()
+
+        assert get_timeline_date_counts() == {'2023-11-14': 1}
+
+
+class TestCategoryMediaSummary:
+    """Trigger-maintained category and directory media summaries."""
+
+    @staticmethod
+    def _raw_summaries(test_db):
+        with test_db.get_db() as conn:
+            rows = conn.execute(
+                """
+                SELECT category_id, COUNT(*) AS count,
+                       SUM(CASE WHEN type = 'video' THEN 1 ELSE 0 END) AS video_count,
+                       MIN(CASE WHEN type = 'image' THEN rel_path END) AS image_rel_path,
+                       MIN(CASE WHEN type = 'video' THEN rel_path END) AS video_rel_path
+                FROM media_index WHERE is_hidden = 0
+                GROUP BY category_id
+                """
+            ).fetchall()
+        return {
+            row['category_id']: {
+                'count': row['count'],
+                'contains_video': row['video_count'] > 0,
+                'image_rel_path': row['image_rel_path'],
+                'video_rel_path': row['video_rel_path'],
+            }
+            for row in rows
+        }
+
+    def test_summaries_track_inserts_updates_and_deletes(self, test_db):
+        """Summaries stay equal to a full media_index aggregate after every write."""
+        from app.services.media.media_index_service import (
+            delete_media_index_entry,
+            get_all_category_media_summaries,
+            get_subfolder_media_summaries,
+            update_media_index_batch,
+        )
+
+        test_db.batch_upsert_media_index_entries(
+            category_id='summary-cat',
+            category_path=None,
+            file_entries=[
+                {'name': 'Show/S1/a.jpg', 'size': 1, 'mtime': 1.0, 'type': 'image'},
+                {'name': 'Show/S1/b.mp4', 'size': 1, 'mtime': 1.0, 'type': 'video'},
+                {'name': 'Show/S2/c.mp4', 'size': 1, 'mtime': 1.0, 'type': 'video'},
+                {'name': 'Other/d.jpg', 'size': 1, 'mtime': 1.0, 'type': 'image'},
+                {'name': 'root.jpg', 'size': 1, 'mtime': 1.0, 'type': 'image'},
+            ],
+        )
+        assert get_all_category_media_summaries() == self._raw_summaries(test_db)
+
+        with test_db.get_db() as conn:
+            conn.execute("UPDATE media_index SET is_hidden = 1 WHERE rel_path = 'Other/d.jpg'")
+        delete_media_index_entry('summary-cat', 'Show/S1/b.mp4')
+
+        assert get_all_category_media_summaries() == self._raw_summaries(test_db)
+        assert get_all_category_media_summaries()['summary-cat']['video_rel_path'] == 'Show/S2/c.mp4'
+
+        subfolders = get_subfolder_media_summaries('summary-cat')
+        assert [(item['name'], item['count']) for item in subfolders] == [('Show', 2)]
+        assert subfolders[0]['image_rel_path'] == 'Show/S1/a.jpg'
+        nested = get_subfolder_media_summaries('summary-cat', 'Show')
+        assert [(item['name'], item['count']) for item in nested] == [('S1', 1), ('S2', 1)]
+        assert [item['name'] for item in get_subfolder_media_summaries('summary-cat', show_hidden=True)] == [
+            'Other',
+            'Show',
+        ]
+
+        with patch(
+            'app.services.media.category_query_service.get_category_by_id',
+            return_value=None,
+        ):
+            update_media_index_batch('summary-cat', [
+                {'name': 'new.mp4', 'size': 1, 'mtime': 1.0, 'type': 'video'},
+            ])
+        assert get_all_category_media_summaries() == self._raw_summaries(test_db)
+        with test_db.get_db() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM category_dir_media_summary").fetchone()[0] == 1
+
+    def test_auto_category_summaries_roll_up_descendants(self, test_db):
+        """auto:: summaries aggregate descendant category rows."""
+        from app.services.media.media_index_service import (
+            get_category_media_summary,
+            get_subfolder_media_summaries,
+        )
+
+        for category_id, name, file_type in (
+            ('auto::usb::TV::ShowA', 'e1.mp4', 'video'),
+            ('auto::usb::TV::ShowA::S1', 'e2.mp4', 'video'),
+            ('auto::usb::TV::ShowB', 'cover.jpg', 'image'),
+        ):
+            test_db.batch_upsert_media_index_entries(
+                category_id=category_id,
+                category_path=None,
+                file_entries=[{'name': name, 'size': 1, 'mtime': 1.0, 'type': file_type}],
+            )
+
+        summary = get_category_media_summary('auto::usb::TV', include_descendants=True)
+        assert summary['count'] == 3
+        assert summary['video_category_id'] == 'auto::usb::TV::ShowA'
+        assert summary['image_category_id'] == 'auto::usb::TV::ShowB'
+
+        subfolders = get_subfolder_media_summaries('auto::usb::TV')
+        assert [(item['name'], item['count'], item['contains_video']) for item in subfolders] == [
+            ('ShowA', 2, True),
+            ('ShowB', 1, False),
+        ]
+
+    def test_bootstrap_backfills_missing_summaries(self, test_db):
+        """Upgrading databases rebuild the summaries from existing rows."""
+        from app.services.core.database_bootstrap_service import ensure_database_ready
+        from app.services.media.media_index_service import get_all_category_media_summaries
+
+        test_db.batch_upsert_media_index_entries(
+            category_id='summary-cat',
+            category_path=None,
+            file_entries=[{'name': 'dir/a.jpg', 'size': 1, 'mtime': 1.0, 'type': 'image'}],
+        )
+        with test_db.get_db() as conn:
+            conn.execute("DROP TABLE category_media_summary")
+            conn.execute("DELETE FROM category_dir_media_summary")
+
+        ensure_database_ready()
+
+        assert get_all_category_media_summaries()['summary-cat']['count'] == 1
+        with test_db.get_db() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM category_dir_media_summary").fetchone()[0] == 1
+
+
 class TestMediaIndexSearch:
     """Tests for media_index search behavior."""
 
@@ -1062,3 +1475,70 @@ class TestMediaIndexSearch:
         assert visible_id in visible_only
         assert hidden_id not in visible_only
         assert hidden_id in with_hidden
+
+    def test_media_search_index_tracks_upserts_and_deletes(self, test_db):
+        """FTS rows should follow media_index inserts, replaces, and deletes."""
+        test_db.batch_upsert_media_index_entries(
+            category_id='fts-cat',
+            category_path='/tmp/fts-cat',
+            file_entries=[
+                {'name': 'Trips/Alpine.mp4', 'size': 10, 'mtime': 1.0, 'hash': 'h1'},
+                {'name': 'Trips/Beach.mp4', 'size': 20, 'mtime': 2.0, 'hash': 'h2'},
+            ],
+        )
+        # Re-upserting the same path replaces the row without leaving stale FTS entries.
+        test_db.batch_upsert_media_index_entries(
+            category_id='fts-cat',
+            category_path='/tmp/fts-cat',
+            file_entries=[{'name': 'Trips/Alpine.mp4', 'size': 11, 'mtime': 3.0, 'hash': 'h3'}],
+        )
+
+        with test_db.get_db() as conn:
+            fts_count = conn.execute("SELECT COUNT(*) FROM media_index_fts").fetchone()[0]
+        assert fts_count == 2
+        assert [row['name'] for row in test_db.search_media_index('alpine', show_hidden=True)] == ['Alpine.mp4']
+
+        from app.services.media.media_index_service import delete_media_index_entries_batch
+        delete_media_index_entries_batch([('fts-cat', 'Trips/Alpine.mp4')])
+
+        assert test_db.search_media_index('alpine', show_hidden=True) == []
+        with test_db.get_db() as conn:
+            fts_count = conn.execute("SELECT COUNT(*) FROM media_index_fts").fetchone()[0]
+        assert fts_count == 1
+
+    def test_search_media_index_paginates_with_offset(self, test_db):
+        """Offset should page through ranked results without overlap."""
+        test_db.batch_upsert_media_index_entries(
+            category_id='fts-page',
+            category_path='/tmp/fts-page',
+            file_entries=[
+                {'name': f'Deep/clip{i}.mp4', 'size': i, 'mtime': float(i), 'hash': f'h{i}'}
+                for i in range(5)
+            ],
+        )
+
+        first = test_db.search_media_index('deep', limit=3, show_hidden=True)
+        second = test_db.search_media_index('deep', limit=3, show_hidden=True, offset=3)
+
+        assert len(first) == 3
+        assert len(second) == 2
+        assert not {row['id'] for row in first} & {row['id'] for row in second}
+
+    def test_search_falls_back_to_like_without_fts_index(self, test_db):
+        """Search should keep working when the platform SQLite lacks FTS5."""
+        test_db.batch_upsert_media_index_entries(
+            category_id='auto::ghost::sda2::TV::ShowB',
+            category_path='/tmp/fts-fallback',
+            file_entries=[{'name': 'Extras/ab-clip.mp4', 'size': 1, 'mtime': 1.0, 'hash': 'h1'}],
+        )
+
+        # Two-character terms are below the trigram window and use LIKE.
+        assert len(test_db.search_media_index('ab', show_hidden=True)) == 1
+
+        with patch(
+            'app.services.media.media_index_service._media_search_index_available',
+            return_value=False,
+        ):
+            assert len(test_db.search_media_index('extras', show_hidden=True)) == 1
+            assert len(test_db.search_media_paths_for_folder_matches('extras', show_hidden=True)) == 1
+            assert len(test_db.search_media_category_ids('showb', show_hidden=True)) == 1
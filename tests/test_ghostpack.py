@@ -77,3 +77,18 @@ def test_ghostpack_validation_falls_back_to_current_python(monkeypatch, tmp_path
     monkeypatch.setattr(ghostpack.sys, "executable", fallback_python)
 
     assert ghostpack.get_validation_python() == fallback_python
+
+
+def test_ghostpack_precompress_fails_without_brotli(monkeypatch, tmp_path):
+    """The build must not silently ship without .br static assets."""
+    import argparse
+    import sys
+
+    import pytest
+    from scripts import ghostpack
+
+    monkeypatch.setitem(sys.modules, "brotli", None)
+    builder = ghostpack.GhostPack(argparse.Namespace(dist=str(tmp_path), dry_run=False))
+
+    with pytest.raises(RuntimeError, match="brotli"):
+        builder._phase_precompress()
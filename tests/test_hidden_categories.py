@@ -382,5 +382,70 @@ def test_media_index_queries_hide_descendants_of_hidden_parent(setup_database):
     assert [item["category_id"] for item in results] == ["visible"]
 
 
+
+def _closure_ids():
+    from app.services.core.sqlite_runtime_service import get_db
+
+    with get_db() as conn:
+        rows = conn.execute("SELECT category_id FROM hidden_category_closure").fetchall()
+    return {row["category_id"] for row in rows}
+
+
+@pytest.mark.integration
+def test_hidden_category_closure_tracks_descendants_indexed_after_hide(setup_database):
+    """Descendants indexed after the parent was hidden must join the closure."""
+    hidden_content_service.hide_category("library", "admin")
+    update_media_index_batch(
+        "library::Later",
+        [{"name": "late.jpg", "size": 1, "mtime": 1, "hash": "late-hash", "type": "image"}],
+    )
+    update_media_index_batch(
+        "libraryother",
+        [{"name": "other.jpg", "size": 1, "mtime": 2, "hash": "other-hash", "type": "image"}],
+    )
+
+    assert {"library", "library::Later"} <= _closure_ids()
+    assert "libraryother" not in _closure_ids()
+    recent_ids = {item["category_id"] for item in get_recent_media(limit=50, show_hidden=False)}
+    assert "libraryother" in recent_ids
+    assert "library::Later" not in recent_ids
+
+
+@pytest.mark.integration
+def test_hidden_category_closure_keeps_rows_still_covered_after_unhide(setup_database):
+    """Unhiding one ancestor keeps descendants another hidden row still covers."""
+    update_media_index_batch(
+        "outer::inner::leaf",
+        [{"name": "leaf.jpg", "size": 1, "mtime": 1, "hash": "leaf-hash", "type": "image"}],
+    )
+    hidden_content_service.hide_category("outer", "admin")
+    hidden_content_service.hide_category("outer::inner", "admin")
+
+    hidden_content_service.unhide_category("outer", cascade=False)
+    assert "outer::inner::leaf" in _closure_ids()
+    assert "outer" not in _closure_ids()
+
+    hidden_content_service.unhide_category("outer::inner", cascade=False)
+    assert _closure_ids() == set()
+
+
+@pytest.mark.integration
+def test_bootstrap_rebuilds_missing_hidden_category_closure(setup_database):
+    """Upgrading databases backfill the closure from existing hidden rows."""
+    from app.services.core.sqlite_runtime_service import get_db
+
+    update_media_index_batch(
+        "legacy::child",
+        [{"name": "legacy.jpg", "size": 1, "mtime": 1, "hash": "legacy-hash", "type": "image"}],
+    )
+    hidden_content_service.hide_category("legacy", "admin")
+    with get_db() as conn:
+        conn.execute("DROP TABLE hidden_category_closure")
+
+    database_bootstrap_service.ensure_database_ready()
+
+    assert _closure_ids() == {"legacy", "legacy::child"}
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
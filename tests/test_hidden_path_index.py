@@ -0,0 +1,108 @@
+"""
+Tests for hidden-file membership
+--------------------------------
+Hidden checks run on every media request. Large hidden sets use a Bloom
+filter plus sorted hash array; hides and unhides fold into the cached
+structure instead of reloading hidden_files from SQLite.
+"""
+import os
+from unittest.mock import patch
+
+import pytest
+
+from app.services.media import hidden_content_service, hidden_path_index
+from app.services.media.hidden_path_index import HiddenPathIndex
+
+
+def _paths(count, prefix='/media/usb/Movies'):
+    return [f"{prefix}/film_{index:05d}.mkv" for index in range(count)]
+
+
+class TestHiddenPathIndex:
+    """Tests for the Bloom filter + sorted hash array."""
+
+    def test_membership_matches_inserted_paths(self):
+        hidden = _paths(2000)
+        index = HiddenPathIndex.from_paths(hidden)
+
+        assert len(index) == 2000
+        assert all(path in index for path in hidden)
+        assert not any(path in index for path in _paths(2000, prefix='/media/usb/Shows'))
+
+    def test_small_and_bulk_updates(self):
+        index = HiddenPathIndex.from_paths(_paths(100))
+
+        index.update(added=['/media/a.mkv'], removed=['/media/usb/Movies/film_00000.mkv'])
+        assert '/media/a.mkv' in index
+        assert '/media/usb/Movies/film_00000.mkv' not in index
+
+        bulk = _paths(500, prefix='/media/bulk')
+        index.update(added=bulk)
+        assert len(index) == 600
+        assert all(path in index for path in bulk)
+
+        index.update(removed=bulk)
+        assert len(index) == 100
+        assert not any(path in index for path in bulk)
+
+    def test_bloom_filter_grows_with_additions(self):
+        index = HiddenPathIndex.from_paths(_paths(10))
+        index.update(added=_paths(5000, prefix='/media/more'))
+
+        assert index._bloom_bits >= 5010 * hidden_path_index.BLOOM_BITS_PER_PATH
+        assert all(path in index for path in _paths(5000, prefix='/media/more'))
+
+    def test_negative_lookups_mostly_stop_at_the_bloom_filter(self):
+        index = HiddenPathIndex.from_paths(_paths(5000))
+
+        with patch.object(hidden_path_index, 'bisect_left', wraps=hidden_path_index.bisect_left) as search:
+            misses = [path for path in _paths(5000, prefix='/media/visible') if path in index]
+
+        assert misses == []
+        assert search.call_count < 250
+
+    def test_memory_is_compact(self):
+        index = HiddenPathIndex.from_paths(_paths(10000))
+        assert index.memory_bytes() < 10000 * 12
+
+
+@pytest.fixture
+def small_hidden_cache_limit():
+    hidden_content_service._invalidate_hidden_files_cache()
+    with patch.object(hidden_content_service, '_MAX_HIDDEN_FILES_CACHE', 3):
+        yield
+    hidden_content_service._invalidate_hidden_files_cache()
+
+
+class TestHiddenFilesCache:
+    """Tests for the cached membership in hidden_content_service."""
+
+    def test_large_sets_use_the_index_without_sqlite_lookups(self, app_context, small_hidden_cache_limit):
+        hidden = [os.path.normpath(path) for path in _paths(5)]
+        hidden_content_service.hide_files_batch(hidden)
+
+        hidden_set = hidden_content_service.get_hidden_files_set()
+        assert isinstance(hidden_set, HiddenPathIndex)
+
+        with patch.object(hidden_content_service, 'get_db', side_effect=AssertionError('no SQLite')):
+            assert hidden_content_service.is_file_hidden(hidden[0])
+            assert not hidden_content_service.is_file_hidden('/media/usb/Movies/visible.mkv')
+
+    def test_batches_update_the_cached_structure_in_place(self, app_context, small_hidden_cache_limit):
+        hidden = [os.path.normpath(path) for path in _paths(2)]
+        hidden_content_service.hide_files_batch(hidden)
+        first = hidden_content_service.get_hidden_files_set()
+        version = hidden_content_service.get_hidden_state_version()
+
+        more = [os.path.normpath(path) for path in _paths(4, prefix='/media/more')]
+        hidden_content_service.hide_files_batch(more)
+        promoted = hidden_content_service.get_hidden_files_set()
+        assert isinstance(first, frozenset)
+        assert isinstance(promoted, HiddenPathIndex)
+        assert hidden_content_service.get_hidden_state_version() > version
+
+        hidden_content_service.unhide_files_batch(more[:2])
+        assert hidden_content_service.get_hidden_files_set() is promoted
+        assert not hidden_content_service.is_file_hidden(more[0])
+        assert hidden_content_service.is_file_hidden(more[3])
+        assert hidden_content_service.is_file_hidden(hidden[1])
@@ -0,0 +1,240 @@
+"""
+Tests for the GhostStream HLS proxy
+-----------------------------------
+Segments are streamed through pooled upstream sessions and shared between
+viewers; playlists and Range requests always go upstream.
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from app.services.ghoststream import hls_proxy_service
+
+
+SEGMENT_URL = 'http://10.0.0.9:8765/stream/job-1/segment_00001.ts'
+
+
+def _upstream_response(status=200, chunks=(b'abc', b'def'), headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers if headers is not None else {'Content-Length': str(sum(map(len, chunks)))}
+    response.iter_content.return_value = iter(chunks)
+    response.content = b''.join(chunks)
+    return response
+
+
+@pytest.fixture
+def upstream():
+    """Patch the pooled session and reset module caches around each test."""
+    hls_proxy_service.close_upstream_sessions()
+    session = MagicMock()
+    with patch.object(hls_proxy_service, 'get_upstream_session', return_value=session):
+        yield session
+    hls_proxy_service.close_upstream_sessions()
+    hls_proxy_service._inflight.clear()
+
+
+@pytest.fixture
+def deferred_drain():
+    """Hold back segment drain greenlets until the test runs them."""
+    pending = []
+    with patch.object(
+        hls_proxy_service.gevent,
+        'spawn',
+        side_effect=lambda fn, *args: pending.append((fn, args)),
+    ):
+        yield lambda: [fn(*args) for fn, args in pending]
+
+
+class TestUpstreamSessions:
+    """Tests for the per-server keep-alive pool."""
+
+    def test_session_is_shared_per_server(self):
+        hls_proxy_service.close_upstream_sessions()
+        try:
+            first = hls_proxy_service.get_upstream_session(SEGMENT_URL)
+            second = hls_proxy_service.get_upstream_session('http://10.0.0.9:8765/stream/job-2/master.m3u8')
+            other = hls_proxy_service.get_upstream_session('http://10.0.0.10:8765/stream/job-3/master.m3u8')
+
+            assert first is second
+            assert other is not first
+            assert first.get_adapter('http://10.0.0.9:8765')._pool_maxsize == hls_proxy_service.UPSTREAM_POOL_MAXSIZE
+        finally:
+            hls_proxy_service.close_upstream_sessions()
+
+
+class TestOpenHlsAsset:
+    """Tests for segment streaming, sharing and caching."""
+
+    def test_segment_is_fetched_once_for_repeat_viewers(self, upstream):
+        upstream.get.return_value = _upstream_response()
+
+        first = hls_proxy_service.open_hls_asset(SEGMENT_URL, 'segment_00001.ts')
+        assert b''.join(first.body) == b'abcdef'
+        assert first.headers['Content-Length'] == '6'
+
+        second = hls_proxy_service.open_hls_asset(SEGMENT_URL, 'segment_00001.ts')
+        assert second.body == b'abcdef'
+        assert upstream.get.call_count == 1
+        assert upstream.get.call_args.kwargs['stream'] is True
+
+    def test_concurrent_viewer_follows_inflight_fetch(self, upstream, deferred_drain):
+        upstream.get.return_value = _upstream_response(chunks=(b'one', b'two', b'three'))
+
+        leader = hls_proxy_service.open_hls_asset(SEGMENT_URL, 'segment_00001.ts')
+        follower = hls_proxy_service.open_hls_asset(SEGMENT_URL, 'segment_00001.ts')
+        deferred_drain()
+
+        assert list(leader.body) == [b'one', b'two', b'three']
+        assert list(follower.body) == [b'one', b'two', b'three']
+        assert upstream.get.call_count == 1
+
+    def test_leader_disconnect_does_not_cut_followers(self, upstream, deferred_drain):
+        response = _upstream_response(chunks=(b'one', b'two'))
+        upstream.get.return_value = response
+
+        leader = hls_proxy_service.open_hls_asset(SEGMENT_URL, 'segment_00001.ts')
+        follower = hls_proxy_service.open_hls_asset(SEGMENT_URL, 'segment_00001.ts')
+        leader.body.close()
+        deferred_drain()
+
+        assert list(follower.body) == [b'one', b'two']
+        assert hls_proxy_service._segment_cache.get(SEGMENT_URL) == b'onetwo'
+        assert SEGMENT_URL not in hls_proxy_service._inflight
+        response.close.assert_called()
+
+    def test_failed_fetch_is_not_cached(self, upstream, deferred_drain):
+        def broken_chunks(chunk_size):
+            yield b'one'
+            raise requests.ConnectionError('reset')
+
+        response = _upstream_response()
+        response.iter_content.side_effect = broken_chunks
+        upstream.get.return_value = response
+
+        viewer = hls_proxy_service.open_hls_asset(SEGMENT_URL, 'segment_00001.ts')
+        deferred_drain()
+
+        assert list(viewer.body) == [b'one']
+        assert hls_proxy_service._segment_cache.get(SEGMENT_URL) is None
+        assert SEGMENT_URL not in hls_proxy_service._inflight
+
+    def test_oversized_segment_is_streamed_but_not_kept(self, upstream):
+        upstream.get.return_value = _upstream_response(chunks=(b'abc', b'def'))
+
+        with patch.object(hls_proxy_service, '_segment_cache', hls_proxy_service.SegmentCache(max_entry_bytes=4)):
+            viewer = hls_proxy_service.open_hls_asset(SEGMENT_URL, 'segment_00001.ts')
+
+            assert list(viewer.body) == [b'abc', b'def']
+            assert hls_proxy_service._segment_cache.get(SEGMENT_URL) is None
+        assert SEGMENT_URL not in hls_proxy_service._inflight
+
+        fetch = hls_proxy_service._SegmentFetch({}, max_bytes=4)
+        assert fetch.publish(b'abc') is False
+        assert fetch.publish(b'def') is True
+        assert fetch.subscribe() is None
+        assert fetch.body() is None
+
+    def test_range_requests_are_forwarded_and_not_cached(self, upstream):
+        upstream.get.return_value = _upstream_response(
+            status=206,
+            chunks=(b'cd',),
+            headers={'Content-Length': '2', 'Content-Range': 'bytes 2-3/6'},
+        )
+
+        asset = hls_proxy_service.open_hls_asset(SEGMENT_URL, 'segment_00001.ts', range_header='bytes=2-3')
+
+        assert asset.status == 206
+        assert asset.headers['Content-Range'] == 'bytes 2-3/6'
+        assert b''.join(asset.body) == b'cd'
+        assert upstream.get.call_args.kwargs['headers']['Range'] == 'bytes=2-3'
+        assert hls_proxy_service._segment_cache.get(SEGMENT_URL) is None
+
+    def test_playlists_are_always_fetched(self, upstream):
+        playlist_url = 'http://10.0.0.9:8765/stream/job-1/master.m3u8'
+        upstream.get.side_effect = lambda *a, **k: _upstream_response(chunks=(b'#EXTM3U\n',))
+
+        assert hls_proxy_service.open_hls_asset(playlist_url, 'master.m3u8').body == b'#EXTM3U\n'
+        assert hls_proxy_service.open_hls_asset(playlist_url, 'master.m3u8').body == b'#EXTM3U\n'
+        assert upstream.get.call_count == 2
+
+    def test_upstream_redirect_is_reported(self, upstream):
+        upstream.get.return_value = _upstream_response(
+            status=307,
+            headers={'location': 'http://10.0.0.9:8765/stream/job-2/master.m3u8'},
+        )
+
+        asset = hls_proxy_service.open_hls_asset(SEGMENT_URL, 'segment_00001.ts')
+
+        assert asset.status == 307
+        assert asset.location.endswith('/stream/job-2/master.m3u8')
+
+
+class TestSegmentCache:
+    """Tests for the byte-bounded LRU."""
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        cache = hls_proxy_service.SegmentCache(max_bytes=10, max_entry_bytes=8)
+        cache.put('a', b'aaaa')
+        cache.put('b', b'bbbb')
+        cache.get('a')
+        cache.put('c', b'cccc')
+
+        assert cache.get('b') is None
+        assert cache.get('a') == b'aaaa'
+        assert cache.stats()['bytes'] == 8
+        assert cache.put('big', b'x' * 9) is False
+
+
+class TestProxyRoute:
+    """Tests for the controller wiring."""
+
+    def test_segment_route_streams_upstream_body(self, client, app_context, upstream):
+        upstream.get.return_value = _upstream_response()
+
+        with patch(
+            'app.controllers.ghoststream.ghoststream_controller.ghoststream_service.get_stream_proxy_target',
+            return_value=SEGMENT_URL,
+        ), patch(
+            'app.controllers.ghoststream.ghoststream_controller.ghoststream_service.get_job_auth_headers',
+            return_value={'Authorization': 'Bearer job-token'},
+        ):
+            response = client.get('/api/ghoststream/stream/job-1/segment_00001.ts')
+
+        assert response.status_code == 200
+        assert response.data == b'abcdef'
+        assert response.headers['Content-Type'] == 'video/mp2t'
+        assert response.headers['Access-Control-Allow-Origin'] == '*'
+        assert upstream.get.call_args.kwargs['headers'] == {'Authorization': 'Bearer job-token'}
+
+    def test_head_answers_cached_segment_locally(self, client, app_context, upstream):
+        hls_proxy_service._segment_cache.put(SEGMENT_URL, b'abcdef')
+        with patch(
+            'app.controllers.ghoststream.ghoststream_controller.ghoststream_service.get_stream_proxy_target',
+            return_value=SEGMENT_URL,
+        ):
+            response = client.head('/api/ghoststream/stream/job-1/segment_00001.ts')
+
+        assert response.status_code == 200
+        assert response.headers['Content-Type'] == 'video/mp2t'
+        assert response.headers['Content-Length'] == '6'
+        upstream.get.assert_not_called()
+        upstream.head.assert_not_called()
+
+    def test_head_for_unknown_asset_reports_upstream_status(self, client, app_context, upstream):
+        upstream.head.return_value = _upstream_response(status=404, chunks=(), headers={})
+
+        with patch(
+            'app.controllers.ghoststream.ghoststream_controller.ghoststream_service.get_stream_proxy_target',
+            return_value=SEGMENT_URL,
+        ), patch(
+            'app.controllers.ghoststream.ghoststream_controller.ghoststream_service.get_job_auth_headers',
+            return_value={'Authorization': 'Bearer job-token'},
+        ):
+            response = client.head('/api/ghoststream/stream/job-1/segment_00001.ts')
+
+        assert response.status_code == 404
+        assert upstream.head.call_args.kwargs['headers'] == {'Authorization': 'Bearer job-token'}
+        upstream.get.assert_not_called()
+        assert hls_proxy_service._inflight == {}
@@ -0,0 +1,187 @@
+"""Tests for directory-mtime incremental indexing and watch deltas."""
+
+import os
+from unittest.mock import MagicMock, patch
+
+from app.services.media import indexing_processor, media_index_service
+from app.services.media.media_watch_service import (
+    IN_CLOSE_WRITE,
+    IN_DELETE,
+    IN_ISDIR,
+    IN_MOVED_FROM,
+    MediaWatchService,
+)
+
+
+def _index(category_id, category_path, force_refresh=False):
+    return indexing_processor.process_indexing_task(
+        category_id,
+        str(category_path),
+        'Library',
+        force_refresh,
+        generate_thumbnails=False,
+    )
+
+
+def _touch_dir(path, offset=10):
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + offset))
+
+
+class TestIncrementalIndexing:
+    """Rescans list only directories whose mtime changed."""
+
+    def test_full_scan_records_directory_snapshot(self, app_context, mock_media_dir):
+        result = _index('incremental-snap', mock_media_dir)
+
+        state = media_index_service.get_directory_scan_state('incremental-snap')
+        assert set(state['dirs']) == {'', 'subalbum'}
+        assert state['file_count'] == state['indexed_count'] == 10
+        assert state['reconciled_at'] > 0
+        assert result['directories'] == ['', 'subalbum']
+
+    def test_rescan_applies_deltas_from_changed_directories_only(
+        self, app_context, mock_media_dir
+    ):
+        (mock_media_dir / 'other').mkdir()
+        (mock_media_dir / 'other' / 'keep.mp4').write_bytes(b'keep')
+        _index('incremental-delta', mock_media_dir)
+
+        (mock_media_dir / 'subalbum' / 'new_clip.mp4').write_bytes(b'new')
+        (mock_media_dir / 'subalbum' / 'nested_photo.jpg').unlink()
+        _touch_dir(mock_media_dir / 'subalbum')
+
+        listed = []
+        real_list = indexing_processor._list_directory
+
+        def spy(full_dir, rel_dir, recursive):
+            listed.append(rel_dir)
+            return real_list(full_dir, rel_dir, recursive)
+
+        with patch.object(indexing_processor, '_list_directory', side_effect=spy):
+            result = _index('incremental-delta', mock_media_dir)
+
+        assert listed == ['subalbum']
+        assert result['index_changed'] is True
+        assert result['total_files'] == 11
+        rel_paths = media_index_service.get_all_rel_paths('incremental-delta')
+        assert 'subalbum/new_clip.mp4' in rel_paths
+        assert 'subalbum/nested_photo.jpg' not in rel_paths
+        assert 'other/keep.mp4' in rel_paths
+
+    def test_rescan_drops_removed_directories(self, app_context, mock_media_dir):
+        nested = mock_media_dir / 'subalbum' / 'deeper'
+        nested.mkdir()
+        (nested / 'deep.mp4').write_bytes(b'deep')
+        _index('incremental-rmdir', mock_media_dir)
+
+        for path in (nested / 'deep.mp4', mock_media_dir / 'subalbum' / 'nested_photo.jpg',
+                     mock_media_dir / 'subalbum' / 'nested_video.mp4'):
+            path.unlink()
+        nested.rmdir()
+        (mock_media_dir / 'subalbum').rmdir()
+        _touch_dir(mock_media_dir)
+
+        _index('incremental-rmdir', mock_media_dir)
+
+        rel_paths = media_index_service.get_all_rel_paths('incremental-rmdir')
+        assert not any(path.startswith('subalbum/') for path in rel_paths)
+        state = media_index_service.get_directory_scan_state('incremental-rmdir')
+        assert set(state['dirs']) == {''}
+
+    def test_unreadable_directory_keeps_its_index_rows(self, app_context, mock_media_dir):
+        _index('incremental-eio', mock_media_dir)
+        before = media_index_service.get_all_rel_paths('incremental-eio')
+        _touch_dir(mock_media_dir)
+
+        real_stat = os.stat
+
+        def flaky_stat(path, *args, **kwargs):
+            if str(path).endswith('subalbum'):
+                raise OSError(5, 'Input/output error', str(path))
+            return real_stat(path, *args, **kwargs)
+
+        with patch.object(indexing_processor.os, 'stat', side_effect=flaky_stat):
+            _index('incremental-eio', mock_media_dir)
+
+        assert media_index_service.get_all_rel_paths('incremental-eio') == before
+        state = media_index_service.get_directory_scan_state('incremental-eio')
+        assert set(state['dirs']) == {'', 'subalbum'}
+
+    def test_unchanged_tree_keeps_version_hash(self, app_context, mock_media_dir):
+        first = _index('incremental-same', mock_media_dir)
+
+        with patch.object(indexing_processor, '_list_directory') as mock_list:
+            second = _index('incremental-same', mock_media_dir)
+
+        mock_list.assert_not_called()
+        assert second['index_changed'] is False
+        assert second['hash'] == first['hash']
+
+    def test_out_of_band_index_edits_force_full_scan(self, app_context, mock_media_dir):
+        _index('incremental-drift', mock_media_dir)
+        media_index_service.delete_media_index_entry('incremental-drift', 'photo1.jpg')
+
+        _index('incremental-drift', mock_media_dir)
+
+        assert 'photo1.jpg' in media_index_service.get_all_rel_paths('incremental-drift')
+
+    def test_reconcile_interval_zero_disables_incremental(
+        self, app_context, mock_media_dir, monkeypatch
+    ):
+        _index('incremental-off', mock_media_dir)
+        monkeypatch.setattr(indexing_processor, 'get_full_reconcile_interval', lambda: 0)
+
+        with patch.object(indexing_processor, '_scan_changed_directories') as mock_scan:
+            _index('incremental-off', mock_media_dir)
+
+        mock_scan.assert_not_called()
+
+
+class TestMediaWatchDeltas:
+    """inotify events are debounced into media_index upserts and deletes."""
+
+    def _watched_service(self, category_id, category_path):
+        service = MediaWatchService()
+        service._watches[1] = {category_id: ((category_id, str(category_path), 'Library'), '')}
+        service._watches[2] = {
+            category_id: ((category_id, str(category_path), 'Library'), 'subalbum'),
+        }
+        return service
+
+    def test_file_events_are_applied_to_index(self, app_context, mock_media_dir):
+        _index('watch-files', mock_media_dir)
+        service = self._watched_service('watch-files', mock_media_dir)
+        (mock_media_dir / 'subalbum' / 'arrived.mp4').write_bytes(b'arrived')
+        (mock_media_dir / 'photo2.png').unlink()
+
+        service._handle_event(2, IN_CLOSE_WRITE, 'arrived.mp4')
+        service._handle_event(1, IN_DELETE, 'photo2.png')
+        service._handle_event(1, IN_CLOSE_WRITE, 'notes.txt')
+
+        library_events = MagicMock()
+        with patch(
+            'app.services.media.media_watch_service.registry.require',
+            return_value=library_events,
+        ):
+            service._flush_pending()
+
+        rel_paths = media_index_service.get_all_rel_paths('watch-files')
+        assert 'subalbum/arrived.mp4' in rel_paths
+        assert 'photo2.png' not in rel_paths
+        assert 'notes.txt' not in rel_paths
+        library_events.emit_category_updated.assert_called_once()
+        state = media_index_service.get_directory_scan_state('watch-files')
+        assert state['file_count'] == state['indexed_count']
+
+    def test_directory_removal_deletes_subtree(self, app_context, mock_media_dir):
+        _index('watch-dirs', mock_media_dir)
+        service = self._watched_service('watch-dirs', mock_media_dir)
+
+        service._handle_event(1, IN_MOVED_FROM | IN_ISDIR, 'subalbum')
+        with patch('app.services.media.media_watch_service.registry.require'):
+            service._flush_pending()
+
+        rel_paths = media_index_service.get_all_rel_paths('watch-dirs')
+        assert not any(path.startswith('subalbum/') for path in rel_paths)
+        assert len(rel_paths) == 8
@@ -120,3 +120,86 @@ class TestLogObfuscationFilter:
         assert log_filter.filename_replacement == "[FILENAME_REDACTED]"
         assert log_filter.url_path_replacement == "[URL_REDACTED]"
         assert log_filter.chat_replacement == "[CHAT_MESSAGE_REDACTED]"
+
+    def test_single_pass_matches_each_pattern(self, log_filter):
+        """Test that URL, path and filename redaction happen in one combined pass."""
+        text = "GET /api/media?x=1 from C:\\Media\\Movies and movie.mkv"
+        result = log_filter._obfuscate_paths_and_filenames(text)
+
+        assert result == "GET [URL_REDACTED] from [PATH_REDACTED]"
+        assert log_filter._obfuscate_paths_and_filenames("Saved movie.mkv") == "Saved [FILENAME_REDACTED]"
+
+    def test_filter_formats_before_obfuscating(self, log_filter):
+        """Test that a slash between placeholders no longer breaks %-formatting."""
+        record = logging.LogRecord(
+            name='test',
+            level=logging.INFO,
+            pathname='test.py',
+            lineno=1,
+            msg='Progress %s/%s',
+            args=(3, 10),
+            exc_info=None
+        )
+
+        log_filter.filter(record)
+
+        assert record.getMessage() == 'Progress 3[URL_REDACTED]'
+
+    def test_record_is_obfuscated_once_across_handlers(self, log_filter):
+        """Test that a second handler's filter does not re-scan the record."""
+        from app.utils.log_utils import LogObfuscationFilter
+
+        record = logging.LogRecord(
+            name='test',
+            level=logging.INFO,
+            pathname='test.py',
+            lineno=1,
+            msg='Loading %s',
+            args=('/home/user/file.txt',),
+            exc_info=None
+        )
+        log_filter.filter(record)
+        record.msg = 'already handled /kept/path'
+
+        LogObfuscationFilter().filter(record)
+
+        assert record.msg == 'already handled /kept/path'
+
+
+class TestAsyncLogHandler:
+    """Tests for the queue-based async log handler."""
+
+    def test_records_reach_target_handler_obfuscated(self):
+        """Test that queued records are formatted and obfuscated by the target handler."""
+        import io
+        from app.utils.log_utils import LogObfuscationFilter, create_async_log_handler
+
+        stream = io.StringIO()
+        target = logging.StreamHandler(stream)
+        target.addFilter(LogObfuscationFilter())
+        queue_handler, listener = create_async_log_handler([target])
+
+        logger = logging.getLogger('ghosthub.test.async_logging')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(queue_handler)
+        try:
+            logger.info('Streaming %s', '/media/usb/film.mkv')
+        finally:
+            listener.stop()
+            logger.removeHandler(queue_handler)
+
+        assert stream.getvalue().strip() == 'Streaming [URL_REDACTED]'
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Test that logging never blocks the caller when the queue is full."""
+        from app.utils.log_utils import create_async_log_handler
+
+        queue_handler, listener = create_async_log_handler([logging.NullHandler()], max_queue_size=1)
+        listener.stop()
+
+        record = logging.LogRecord('test', logging.INFO, 'test.py', 1, 'msg', (), None)
+        queue_handler.handle(record)
+        queue_handler.handle(record)
+
+        assert queue_handler.queue.qsize() == 1
@@ -4,9 +4,15 @@ Tests main page and template rendering.
 Uses fixtures from conftest.py.
 """
 import gzip
+import os
 
 import pytest
 
+from app.utils.static_asset_utils import precompress_static_assets
+
+
+STATIC_SCRIPT = b"/** main */\n" + b"console.log('ghosthub');\n" * 200
+
 
 class TestMainRoutes:
     """Tests for main route endpoints."""
@@ -36,8 +42,34 @@ class TestMainRoutes:
             response = client.get('/static/manifest.json')
             assert response.status_code == 200
 
-    def test_static_js_is_gzipped_when_requested(self, client, app):
-        """Test that static JavaScript is gzip-compressed for capable clients."""
+    def test_dynamic_html_is_gzipped_when_requested(self, client, app):
+        """Test that dynamic responses above GZIP_MIN_SIZE keep runtime gzip."""
+        with app.app_context():
+            response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+            assert response.status_code == 200
+            assert response.headers.get('Content-Encoding') == 'gzip'
+            assert b'<html' in gzip.decompress(response.data)
+
+    def test_static_js_is_not_compressed_at_runtime(self, client, app, tmp_path, monkeypatch):
+        """Test that static files without precompressed siblings are sent as-is."""
+        (tmp_path / 'js').mkdir()
+        (tmp_path / 'js' / 'main.js').write_bytes(STATIC_SCRIPT)
+        monkeypatch.setattr(app, 'static_folder', str(tmp_path))
+        with app.app_context():
+            response = client.get(
+                '/static/js/main.js',
+                headers={'Accept-Encoding': 'gzip'},
+            )
+            assert response.status_code == 200
+            assert 'Content-Encoding' not in response.headers
+            assert response.data == STATIC_SCRIPT
+
+    def test_static_js_served_from_precompressed_sibling(self, client, app, tmp_path, monkeypatch):
+        """Test that a fresh .gz sibling is served with Content-Encoding and Vary."""
+        (tmp_path / 'js').mkdir()
+        (tmp_path / 'js' / 'main.js').write_bytes(STATIC_SCRIPT)
+        precompress_static_assets(str(tmp_path))
+        monkeypatch.setattr(app, 'static_folder', str(tmp_path))
         with app.app_context():
             response = client.get(
                 '/static/js/main.js',
@@ -45,8 +77,36 @@ class TestMainRoutes:
             )
             assert response.status_code == 200
             assert response.headers.get('Content-Encoding') == 'gzip'
+            assert 'javascript' in response.content_type
             assert 'Accept-Encoding' in (response.headers.get('Vary') or '')
-            assert gzip.decompress(response.data).startswith(b'/**')
+            assert gzip.decompress(response.data) == STATIC_SCRIPT
+
+    def test_static_prefers_brotli_and_ignores_stale_siblings(self, client, app, tmp_path, monkeypatch):
+        """Test br is preferred over gzip and siblings with a mismatched mtime are skipped."""
+        source = tmp_path / 'app.css'
+        source.write_bytes(STATIC_SCRIPT)
+        brotli_sibling = tmp_path / 'app.css.br'
+        brotli_sibling.write_bytes(b'fake-brotli-payload')
+        source_stat = os.stat(source)
+        os.utime(brotli_sibling, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        monkeypatch.setattr(app, 'static_folder', str(tmp_path))
+        with app.app_context():
+            response = client.get('/static/app.css', headers={'Accept-Encoding': 'gzip, br'})
+            assert response.headers.get('Content-Encoding') == 'br'
+            assert response.data == b'fake-brotli-payload'
+
+            os.utime(source, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns + 10**9))
+            response = client.get('/static/app.css', headers={'Accept-Encoding': 'br'})
+            assert 'Content-Encoding' not in response.headers
+            assert response.data == STATIC_SCRIPT
+
+    def test_static_assets_use_default_cache_policy(self, client, app, tmp_path, monkeypatch):
+        """Test that static files get the shared cache policy."""
+        (tmp_path / 'plain.js').write_bytes(STATIC_SCRIPT)
+        monkeypatch.setattr(app, 'static_folder', str(tmp_path))
+        with app.app_context():
+            plain = client.get('/static/plain.js')
+            assert plain.headers['Cache-Control'] == 'public, max-age=86400'
     
     def test_favicon(self, client, app):
         """Test favicon is accessible."""
@@ -40,6 +40,12 @@ class TestMediaDeduplication:
             )
         ''')
         
+        conn.execute('''
+            CREATE TABLE hidden_category_closure (
+                category_id TEXT PRIMARY KEY
+            ) WITHOUT ROWID
+        ''')
+        
         # Insert duplicate media items
         # Same hash, different categories/paths, different mtimes
         conn.execute('''
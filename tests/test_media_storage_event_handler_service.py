@@ -1,6 +1,6 @@
-"""Tests for media storage mount-change handling."""
+"""Tests for media storage event handling."""
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, PropertyMock, patch
 
 
 class TestMediaStorageEventHandlerService:
@@ -116,3 +116,67 @@ class TestMediaStorageEventHandlerService:
         assert usb_payload['unmounted_paths'] == []
         assert usb_payload['force_refresh'] is True
         library_events.emit_category_updated.assert_not_called()
+
+    def test_upload_refresh_is_coalesced_across_files(self, tmp_path):
+        """Per-file upload events should share one rehash and one client broadcast."""
+        from app.services.media.storage_event_handler_service import (
+            MediaStorageEventHandlerService,
+        )
+
+        library_events = MagicMock()
+        thumbnail_runtime = MagicMock()
+
+        def mock_require(key):
+            if key == 'library_events':
+                return library_events
+            if key == 'thumbnail_runtime':
+                return thumbnail_runtime
+            raise KeyError(key)
+
+        for name in ('a.jpg', 'b.jpg'):
+            (tmp_path / name).write_bytes(b'x' * 10)
+
+        service = MediaStorageEventHandlerService()
+        module = 'app.services.media.storage_event_handler_service'
+
+        with (
+            patch.object(
+                MediaStorageEventHandlerService,
+                'running',
+                new_callable=PropertyMock,
+                return_value=True,
+            ),
+            patch.object(service, 'timeout', return_value='timeout_1') as timeout_mock,
+            patch(f'{module}.media_index_service.upsert_media_index_entry') as upsert_mock,
+            patch(f'{module}.media_index_service.recalculate_category_version_hash') as rehash_mock,
+            patch(f'{module}.media_session_service.clear_session_tracker'),
+            patch(f'{module}.category_cache_service.update_cached_category') as cache_mock,
+            patch(f'{module}.registry.require', side_effect=mock_require),
+        ):
+            for name in ('a.jpg', 'b.jpg'):
+                service._handle_file_uploaded({
+                    'target_dir': str(tmp_path),
+                    'target_path': str(tmp_path / name),
+                    'filename': name,
+                    'category_id': 'auto::usb::Photos',
+                })
+                service._handle_batch_uploaded({
+                    'success_count': 1,
+                    'uploaded_categories': ['/media/usb/Photos'],
+                })
+
+            assert upsert_mock.call_count == 2
+            timeout_mock.assert_called_once()
+            rehash_mock.assert_not_called()
+            library_events.emit_category_updated.assert_not_called()
+
+            service._flush_upload_refresh()
+
+        rehash_mock.assert_called_once_with('auto::usb::Photos')
+        cache_mock.assert_called_once_with('auto::usb::Photos')
+        library_events.emit_category_updated.assert_called_once()
+        payload = library_events.emit_category_updated.call_args.args[0]
+        assert payload['count'] == 2
+        assert payload['categories'] == ['/media/usb/Photos']
+        queue_kwargs = thumbnail_runtime.queue_thumbnail.call_args.kwargs
+        assert queue_kwargs['priority'] == 'front'
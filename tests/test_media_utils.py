@@ -322,7 +322,7 @@ class TestThumbnailGeneration:
         # Content should be unchanged
         assert thumb_path.read_bytes() == b'existing thumbnail'
     
-    @patch('app.utils.media_utils._has_video_stream', return_value=True)
+    @patch('app.utils.media_utils.probe_video', return_value={'has_video': True, 'duration': 60.0})
     @patch('subprocess.run')
     def test_generate_thumbnail_calls_ffmpeg(self, mock_run, mock_has_stream, app_context, tmp_path):
         """Test that generate_thumbnail calls ffmpeg."""
@@ -348,7 +348,7 @@ class TestThumbnailGeneration:
         # ffmpeg should have been called
         mock_run.assert_called()
 
-    @patch('app.utils.media_utils._has_video_stream', return_value=True)
+    @patch('app.utils.media_utils.probe_video', return_value={'has_video': True, 'duration': 60.0})
     @patch('psutil.virtual_memory')
     def test_generate_thumbnail_low_memory_skip(self, mock_memory, mock_has_stream, app_context, tmp_path):
         """Test thumbnail generation skips when memory is low."""
@@ -364,7 +364,7 @@ class TestThumbnailGeneration:
 
         assert result is False
 
-    @patch('app.utils.media_utils._has_video_stream', return_value=False)
+    @patch('app.utils.media_utils.probe_video', return_value={'has_video': False, 'duration': None})
     def test_generate_thumbnail_skips_no_video_stream(self, mock_has_stream, app_context, tmp_path):
         """Test that files without a video stream are rejected with permanent failure marker."""
         from app.utils.media_utils import generate_thumbnail
@@ -399,6 +399,122 @@ class TestThumbnailGeneration:
         assert should_retry_thumbnail(thumb_path, media_path) is False
 
 
+class TestVideoProbeAndBatching:
+    """Tests for single-pass probing and batched ffmpeg thumbnails."""
+
+    @patch('subprocess.run')
+    def test_probe_video_reads_stream_and_duration(self, mock_run, app_context):
+        """One ffprobe call returns both the video stream flag and duration."""
+        from app.utils.media_utils import probe_video
+
+        mock_run.return_value = MagicMock(
+            returncode=0,
+            stdout=b'{"streams": [{"codec_type": "video"}], "format": {"duration": "93.5"}}',
+        )
+
+        assert probe_video('/media/clip.mp4') == {'has_video': True, 'duration': 93.5}
+        mock_run.assert_called_once()
+
+    @patch('subprocess.run', side_effect=FileNotFoundError('ffprobe'))
+    def test_probe_video_unavailable_returns_none(self, mock_run, app_context):
+        """Missing ffprobe yields None so ffmpeg still gets a chance."""
+        from app.utils.media_utils import probe_video
+
+        assert probe_video('/media/clip.mp4') is None
+
+    @patch('subprocess.run')
+    def test_batch_uses_one_ffmpeg_for_all_videos(self, mock_run, app_context, tmp_path):
+        """All videos in a batch share one ffmpeg invocation with per-input outputs."""
+        from app.utils.media_utils import generate_video_thumbnails_batch
+
+        jobs = []
+        for name in ('a', 'b', 'c'):
+            media = tmp_path / f'{name}.mp4'
+            media.write_bytes(b'video')
+            jobs.append({
+                'media_path': str(media),
+                'thumbnail_path': str(tmp_path / 'thumbs' / f'{name}.jpeg'),
+                'probe': {'has_video': True, 'duration': 60.0},
+            })
+
+        def write_outputs(cmd, **kwargs):
+            for output in [arg for arg in cmd if arg.endswith('.batch.jpeg')]:
+                with open(output, 'wb') as f:
+                    f.write(b'x' * 200)
+            return MagicMock(returncode=0)
+
+        mock_run.side_effect = write_outputs
+
+        results, ffmpeg_runs = generate_video_thumbnails_batch(jobs, size=(240, 135))
+
+        assert ffmpeg_runs == 1
+        assert all(results[job['thumbnail_path']] for job in jobs)
+        assert all(os.path.getsize(job['thumbnail_path']) == 200 for job in jobs)
+        cmd = mock_run.call_args[0][0]
+        assert cmd.count('-i') == 3
+        assert ['-map', '2:v:0'] == cmd[cmd.index('-map', cmd.index('1:v:0')):][:2]
+
+    @patch('app.utils.media_utils.generate_thumbnail', return_value=True)
+    @patch('subprocess.run')
+    def test_batch_falls_back_per_file_for_missing_outputs(
+        self, mock_run, mock_single, app_context, tmp_path
+    ):
+        """Outputs missing after the batch run are retried individually."""
+        from app.utils.media_utils import generate_video_thumbnails_batch
+
+        jobs = []
+        for name in ('good', 'bad'):
+            media = tmp_path / f'{name}.mp4'
+            media.write_bytes(b'video')
+            jobs.append({
+                'media_path': str(media),
+                'thumbnail_path': str(tmp_path / f'{name}.jpeg'),
+                'probe': {'has_video': True, 'duration': 10.0},
+            })
+
+        def write_first(cmd, **kwargs):
+            with open(str(tmp_path / 'good.batch.jpeg'), 'wb') as f:
+                f.write(b'x' * 200)
+            return MagicMock(returncode=1)
+
+        mock_run.side_effect = write_first
+
+        results, ffmpeg_runs = generate_video_thumbnails_batch(jobs)
+
+        assert ffmpeg_runs == 2
+        assert results == {jobs[0]['thumbnail_path']: True, jobs[1]['thumbnail_path']: True}
+        mock_single.assert_called_once()
+        assert mock_single.call_args[0][0] == jobs[1]['media_path']
+        assert mock_single.call_args.kwargs['probe'] == {'has_video': True, 'duration': 10.0}
+
+    @patch('app.utils.media_utils.generate_thumbnail', return_value=False)
+    @patch('subprocess.run', return_value=MagicMock(returncode=1))
+    def test_batch_force_refresh_failure_is_not_masked_by_old_thumbnail(
+        self, mock_run, mock_single, app_context, tmp_path
+    ):
+        """A failed refresh run must not report the existing thumbnails as new."""
+        from app.utils.media_utils import generate_video_thumbnails_batch
+
+        jobs = []
+        for name in ('a', 'b'):
+            media = tmp_path / f'{name}.mp4'
+            media.write_bytes(b'video')
+            thumbnail = tmp_path / f'{name}.jpeg'
+            thumbnail.write_bytes(b'old' * 100)
+            jobs.append({
+                'media_path': str(media),
+                'thumbnail_path': str(thumbnail),
+                'force_refresh': True,
+                'probe': {'has_video': True, 'duration': 10.0},
+            })
+
+        results, ffmpeg_runs = generate_video_thumbnails_batch(jobs)
+
+        assert ffmpeg_runs == 3
+        assert mock_single.call_count == 2
+        assert results == {job['thumbnail_path']: False for job in jobs}
+
+
 class TestHardwareAcceleration:
     """Tests for hardware acceleration detection."""
     
@@ -6,3 +6,127 @@ def test_ghosthub_runtime_init_uses_local_socketio_alias():
     from app.services.system.display.native_tv_runtime import GhostHubRuntime
 
     assert "_socketio" in GhostHubRuntime.__init__.__code__.co_varnames
+
+
+class _ObservedMPV:
+    """MPV stand-in that serves pushed properties and counts time-pos reads."""
+
+    def __init__(self, properties, time_pos=0.0):
+        self.properties = properties
+        self.time_pos = time_pos
+        self.reads = []
+
+    def is_observing(self):
+        return True
+
+    def get_observed(self, prop):
+        return self.properties.get(prop)
+
+    def get_property(self, prop):
+        assert prop == "time-pos", f"unexpected get_property({prop!r}) round-trip"
+        self.reads.append(prop)
+        return self.time_pos
+
+
+def _casting_runtime(properties, time_pos=0.0):
+    import threading
+    import time
+    from unittest.mock import MagicMock
+
+    from app.services.system.display.native_tv_runtime import GhostHubRuntime
+
+    runtime = GhostHubRuntime.__new__(GhostHubRuntime)
+    runtime.mpv = _ObservedMPV(properties, time_pos)
+    runtime.sio = MagicMock(connected=True)
+    runtime.running = True
+    runtime.mode = "CASTING"
+    runtime.cast_start_time = None
+    runtime.last_reported_time = -1.0
+    runtime.last_reported_pause = None
+    runtime.last_reported_emit_time = time.time()
+    runtime.estimated_time = 0.0
+    runtime.estimated_wallclock = time.time()
+    runtime.estimated_paused = False
+    runtime.estimated_stalled = False
+    runtime._position_synced_at = 0.0
+    runtime._report_wakeup = threading.Event()
+    runtime._report_urgent = False
+    runtime._report_reason = "progress"
+    return runtime
+
+
+def test_mpv_controller_mirrors_property_change_pushes():
+    """property-change events update the mirror and reach the callback."""
+    import threading
+
+    from app.services.system.display.native_tv_runtime import MPVController, OBSERVED_MPV_PROPERTIES
+
+    controller = MPVController.__new__(MPVController)
+    controller._lock = threading.RLock()
+    controller._properties = {}
+    controller._observing = False
+    controller.on_event = None
+    changes = []
+    controller.on_property_change = lambda name, value: changes.append((name, value))
+
+    controller._handle_incoming_message({"event": "property-change", "id": 2, "name": "pause", "data": True})
+
+    assert controller.is_observing()
+    assert controller.get_observed("pause") is True
+    assert changes == [("pause", True)]
+    # time-pos changes every frame, so it is never observed.
+    assert "time-pos" not in OBSERVED_MPV_PROPERTIES
+
+
+def test_state_reports_extrapolate_position_between_syncs():
+    runtime = _casting_runtime(
+        {"duration": 100.0, "pause": False, "idle-active": False}, time_pos=12.0,
+    )
+
+    runtime._emit_state_snapshot("first")
+    runtime._emit_state_snapshot("second")
+
+    assert runtime.mpv.reads == ["time-pos"]
+    first, second = [call.args[1] for call in runtime.sio.emit.call_args_list]
+    assert first == {'currentTime': 12.0, 'duration': 100.0, 'paused': False}
+    assert 12.0 <= second['currentTime'] < 12.5
+
+
+def test_seek_event_resyncs_position_and_reports_urgently():
+    runtime = _casting_runtime({"duration": 100.0, "pause": False, "idle-active": False})
+    runtime._position_synced_at = 1e12
+
+    runtime._handle_mpv_event("seek", {"event": "seek"})
+    runtime._handle_mpv_event("playback-restart", {"event": "playback-restart"})
+
+    assert runtime._position_synced_at == 0.0
+    assert runtime._report_wakeup.is_set()
+    assert runtime._report_urgent is True
+    assert runtime._report_reason == "seek"
+
+
+def test_buffering_stall_freezes_position_and_resyncs():
+    import time
+
+    from app.services.system.display.native_tv_runtime import OBSERVED_MPV_PROPERTIES
+
+    assert "core-idle" in OBSERVED_MPV_PROPERTIES
+    runtime = _casting_runtime({"duration": 100.0, "pause": False, "idle-active": False}, time_pos=30.0)
+    runtime.estimated_time = 30.0
+    runtime.estimated_wallclock = time.time() - 3.0
+    runtime._position_synced_at = 1e12
+
+    runtime._handle_mpv_property("core-idle", True)
+    frozen = runtime.estimated_time
+    runtime.estimated_wallclock -= 8.0
+
+    assert 33.0 <= frozen < 33.5
+    assert runtime._estimated_position(time.time()) == frozen
+    assert runtime._position_synced_at == 0.0
+    assert runtime._report_wakeup.is_set()
+
+    runtime._handle_mpv_property("core-idle", False)
+    runtime._emit_state_snapshot("resume")
+
+    assert runtime.mpv.reads == ["time-pos"]
+    assert runtime.sio.emit.call_args.args[1]['currentTime'] == 30.0
@@ -5,6 +5,7 @@ Tests for playback progress management.
 Focuses on video-specific progress tracking which is the current architecture.
 """
 import pytest
+import sqlite3
 import time
 from unittest.mock import patch, MagicMock
 
@@ -158,3 +159,94 @@ class TestVideoProgressTracking:
         assert '/media/v1.mp4' in category_progress
         assert '/media/v2.mp4' in category_progress
         assert '/media/v3.mp4' not in category_progress
+
+
+class TestProgressWriteBehind:
+    """Tests for the coalescing progress write-behind buffer."""
+
+    @pytest.fixture
+    def write_behind(self, app_context, test_db, mock_config):
+        from specter import registry
+
+        mock_config('SAVE_VIDEO_PROGRESS', True)
+        service = registry.require('progress_write_behind')
+        service._pending.clear()
+        with patch.object(service, 'accepts_writes', return_value=True):
+            yield service
+        service._pending.clear()
+
+    @staticmethod
+    def _stored_timestamp(test_db, video_path):
+        with test_db.get_db() as conn:
+            row = conn.execute(
+                "SELECT video_timestamp FROM video_progress WHERE video_path = ?",
+                (video_path,),
+            ).fetchone()
+        return row['video_timestamp'] if row else None
+
+    def test_deferred_saves_coalesce_and_flush_once(self, write_behind, test_db):
+        from app.services.media import video_progress_service as progress_service
+
+        for timestamp in (10.0, 20.0, 30.0):
+            success, _ = progress_service.save_video_progress(
+                '/media/movies/a.mp4', 'movies', timestamp,
+                video_duration=100.0, profile_id=PROFILE_ID, defer=True,
+            )
+            assert success is True
+
+        # Reads see the buffered position before anything reaches SQLite.
+        assert self._stored_timestamp(test_db, '/media/movies/a.mp4') is None
+        progress = progress_service.get_video_progress('/media/movies/a.mp4', profile_id=PROFILE_ID)
+        assert progress['video_timestamp'] == 30.0
+        recent = progress_service.get_all_video_progress(profile_id=PROFILE_ID)
+        assert [video['video_timestamp'] for video in recent] == [30.0]
+        category = progress_service.get_category_video_progress('movies', profile_id=PROFILE_ID)
+        assert category['/media/movies/a.mp4']['video_timestamp'] == 30.0
+
+        assert write_behind.flush() == 1
+        assert self._stored_timestamp(test_db, '/media/movies/a.mp4') == 30.0
+        assert write_behind.get_state()['coalesced'] >= 2
+
+    def test_delete_and_write_through_drop_buffered_rows(self, write_behind, test_db):
+        from app.services.media import video_progress_service as progress_service
+
+        progress_service.save_video_progress(
+            '/media/movies/a.mp4', 'movies', 10.0, profile_id=PROFILE_ID, defer=True,
+        )
+        progress_service.save_video_progress(
+            '/media/movies/b.mp4', 'movies', 10.0, profile_id=PROFILE_ID, defer=True,
+        )
+
+        assert progress_service.delete_video_progress('/media/movies/a.mp4', profile_id=PROFILE_ID)
+        progress_service.save_video_progress(
+            '/media/movies/b.mp4', 'movies', 55.0, profile_id=PROFILE_ID,
+        )
+
+        assert write_behind.rows_for_profile(PROFILE_ID) == []
+        assert write_behind.flush() == 0
+        assert self._stored_timestamp(test_db, '/media/movies/a.mp4') is None
+        assert self._stored_timestamp(test_db, '/media/movies/b.mp4') == 55.0
+
+    def test_delete_wins_over_flush_already_queued(self, write_behind, test_db):
+        from app.services.core import sqlite_runtime_service
+        from app.services.media import video_progress_service as progress_service
+
+        progress_service.save_video_progress(
+            '/media/movies/a.mp4', 'movies', 10.0, profile_id=PROFILE_ID, defer=True,
+        )
+        queued = []
+
+        def _queue_then_fail(fn, *args, **kwargs):
+            # The delete runs while the flush job is still waiting in the writer.
+            queued.append((fn, args))
+            progress_service.delete_video_progress('/media/movies/a.mp4', profile_id=PROFILE_ID)
+            sqlite_runtime_service.run_write_inline(fn, *args)
+            raise sqlite3.OperationalError('disk I/O error')
+
+        with patch.object(sqlite_runtime_service, 'run_write', side_effect=_queue_then_fail):
+            assert write_behind.flush() == 0
+
+        assert queued
+        assert self._stored_timestamp(test_db, '/media/movies/a.mp4') is None
+        # The discarded row is not requeued by the failed flush either.
+        assert write_behind.rows_for_profile(PROFILE_ID) == []
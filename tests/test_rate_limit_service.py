@@ -100,6 +100,17 @@ class TestTokenBucket:
         wait_time = bucket.get_wait_time(100)
         assert 0.9 <= wait_time <= 1.1  # Allow some variance
 
+    def test_reserve_borrows_and_reports_wait(self):
+        """Test that reserve never rejects and returns the time to repay debt."""
+        from app.services.system.rate_limit_service import TokenBucket
+
+        bucket = TokenBucket(capacity=1000, refill_rate=100)
+
+        assert bucket.reserve(800) == 0.0
+        wait_time = bucket.reserve(400)  # 200 tokens of debt at 100/sec
+        assert 1.9 <= wait_time <= 2.0
+        assert bucket.tokens < 0
+
 
 class TestRateLimiter:
     """Tests for RateLimiter with per-client and global limits."""
@@ -203,7 +214,7 @@ class TestRateLimiter:
 
         # Simulate staleness by backdating last_refill (>5 min idle)
         for bucket in limiter.client_buckets['192.168.1.100'].values():
-            bucket.last_refill = time.time() - 600
+            bucket.last_refill = time.monotonic() - 600
 
         # Trigger cleanup
         limiter._maybe_cleanup()
@@ -235,6 +246,110 @@ class TestRateLimiter:
         assert 'global_download_available' in stats
 
 
+    def test_loopback_clients_bypass_all_limits(self):
+        """Test that loopback traffic is exempt from global and client limits."""
+        from app.services.system.rate_limit_service import RateLimiter
+
+        limiter = RateLimiter()
+        limiter.init_limits(
+            upload_per_client_mbps=0.001,
+            upload_global_mbps=0.001,
+            download_per_client_mbps=0.001,
+            download_global_mbps=0.001
+        )
+
+        assert limiter.check_limit('127.0.0.1', 'download', 10 * 1024 * 1024) is True
+        assert limiter.reserve('127.0.0.1', 'download', 10 * 1024 * 1024) == (0.0, 10 * 1024 * 1024)
+        assert limiter.client_buckets == {}
+
+    def test_client_buckets_are_built_once_per_client(self):
+        """Test that every limited operation is allocated on first sight."""
+        from app.services.system.rate_limit_service import RateLimiter
+
+        limiter = RateLimiter()
+        limiter.init_limits(
+            upload_per_client_mbps=50.0,
+            upload_global_mbps=100.0,
+            download_per_client_mbps=50.0,
+            download_global_mbps=100.0
+        )
+
+        with patch(
+            'app.services.system.rate_limit_service._get_rate_limit_multiplier',
+            return_value=1.0,
+        ) as multiplier:
+            limiter.check_limit('192.168.1.100', 'upload', 1024)
+            limiter.check_limit('192.168.1.100', 'download', 1024)
+
+        assert multiplier.call_count == 1
+        assert set(limiter.client_buckets['192.168.1.100']) == {'upload', 'download'}
+
+    def test_reserve_prepays_capped_batch(self):
+        """Test that prepaid tokens are capped to a fraction of a second of the slowest rate."""
+        from app.services.system import rate_limit_service
+        from app.services.system.rate_limit_service import RateLimiter
+
+        limiter = RateLimiter()
+        limiter.init_limits(
+            upload_per_client_mbps=50.0,
+            upload_global_mbps=100.0,
+            download_per_client_mbps=8.0,
+            download_global_mbps=100.0
+        )
+
+        with patch.object(rate_limit_service, '_get_rate_limit_multiplier', return_value=1.0):
+            wait, reserved = limiter.reserve('192.168.1.100', 'download', 1024, prepay_bytes=10 ** 9)
+
+        slowest_rate = 8.0 * 1024 * 1024
+        assert wait == 0.0
+        assert reserved == 1024 + int(slowest_rate * rate_limit_service.RATE_LIMIT_MAX_RESERVE_SECONDS)
+
+
+class TestStreamThrottle:
+    """Tests for per-stream batched pacing."""
+
+    def test_prepaid_credit_skips_bucket_visits(self):
+        """Test that chunks covered by prepaid credit do not touch the limiter."""
+        from app.services.system import rate_limit_service
+
+        rate_limit_service.init_rate_limiter(
+            upload_per_client_mbps=50.0,
+            upload_global_mbps=100.0,
+            download_per_client_mbps=50.0,
+            download_global_mbps=100.0
+        )
+        throttle = rate_limit_service.create_download_throttle('192.168.1.100')
+        limiter = rate_limit_service._get_rate_limiter()
+
+        with patch.object(limiter, 'reserve', wraps=limiter.reserve) as reserve:
+            for _ in range(rate_limit_service.RATE_LIMIT_RESERVE_CHUNKS):
+                assert throttle.wait(64 * 1024) == 0.0
+
+        assert reserve.call_count == 1
+
+    def test_sleeps_for_wait_time_instead_of_rejecting(self):
+        """Test that an exhausted bucket yields one cooperative sleep of the computed wait."""
+        from app.services.system import rate_limit_service
+
+        rate_limit_service.init_rate_limiter(
+            upload_per_client_mbps=50.0,
+            upload_global_mbps=100.0,
+            download_per_client_mbps=1.0,
+            download_global_mbps=100.0
+        )
+        throttle = rate_limit_service.create_download_throttle('192.168.1.100')
+
+        with patch.object(rate_limit_service.gevent, 'sleep') as sleep:
+            # Burst capacity is 10 seconds of the 1 Mbps client rate; the
+            # prepaid quarter second on top of it is already debt.
+            first_wait = throttle.wait(10 * 1024 * 1024)
+            wait = throttle.wait(1024 * 1024)
+
+        assert 0.2 <= first_wait <= 0.25
+        assert 1.2 <= wait <= 1.25
+        assert [c.args for c in sleep.call_args_list] == [(first_wait,), (wait,)]
+
+
 class TestRateLimiterModule:
     """Tests for rate_limit_service module functions."""
 
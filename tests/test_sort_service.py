@@ -5,6 +5,7 @@ Tests for SortService - backend sorting and pagination logic
 import pytest
 from unittest.mock import patch, MagicMock
 import os
+from array import array
 
 
 class TestExtractSeasonEpisode:
@@ -297,49 +298,111 @@ class TestShuffleCompatibility:
         assert not mock_tv.called
 
 
-    def test_shared_shuffle_order_changes_when_file_basis_changes(self, app_context):
-        from app.services.media.sort_service import SortService
-        # ... remaining shuffle tests ...
+    @staticmethod
+    def _index_files(category_id, names):
+        from app.services.media.media_index_service import batch_upsert_media_index_entries
 
-    def test_sort_shuffle_fetches_page_metadata_when_all_items_are_rel_path_only(self, app_context):
-        from app.services.media.sort_service import SortService
+        batch_upsert_media_index_entries(
+            category_id,
+            None,
+            [{"name": name, "size": 10, "mtime": 1.0, "type": "video"} for name in names],
+        )
 
-        rel_path_only_rows = [
-            {"rel_path": "movie-a.mp4"},
-            {"rel_path": "movie-b.mp4"},
-            {"rel_path": "movie-c.mp4"},
-        ]
-        page_rows = [{"name": "movie-b.mp4"}]
+    @staticmethod
+    def _shuffle_page(category_id, page, limit):
+        from app.services.media.sort_service import SortService
 
-        with patch.object(
-            SortService,
-            "_fetch_all_items",
-            return_value=rel_path_only_rows,
-        ), patch.object(
-            SortService,
-            "_build_shared_shuffle_order",
-            return_value=["movie-c.mp4", "movie-b.mp4", "movie-a.mp4"],
-        ), patch.object(
-            SortService,
-            "get_media_by_filenames",
-            return_value=page_rows,
-        ) as mock_get_page_rows:
-            result = SortService._sort_shuffle(
-                category_id="auto::ghost::sda2::Movies::Action",
-                subfolder=None,
+        return [
+            item["name"]
+            for item in SortService._sort_shuffle(
+                category_id=category_id,
+                subfolder="__all__",
                 filter_type="all",
-                show_hidden=False,
+                show_hidden=True,
                 session_id="session-1",
                 force_refresh=False,
-                page=1,
-                limit=1,
+                page=page,
+                limit=limit,
             )
+        ]
+
+    def test_shared_shuffle_order_changes_when_file_basis_changes(self, app_context):
+        names = [f"clip-{i:03d}.mp4" for i in range(40)]
+        self._index_files("shuffle-cat", names)
+        first = self._shuffle_page("shuffle-cat", 1, 40)
 
-        assert result == page_rows
-        mock_get_page_rows.assert_called_once_with(
-            "auto::ghost::sda2::Movies::Action",
-            ["movie-c.mp4"],
+        self._index_files("shuffle-cat", ["clip-new.mp4"])
+        second = self._shuffle_page("shuffle-cat", 1, 41)
+
+        assert sorted(first) == names
+        assert sorted(second) == sorted(names + ["clip-new.mp4"])
+        assert second != first
+
+    def test_sort_shuffle_pages_persisted_rowid_order(self, app_context):
+        from app.services.core.sqlite_runtime_service import get_db
+        from app.services.media.sort_service import SortService
+
+        names = [f"clip-{i:03d}.mp4" for i in range(25)]
+        self._index_files("shuffle-cat", names)
+
+        with patch.object(
+            SortService,
+            "_build_shared_shuffle_order",
+            wraps=SortService._build_shared_shuffle_order,
+        ) as mock_build:
+            pages = [self._shuffle_page("shuffle-cat", page, 10) for page in (1, 2, 3)]
+            repeat = self._shuffle_page("shuffle-cat", 2, 10)
+
+        # Built once, then every page is a slice of the stored permutation.
+        assert mock_build.call_count == 1
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert sorted(pages[0] + pages[1] + pages[2]) == names
+        assert repeat == pages[1]
+
+        with get_db() as conn:
+            row = conn.execute(
+                "SELECT length(rowid_order) AS size FROM media_shuffle_orders "
+                "WHERE category_id = ?",
+                ("shuffle-cat",),
+            ).fetchone()
+        assert row["size"] == len(names) * array("I").itemsize
+
+    def test_cached_shuffle_order_respects_visibility_flips(self, app_context):
+        from app.services.core.sqlite_runtime_service import get_db
+        from app.services.media import hidden_content_service, media_index_service
+
+        names = [f"clip-{i}.mp4" for i in range(1, 9)]
+        self._index_files("shuffle-cat", names)
+        rowids = list(media_index_service.get_media_rowids("shuffle-cat", "__all__", show_hidden=True))
+
+        def _set_hidden(hidden_rowids):
+            with get_db() as conn:
+                conn.execute("UPDATE media_index SET is_hidden = 0 WHERE category_id = 'shuffle-cat'")
+                conn.executemany(
+                    "UPDATE media_index SET is_hidden = 1 WHERE rowid = ?",
+                    [(rowid,) for rowid in hidden_rowids],
+                )
+
+        _set_hidden([rowids[2], rowids[4]])
+        before = media_index_service.get_media_rowid_basis("shuffle-cat", "__all__")
+
+        # In-memory hidden-cache churn (e.g. a restart) must not stale the order.
+        hidden_content_service._bump_hidden_state_version()
+        assert media_index_service.get_media_rowid_basis("shuffle-cat", "__all__") == before
+
+        # Same count, sum and max of visible rowids, different rows visible.
+        _set_hidden([rowids[1], rowids[5]])
+        after = media_index_service.get_media_rowid_basis("shuffle-cat", "__all__")
+        assert after != before
+
+        rows = media_index_service.get_media_rows_by_rowids(
+            rowids, category_id="shuffle-cat", subfolder="__all__", show_hidden=False,
         )
+        assert rowids[1] not in rows and rowids[5] not in rows
+        assert rowids[2] in rows and len(rows) == 6
+
+    def test_sort_shuffle_returns_empty_for_empty_scope(self, app_context):
+        assert self._shuffle_page("missing-cat", 1, 10) == []
 
 
 class TestAutoSubfolderFallback:
@@ -353,15 +416,15 @@ class TestAutoSubfolderFallback:
                 "sub_name": "ShowA",
                 "count": 12,
                 "video_count": 10,
-                "image_pick": "poster.jpg\x1fauto::ghost::sda2::TV::ShowA\x1fPoster.jpg",
-                "video_pick": "episode01.mkv\x1fauto::ghost::sda2::TV::ShowA\x1fEpisode01.mkv",
+                "image_pick": "auto::ghost::sda2::TV::ShowA\x1fPoster.jpg",
+                "video_pick": "auto::ghost::sda2::TV::ShowA\x1fEpisode01.mkv",
             },
             {
                 "sub_name": "ShowB",
                 "count": 7,
                 "video_count": 7,
                 "image_pick": None,
-                "video_pick": "episode01.mkv\x1fauto::ghost::sda2::TV::ShowB\x1fEpisode01.mkv",
+                "video_pick": "auto::ghost::sda2::TV::ShowB\x1fEpisode01.mkv",
             },
         ]
 
@@ -497,3 +560,177 @@ class TestAutoSubfolderFallback:
         assert names == ["ShowA", "ShowB"]
         assert subfolders[0]["count"] == 5
         assert subfolders[1]["count"] == 3
+
+
+class TestKeysetPagination:
+    """Tests for cursor-based media pagination."""
+
+    def _seed(self, test_db, count=7):
+        test_db.batch_upsert_media_index_entries(
+            category_id="keyset-cat",
+            category_path="/tmp/keyset-cat",
+            file_entries=[
+                # Duplicate names across folders exercise the id tie-breaker.
+                {"name": f"{'a' if i % 2 else 'b'}/Clip{i // 2}.mp4", "size": 100 - i, "mtime": float(i % 3), "hash": f"h{i}"}
+                for i in range(count)
+            ],
+        )
+
+    @pytest.mark.parametrize("sort_by,sort_order", [("name", "ASC"), ("mtime", "DESC"), ("size", "ASC")])
+    def test_cursor_pages_match_offset_order(self, test_db, sort_by, sort_order):
+        from app.services.media import media_index_service
+        from app.services.media.sort_service import SortService
+
+        self._seed(test_db)
+        expected = [
+            row["rel_path"]
+            for row in media_index_service.get_paginated_media(
+                category_id="keyset-cat",
+                subfolder="__all__",
+                sort_by=sort_by,
+                sort_order=sort_order,
+                limit=100,
+                show_hidden=True,
+            )
+        ]
+
+        seen = []
+        cursor = None
+        with patch(
+            "app.services.media.media_catalog_service.ensure_category_indexed",
+            return_value=None,
+        ), patch.object(SortService, "_is_tv_category", return_value=False):
+            for _ in range(10):
+                items, cursor = SortService.get_sorted_media_page(
+                    category_id="keyset-cat",
+                    subfolder="__all__",
+                    sort_by=sort_by,
+                    sort_order=sort_order,
+                    limit=3,
+                    show_hidden=True,
+                    shuffle=False,
+                    cursor=cursor,
+                )
+                seen.extend(item["name"] for item in items)
+                if cursor is None:
+                    break
+
+        assert seen == expected
+        assert len(seen) == 7
+
+    def test_cursor_for_different_sort_is_rejected(self, test_db):
+        from app.services.media.sort_service import SortService
+
+        self._seed(test_db)
+        with patch(
+            "app.services.media.media_catalog_service.ensure_category_indexed",
+            return_value=None,
+        ), patch.object(SortService, "_is_tv_category", return_value=False):
+            _items, cursor = SortService.get_sorted_media_page(
+                category_id="keyset-cat",
+                subfolder="__all__",
+                sort_by="name",
+                limit=2,
+                show_hidden=True,
+                shuffle=False,
+            )
+            with pytest.raises(ValueError):
+                SortService.get_sorted_media_page(
+                    category_id="keyset-cat",
+                    subfolder="__all__",
+                    sort_by="mtime",
+                    limit=2,
+                    show_hidden=True,
+                    shuffle=False,
+                    cursor=cursor,
+                )
+
+    def test_malformed_cursor_is_rejected(self, app_context):
+        from app.services.media import media_index_service
+
+        with pytest.raises(ValueError):
+            media_index_service.decode_media_cursor("not-a-cursor")
+
+
+class TestStaleVerification:
+    """Stale rows are verified in the background, not during enrichment."""
+
+    def test_enrich_items_queues_verification_without_stat_calls(self, app_context):
+        from app.services.media.sort_service import SortService
+
+        verifier = MagicMock()
+        verifier.is_known_missing.side_effect = lambda cat_id, rel_path: rel_path == "gone.mp4"
+        rows = [
+            {"category_id": "movies", "rel_path": "kept.mp4", "type": "video"},
+            {"category_id": "movies", "rel_path": "gone.mp4", "type": "video"},
+        ]
+
+        with patch("app.services.media.sort_service.registry.resolve", return_value=verifier), \
+                patch("app.services.media.sort_service.os.path.exists") as mock_exists:
+            items = SortService._enrich_items(rows, check_exists=True)
+
+        assert [item["name"] for item in items] == ["kept.mp4"]
+        verifier.queue_verification.assert_called_once_with([("movies", "kept.mp4")])
+        mock_exists.assert_not_called()
+
+    def test_verification_scans_each_directory_once_and_batch_deletes(self, app_context, tmp_path):
+        from app.services.core import stale_media_cleanup_runtime_service as stale_runtime
+
+        (tmp_path / "Season 1").mkdir()
+        (tmp_path / "Season 1" / "e1.mp4").write_bytes(b"x")
+        (tmp_path / "root.mp4").write_bytes(b"x")
+
+        service = stale_runtime.StaleMediaCleanupRuntimeService()
+        service._pending_verification = dict.fromkeys([
+            ("movies", "Season 1/e1.mp4"),
+            ("movies", "Season 1/e2.mp4"),
+            ("movies", "root.mp4"),
+            ("movies", "missing-dir/e3.mp4"),
+        ])
+
+        with patch(
+            "app.services.media.category_query_service.get_category_by_id",
+            return_value={"path": str(tmp_path)},
+        ), patch(
+            "app.services.core.stale_media_cleanup_runtime_service._list_directory_names",
+            wraps=stale_runtime._list_directory_names,
+        ) as mock_scan, patch(
+            "app.services.media.media_index_service.delete_media_index_entries_batch",
+            return_value=2,
+        ) as mock_delete:
+            service._drain_verification_queue()
+
+        assert mock_scan.call_count == 3
+        mock_delete.assert_called_once()
+        assert sorted(mock_delete.call_args.args[0]) == [
+            ("movies", "Season 1/e2.mp4"),
+            ("movies", "missing-dir/e3.mp4"),
+        ]
+        # Cached listings let request paths drop the stale rows immediately.
+        assert service.is_known_missing("movies", "Season 1/e2.mp4") is True
+        assert service.is_known_missing("movies", "Season 1/e1.mp4") is False
+        assert service.is_known_missing("other", "Season 1/e2.mp4") is False
+
+    def test_new_files_are_not_deleted_from_stale_listings(self, app_context, tmp_path):
+        from app.services.core import stale_media_cleanup_runtime_service as stale_runtime
+
+        service = stale_runtime.StaleMediaCleanupRuntimeService()
+        with patch(
+            "app.services.media.category_query_service.get_category_by_id",
+            return_value={"path": str(tmp_path)},
+        ), patch(
+            "app.services.media.media_index_service.delete_media_index_entries_batch",
+            return_value=0,
+        ) as mock_delete:
+            service._get_directory_listing(str(tmp_path))
+            service._resolve_category_path("movies")
+            (tmp_path / "new.mp4").write_bytes(b"x")
+
+            # The cached listing predates the file, but the drain re-checks it.
+            service._pending_verification = dict.fromkeys([("movies", "new.mp4")])
+            service._drain_verification_queue()
+            mock_delete.assert_not_called()
+
+            assert service.is_known_missing("movies", "new.mp4") is True
+            service._handle_file_uploaded({"target_path": str(tmp_path / "new.mp4")})
+            assert service.is_known_missing("movies", "new.mp4") is False
@@ -0,0 +1,81 @@
+"""
+Tests for Static Asset Utilities
+--------------------------------
+Precompressed siblings are served straight from disk, so a stale or orphaned
+variant would ship outdated JavaScript to every client. Freshness is keyed on
+the source mtime; these tests pin that contract.
+"""
+import gzip
+import os
+
+from app.utils.static_asset_utils import (
+    is_variant_fresh,
+    precompress_static_assets,
+)
+
+
+SCRIPT = b"/** app */\n" + b"console.log('ghosthub');\n" * 200
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+class TestPrecompressStaticAssets:
+    """Tests for sibling generation and reuse."""
+
+    def test_writes_fresh_gzip_sibling(self, tmp_path):
+        source = _write(tmp_path / "js" / "app.js", SCRIPT)
+
+        stats = precompress_static_assets(str(tmp_path))
+
+        sibling = tmp_path / "js" / "app.js.gz"
+        assert stats["files"] == 1
+        assert stats["written"] >= 1
+        assert gzip.decompress(sibling.read_bytes()) == SCRIPT
+        assert is_variant_fresh(os.stat(source), str(sibling))
+
+    def test_second_run_skips_unchanged_files(self, tmp_path):
+        _write(tmp_path / "js" / "app.js", SCRIPT)
+        precompress_static_assets(str(tmp_path))
+
+        assert precompress_static_assets(str(tmp_path))["written"] == 0
+
+    def test_modified_source_invalidates_sibling(self, tmp_path):
+        source = _write(tmp_path / "js" / "app.js", SCRIPT)
+        precompress_static_assets(str(tmp_path))
+
+        source.write_bytes(SCRIPT + b"// changed\n")
+        os.utime(source, ns=(0, os.stat(source).st_mtime_ns + 1_000_000_000))
+        sibling = str(tmp_path / "js" / "app.js.gz")
+        assert not is_variant_fresh(os.stat(source), sibling)
+
+        precompress_static_assets(str(tmp_path))
+        assert gzip.decompress(open(sibling, "rb").read()).endswith(b"// changed\n")
+
+    def test_small_and_binary_files_are_skipped(self, tmp_path):
+        _write(tmp_path / "tiny.css", b"body{}")
+        _write(tmp_path / "icons" / "logo.png", SCRIPT)
+
+        stats = precompress_static_assets(str(tmp_path))
+
+        assert stats["written"] == 0
+        assert not (tmp_path / "tiny.css.gz").exists()
+        assert not (tmp_path / "icons" / "logo.png.gz").exists()
+
+    def test_orphaned_siblings_are_removed(self, tmp_path):
+        source = _write(tmp_path / "js" / "old.js", SCRIPT)
+        precompress_static_assets(str(tmp_path))
+        source.unlink()
+
+        stats = precompress_static_assets(str(tmp_path))
+
+        assert stats["removed"] >= 1
+        assert not (tmp_path / "js" / "old.js.gz").exists()
+
+    def test_missing_root_is_a_no_op(self, tmp_path):
+        stats = precompress_static_assets(str(tmp_path / "missing"))
+        assert stats == {"written": 0, "files": 0, "removed": 0, "failed": 0}
+
@@ -14,7 +14,7 @@ import time
 import tempfile
 import zipfile
 import threading
-from unittest.mock import patch, MagicMock, mock_open
+from unittest.mock import patch, MagicMock
 from io import BytesIO
 
 
@@ -480,7 +480,7 @@ class TestChunkedUpload:
             with patch('app.services.storage.upload_session_runtime_service.get_memory_info', return_value={'available_mb': 8192}):
                 with patch('app.services.storage.upload_session_runtime_service.get_hardware_tier', return_value='PRO'):
                     with patch('os.makedirs'):
-                        with patch('builtins.open', mock_open()):
+                        with patch('app.services.storage.upload_session_runtime_service._open_staging_file', return_value=-1):
                             success, message, upload_id = svc.init_chunked_upload(
                                 filename='ram_test.mp4',
                                 total_chunks=1,
@@ -500,7 +500,7 @@ class TestChunkedUpload:
             with patch('app.services.storage.upload_session_runtime_service.get_memory_info', return_value={'available_mb': 1024}):
                 with patch('app.services.storage.upload_session_runtime_service.get_hardware_tier', return_value='LITE'):
                     with patch('os.makedirs'):
-                        with patch('builtins.open', mock_open()):
+                        with patch('app.services.storage.upload_session_runtime_service._open_staging_file', return_value=-1):
                             success, message, upload_id = svc.init_chunked_upload(
                                 filename='disk_fallback.mp4',
                                 total_chunks=1,
@@ -513,6 +513,216 @@ class TestChunkedUpload:
                                 assert '.ghosthub_uploads' in svc.active_uploads[upload_id]['temp_path']
                                 assert str(mock_usb_drive) in svc.active_uploads[upload_id]['temp_path']
 
+    def test_out_of_order_stream_chunks_assemble_file(self, app_context, mock_usb_drive):
+        """Test that streamed chunks written out of order land at their offsets."""
+        svc = _upload_service()
+        chunk_size = 4096
+
+        success, _, upload_id = svc.init_chunked_upload(
+            filename='streamed.bin',
+            total_chunks=3,
+            total_size=chunk_size * 2 + 100,
+            drive_path=str(mock_usb_drive),
+            chunk_size=chunk_size,
+        )
+        assert success is True
+
+        chunks = [b'a' * chunk_size, b'b' * chunk_size, b'c' * 100]
+        for index in (2, 0, 1):
+            success, _, status = svc.upload_chunk(upload_id, index, BytesIO(chunks[index]))
+            assert success is True
+
+        assert status['complete'] is True
+        assert (mock_usb_drive / 'streamed.bin').read_bytes() == b''.join(chunks)
+
+    def test_stream_chunk_is_copied_in_blocks(self, app_context, mock_usb_drive):
+        """Test that a streamed chunk is never read as one whole buffer."""
+        from app.services.storage import upload_session_runtime_service as module
+
+        class _TrackingStream(BytesIO):
+            largest_read = 0
+
+            def readinto(self, buffer):
+                count = super().readinto(buffer)
+                _TrackingStream.largest_read = max(_TrackingStream.largest_read, count)
+                return count
+
+        svc = _upload_service()
+        payload = os.urandom(10000)
+        success, _, upload_id = svc.init_chunked_upload(
+            filename='blocks.bin',
+            total_chunks=1,
+            total_size=len(payload),
+            drive_path=str(mock_usb_drive),
+            chunk_size=len(payload),
+        )
+        assert success is True
+
+        with patch.object(module, 'CHUNK_WRITE_BLOCK_SIZE', 1024):
+            success, _, status = svc.upload_chunk(upload_id, 0, _TrackingStream(payload))
+
+        assert success is True
+        assert _TrackingStream.largest_read == 1024
+        assert (mock_usb_drive / 'blocks.bin').read_bytes() == payload
+
+    def test_preallocated_staging_is_trimmed_on_finalize(self, app_context, mock_usb_drive):
+        """Test that a preallocated staging file is cut back to the bytes written."""
+        from app.services.storage.upload_session_runtime_service import _open_staging_file
+
+        svc = _upload_service()
+
+        def _preallocating_open(temp_path, total_size, preallocate=False):
+            return _open_staging_file(temp_path, total_size, True)
+
+        with patch(
+            'app.services.storage.upload_session_runtime_service._open_staging_file',
+            side_effect=_preallocating_open,
+        ):
+            success, _, upload_id = svc.init_chunked_upload(
+                filename='trimmed.bin',
+                total_chunks=1,
+                total_size=8192,
+                drive_path=str(mock_usb_drive),
+            )
+        assert success is True
+        with svc.upload_lock:
+            temp_path = svc.active_uploads[upload_id]['temp_path']
+        if hasattr(os, 'posix_fallocate'):
+            assert os.path.getsize(temp_path) == 8192
+
+        success, _, status = svc.upload_chunk(upload_id, 0, b'x' * 1000)
+
+        assert success is True
+        assert os.path.getsize(mock_usb_drive / 'trimmed.bin') == 1000
+
+    def test_finalize_copies_across_filesystems(self, app_context, mock_usb_drive):
+        """Test that finalize falls back to a kernel copy when rename crosses devices."""
+        import errno
+        from app.services.storage import upload_session_runtime_service as module
+
+        svc = _upload_service()
+        payload = os.urandom(5000)
+        success, _, upload_id = svc.init_chunked_upload(
+            filename='crossdev.bin',
+            total_chunks=1,
+            total_size=len(payload),
+            drive_path=str(mock_usb_drive),
+            chunk_size=len(payload),
+        )
+        with svc.upload_lock:
+            temp_path = svc.active_uploads[upload_id]['temp_path']
+
+        with patch.object(module.os, 'rename', side_effect=OSError(errno.EXDEV, 'cross-device')):
+            success, _, status = svc.upload_chunk(upload_id, 0, payload)
+
+        assert success is True
+        assert status['complete'] is True
+        assert (mock_usb_drive / 'crossdev.bin').read_bytes() == payload
+        assert not os.path.exists(temp_path)
+
+    def test_failed_finalize_drops_session_and_staging(self, app_context, mock_usb_drive):
+        """Test that a failed move leaves no half-finalized session behind."""
+        import errno
+        from app.services.storage import upload_session_runtime_service as module
+
+        svc = _upload_service()
+        success, _, upload_id = svc.init_chunked_upload(
+            filename='nospace.bin',
+            total_chunks=1,
+            total_size=100,
+            drive_path=str(mock_usb_drive),
+            chunk_size=100,
+        )
+        with svc.upload_lock:
+            temp_path = svc.active_uploads[upload_id]['temp_path']
+
+        with patch.object(module, '_move_staged_file', side_effect=OSError(errno.ENOSPC, 'no space')):
+            success, message, _ = svc.upload_chunk(upload_id, 0, b'x' * 100)
+
+        assert success is False
+        assert 'no space' in message
+        assert upload_id not in svc.active_uploads
+        assert not os.path.exists(temp_path)
+        success, message, _ = svc.upload_chunk(upload_id, 0, b'x' * 100)
+        assert success is False
+        assert message == "Upload session not found or expired"
+
+    def test_staged_copy_falls_back_to_sendfile(self, tmp_path):
+        """Test that a refused copy_file_range is retried with sendfile."""
+        import errno
+        from app.services.storage import upload_session_runtime_service as module
+
+        payload = os.urandom(3000)
+        source = tmp_path / 'source.tmp'
+        source.write_bytes(payload)
+        target = tmp_path / 'target.bin'
+
+        src_fd = os.open(source, os.O_RDONLY)
+        dst_fd = os.open(target, os.O_WRONLY | os.O_CREAT)
+        try:
+            with patch.object(
+                module.os,
+                'copy_file_range',
+                side_effect=OSError(errno.EXDEV, 'cross-device'),
+                create=True,
+            ):
+                copied = module._copy_staged_bytes(src_fd, dst_fd, len(payload))
+        finally:
+            os.close(src_fd)
+            os.close(dst_fd)
+
+        assert copied == len(payload)
+        assert target.read_bytes() == payload
+
+    def test_chunk_in_flight_is_not_written_twice(self, app_context, mock_usb_drive):
+        """Test that a retry of a chunk still being written is rejected."""
+        svc = _upload_service()
+
+        success, _, upload_id = svc.init_chunked_upload(
+            filename='inflight.bin',
+            total_chunks=2,
+            total_size=2048,
+            drive_path=str(mock_usb_drive),
+            chunk_size=1024,
+        )
+        with svc.upload_lock:
+            svc.active_uploads[upload_id]['writing_chunks'].add(0)
+
+        success, message, status = svc.upload_chunk(upload_id, 0, b'x' * 1024)
+
+        assert success is False
+        assert 'in progress' in message.lower()
+
+    def test_cancel_defers_fd_close_until_write_finishes(self, app_context, mock_usb_drive):
+        """Test that cancelling mid-write closes the descriptor after the writer."""
+        from app.services.storage import upload_session_runtime_service as module
+
+        svc = _upload_service()
+        success, _, upload_id = svc.init_chunked_upload(
+            filename='cancelled.bin',
+            total_chunks=2,
+            total_size=2048,
+            drive_path=str(mock_usb_drive),
+            chunk_size=1024,
+        )
+        with svc.upload_lock:
+            fd = svc.active_uploads[upload_id]['fd']
+
+        real_write = module._write_chunk_at
+
+        def _write_then_cancel(write_fd, offset, chunk_data):
+            written = real_write(write_fd, offset, chunk_data)
+            svc.cancel_chunked_upload(upload_id)
+            os.fstat(write_fd)  # still open while this chunk is writing
+            return written
+
+        with patch.object(module, '_write_chunk_at', side_effect=_write_then_cancel):
+            success, message, status = svc.upload_chunk(upload_id, 0, b'x' * 1024)
+
+        assert success is False
+        with pytest.raises(OSError):
+            os.fstat(fd)
+
 
 class TestFolderOperations:
     """Tests for folder-related operations."""
@@ -648,6 +858,102 @@ class TestZipStreaming:
         total_size = sum(len(chunk) for chunk in chunks)
         assert total_size > 0
 
+    def test_zip_plan_matches_streamed_archive(self, app_context, mock_usb_drive):
+        """Test that the precomputed length matches a valid STORED archive."""
+        from app.services.storage.storage_archive_service import build_zip_plan
+
+        test_folder = mock_usb_drive / 'PlanTest'
+        test_folder.mkdir()
+        contents = {
+            'clip.mp4': os.urandom(70000),
+            'empty.txt': b'',
+            'café.jpg': os.urandom(1234),
+        }
+        for name, data in contents.items():
+            (test_folder / name).write_bytes(data)
+
+        plan = build_zip_plan([(str(test_folder / name), name) for name in contents])
+        archive = b''.join(plan.iter_bytes())
+
+        assert len(archive) == plan.total_size
+        with zipfile.ZipFile(BytesIO(archive)) as zip_file:
+            assert zip_file.testzip() is None
+            for info in zip_file.infolist():
+                assert info.compress_type == zipfile.ZIP_STORED
+                assert zip_file.read(info.filename) == contents[info.filename]
+
+    def test_zip_ranges_reassemble_archive_from_cached_crcs(self, app_context, mock_usb_drive):
+        """Test that resumed ranges reuse cached CRCs and stitch back together."""
+        from app.services.storage.storage_archive_service import build_zip_plan
+
+        test_folder = mock_usb_drive / 'RangeTest'
+        test_folder.mkdir()
+        files = []
+        for index in range(3):
+            path = test_folder / f'part{index}.bin'
+            path.write_bytes(os.urandom(50000 + index))
+            files.append((str(path), path.name))
+
+        full = b''.join(build_zip_plan(files).iter_bytes())
+
+        plan = build_zip_plan(files)
+        assert all(member['crc'] is not None for member in plan.members)
+        segments = list(plan.iter_segments())
+        assert sum(1 for segment in segments if isinstance(segment, tuple)) == 3
+
+        cuts = [0, 17, 40000, 100003, plan.total_size - 30, plan.total_size]
+        stitched = b''.join(
+            b''.join(plan.iter_bytes(start, stop - 1))
+            for start, stop in zip(cuts, cuts[1:])
+        )
+        assert stitched == full
+
+    def test_zip_crcs_are_saved_in_one_writer_job(self, app_context, mock_usb_drive):
+        """Test that CRCs computed on a first download are batched through the writer."""
+        from app.services.core import sqlite_runtime_service
+        from app.services.storage import storage_archive_service
+
+        test_folder = mock_usb_drive / 'CrcBatchTest'
+        test_folder.mkdir()
+        files = []
+        for index in range(3):
+            path = test_folder / f'batch{index}.bin'
+            path.write_bytes(os.urandom(1000 + index))
+            files.append((str(path), path.name))
+
+        with patch.object(
+            storage_archive_service,
+            'run_write',
+            wraps=sqlite_runtime_service.run_write,
+        ) as mock_run_write:
+            b''.join(storage_archive_service.build_zip_plan(files).iter_bytes())
+
+        assert mock_run_write.call_count == 1
+        cached = storage_archive_service.get_cached_crc32s([
+            (path, os.path.getsize(path), os.path.getmtime(path)) for path, _ in files
+        ])
+        assert len(cached) == 3
+
+    def test_zip_range_past_uncached_member_computes_crc(self, app_context, mock_usb_drive):
+        """Test that a range starting mid-archive still gets correct CRCs."""
+        from app.services.storage.storage_archive_service import build_zip_plan
+
+        test_folder = mock_usb_drive / 'ResumeTest'
+        test_folder.mkdir()
+        files = []
+        for index in range(2):
+            path = test_folder / f'resume{index}.bin'
+            path.write_bytes(os.urandom(30000))
+            files.append((str(path), path.name))
+
+        plan = build_zip_plan(files)
+        assert plan.members[0]['crc'] is None
+        head = b''.join(plan.iter_bytes(0, 99))
+        tail = b''.join(plan.iter_bytes(100))
+
+        with zipfile.ZipFile(BytesIO(head + tail)) as zip_file:
+            assert zip_file.testzip() is None
+
 
 class TestMountChangeDetection:
     """Tests for USB mount change detection."""
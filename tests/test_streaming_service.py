@@ -472,3 +472,168 @@ class TestCacheIntegration:
         )
         
         assert response1.data == response2.data
+
+
+class TestSendfileStreaming:
+    """Tests for the wsgi.file_wrapper (sendfile) streaming path."""
+
+    def _environ(self):
+        from gunicorn_worker import SendfileFileWrapper
+        return {'wsgi.file_wrapper': SendfileFileWrapper, 'REMOTE_ADDR': '192.168.1.20'}
+
+    def test_range_request_returns_wrapper_at_offset(self, app, tmp_path):
+        """Range responses hand the server a file wrapper seeked to the start byte."""
+        from gunicorn_worker import SendfileFileWrapper
+        from app.services.streaming.streaming_service import stream_video_file
+
+        test_file = tmp_path / "video.mp4"
+        test_file.write_bytes(bytes(range(256)) * 40)
+
+        with app.test_request_context(
+            headers={'Range': 'bytes=100-199'},
+            environ_overrides=self._environ(),
+        ):
+            response = stream_video_file(str(test_file), "video/mp4", 10240, None)
+
+            assert response.status_code == 206
+            assert isinstance(response.response, SendfileFileWrapper)
+            assert response.response.filelike.tell() == 100
+            assert response.response.throttle is not None
+            response.close()
+            assert response.response.filelike.closed
+
+    def test_large_file_uses_wrapper_for_full_response(self, app, tmp_path):
+        """serve_large_file_non_blocking skips the generator when sendfile is available."""
+        from gunicorn_worker import SendfileFileWrapper
+        from app.services.streaming.streaming_service import serve_large_file_non_blocking
+
+        test_file = tmp_path / "large.mp4"
+        test_file.write_bytes(b"x" * 100000)
+
+        with app.test_request_context(environ_overrides=self._environ()):
+            response = serve_large_file_non_blocking(
+                str(test_file), "video/mp4", 100000, '"etag"', is_video=True
+            )
+
+            assert response.status_code == 200
+            assert isinstance(response.response, SendfileFileWrapper)
+            assert response.response.filelike.tell() == 0
+            response.close()
+
+    def test_tailscale_client_keeps_generator_path(self, app, tmp_path):
+        """Tailscale clients keep small generator chunks for low jitter."""
+        from gunicorn_worker import SendfileFileWrapper
+        from app.services.streaming.streaming_service import stream_video_file
+
+        test_file = tmp_path / "video.mp4"
+        test_file.write_bytes(b"x" * 1000)
+
+        with app.test_request_context(environ_overrides=self._environ()), \
+                patch('app.services.streaming.streaming_service.is_tailscale_connection',
+                      return_value=True):
+            response = stream_video_file(str(test_file), "video/mp4", 1000, None)
+
+            assert not isinstance(response.response, SendfileFileWrapper)
+
+    def test_plain_file_wrapper_keeps_generator_path(self, app, tmp_path):
+        """Servers whose file_wrapper has no throttle hook keep the generator."""
+        from app.services.streaming.streaming_service import stream_video_file
+
+        test_file = tmp_path / "video.mp4"
+        test_file.write_bytes(b"x" * 1000)
+
+        with app.test_request_context(
+            environ_overrides={'wsgi.file_wrapper': lambda f, blksize=8192: f}
+        ):
+            response = stream_video_file(str(test_file), "video/mp4", 1000, None)
+
+            assert response.status_code == 200
+            assert b"".join(response.response) == b"x" * 1000
+
+    def test_handler_sends_content_length_bytes_from_offset(self, tmp_path):
+        """The worker handler transmits exactly Content-Length bytes via sendfile."""
+        import socket as socket_module
+        from gunicorn_worker import SendfileFileWrapper, SendfileWebSocketHandler
+
+        data = bytes(range(256)) * 200
+        test_file = tmp_path / "video.mp4"
+        test_file.write_bytes(data)
+
+        server_sock, client_sock = socket_module.socketpair()
+        handler = SendfileWebSocketHandler.__new__(SendfileWebSocketHandler)
+        handler.socket = server_sock
+        handler.code = 206
+        handler.provided_content_length = '30000'
+        handler.response_length = 0
+        handler.close_connection = False
+        handler.write = Mock()
+
+        throttled = []
+        with open(test_file, 'rb') as f:
+            f.seek(1000)
+            wrapper = SendfileFileWrapper(f, blksize=8192)
+            wrapper.throttle = throttled.append
+            handler.result = wrapper
+            handler.process_result()
+
+        server_sock.close()
+        received = b""
+        while True:
+            chunk = client_sock.recv(65536)
+            if not chunk:
+                break
+            received += chunk
+        client_sock.close()
+
+        handler.write.assert_called_once_with(b'')
+        assert received == data[1000:31000]
+        assert handler.response_length == 30000
+        assert sum(throttled) == 30000
+        assert handler.close_connection is False
+
+    def test_handler_sends_segment_bodies_with_sendfile(self, tmp_path):
+        """Bodies with sendfile_segments mix written bytes and sendfile ranges."""
+        import socket as socket_module
+        from gunicorn_worker import SendfileWebSocketHandler
+
+        data = bytes(range(256)) * 100
+        test_file = tmp_path / "member.bin"
+        test_file.write_bytes(data)
+
+        class _SegmentBody:
+            throttle = None
+            deadline = None
+
+            def __init__(self, handle):
+                self.handle = handle
+
+            def sendfile_segments(self):
+                yield b"head"
+                yield self.handle.fileno(), 500, 10000
+                yield b"tail"
+
+        server_sock, client_sock = socket_module.socketpair()
+        handler = SendfileWebSocketHandler.__new__(SendfileWebSocketHandler)
+        handler.socket = server_sock
+        handler.code = 200
+        handler.provided_content_length = str(10008)
+        handler.response_length = 0
+        handler.close_connection = False
+        handler.write = Mock(side_effect=server_sock.sendall)
+
+        with open(test_file, 'rb') as f:
+            handler.result = _SegmentBody(f)
+            handler.process_result()
+
+        server_sock.close()
+        received = b""
+        while True:
+            chunk = client_sock.recv(65536)
+            if not chunk:
+                break
+            received += chunk
+        client_sock.close()
+
+        assert received == b"head" + data[500:10500] + b"tail"
+        assert handler.response_length == 10000
+        assert handler.close_connection is False
@@ -206,3 +206,136 @@ class TestSubtitleExtraction:
             assert len(subs) == 2
             assert subs[0]['type'] == 'external_converted'
             assert subs[1]['type'] == 'embedded_image'
+
+
+class TestSubtitleProbeCache:
+    """Probe results are reused until the video file changes."""
+
+    PROBE_OUTPUT = json.dumps({
+        "streams": [
+            {"index": 2, "codec_type": "subtitle", "codec_name": "subrip",
+             "tags": {"language": "eng"}},
+            {"index": 3, "codec_type": "subtitle", "codec_name": "ass",
+             "tags": {"language": "spa"}},
+        ],
+        "format": {"start_time": "1.500000"},
+    })
+
+    def test_probe_is_cached_by_video_hash(self, app_context, tmp_path):
+        from app.services.media.subtitle_service import get_video_start_time, run_ffprobe
+
+        video = tmp_path / "movie.mkv"
+        video.write_bytes(b"video")
+
+        with patch('subprocess.run', return_value=MagicMock(returncode=0, stdout=self.PROBE_OUTPUT)) as mock_run:
+            first = run_ffprobe(str(video))
+            second = run_ffprobe(str(video))
+            start_time = get_video_start_time(str(video))
+
+        assert mock_run.call_count == 1
+        assert [track['codec'] for track in second] == ['subrip', 'ass']
+        assert second == first
+        assert start_time == 1.5
+
+    def test_modified_video_is_probed_again(self, app_context, tmp_path):
+        from app.services.media.subtitle_service import run_ffprobe
+
+        video = tmp_path / "movie.mkv"
+        video.write_bytes(b"video")
+
+        with patch('subprocess.run', return_value=MagicMock(returncode=0, stdout=self.PROBE_OUTPUT)) as mock_run:
+            run_ffprobe(str(video))
+            video.write_bytes(b"re-encoded video")
+            run_ffprobe(str(video))
+
+        assert mock_run.call_count == 2
+
+    def test_failed_probe_is_not_cached(self, app_context, tmp_path):
+        from app.services.media.subtitle_service import run_ffprobe
+
+        video = tmp_path / "movie.mkv"
+        video.write_bytes(b"video")
+
+        with patch('subprocess.run', return_value=MagicMock(returncode=1, stdout='', stderr='boom')) as mock_run:
+            assert run_ffprobe(str(video)) == []
+            assert run_ffprobe(str(video)) == []
+
+        assert mock_run.call_count == 2
+
+
+class TestMultiTrackExtraction:
+    """All text tracks are extracted with one ffmpeg run."""
+
+    @staticmethod
+    def _write_outputs(cmd, **kwargs):
+        for arg in cmd:
+            if arg.endswith('.vtt'):
+                with open(arg, 'w') as handle:
+                    handle.write("WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nHello\n")
+        return MagicMock(returncode=0, stderr='')
+
+    def test_tracks_share_a_single_ffmpeg_invocation(self, app_context, tmp_path):
+        from app.services.media.subtitle_service import extract_subtitle_tracks
+
+        outputs = [(0, str(tmp_path / "a.vtt")), (1, str(tmp_path / "b.vtt"))]
+        with patch('app.services.media.subtitle_service.get_video_start_time', return_value=2.0), \
+             patch('subprocess.run', side_effect=self._write_outputs) as mock_run:
+            extracted = extract_subtitle_tracks('/path/movie.mkv', outputs)
+
+        assert extracted == {0, 1}
+        assert mock_run.call_count == 1
+        cmd = mock_run.call_args[0][0]
+        assert cmd.count('-i') == 1
+        assert [cmd[i + 1] for i, arg in enumerate(cmd) if arg == '-map'] == ['0:s:0', '0:s:1']
+        assert cmd.count('-output_ts_offset') == 2
+
+    def test_failed_combined_run_retries_each_track(self, app_context, tmp_path):
+        from app.services.media.subtitle_service import extract_subtitle_tracks
+
+        def _run(cmd, **kwargs):
+            if '0:s:1' in cmd:
+                return MagicMock(returncode=1, stderr='unsupported codec')
+            return self._write_outputs(cmd)
+
+        outputs = [(0, str(tmp_path / "a.vtt")), (1, str(tmp_path / "b.vtt"))]
+        with patch('app.services.media.subtitle_service.get_video_start_time', return_value=0.0), \
+             patch('subprocess.run', side_effect=_run) as mock_run:
+            extracted = extract_subtitle_tracks('/path/movie.mkv', outputs)
+
+        assert extracted == {0}
+        assert mock_run.call_count == 3
+        assert not os.path.exists(outputs[1][1])
+
+
+class TestSubtitlePrewarmRuntimeService:
+    """Indexing hands new videos to the pre-extraction queue."""
+
+    def test_queue_is_deduplicated_and_drained_in_order(self, app_context):
+        from app.services.media.subtitle_prewarm_runtime_service import (
+            SubtitlePrewarmRuntimeService,
+        )
+
+        service = SubtitlePrewarmRuntimeService()
+        service.start()
+        try:
+            with patch('app.services.media.subtitle_service.is_subtitles_enabled', return_value=True):
+                assert service.queue_videos(['/m/a.mkv', '/m/b.mkv', '/m/a.mkv']) == 2
+            with patch('app.services.media.subtitle_service.get_subtitles_for_video') as mock_get:
+                assert service.process_pending() == 2
+            assert [call.args[0] for call in mock_get.call_args_list] == ['/m/a.mkv', '/m/b.mkv']
+            assert service.state['pending'] == 0
+        finally:
+            service.stop()
+
+    def test_nothing_is_queued_when_subtitles_are_disabled(self, app_context):
+        from app.services.media.subtitle_prewarm_runtime_service import (
+            SubtitlePrewarmRuntimeService,
+        )
+
+        service = SubtitlePrewarmRuntimeService()
+        service.start()
+        try:
+            with patch('app.services.media.subtitle_service.is_subtitles_enabled', return_value=False):
+                assert service.queue_videos(['/m/a.mkv']) == 0
+        finally:
+            service.stop()
@@ -305,6 +305,110 @@ class TestThumbnailRuntimeService:
             assert service._thumbnail_queue.qsize() == 0
 
 
+class TestThumbnailBatching:
+    """Tests for batched video thumbnails and probe reuse."""
+
+    def _service(self):
+        from unittest.mock import patch
+
+        with (
+            patch('app.services.media.thumbnail_runtime_service.get_max_concurrent_tasks', return_value=2),
+            patch('app.services.media.thumbnail_runtime_service.get_max_queue_size', return_value=500),
+        ):
+            return ThumbnailRuntimeService()
+
+    @staticmethod
+    def _task(rel_path, media_type):
+        return {
+            'category_path': '/media/Movies',
+            'category_id': 'movies',
+            'file_meta': {'path': rel_path, 'name': rel_path, 'type': media_type},
+            'force_refresh': False,
+            'task_key': f'movies|{rel_path}|0',
+            '_queue_origin': 'regular',
+        }
+
+    def test_take_video_batch_drains_queued_videos_until_non_video(self):
+        """Queued videos join the batch; a non-video task ends it."""
+        service = self._service()
+        for name in ('b.mp4', 'c.mp4', 'd.jpg', 'e.mp4'):
+            service._thumbnail_queue.put_nowait(
+                self._task(name, 'image' if name.endswith('.jpg') else 'video')
+            )
+
+        batch = service._take_video_batch(self._task('a.mp4', 'video'))
+
+        assert [t['file_meta']['path'] for t in batch] == ['b.mp4', 'c.mp4', 'd.jpg']
+        assert service._thumbnail_queue.qsize() == 1
+
+    def test_take_video_batch_skips_image_tasks(self):
+        """Image tasks are processed on their own."""
+        service = self._service()
+        service._thumbnail_queue.put_nowait(self._task('b.mp4', 'video'))
+
+        assert service._take_video_batch(self._task('a.jpg', 'image')) == []
+        assert service._thumbnail_queue.qsize() == 1
+
+    def test_resolve_video_probe_reuses_stored_result(self, app_context, tmp_path):
+        """Unchanged files reuse the probe stored alongside media_index."""
+        from unittest.mock import patch
+
+        media = tmp_path / 'clip.mp4'
+        media.write_bytes(b'video')
+        service = self._service()
+        job = {'category_id': 'movies', 'filename': 'clip.mp4', 'abs_path': str(media)}
+
+        with patch(
+            'app.services.media.thumbnail_runtime_service.probe_video',
+            return_value={'has_video': True, 'duration': 42.0},
+        ) as mock_probe:
+            first = service._resolve_video_probe(job)
+            second = service._resolve_video_probe(job)
+
+        assert first == second == {'has_video': True, 'duration': 42.0}
+        mock_probe.assert_called_once()
+        stats = service.get_performance_stats()
+        assert stats['probe_cache_hits'] == 1
+        assert stats['probe_cache_misses'] == 1
+
+    def test_process_thumbnail_batch_uses_single_generator_call(self, app, app_context, tmp_path):
+        """Several video tasks are handed to one batched ffmpeg run."""
+        from unittest.mock import MagicMock, patch
+
+        category = tmp_path / 'Movies'
+        category.mkdir()
+        tasks = []
+        for name in ('a.mp4', 'b.mp4', 'c.mp4'):
+            (category / name).write_bytes(b'video')
+            task = self._task(name, 'video')
+            task['category_path'] = str(category)
+            tasks.append(task)
+
+        service = self._service()
+        service_manager = MagicMock()
+        service_manager.app = app
+
+        def fake_batch(jobs, size=None):
+            return {job['thumbnail_path']: True for job in jobs}, 1
+
+        with (
+            patch('app.services.media.thumbnail_runtime_service.registry.require', return_value=service_manager),
+            patch('app.services.media.thumbnail_runtime_service.probe_video', return_value=None),
+            patch(
+                'app.services.media.thumbnail_runtime_service.generate_video_thumbnails_batch',
+                side_effect=fake_batch,
+            ) as mock_batch,
+            patch.object(service, '_update_thumbnail_category_stats') as mock_stats,
+        ):
+            service._process_thumbnail_batch(tasks)
+
+        mock_batch.assert_called_once()
+        assert len(mock_batch.call_args[0][0]) == 3
+        assert mock_stats.call_count == 3
+        assert all(call.kwargs['success'] for call in mock_stats.call_args_list)
+        assert service.get_performance_stats()['ffmpeg_runs'] == 1
+
+
 class TestPerformanceMonitor:
     """Tests for PerformanceMonitor class."""
 
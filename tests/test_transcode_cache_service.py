@@ -6,11 +6,14 @@ Cache integrity for transcoded media files. If this breaks:
 - Cache grows unbounded (fills SD card)
 - Performance tanks from redundant transcoding
 
-Tests are filesystem-based (uses tmp_path), no mocking of file I/O.
+Tests are filesystem-based (uses tmp_path), no mocking of file I/O. The
+cache index itself lives in SQLite, so fixtures run inside app_context.
 """
 import os
 import json
 import time
+from datetime import datetime
+
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -24,14 +27,24 @@ from app.services.ghoststream.transcode_cache_service import (
     cleanup_old_cache,
     cleanup_cache_by_size,
     get_transcoded_filename,
+    get_cache_totals,
     _generate_cache_key,
     _load_cache_index,
-    _save_cache_index,
 )
 
 
+def _set_last_accessed(category_dir, filename, timestamp):
+    from app.services.core.sqlite_runtime_service import get_db
+
+    with get_db() as conn:
+        conn.execute(
+            "UPDATE transcode_cache SET last_accessed = ? WHERE category_path = ? AND cache_key = ?",
+            (timestamp, os.path.normpath(category_dir), _generate_cache_key(filename)),
+        )
+
+
 @pytest.fixture
-def category_dir(tmp_path):
+def category_dir(tmp_path, app_context):
     """Create a temporary category directory with .ghosthub/transcoded structure."""
     cat_dir = tmp_path / "Movies" / "Action"
     cat_dir.mkdir(parents=True)
@@ -107,23 +120,14 @@ class TestCacheKeyGeneration:
         assert len(key) > 0
 
 
-# ─── Cache Index Persistence ──────────────────────────────────────────────────
+# ─── Legacy Index Import ──────────────────────────────────────────────────────
 
-class TestCacheIndex:
+class TestLegacyCacheIndex:
     def test_load_empty_index(self, category_dir):
         """Missing index file should return empty dict."""
         index = _load_cache_index(category_dir)
         assert index == {}
 
-    def test_save_and_load_roundtrip(self, category_dir):
-        test_index = {
-            "key1": {"path": "/some/path.mp4", "size": 1000},
-            "key2": {"path": "/other/path.mp4", "size": 2000}
-        }
-        _save_cache_index(category_dir, test_index)
-        loaded = _load_cache_index(category_dir)
-        assert loaded == test_index
-
     def test_corrupted_index_returns_empty(self, category_dir):
         """Corrupted JSON should not crash, just return empty."""
         index_path = get_cache_index_path(category_dir)
@@ -133,6 +137,32 @@ class TestCacheIndex:
         index = _load_cache_index(category_dir)
         assert index == {}
 
+    def test_json_index_is_imported_once(self, category_dir):
+        """Existing cache_index.json entries move into SQLite and the file is retired."""
+        cached_file = os.path.join(get_cache_path(category_dir), "legacy_h264.mp4")
+        with open(cached_file, "wb") as f:
+            f.write(b"x" * 700)
+        index_path = get_cache_index_path(category_dir)
+        with open(index_path, "w") as f:
+            json.dump({
+                _generate_cache_key("legacy.mkv"): {
+                    "original_filename": "legacy.mkv",
+                    "path": cached_file,
+                    "resolution": "original",
+                    "video_codec": "h264",
+                    "audio_codec": "aac",
+                    "file_size": 700,
+                    "source_size": 7000,
+                    "created_at": "2025-01-01T00:00:00",
+                    "last_accessed": "2025-01-02T00:00:00",
+                },
+            }, f)
+
+        assert get_cached_file(category_dir, "legacy.mkv") == cached_file
+        assert not os.path.exists(index_path)
+        assert os.path.exists(f"{index_path}.migrated")
+        assert get_cache_totals(category_dir) == {"file_count": 1, "total_size_bytes": 700}
+
 
 # ─── Cache CRUD ───────────────────────────────────────────────────────────────
 
@@ -247,11 +277,7 @@ class TestCacheCleanup:
         )
 
         # Patch the last_accessed time to be very old
-        from datetime import datetime
-        index = _load_cache_index(category_dir)
-        for key in index:
-            index[key]["last_accessed"] = datetime.fromtimestamp(time.time() - (100 * 86400)).isoformat()
-        _save_cache_index(category_dir, index)
+        _set_last_accessed(category_dir, "old_movie.mkv", time.time() - (100 * 86400))
 
         # Set the file mtime to be old too
         old_time = time.time() - (100 * 86400)
@@ -286,12 +312,50 @@ class TestCacheCleanup:
             )
 
             # Make different last_accessed times
-            index = _load_cache_index(category_dir)
-            for key in index:
-                if f"video{i}" in key:
-                    index[key]["last_accessed"] = now - age_offset
-            _save_cache_index(category_dir, index)
+            _set_last_accessed(category_dir, f"video{i}.mkv", now - age_offset)
 
         # Cleanup with 1MB max: all 3 files = 1.5MB > 1MB → should remove at least one
         cleaned = cleanup_cache_by_size(category_dir, max_size_gb=0.001)  # 1MB
         assert cleaned >= 1
+        assert get_cached_file(category_dir, "video0.mkv") is None
+        assert get_cached_file(category_dir, "video2.mkv") is not None
+        assert get_cache_totals(category_dir)["total_size_bytes"] <= 1024 * 1024
+
+
+# ─── Size Accounting ──────────────────────────────────────────────────────────
+
+class TestCacheTotals:
+    def test_totals_follow_add_replace_and_remove(self, populated_cache):
+        category_dir, cached_file = populated_cache
+        assert get_cache_totals(category_dir) == {"file_count": 1, "total_size_bytes": 5000}
+
+        add_cached_file(category_dir, "movie.mkv", cached_file, file_size=6000)
+        assert get_cache_totals(category_dir) == {"file_count": 1, "total_size_bytes": 6000}
+
+        remove_cached_file(category_dir, "movie.mkv")
+        assert get_cache_totals(category_dir) == {"file_count": 0, "total_size_bytes": 0}
+
+    def test_global_totals_span_categories(self, populated_cache, tmp_path):
+        other_dir = str(tmp_path / "Shows")
+        os.makedirs(other_dir)
+        add_cached_file(other_dir, "episode.mkv", os.path.join(other_dir, "episode.mp4"), file_size=250)
+
+        assert get_cache_totals() == {"file_count": 2, "total_size_bytes": 5250}
+
+
+class TestAccessTouch:
+    def test_recent_hits_skip_the_last_accessed_write(self, populated_cache):
+        category_dir, _ = populated_cache
+
+        with patch('app.services.ghoststream.transcode_cache_service.run_write') as mock_write:
+            assert get_cached_file(category_dir, "movie.mkv") is not None
+        mock_write.assert_not_called()
+
+    def test_stale_hits_refresh_last_accessed(self, populated_cache):
+        category_dir, _ = populated_cache
+        _set_last_accessed(category_dir, "movie.mkv", time.time() - 3600)
+
+        get_cached_file(category_dir, "movie.mkv")
+
+        entry = get_cache_stats(category_dir)["entries"][0]
+        assert entry["last_accessed"] > datetime.fromtimestamp(time.time() - 60).isoformat()